@@ -2,7 +2,15 @@
 健康检查API端点
 """
 from fastapi import APIRouter
+from app.core.config import settings
 from app.models.resume import ErrorResponse
+from app.services.storage_tiering_service import storage_tiering_service
+from app.services.llm_router import llm_router
+from app.services.llm_dispatcher import llm_dispatcher
+from app.services.llm_packer import llm_packer
+from app.services.resume_service import parse_singleflight
+from app.services.task_scheduler import task_scheduler
+from app.prompts import get_prompt, list_prompts
 
 router = APIRouter()
 
@@ -19,3 +27,40 @@ async def health_check():
 async def ping():
     """简单的ping测试"""
     return {"message": "pong"}
+
+@router.get("/storage", summary="存储分层报告")
+async def storage_report():
+    """按存储编码统计文件数和大小，以及冷文件压缩节省的空间"""
+    report = storage_tiering_service.get_report()
+    return {
+        "backend": settings.STORAGE_BACKEND,
+        "tiering_enabled": settings.TIERING_ENABLED,
+        **report
+    }
+
+@router.get("/prompts", summary="提示词版本")
+async def prompt_versions():
+    """已注册的提示词版本及当前使用的版本"""
+    return {
+        "current": get_prompt().to_dict(),
+        "prompts": [prompt.to_dict() for prompt in list_prompts()]
+    }
+
+@router.get("/llm", summary="LLM服务状态")
+async def llm_status():
+    """LLM配额调度和请求合并状态，以及各端点的熔断器状态、在途请求数、延迟EWMA及请求、重试、失败次数"""
+    return {
+        "dispatcher": llm_dispatcher.get_status(),
+        "packer": llm_packer.get_status(),
+        "endpoints": llm_router.get_status()
+    }
+
+@router.get("/parsing", summary="解析去重统计")
+async def parsing_status():
+    """进行中的解析数，以及相同文件并发解析时实际执行和共用结果的次数"""
+    return parse_singleflight.get_status()
+
+@router.get("/scheduler", summary="解析任务调度状态")
+async def scheduler_status():
+    """各优先级通道的权重、排队数、执行数和排队等待时间"""
+    return task_scheduler.get_status()
@@ -6,8 +6,8 @@ from datetime import datetime, date
 from typing import Optional
 import random
 import json
-import requests
 from app.core.config import settings
+from app.services.llm_router import llm_router
 
 router = APIRouter()
 
@@ -30,12 +30,15 @@ INSPIRATION_TEMPLATES = [
     "梦想照进现实，需要的是行动和坚持。今天也要为梦想努力！"
 ]
 
+# 生成激励语的请求超时（秒），页面加载时调用，不宜等待太久
+INSPIRATION_TIMEOUT = 30
+
 # 存储每日激励语的简单缓存（实际项目中应该使用数据库）
 daily_inspiration_cache = {}
 
 async def generate_inspiration_with_llm() -> str:
     """使用LLM生成激励语"""
-    if not settings.SILICONFLOW_API_KEY:
+    if not llm_router.configured:
         # 如果没有API Key，使用模板库
         return random.choice(INSPIRATION_TEMPLATES)
     
@@ -82,7 +85,6 @@ async def generate_inspiration_with_llm() -> str:
 """
         
         payload = {
-            "model": settings.LLM_MODEL,
             "messages": [
                 {
                     "role": "system",
@@ -98,15 +100,10 @@ async def generate_inspiration_with_llm() -> str:
             "top_p": settings.LLM_TOP_P  # 添加top_p参数
         }
         
-        headers = {
-            "Authorization": f"Bearer {settings.SILICONFLOW_API_KEY}",
-            "Content-Type": "application/json"
-        }
-        
-        response = requests.post(settings.SILICONFLOW_API_URL, json=payload, headers=headers)
-        response.raise_for_status()
-        
-        result = response.json()
+        # 与简历解析共用端点路由、重试和熔断；没有可用端点时不等待，直接使用模板库
+        async with llm_router.request(payload, wait=False, max_retries=1, timeout=INSPIRATION_TIMEOUT) as response:
+            response.raise_for_status()
+            result = response.json()
         
         # 提取LLM返回的文本
         if 'choices' in result and len(result['choices']) > 0:
@@ -170,7 +167,7 @@ async def get_daily_inspiration():
             "inspiration": inspiration,
             "date": today,
             "timestamp": datetime.now().isoformat(),
-            "source": "llm" if settings.SILICONFLOW_API_KEY else "template"
+            "source": "llm" if llm_router.configured else "template"
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"生成激励语失败: {str(e)}")
@@ -192,7 +189,7 @@ async def refresh_daily_inspiration():
             "date": today,
             "timestamp": datetime.now().isoformat(),
             "refreshed": True,
-            "source": "llm" if settings.SILICONFLOW_API_KEY else "template"
+            "source": "llm" if llm_router.configured else "template"
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"刷新激励语失败: {str(e)}")
@@ -1,13 +1,102 @@
 """
 任务管理API端点
 """
-from typing import List, Optional
-from fastapi import APIRouter, HTTPException, Query
-from app.models.resume import TaskResponse, ErrorResponse
+import json
+from datetime import datetime
+from typing import List, Optional, Dict, Any, AsyncGenerator
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from app.core.config import settings
+from app.models.resume import (
+    TaskResponse, ErrorResponse, TaskStatus,
+    TaskStatusQuery, TaskStatusItem, TaskStatusBatchResponse, BatchProgressResponse,
+    ReprocessRequest, ReprocessJobResponse
+)
 from app.services.task_service import TaskService
+from app.services.database_service import db_service
+from app.services.reprocess_service import reprocess_service
+from app.services.task_events import task_event_broker
 
 router = APIRouter()
 
+# 终态任务，推送后即可结束订阅
+TERMINAL_STATUSES = {TaskStatus.COMPLETED.value, TaskStatus.FAILED.value}
+
+def _format_sse(event: str, data: Dict[str, Any]) -> str:
+    """格式化SSE消息"""
+    payload = json.dumps(data, ensure_ascii=False, default=str)
+    return f"event: {event}\ndata: {payload}\n\n"
+
+async def _task_event_stream(request: Request, task_ids: List[str]) -> AsyncGenerator[str, None]:
+    """
+    任务事件流生成器
+    
+    先订阅再发送当前状态快照，避免快照与订阅之间的事件丢失；
+    所有任务进入终态或客户端断开后结束。
+    """
+    task_service = TaskService()
+    subscription = task_event_broker.subscribe(task_ids)
+    pending = set(subscription.task_ids)
+    
+    try:
+        yield f"retry: {settings.SSE_RETRY_INTERVAL}\n\n"
+        
+        # 发送当前状态快照
+        for task_id in subscription.task_ids:
+            task = await task_service.get_task(task_id)
+            if not task:
+                yield _format_sse("error", {"task_id": task_id, "error": "任务不存在"})
+                pending.discard(task_id)
+                continue
+            
+            snapshot = {
+                "task_id": task.id,
+                "status": task.status.value,
+                "progress": task.progress,
+                "error": task.error,
+                "updated_at": task.updated_at.isoformat() if task.updated_at else None
+            }
+            if task.status == TaskStatus.COMPLETED and task.result:
+                snapshot["result"] = task.result.dict()
+            elif task.partial_result:
+                snapshot["partial_result"] = task.partial_result.dict()
+            yield _format_sse("status", snapshot)
+            
+            if task.status.value in TERMINAL_STATUSES:
+                pending.discard(task_id)
+        
+        # 推送增量事件
+        while pending:
+            if await request.is_disconnected():
+                break
+            
+            message = await subscription.get(timeout=settings.SSE_HEARTBEAT_INTERVAL)
+            if message is None:
+                # 心跳注释，防止代理断开空闲连接
+                yield ": keep-alive\n\n"
+                continue
+            
+            yield _format_sse(message["event"], message["data"])
+            
+            if message["data"].get("status") in TERMINAL_STATUSES:
+                pending.discard(message["data"]["task_id"])
+        
+        yield _format_sse("end", {"task_ids": subscription.task_ids})
+    finally:
+        subscription.close()
+
+def _event_stream_response(request: Request, task_ids: List[str]) -> StreamingResponse:
+    """创建SSE响应"""
+    return StreamingResponse(
+        _task_event_stream(request, task_ids),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no"  # 禁用Nginx缓冲
+        }
+    )
+
 @router.get("/", response_model=List[TaskResponse], summary="获取所有任务")
 async def get_all_tasks(
     limit: int = Query(100, ge=1, le=1000, description="返回任务数量限制"),
@@ -43,6 +132,165 @@ async def get_all_tasks(
             detail=f"获取任务列表失败: {str(e)}"
         )
 
+@router.post("/status", response_model=TaskStatusBatchResponse, summary="批量获取任务状态")
+async def get_task_statuses(query: TaskStatusQuery):
+    """
+    批量获取多个任务的状态（单次查询，仅返回状态、进度、错误和时间字段）
+    
+    - **task_ids**: 任务ID列表
+    - **changed_since**: 可选，仅返回此时间之后状态有变化的任务；
+      可直接使用上次响应中的 server_time
+    """
+    task_ids = list(dict.fromkeys(query.task_ids))
+    if len(task_ids) > settings.TASK_STATUS_BATCH_LIMIT:
+        raise HTTPException(
+            status_code=400,
+            detail=f"单次最多查询 {settings.TASK_STATUS_BATCH_LIMIT} 个任务"
+        )
+    
+    try:
+        # 先取服务器时间，保证下次以此为基准时不会漏掉查询期间的变化
+        server_time = datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
+        
+        task_service = TaskService()
+        statuses = await task_service.get_task_statuses(task_ids, query.changed_since)
+        
+        return TaskStatusBatchResponse(
+            tasks=[TaskStatusItem(**item) for item in statuses["tasks"]],
+            missing=statuses["missing"],
+            server_time=server_time
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"批量获取任务状态失败: {str(e)}"
+        )
+
+@router.get("/batches/{batch_id}", response_model=BatchProgressResponse, summary="获取批次进度")
+async def get_batch_progress(batch_id: str):
+    """
+    获取批量上传批次的聚合进度
+    
+    - **batch_id**: 批次ID
+    """
+    try:
+        task_service = TaskService()
+        progress = await task_service.get_batch_progress(batch_id)
+        
+        if not progress:
+            raise HTTPException(
+                status_code=404,
+                detail="批次不存在"
+            )
+        
+        return BatchProgressResponse(**progress)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"获取批次进度失败: {str(e)}"
+        )
+
+@router.post("/reprocess", response_model=ReprocessJobResponse, summary="批量重新解析")
+async def start_reprocess(request: ReprocessRequest):
+    """
+    基于已保存的提取文本批量仅重跑LLM解析（不重新提取文本和OCR）
+    
+    - **created_from / created_to**: 任务创建时间范围
+    - **failed_only**: 仅失败的任务
+    - **llm_model**: 仅由该模型解析的任务
+    - **prompt_version**: 仅由该提示词版本解析的任务
+    - **outdated_only**: 仅非当前模型或非当前提示词版本解析的任务
+    - **concurrency**: LLM并发数
+    """
+    try:
+        filters = request.dict(exclude={"limit", "concurrency"})
+        job = reprocess_service.start_job(filters, request.limit, request.concurrency)
+        return ReprocessJobResponse(**job)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"创建重新解析作业失败: {str(e)}"
+        )
+
+@router.get("/reprocess", response_model=List[ReprocessJobResponse], summary="获取重新解析作业列表")
+async def list_reprocess_jobs():
+    """获取最近的重新解析作业及进度"""
+    return [ReprocessJobResponse(**job) for job in reprocess_service.list_jobs()]
+
+@router.get("/reprocess/{job_id}", response_model=ReprocessJobResponse, summary="获取重新解析作业进度")
+async def get_reprocess_job(job_id: str):
+    """
+    获取重新解析作业的进度
+    
+    - **job_id**: 作业ID
+    """
+    job = reprocess_service.get_job(job_id)
+    if not job:
+        raise HTTPException(
+            status_code=404,
+            detail="作业不存在"
+        )
+    return ReprocessJobResponse(**job)
+
+@router.delete("/reprocess/{job_id}", summary="取消重新解析作业")
+async def cancel_reprocess_job(job_id: str):
+    """
+    取消重新解析作业，正在解析的任务会继续完成
+    
+    - **job_id**: 作业ID
+    """
+    if not reprocess_service.cancel_job(job_id):
+        raise HTTPException(
+            status_code=404,
+            detail="作业不存在或已结束"
+        )
+    return {"message": "作业已取消"}
+
+@router.get("/llm-usage", summary="LLM解析用量统计")
+async def get_llm_usage(since: Optional[datetime] = Query(None, description="只统计该时间之后创建的任务")):
+    """
+    按模型级别（fast 快速模型 / strong 主模型）统计已完成任务的LLM解析用量
+    
+    返回每个级别的任务数、从快速模型升级的任务数、平均耗时（秒）、平均token数、平均和总费用（元）
+    """
+    since_value = since.replace(tzinfo=None).isoformat() if since else None
+    return db_service.get_llm_usage_statistics(since_value)
+
+@router.get("/events", summary="订阅多个任务的进度事件")
+async def stream_tasks_events(
+    request: Request,
+    task_ids: str = Query(..., description="任务ID列表，逗号分隔")
+):
+    """
+    以Server-Sent Events方式推送多个任务的状态和阶段进度
+    
+    - **task_ids**: 任务ID列表，逗号分隔
+    
+    事件类型：status（状态/进度变化）、error（任务不存在）、end（全部结束）。
+    所有任务完成或失败后服务端关闭连接；轮询接口仍可作为后备。
+    """
+    ids = [task_id.strip() for task_id in task_ids.split(",") if task_id.strip()]
+    if not ids:
+        raise HTTPException(status_code=400, detail="请提供至少一个任务ID")
+    if len(ids) > settings.SSE_MAX_TASKS_PER_STREAM:
+        raise HTTPException(
+            status_code=400,
+            detail=f"单个事件流最多订阅 {settings.SSE_MAX_TASKS_PER_STREAM} 个任务"
+        )
+    
+    return _event_stream_response(request, ids)
+
+@router.get("/{task_id}/events", summary="订阅任务进度事件")
+async def stream_task_events(request: Request, task_id: str):
+    """
+    以Server-Sent Events方式推送单个任务的状态和阶段进度
+    
+    - **task_id**: 任务唯一标识符
+    """
+    return _event_stream_response(request, [task_id])
+
 @router.get("/{task_id}", response_model=TaskResponse, summary="获取任务详情")
 async def get_task(task_id: str):
     """
@@ -69,7 +317,15 @@ async def get_task(task_id: str):
             error=task.error,
             created_at=task.created_at.isoformat(),
             updated_at=task.updated_at.isoformat() if task.updated_at else None,
-            completed_at=task.completed_at.isoformat() if task.completed_at else None
+            completed_at=task.completed_at.isoformat() if task.completed_at else None,
+            llm_model=task.llm_model,
+            prompt_version=task.prompt_version,
+            llm_tier=task.llm_tier,
+            lane=task.lane,
+            cost_class=task.cost_class,
+            probe=task.probe,
+            parse_stats=task.parse_stats,
+            partial_result=task.partial_result.dict() if task.partial_result else None
         )
     except HTTPException:
         raise
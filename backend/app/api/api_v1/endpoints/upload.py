@@ -3,23 +3,36 @@
 """
 import os
 import uuid
+from typing import List
 from urllib.parse import quote
-from fastapi import APIRouter, File, UploadFile, HTTPException, BackgroundTasks, Query
-from fastapi.responses import Response
+from fastapi import APIRouter, File, UploadFile, HTTPException, Query, Request
 from app.core.config import settings
-from app.models.resume import UploadResponse, UploadTask, TaskStatus
-from app.services.file_service import FileService
+from app.models.resume import (
+    UploadResponse, UploadTask, TaskStatus, BatchUploadResponse, RejectedFile
+)
+from app.services.file_service import FileService, FileValidationError
 from app.services.task_service import TaskService
 from app.services.resume_service import ResumeService
+from app.services.task_scheduler import task_scheduler, LANES, LANE_INTERACTIVE, LANE_BULK
+from app.utils.file_probe import COST_OCR
 from app.services.database_service import db_service
+from app.utils.file_response import build_storage_response
 
 router = APIRouter()
 
+def _validate_lane(lane: str):
+    """校验调度优先级通道"""
+    if lane not in LANES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"未知的调度通道: {lane}。可选: {', '.join(LANES)}"
+        )
+
 @router.post("/", response_model=UploadResponse, summary="上传简历文件")
 async def upload_resume(
-    background_tasks: BackgroundTasks,
     file: UploadFile = File(..., description="简历文件"),
-    force_update: bool = Query(False, description="是否强制更新已存在的候选人")
+    force_update: bool = Query(False, description="是否强制更新已存在的候选人"),
+    lane: str = Query(LANE_INTERACTIVE, description="调度优先级通道：interactive / bulk")
 ):
     """
     上传简历文件并开始解析
@@ -33,7 +46,10 @@ async def upload_resume(
     
     参数：
     - force_update: 如果候选人已存在，是否强制更新
+    - lane: 调度优先级通道，默认 interactive（优先解析）；后台导入等不急的上传可指定 bulk
     """
+    _validate_lane(lane)
+    
     # 验证文件类型
     if file.content_type not in settings.ALLOWED_FILE_TYPES:
         raise HTTPException(
@@ -41,37 +57,47 @@ async def upload_resume(
             detail=f"不支持的文件类型: {file.content_type}。支持的类型: {', '.join(settings.ALLOWED_FILE_TYPES)}"
         )
     
-    # 验证文件大小
-    if file.size > settings.MAX_FILE_SIZE:
+    # 验证文件大小（客户端声明的大小仅用于提前拒绝，实际大小在写入时强制校验）
+    if file.size is not None and file.size > settings.MAX_FILE_SIZE:
         raise HTTPException(
             status_code=400,
             detail=f"文件大小超过限制。最大允许: {settings.MAX_FILE_SIZE // (1024*1024)}MB"
         )
     
+    saved = None
     try:
         # 生成唯一任务ID
         task_id = str(uuid.uuid4())
         
-        # 保存文件
+        # 流式保存文件，同时探测解析成本（是否需要OCR），决定进入哪个工作池
         file_service = FileService()
-        file_path = await file_service.save_upload_file(file, task_id)
+        saved = await file_service.save_upload_file(file, task_id)
+        probe = saved["probe"]
         
         # 创建任务记录
         task_service = TaskService()
         task = UploadTask(
             id=task_id,
             filename=file.filename,
-            file_path=file_path,
-            file_size=file.size,
+            file_path=saved["file_path"],
+            file_size=saved["file_size"],
             file_type=file.content_type,
-            status=TaskStatus.UPLOADED
+            file_hash=saved["file_hash"],
+            status=TaskStatus.UPLOADED,
+            lane=lane,
+            cost_class=probe["cost_class"],
+            probe=probe
         )
         
-        await task_service.create_task(task)
+        if not await task_service.create_task(task):
+            raise RuntimeError("创建任务记录失败")
         
-        # 后台处理文件解析，传递force_update参数
+        # 按优先级通道排队解析，传递force_update参数
         resume_service = ResumeService()
-        background_tasks.add_task(resume_service.process_resume, task_id, force_update)
+        task_scheduler.submit(
+            lane, resume_service.process_resume, task_id, force_update, bulk=lane == LANE_BULK,
+            pool=task.cost_class, task_id=task_id
+        )
         
         return UploadResponse(
             task_id=task_id,
@@ -80,13 +106,153 @@ async def upload_resume(
             message="文件上传成功，开始解析..."
         )
         
+    except FileValidationError as e:
+        raise HTTPException(
+            status_code=400,
+            detail=str(e)
+        )
     except Exception as e:
+        # 文件已保存但任务未创建时释放文件，避免留下孤儿文件
+        if saved:
+            await TaskService().release_file(saved["file_path"], saved["file_hash"])
         raise HTTPException(
             status_code=500,
             detail=f"文件上传失败: {str(e)}"
         )
 
 
+@router.post("/batch", response_model=BatchUploadResponse, summary="批量上传简历文件")
+async def upload_resume_batch(
+    files: List[UploadFile] = File(..., description="简历文件或ZIP压缩包，可多选"),
+    force_update: bool = Query(False, description="是否强制更新已存在的候选人"),
+    lane: str = Query(LANE_BULK, description="调度优先级通道：interactive / bulk")
+):
+    """
+    批量上传多个简历文件或ZIP压缩包，并作为一个批次开始解析
+    
+    - 支持同时上传多个简历文件（PDF、Word、图片）
+    - 支持ZIP压缩包，服务端逐个成员流式解压，不支持的文件会被跳过
+    - 所有任务在单个事务中创建，并共享同一个批次ID
+    - 默认进入 bulk 通道排队，不占用为单份上传保留的解析能力
+    
+    批次整体进度可通过 `GET /tasks/batches/{batch_id}` 查询。
+    """
+    _validate_lane(lane)
+    batch_id = str(uuid.uuid4())
+    file_service = FileService()
+    saved_files = []
+    rejected = []
+    
+    try:
+        for file in files:
+            if len(saved_files) >= settings.BATCH_MAX_FILES:
+                rejected.append({"filename": file.filename, "reason": f"超过单批次最多 {settings.BATCH_MAX_FILES} 个文件的限制"})
+                continue
+            
+            if file_service.is_zip_upload(file):
+                if file.size is not None and file.size > settings.BATCH_MAX_ARCHIVE_SIZE:
+                    rejected.append({"filename": file.filename, "reason": "压缩包大小超过限制"})
+                    continue
+                
+                extracted, archive_rejected = await file_service.extract_zip_upload(
+                    file, settings.BATCH_MAX_FILES - len(saved_files)
+                )
+                saved_files.extend(extracted)
+                rejected.extend(archive_rejected)
+                continue
+            
+            if file.content_type not in settings.ALLOWED_FILE_TYPES:
+                rejected.append({"filename": file.filename, "reason": f"不支持的文件类型: {file.content_type}"})
+                continue
+            
+            if file.size is not None and file.size > settings.MAX_FILE_SIZE:
+                rejected.append({"filename": file.filename, "reason": "文件大小超过限制"})
+                continue
+            
+            task_id = str(uuid.uuid4())
+            try:
+                saved = await file_service.save_upload_file(file, task_id)
+            except FileValidationError as e:
+                rejected.append({"filename": file.filename, "reason": str(e)})
+                continue
+            
+            saved_files.append({
+                "task_id": task_id,
+                "filename": file.filename,
+                "file_path": saved["file_path"],
+                "file_size": saved["file_size"],
+                "file_type": file.content_type,
+                "file_hash": saved["file_hash"],
+                "probe": saved["probe"]
+            })
+        
+        if not saved_files:
+            raise HTTPException(
+                status_code=400,
+                detail="没有可解析的简历文件"
+            )
+        
+        # 单个事务批量创建任务记录
+        tasks = [
+            UploadTask(
+                id=item["task_id"],
+                filename=item["filename"],
+                file_path=item["file_path"],
+                file_size=item["file_size"],
+                file_type=item["file_type"],
+                file_hash=item["file_hash"],
+                status=TaskStatus.UPLOADED,
+                batch_id=batch_id,
+                lane=lane,
+                cost_class=item["probe"]["cost_class"],
+                probe=item["probe"]
+            )
+            for item in saved_files
+        ]
+        
+        task_service = TaskService()
+        if not await task_service.create_tasks(tasks):
+            raise RuntimeError("创建任务记录失败")
+        
+        # 批次内的任务逐个进入优先级通道排队
+        resume_service = ResumeService()
+        for task in tasks:
+            task_scheduler.submit(
+                lane, resume_service.process_resume, task.id, force_update, bulk=lane == LANE_BULK,
+                pool=task.cost_class, task_id=task.id
+            )
+        ocr_count = sum(1 for task in tasks if task.cost_class == COST_OCR)
+        print(f"批次 {batch_id} 共 {len(tasks)} 个任务进入 {lane} 通道（需OCR {ocr_count} 个）")
+        
+        return BatchUploadResponse(
+            batch_id=batch_id,
+            total=len(tasks),
+            tasks=[
+                UploadResponse(
+                    task_id=task.id,
+                    filename=task.filename,
+                    status=task.status,
+                    message="等待解析"
+                )
+                for task in tasks
+            ],
+            rejected=[RejectedFile(**item) for item in rejected],
+            message=f"已上传 {len(tasks)} 个文件，开始批量解析..."
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        # 清理已保存且无其他任务引用的文件，避免留下孤儿文件
+        task_service = TaskService()
+        for item in saved_files:
+            await task_service.release_file(item["file_path"], item.get("file_hash"))
+        raise HTTPException(
+            status_code=500,
+            detail=f"批量上传失败: {str(e)}"
+        )
+
+
 @router.post("/check-duplicate", summary="检查候选人是否已存在")
 async def check_duplicate(
     name: str = Query(..., description="候选人姓名"),
@@ -128,13 +294,14 @@ async def check_duplicate(
 
 
 @router.get("/download/{task_id}", summary="下载简历文件")
-async def download_resume(task_id: str):
+async def download_resume(task_id: str, request: Request):
     """
     下载指定任务的简历文件
     
     - **task_id**: 任务唯一标识符
     
-    文件名将使用候选人姓名（如果有的话）
+    文件名将使用候选人姓名（如果有的话）。
+    文件以流式发送，支持 Range 分段请求和基于内容哈希的 ETag 缓存校验。
     """
     try:
         # 获取任务信息
@@ -147,13 +314,6 @@ async def download_resume(task_id: str):
                 detail="任务不存在"
             )
         
-        # 检查文件是否存在
-        if not os.path.exists(task.file_path):
-            raise HTTPException(
-                status_code=404,
-                detail="文件不存在"
-            )
-        
         # 尝试获取候选人姓名作为文件名
         candidate = db_service.get_candidate_by_task_id(task_id)
         print(f"📥 下载请求 task_id={task_id}, 候选人={candidate.name if candidate else 'None'}")
@@ -172,10 +332,6 @@ async def download_resume(task_id: str):
             download_filename = original_filename
             print(f"⚠️ 未找到候选人，使用原始文件名: {download_filename}")
         
-        # 读取文件内容
-        with open(task.file_path, 'rb') as f:
-            file_content = f.read()
-        
         # 正确编码文件名以支持中文
         # RFC 5987 编码方式
         encoded_filename = quote(download_filename, safe='')
@@ -186,19 +342,36 @@ async def download_resume(task_id: str):
         # 确定媒体类型
         media_type = task.file_type or 'application/octet-stream'
         
-        # 创建响应
-        response = Response(
-            content=file_content,
-            media_type=media_type
-        )
-        
         # 设置Content-Disposition头
         # filename 使用 ASCII 安全的名称，filename* 使用 UTF-8 编码的中文名称
-        response.headers["Content-Disposition"] = (
+        content_disposition = (
             f"attachment; filename=\"{ascii_filename}\"; "
             f"filename*=UTF-8''{encoded_filename}"
         )
         
+        # 创建流式响应（支持Range和条件请求，本地和对象存储均可）
+        file_service = FileService()
+        response = await build_storage_response(
+            request,
+            file_service.storage,
+            task.file_path,
+            media_type,
+            headers={"Content-Disposition": content_disposition},
+            content_hash=task.file_hash,
+            codec=task.storage_codec,
+            original_size=task.file_size
+        )
+        
+        # 检查文件是否存在
+        if response is None:
+            raise HTTPException(
+                status_code=404,
+                detail="文件不存在"
+            )
+        
+        # 记录下载，被下载过的文件不再视为冷文件
+        db_service.record_task_download(task_id)
+        
         print(f"📤 文件下载响应: ascii={ascii_filename}, utf8={download_filename}")
         
         return response
@@ -215,7 +388,6 @@ async def download_resume(task_id: str):
 @router.put("/update/{candidate_id}", summary="更新已存在候选人的简历")
 async def update_candidate_resume(
     candidate_id: int,
-    background_tasks: BackgroundTasks,
     file: UploadFile = File(..., description="新的简历文件")
 ):
     """
@@ -231,8 +403,8 @@ async def update_candidate_resume(
             detail=f"不支持的文件类型: {file.content_type}"
         )
     
-    # 验证文件大小
-    if file.size > settings.MAX_FILE_SIZE:
+    # 验证文件大小（实际大小在写入时强制校验）
+    if file.size is not None and file.size > settings.MAX_FILE_SIZE:
         raise HTTPException(
             status_code=400,
             detail=f"文件大小超过限制"
@@ -246,33 +418,39 @@ async def update_candidate_resume(
             detail="候选人不存在"
         )
     
+    saved = None
     try:
         # 生成新的任务ID
         task_id = str(uuid.uuid4())
         
-        # 保存新文件
+        # 流式保存新文件
         file_service = FileService()
-        file_path = await file_service.save_upload_file(file, task_id)
+        saved = await file_service.save_upload_file(file, task_id)
+        probe = saved["probe"]
         
         # 创建任务记录
         task_service = TaskService()
         task = UploadTask(
             id=task_id,
             filename=file.filename,
-            file_path=file_path,
-            file_size=file.size,
+            file_path=saved["file_path"],
+            file_size=saved["file_size"],
             file_type=file.content_type,
-            status=TaskStatus.UPLOADED
+            file_hash=saved["file_hash"],
+            status=TaskStatus.UPLOADED,
+            lane=LANE_INTERACTIVE,
+            cost_class=probe["cost_class"],
+            probe=probe
         )
         
-        await task_service.create_task(task)
+        if not await task_service.create_task(task):
+            raise RuntimeError("创建任务记录失败")
         
-        # 后台处理，指定要更新的候选人ID
+        # 在 interactive 通道排队处理，指定要更新的候选人ID
         resume_service = ResumeService()
-        background_tasks.add_task(
-            resume_service.process_resume_update, 
-            task_id, 
-            candidate_id
+        task_scheduler.submit(
+            LANE_INTERACTIVE, resume_service.process_resume_update, task_id, candidate_id,
+            pool=task.cost_class, task_id=task_id
         )
         
         return {
@@ -283,7 +461,15 @@ async def update_candidate_resume(
             "message": f"文件上传成功，正在更新候选人 {candidate.name} 的简历..."
         }
         
+    except FileValidationError as e:
+        raise HTTPException(
+            status_code=400,
+            detail=str(e)
+        )
     except Exception as e:
+        # 文件已保存但任务未创建时释放文件，避免留下孤儿文件
+        if saved:
+            await TaskService().release_file(saved["file_path"], saved["file_hash"])
         raise HTTPException(
             status_code=500,
             detail=f"更新简历失败: {str(e)}"
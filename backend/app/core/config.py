@@ -39,14 +39,74 @@ class Settings:
         "ALLOWED_FILE_TYPES",
         "application/pdf,application/msword,application/vnd.openxmlformats-officedocument.wordprocessingml.document,image/jpeg,image/jpg,image/png"
     ).split(",")
+    BLOB_DELETE_GRACE_SECONDS: int = int(os.getenv("BLOB_DELETE_GRACE_SECONDS", "300"))  # 刚被复用的文件在此时间内不删除
+    BATCH_MAX_FILES: int = int(os.getenv("BATCH_MAX_FILES", "2000"))  # 单批次最多文件数
+    BATCH_MAX_ARCHIVE_SIZE: int = int(os.getenv("BATCH_MAX_ARCHIVE_SIZE", "524288000"))  # ZIP压缩包最大500MB
+    
+    # 文件存储配置（local: 本地目录 UPLOAD_DIR；s3: S3兼容对象存储，需安装boto3）
+    STORAGE_BACKEND: str = os.getenv("STORAGE_BACKEND", "local")
+    S3_ENDPOINT_URL: str = os.getenv("S3_ENDPOINT_URL", "")  # 如 MinIO: http://127.0.0.1:9000，AWS留空
+    S3_BUCKET: str = os.getenv("S3_BUCKET", "")
+    S3_PREFIX: str = os.getenv("S3_PREFIX", "resumes")  # 对象键前缀
+    S3_ACCESS_KEY: str = os.getenv("S3_ACCESS_KEY", "")
+    S3_SECRET_KEY: str = os.getenv("S3_SECRET_KEY", "")
+    S3_REGION: str = os.getenv("S3_REGION", "")
+    S3_MULTIPART_THRESHOLD: int = int(os.getenv("S3_MULTIPART_THRESHOLD", "8388608"))  # 超过8MB使用分片上传
+    S3_MULTIPART_CHUNK_SIZE: int = int(os.getenv("S3_MULTIPART_CHUNK_SIZE", "8388608"))  # 分片大小8MB
+    
+    # 冷文件分层压缩配置（需安装zstandard）
+    TIERING_ENABLED: bool = os.getenv("TIERING_ENABLED", "false").lower() == "true"
+    TIERING_MIN_AGE_DAYS: int = int(os.getenv("TIERING_MIN_AGE_DAYS", "30"))  # 上传超过此天数且从未下载的文件视为冷文件
+    TIERING_INTERVAL_HOURS: int = int(os.getenv("TIERING_INTERVAL_HOURS", "24"))  # 后台压缩任务运行间隔
+    TIERING_EXTENSIONS: List[str] = [
+        ext.strip().lower() for ext in os.getenv("TIERING_EXTENSIONS", ".pdf,.docx,.doc,.png").split(",") if ext.strip()
+    ]
+    TIERING_MIN_SAVING_RATIO: float = float(os.getenv("TIERING_MIN_SAVING_RATIO", "0.1"))  # 至少节省10%才保存压缩版本
+    TIERING_ZSTD_LEVEL: int = int(os.getenv("TIERING_ZSTD_LEVEL", "19"))
+    TIERING_BATCH_SIZE: int = int(os.getenv("TIERING_BATCH_SIZE", "200"))  # 每批扫描的文件数
+    
+    # 存储垃圾回收配置
+    GC_ENABLED: bool = os.getenv("GC_ENABLED", "false").lower() == "true"
+    GC_INTERVAL_HOURS: int = int(os.getenv("GC_INTERVAL_HOURS", "24"))  # 后台回收运行间隔
+    GC_ORPHAN_GRACE_HOURS: int = int(os.getenv("GC_ORPHAN_GRACE_HOURS", "24"))  # 孤儿文件和未完成任务的宽限期
+    GC_FAILED_TASK_RETENTION_DAYS: int = int(os.getenv("GC_FAILED_TASK_RETENTION_DAYS", "30"))  # 失败任务保留天数，0表示不清理
+    GC_BATCH_SIZE: int = int(os.getenv("GC_BATCH_SIZE", "200"))  # 每批核对的文件/任务数
+    GC_BATCH_PAUSE_SECONDS: float = float(os.getenv("GC_BATCH_PAUSE_SECONDS", "1.0"))  # 批次间暂停（限速）
+    GC_MAX_DELETES_PER_RUN: int = int(os.getenv("GC_MAX_DELETES_PER_RUN", "1000"))  # 单轮最多删除数
     
     # LLM API配置
     SILICONFLOW_API_KEY: str = os.getenv("SILICONFLOW_API_KEY", "")
     SILICONFLOW_API_URL: str = os.getenv("SILICONFLOW_API_URL", "https://api.siliconflow.cn/v1/messages")
     LLM_MODEL: str = os.getenv("LLM_MODEL", "Qwen/Qwen2.5-7B-Instruct")
     MAX_TOKENS: int = int(os.getenv("MAX_TOKENS", "4096"))
+    LLM_REQUEST_TIMEOUT: int = int(os.getenv("LLM_REQUEST_TIMEOUT", "120"))  # LLM请求超时（秒），超时后降级为规则提取
+    LLM_ENDPOINTS: str = os.getenv("LLM_ENDPOINTS", "")  # 多个LLM服务端点（JSON数组），为空时使用上面的单一端点
+    LLM_RPM: int = int(os.getenv("LLM_RPM", "0"))  # 服务商每分钟请求数配额，解析请求按此匀速放行（0不限制）
+    LLM_TPM: int = int(os.getenv("LLM_TPM", "0"))  # 服务商每分钟token配额（0不限制）
+    LLM_MAX_RETRIES: int = int(os.getenv("LLM_MAX_RETRIES", "3"))  # 429/5xx/超时的最大重试次数
+    LLM_RETRY_BASE_DELAY: float = float(os.getenv("LLM_RETRY_BASE_DELAY", "1"))  # 重试退避基准（秒），每次翻倍并加随机抖动
+    LLM_RETRY_MAX_DELAY: float = float(os.getenv("LLM_RETRY_MAX_DELAY", "30"))  # 单次重试最长等待（秒）
+    LLM_BREAKER_FAILURE_THRESHOLD: int = int(os.getenv("LLM_BREAKER_FAILURE_THRESHOLD", "5"))  # 连续失败多少次后熔断
+    LLM_BREAKER_COOLDOWN: int = int(os.getenv("LLM_BREAKER_COOLDOWN", "30"))  # 熔断后多久放行探测请求（秒）
+    LLM_BREAKER_MAX_WAIT: int = int(os.getenv("LLM_BREAKER_MAX_WAIT", "600"))  # 解析任务在熔断期间最长等待（秒）
+    LLM_PROMPT_VERSION: str = os.getenv("LLM_PROMPT_VERSION", "resume-v1")  # 提示词版本：resume-v1 / resume-compact-v1
+    LLM_INPUT_MAX_CHARS: int = int(os.getenv("LLM_INPUT_MAX_CHARS", "12000"))  # 发送给LLM的文本最大字符数（0不限制）
+    LLM_RESPONSE_FORMAT: str = os.getenv("LLM_RESPONSE_FORMAT", "none")  # 输出格式约束：json_object / json_schema / none（仅OpenAI兼容接口支持）
+    LLM_STREAM_ENABLED: bool = os.getenv("LLM_STREAM_ENABLED", "true").lower() == "true"  # 流式请求LLM，边输出边推送部分结果
+    LLM_MAX_CONTINUATIONS: int = int(os.getenv("LLM_MAX_CONTINUATIONS", "1"))  # 输出被截断时的续写次数
     LLM_TEMPERATURE: float = float(os.getenv("LLM_TEMPERATURE", "1.2"))
     LLM_TOP_P: float = float(os.getenv("LLM_TOP_P", "0.9"))
+    LLM_EXTRACTION_TEMPERATURE: float = float(os.getenv("LLM_EXTRACTION_TEMPERATURE", "0.1"))  # 简历解析的温度（抽取任务取低值）
+    LLM_FAST_MODEL: str = os.getenv("LLM_FAST_MODEL", "")  # 先用的快速模型，结果校验不通过再用 LLM_MODEL（为空不启用级联）
+    LLM_MODEL_PRICE: float = float(os.getenv("LLM_MODEL_PRICE", "0"))  # 主模型单价（元/百万token），用于统计解析成本
+    LLM_FAST_MODEL_PRICE: float = float(os.getenv("LLM_FAST_MODEL_PRICE", "0"))  # 快速模型单价（元/百万token）
+    LLM_PACK_ENABLED: bool = os.getenv("LLM_PACK_ENABLED", "false").lower() == "true"  # 批量导入时把多份短简历合并为一个请求
+    LLM_PACK_TOKEN_BUDGET: int = int(os.getenv("LLM_PACK_TOKEN_BUDGET", "4000"))  # 合并请求中简历文本的总token上限
+    LLM_PACK_MAX_ITEM_TOKENS: int = int(os.getenv("LLM_PACK_MAX_ITEM_TOKENS", "1200"))  # 只合并不超过该token数的短简历
+    LLM_PACK_MAX_ITEMS: int = int(os.getenv("LLM_PACK_MAX_ITEMS", "5"))  # 一个合并请求最多包含的简历数
+    LLM_PACK_WINDOW: float = float(os.getenv("LLM_PACK_WINDOW", "0.5"))  # 凑批的最长等待时间（秒）
+    LLM_SECTION_PARSE_ENABLED: bool = os.getenv("LLM_SECTION_PARSE_ENABLED", "true").lower() == "true"  # 长简历按段落分组并行解析
+    LLM_SECTION_PARSE_MIN_TOKENS: int = int(os.getenv("LLM_SECTION_PARSE_MIN_TOKENS", "3000"))  # 超过该token数的简历分段解析
     
     # JWT配置
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
@@ -59,7 +119,20 @@ class Settings:
     # 任务配置
     TASK_TIMEOUT: int = int(os.getenv("TASK_TIMEOUT", "300"))  # 5分钟超时
     POLL_INTERVAL: int = int(os.getenv("POLL_INTERVAL", "2"))   # 轮询间隔（秒）
-    MAX_CONCURRENT_TASKS: int = int(os.getenv("MAX_CONCURRENT_TASKS", "5"))  # 最大并发任务数
+    MAX_CONCURRENT_TASKS: int = int(os.getenv("MAX_CONCURRENT_TASKS", "5"))  # 最大并发任务数（文本工作池的工作协程数）
+    SCHEDULER_OCR_WORKERS: int = int(os.getenv("SCHEDULER_OCR_WORKERS", "2"))  # OCR工作池的工作协程数（扫描件、图片）
+    SCHEDULER_INTERACTIVE_RESERVED: int = int(os.getenv("SCHEDULER_INTERACTIVE_RESERVED", "1"))  # 只执行单份上传的工作协程数
+    SCHEDULER_LANE_WEIGHTS: str = os.getenv("SCHEDULER_LANE_WEIGHTS", "interactive:4,bulk:1")  # 优先级通道权重
+    TASK_STATUS_BATCH_LIMIT: int = int(os.getenv("TASK_STATUS_BATCH_LIMIT", "500"))  # 批量状态查询最多任务数
+    REPROCESS_CONCURRENCY: int = int(os.getenv("REPROCESS_CONCURRENCY", "3"))  # 批量重新解析的LLM并发数
+    INCREMENTAL_PARSE_ENABLED: bool = os.getenv("INCREMENTAL_PARSE_ENABLED", "true").lower() == "true"  # 更新简历时只解析变化的段落
+    INCREMENTAL_PARSE_MAX_CHANGED_RATIO: float = float(os.getenv("INCREMENTAL_PARSE_MAX_CHANGED_RATIO", "0.6"))  # 变化超过该比例时完整解析
+    
+    # 任务事件推送（SSE）配置
+    SSE_HEARTBEAT_INTERVAL: int = int(os.getenv("SSE_HEARTBEAT_INTERVAL", "15"))  # 心跳间隔（秒）
+    SSE_RETRY_INTERVAL: int = int(os.getenv("SSE_RETRY_INTERVAL", "3000"))  # 客户端重连间隔（毫秒）
+    SSE_MAX_TASKS_PER_STREAM: int = int(os.getenv("SSE_MAX_TASKS_PER_STREAM", "200"))  # 单个事件流最多订阅的任务数
+    TASK_PROGRESS_PERSIST_INTERVAL: float = float(os.getenv("TASK_PROGRESS_PERSIST_INTERVAL", "1.0"))  # 阶段进度、部分结果写库的最小间隔（秒），事件推送不受限
     
     # 日志配置
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
@@ -1,11 +1,15 @@
 """
 简历解析后端应用主入口
 """
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
 from app.api.api_v1.api import api_router
 from app.services.database_service import db_service
+from app.services.storage_tiering_service import storage_tiering_service
+from app.services.gc_service import gc_service
+from app.services.task_scheduler import task_scheduler
 
 def create_app() -> FastAPI:
     """创建FastAPI应用实例"""
@@ -24,7 +28,7 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
-        expose_headers=["Content-Disposition"],  # 暴露文件下载头给前端
+        expose_headers=["Content-Disposition", "Content-Range", "Accept-Ranges", "ETag"],  # 暴露文件下载头给前端
     )
     
     # 添加根路径
@@ -45,6 +49,22 @@ def create_app() -> FastAPI:
     async def startup_event():
         """应用启动时初始化"""
         db_service.init_database()
+        
+        # 启动解析任务调度的工作协程
+        task_scheduler.start()
+        for pool in task_scheduler.pools.values():
+            print(f"🚦 {pool.name} 工作池已启动: {pool.workers} 个工作协程，其中 {pool.reserved} 个只处理单份上传")
+        
+        # 启动冷文件分层压缩后台任务
+        if settings.TIERING_ENABLED:
+            app.state.tiering_task = asyncio.create_task(storage_tiering_service.run_periodically())
+            print(f"🧊 冷文件压缩已启用，每 {settings.TIERING_INTERVAL_HOURS} 小时运行一次")
+        
+        # 启动存储垃圾回收后台任务
+        if settings.GC_ENABLED:
+            app.state.gc_task = asyncio.create_task(gc_service.run_periodically())
+            print(f"🧹 垃圾回收已启用，每 {settings.GC_INTERVAL_HOURS} 小时运行一次")
+        
         print(f"🚀 {settings.PROJECT_NAME} v{settings.VERSION} 启动成功")
         print(f"📊 API文档: http://localhost:{settings.PORT}/docs")
     
@@ -72,6 +72,20 @@ class UploadTask(BaseModel):
     created_at: datetime = Field(default_factory=datetime.now, description="创建时间")
     updated_at: Optional[datetime] = Field(None, description="更新时间")
     completed_at: Optional[datetime] = Field(None, description="完成时间")
+    batch_id: Optional[str] = Field(None, description="批次ID")
+    file_hash: Optional[str] = Field(None, description="文件内容SHA-256")
+    storage_codec: Optional[str] = Field(None, description="文件存储编码（identity/zstd）")
+    stored_size: Optional[int] = Field(None, description="存储中的实际大小")
+    download_count: int = Field(0, description="下载次数")
+    last_downloaded_at: Optional[datetime] = Field(None, description="最近下载时间")
+    llm_model: Optional[str] = Field(None, description="生成解析结果的LLM模型")
+    parse_stats: Optional[Dict[str, Any]] = Field(None, description="解析统计（增量解析、token用量等）")
+    partial_result: Optional[ResumeInfo] = Field(None, description="解析中的部分结果（规则提取等）")
+    prompt_version: Optional[str] = Field(None, description="生成解析结果的提示词版本")
+    llm_tier: Optional[str] = Field(None, description="生成解析结果的模型级别（fast / strong）")
+    lane: Optional[str] = Field(None, description="调度优先级通道（interactive / bulk）")
+    cost_class: Optional[str] = Field(None, description="上传时预估的解析成本类别（text / ocr），决定解析工作池")
+    probe: Optional[Dict[str, Any]] = Field(None, description="上传时的文件探测结果（页数、文本层、图片像素）")
 
 # API响应模型
 class TaskResponse(BaseModel):
@@ -85,6 +99,35 @@ class TaskResponse(BaseModel):
     created_at: str = Field(..., description="创建时间")
     updated_at: Optional[str] = Field(None, description="更新时间")
     completed_at: Optional[str] = Field(None, description="完成时间")
+    llm_model: Optional[str] = Field(None, description="生成解析结果的LLM模型")
+    prompt_version: Optional[str] = Field(None, description="生成解析结果的提示词版本")
+    llm_tier: Optional[str] = Field(None, description="生成解析结果的模型级别（fast / strong）")
+    lane: Optional[str] = Field(None, description="调度优先级通道（interactive / bulk）")
+    cost_class: Optional[str] = Field(None, description="上传时预估的解析成本类别（text / ocr），决定解析工作池")
+    probe: Optional[Dict[str, Any]] = Field(None, description="上传时的文件探测结果（页数、文本层、图片像素）")
+    parse_stats: Optional[Dict[str, Any]] = Field(None, description="解析统计（增量解析、token用量等）")
+    partial_result: Optional[Dict[str, Any]] = Field(None, description="解析中的部分结果（规则提取等）")
+
+class TaskStatusQuery(BaseModel):
+    """批量任务状态查询请求"""
+    task_ids: List[str] = Field(..., min_length=1, description="任务ID列表")
+    changed_since: Optional[datetime] = Field(None, description="仅返回此时间之后状态有变化的任务")
+
+class TaskStatusItem(BaseModel):
+    """任务状态（精简字段）"""
+    task_id: str = Field(..., description="任务ID")
+    status: str = Field(..., description="任务状态")
+    progress: int = Field(0, description="进度百分比")
+    error: Optional[str] = Field(None, description="错误信息")
+    created_at: Optional[str] = Field(None, description="创建时间")
+    updated_at: Optional[str] = Field(None, description="更新时间")
+    completed_at: Optional[str] = Field(None, description="完成时间")
+
+class TaskStatusBatchResponse(BaseModel):
+    """批量任务状态响应"""
+    tasks: List[TaskStatusItem] = Field(..., description="任务状态列表")
+    missing: List[str] = Field(default_factory=list, description="不存在的任务ID")
+    server_time: str = Field(..., description="服务器时间（UTC），可作为下次查询的changed_since")
 
 class UploadResponse(BaseModel):
     """上传响应模型"""
@@ -93,6 +136,60 @@ class UploadResponse(BaseModel):
     status: str = Field(..., description="任务状态")
     message: str = Field(..., description="响应消息")
 
+class RejectedFile(BaseModel):
+    """批量上传中被拒绝的文件"""
+    filename: str = Field(..., description="文件名")
+    reason: str = Field(..., description="拒绝原因")
+
+class BatchUploadResponse(BaseModel):
+    """批量上传响应模型"""
+    batch_id: str = Field(..., description="批次ID")
+    total: int = Field(..., description="创建的任务数")
+    tasks: List[UploadResponse] = Field(..., description="任务列表")
+    rejected: List[RejectedFile] = Field(default_factory=list, description="被拒绝的文件")
+    message: str = Field(..., description="响应消息")
+
+class BatchProgressResponse(BaseModel):
+    """批次聚合进度"""
+    batch_id: str = Field(..., description="批次ID")
+    total: int = Field(..., description="任务总数")
+    uploaded: int = Field(0, description="等待解析数")
+    parsing: int = Field(0, description="解析中数")
+    completed: int = Field(0, description="已完成数")
+    failed: int = Field(0, description="失败数")
+    progress: float = Field(0, description="整体进度百分比")
+    finished: bool = Field(False, description="是否全部结束")
+    created_at: Optional[str] = Field(None, description="创建时间")
+    last_completed_at: Optional[str] = Field(None, description="最近完成时间")
+
+class ReprocessRequest(BaseModel):
+    """批量重新解析请求（仅重跑LLM，使用已保存的提取文本）"""
+    created_from: Optional[datetime] = Field(None, description="任务创建时间起（含）")
+    created_to: Optional[datetime] = Field(None, description="任务创建时间止（不含）")
+    failed_only: bool = Field(False, description="仅重新解析失败的任务")
+    llm_model: Optional[str] = Field(None, description="仅重新解析由该模型解析的任务")
+    prompt_version: Optional[str] = Field(None, description="仅重新解析由该提示词版本解析的任务")
+    outdated_only: bool = Field(False, description="仅重新解析非当前模型或非当前提示词版本解析的任务")
+    limit: Optional[int] = Field(None, ge=1, description="最多处理的任务数")
+    concurrency: Optional[int] = Field(None, ge=1, le=20, description="LLM并发数，默认使用配置")
+
+class ReprocessJobResponse(BaseModel):
+    """重新解析作业"""
+    job_id: str = Field(..., description="作业ID")
+    status: str = Field(..., description="作业状态：pending / running / completed / cancelled")
+    filters: Dict[str, Any] = Field(default_factory=dict, description="筛选条件")
+    concurrency: int = Field(..., description="LLM并发数")
+    llm_model: str = Field(..., description="使用的LLM模型")
+    prompt_version: Optional[str] = Field(None, description="使用的提示词版本")
+    total: int = Field(0, description="任务总数")
+    processed: int = Field(0, description="已处理数")
+    succeeded: int = Field(0, description="成功数")
+    failed: int = Field(0, description="失败数")
+    errors: List[Dict[str, Any]] = Field(default_factory=list, description="部分失败详情")
+    created_at: str = Field(..., description="创建时间")
+    started_at: Optional[str] = Field(None, description="开始时间")
+    finished_at: Optional[str] = Field(None, description="结束时间")
+
 class ErrorResponse(BaseModel):
     """错误响应模型"""
     detail: str = Field(..., description="错误详情")
@@ -0,0 +1,74 @@
+"""
+提示词注册表
+提示词按版本注册，进程内只加载一次且内容固定不变，
+使兼容OpenAI接口的服务商能够对相同的前缀做缓存；部署时通过 LLM_PROMPT_VERSION 选择版本
+"""
+import hashlib
+from typing import Dict, List, Optional
+from app.core.config import settings
+from app.prompts import resume_v1, resume_compact
+
+# 未配置或配置了未知版本时使用
+DEFAULT_PROMPT_VERSION = resume_v1.VERSION
+
+class PromptTemplate:
+    """已注册的提示词"""
+
+    def __init__(self, version: str, system: str, description: str = ""):
+        self.version = version
+        self.system = system
+        self.description = description
+        self.fingerprint = hashlib.sha256(system.encode("utf-8")).hexdigest()[:12]
+
+    @property
+    def cache_key(self) -> str:
+        """缓存键：版本号加内容指纹，提示词内容变化时缓存自然失效"""
+        return f"{self.version}:{self.fingerprint}"
+
+    def to_dict(self) -> Dict[str, object]:
+        """转换为字典（不含提示词全文）"""
+        return {
+            "version": self.version,
+            "description": self.description,
+            "fingerprint": self.fingerprint,
+            "chars": len(self.system)
+        }
+
+_PROMPTS: Dict[str, PromptTemplate] = {}
+
+def register_prompt(version: str, system: str, description: str = "") -> PromptTemplate:
+    """注册提示词，同一版本只能注册一次"""
+    if version in _PROMPTS:
+        raise ValueError(f"提示词版本已存在: {version}")
+    prompt = PromptTemplate(version, system, description)
+    _PROMPTS[version] = prompt
+    return prompt
+
+def get_prompt(version: Optional[str] = None) -> PromptTemplate:
+    """
+    获取提示词
+
+    Args:
+        version: 提示词版本，默认使用 LLM_PROMPT_VERSION
+    """
+    version = version or settings.LLM_PROMPT_VERSION
+    prompt = _PROMPTS.get(version)
+    if prompt is None:
+        print(f"⚠️  未知的提示词版本 {version}，使用 {DEFAULT_PROMPT_VERSION}")
+        prompt = _PROMPTS[DEFAULT_PROMPT_VERSION]
+    return prompt
+
+def list_prompts() -> List[PromptTemplate]:
+    """获取所有已注册的提示词"""
+    return list(_PROMPTS.values())
+
+register_prompt(resume_v1.VERSION, resume_v1.SYSTEM_PROMPT, resume_v1.DESCRIPTION)
+register_prompt(resume_compact.VERSION, resume_compact.SYSTEM_PROMPT, resume_compact.DESCRIPTION)
+
+__all__ = [
+    "DEFAULT_PROMPT_VERSION",
+    "PromptTemplate",
+    "register_prompt",
+    "get_prompt",
+    "list_prompts",
+]
@@ -0,0 +1,54 @@
+"""
+简历信息提取提示词（紧凑版）
+由 ResumeInfo 的 JSON Schema 生成字段结构，不含长篇说明和示例，prompt token 约为 v1 的三分之一
+"""
+import json
+from typing import Any, Dict
+from app.models.resume import ResumeInfo
+
+VERSION = "resume-compact-v1"
+
+DESCRIPTION = "由数据模型生成的紧凑字段结构"
+
+def schema_sketch(schema: Dict[str, Any], defs: Dict[str, Any]) -> Any:
+    """
+    将 JSON Schema 简化为字段结构示意：对象保留字段，列表取元素结构，标量用字段说明代替
+
+    Args:
+        schema: 当前节点的 schema
+        defs: schema 中 $defs 的定义
+    """
+    if "$ref" in schema:
+        return schema_sketch(defs[schema["$ref"].split("/")[-1]], defs)
+
+    # Optional[...] 生成 anyOf [..., {"type": "null"}]
+    variants = [item for item in schema.get("anyOf", []) if item.get("type") != "null"]
+    if variants:
+        node = dict(variants[0])
+        if schema.get("description"):
+            node.setdefault("description", schema["description"])
+        return schema_sketch(node, defs)
+
+    if schema.get("type") == "object" or "properties" in schema:
+        return {name: schema_sketch(item, defs) for name, item in schema.get("properties", {}).items()}
+    if schema.get("type") == "array":
+        item = dict(schema.get("items", {}))
+        if schema.get("description") and "$ref" not in item:
+            item.setdefault("description", schema["description"])
+        return [schema_sketch(item, defs)]
+    return schema.get("description") or schema.get("type", "string")
+
+def build_system_prompt() -> str:
+    """生成系统提示词（结果只取决于数据模型，多次生成逐字节一致）"""
+    schema = ResumeInfo.model_json_schema()
+    sketch = schema_sketch(schema, schema.get("$defs", {}))
+    structure = json.dumps(sketch, ensure_ascii=False, separators=(",", ":"))
+    return (
+        "你是简历信息提取专家。从用户提供的简历文本（可能含OCR错误）中提取信息，"
+        "只输出一个JSON对象，结构如下（值为字段说明）：\n"
+        f"{structure}\n"
+        "规则：找不到的字段填null；教育和工作经历按时间倒序；年份用4位数字；"
+        "学位写全称（如“硕士学位”）；学校写全称；不要编造原文没有的内容。"
+    )
+
+SYSTEM_PROMPT = build_system_prompt()
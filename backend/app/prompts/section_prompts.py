@@ -0,0 +1,28 @@
+"""
+分段解析提示词
+长简历按段落分组并行解析时使用：每组只描述该组负责的字段，由 ResumeInfo 的 JSON Schema 生成
+"""
+import json
+from typing import List
+from app.models.resume import ResumeInfo
+from app.prompts.resume_compact import schema_sketch
+from app.utils.resume_sections import SECTION_GROUPS, group_fields
+
+VERSION = "resume-sections-v1"
+
+def build_section_prompt(fields: List[str]) -> str:
+    """生成只提取指定字段的系统提示词"""
+    schema = ResumeInfo.model_json_schema()
+    defs = schema.get("$defs", {})
+    sketch = {field: schema_sketch(schema["properties"][field], defs) for field in fields}
+    structure = json.dumps(sketch, ensure_ascii=False, separators=(",", ":"))
+    return (
+        "你是简历信息提取专家。用户提供的是一份长简历中的部分段落（可能含OCR错误），"
+        "只从这些文本中提取下列字段，只输出一个JSON对象，结构如下（值为字段说明）：\n"
+        f"{structure}\n"
+        "规则：找不到的字段填null；经历按时间倒序；年份用4位数字；"
+        "学位写全称（如“硕士学位”）；学校写全称；不要编造原文没有的内容。"
+    )
+
+# 各分组的系统提示词
+SECTION_PROMPTS = {group: build_section_prompt(group_fields(group)) for group in SECTION_GROUPS}
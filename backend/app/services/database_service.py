@@ -3,17 +3,19 @@
 集成新的数据库架构到现有服务中
 """
 import json
-from typing import List, Optional, Dict, Any
-from datetime import datetime
+from typing import List, Optional, Dict, Any, Set
+from datetime import datetime, timezone
 from database import (
     upload_task_repo, 
     resume_info_repo, 
     candidate_repo,
+    resume_text_repo,
     init_database
 )
 from database.models.upload_task import UploadTaskModel
 from database.models.resume_info import ResumeInfoModel
 from database.models.candidate import CandidateModel
+from database.models.resume_text import ResumeTextModel
 from app.models.resume import UploadTask, TaskStatus, ResumeInfo
 
 class DatabaseService:
@@ -23,6 +25,7 @@ class DatabaseService:
         self.upload_repo = upload_task_repo
         self.resume_repo = resume_info_repo
         self.candidate_repo = candidate_repo
+        self.text_repo = resume_text_repo
     
     def init_database(self) -> bool:
         """初始化数据库"""
@@ -33,27 +36,21 @@ class DatabaseService:
     def create_task(self, task: UploadTask) -> bool:
         """创建任务"""
         try:
-            # 转换为数据库模型
-            task_model = UploadTaskModel(
-                id=task.id,
-                filename=task.filename,
-                file_path=task.file_path,
-                file_size=task.file_size,
-                file_type=task.file_type,
-                status=task.status.value,
-                progress=task.progress,
-                result=task.result.json() if task.result else None,
-                error=task.error,
-                created_at=task.created_at,
-                updated_at=task.updated_at,
-                completed_at=task.completed_at
-            )
-            
-            return self.upload_repo.create(task_model)
+            return self.upload_repo.create(self._convert_upload_task_to_model(task))
         except Exception as e:
             print(f"创建任务失败: {e}")
             return False
     
+    def create_tasks(self, tasks: List[UploadTask]) -> bool:
+        """在单个事务中批量创建任务"""
+        try:
+            return self.upload_repo.create_many(
+                [self._convert_upload_task_to_model(task) for task in tasks]
+            )
+        except Exception as e:
+            print(f"批量创建任务失败: {e}")
+            return False
+    
     def get_task(self, task_id: str) -> Optional[UploadTask]:
         """获取任务"""
         try:
@@ -75,6 +72,24 @@ class DatabaseService:
             print(f"获取任务列表失败: {e}")
             return []
     
+    def get_task_statuses(self, task_ids: List[str],
+                          changed_since: Optional[datetime] = None) -> Dict[str, Any]:
+        """批量获取任务状态"""
+        since = None
+        if changed_since:
+            # 数据库中的status_changed_at以UTC写入
+            if changed_since.tzinfo:
+                changed_since = changed_since.astimezone(timezone.utc).replace(tzinfo=None)
+            since = changed_since.strftime("%Y-%m-%d %H:%M:%S")
+        
+        rows = self.upload_repo.get_status_by_ids(task_ids, since)
+        
+        found_ids = {row["id"] for row in rows}
+        return {
+            "tasks": [self._format_status_row(row) for row in rows if row["changed"]],
+            "missing": [task_id for task_id in task_ids if task_id not in found_ids]
+        }
+    
     def update_task_status(self, task_id: str, status: TaskStatus, 
                           progress: int = None, result: ResumeInfo = None, 
                           error: str = None) -> bool:
@@ -100,6 +115,7 @@ class DatabaseService:
             # 删除相关记录
             self.resume_repo.delete_by_task_id(task_id)
             self.candidate_repo.delete_by_task_id(task_id)
+            self.text_repo.delete(task_id)
             
             # 删除任务
             return self.upload_repo.delete(task_id)
@@ -111,6 +127,74 @@ class DatabaseService:
         """获取任务统计信息"""
         return self.upload_repo.get_statistics()
     
+    def count_file_references(self, file_path: str, file_hash: Optional[str] = None) -> int:
+        """统计引用指定文件的任务数"""
+        return self.upload_repo.count_by_file_path(file_path, file_hash)
+    
+    def record_task_download(self, task_id: str) -> bool:
+        """记录任务文件的一次下载"""
+        return self.upload_repo.record_download(task_id)
+    
+    def get_cold_files(self, after_path: str, created_before: datetime, limit: int = 200) -> List[Dict[str, Any]]:
+        """分批获取可分层压缩的冷文件"""
+        return self.upload_repo.get_cold_files(after_path, created_before.isoformat(), limit)
+    
+    def update_storage_codec(self, old_path: str, new_path: str, codec: str,
+                             stored_size: Optional[int] = None) -> int:
+        """更新文件的存储位置和编码"""
+        return self.upload_repo.update_storage_codec(old_path, new_path, codec, stored_size)
+    
+    def get_storage_statistics(self) -> Dict[str, Dict[str, int]]:
+        """获取按存储编码的统计"""
+        return self.upload_repo.get_storage_statistics()
+    
+    def get_file_refs_after(self, last_id: str = "", limit: int = 200) -> List[Dict[str, Any]]:
+        """按任务ID分批获取文件引用"""
+        return self.upload_repo.get_file_refs_after(last_id, limit)
+    
+    def get_referenced_paths(self, file_paths: List[str]) -> Set[str]:
+        """返回仍被任务引用的文件路径"""
+        return self.upload_repo.get_referenced_paths(file_paths)
+    
+    def get_failed_task_ids_before(self, created_before: datetime, last_id: str = "",
+                                   limit: int = 200) -> List[str]:
+        """分批获取超过保留期的失败任务ID"""
+        return self.upload_repo.get_failed_ids_before(created_before.isoformat(), last_id, limit)
+    
+    def save_resume_text(self, task_id: str, text: str) -> bool:
+        """压缩保存任务提取的简历文本"""
+        return self.text_repo.create(ResumeTextModel.from_text(task_id, text))
+    
+    def get_resume_text(self, task_id: str) -> Optional[str]:
+        """获取任务提取的简历文本"""
+        model = self.text_repo.get_by_id(task_id)
+        return model.text if model else None
+    
+    def update_task_llm_model(self, task_id: str, llm_model: str, prompt_version: Optional[str] = None,
+                              llm_tier: Optional[str] = None) -> bool:
+        """记录生成解析结果的LLM模型、提示词版本和模型级别"""
+        return self.upload_repo.update_llm_model(task_id, llm_model, prompt_version, llm_tier)
+    
+    def update_task_parse_stats(self, task_id: str, stats: Dict[str, Any]) -> bool:
+        """合并写入任务的解析统计"""
+        return self.upload_repo.update_parse_stats(task_id, stats)
+    
+    def update_task_partial_result(self, task_id: str, partial_result: ResumeInfo) -> bool:
+        """保存任务解析中的部分结果"""
+        return self.upload_repo.update_partial_result(task_id, partial_result.json())
+    
+    def get_reprocess_task_ids(self, filters: Dict[str, Any], limit: Optional[int] = None) -> List[str]:
+        """获取可仅重跑LLM解析的任务ID"""
+        return self.upload_repo.get_reprocess_candidates(filters, limit)
+    
+    def get_llm_usage_statistics(self, since: Optional[str] = None) -> List[Dict[str, Any]]:
+        """按模型级别统计LLM解析的耗时、token数和费用"""
+        return self.upload_repo.get_llm_usage_statistics(since)
+    
+    def get_batch_statistics(self, batch_id: str) -> Optional[Dict[str, Any]]:
+        """获取批次聚合进度"""
+        return self.upload_repo.get_batch_statistics(batch_id)
+    
     # ==================== 简历信息管理 ====================
     
     def create_resume_info(self, task_id: str, resume_info: ResumeInfo) -> bool:
@@ -189,6 +273,37 @@ class DatabaseService:
     
     # ==================== 私有方法 ====================
     
+    def _convert_upload_task_to_model(self, task: UploadTask) -> UploadTaskModel:
+        """将UploadTask对象转换为数据库模型"""
+        return UploadTaskModel(
+            id=task.id,
+            filename=task.filename,
+            file_path=task.file_path,
+            file_size=task.file_size,
+            file_type=task.file_type,
+            status=task.status.value,
+            progress=task.progress,
+            result=task.result.json() if task.result else None,
+            error=task.error,
+            created_at=task.created_at,
+            updated_at=task.updated_at,
+            completed_at=task.completed_at,
+            batch_id=task.batch_id,
+            file_hash=task.file_hash,
+            storage_codec=task.storage_codec,
+            stored_size=task.stored_size,
+            download_count=task.download_count,
+            last_downloaded_at=task.last_downloaded_at,
+            llm_model=task.llm_model,
+            parse_stats=json.dumps(task.parse_stats, ensure_ascii=False) if task.parse_stats else None,
+            partial_result=task.partial_result.json() if task.partial_result else None,
+            prompt_version=task.prompt_version,
+            llm_tier=task.llm_tier,
+            lane=task.lane,
+            cost_class=task.cost_class,
+            probe=json.dumps(task.probe, ensure_ascii=False) if task.probe else None
+        )
+    
     def _convert_task_model_to_upload_task(self, task_model: UploadTaskModel) -> UploadTask:
         """将数据库模型转换为UploadTask对象"""
         result = None
@@ -199,6 +314,27 @@ class DatabaseService:
             except Exception as e:
                 print(f"解析结果数据失败: {e}")
         
+        parse_stats = None
+        if task_model.parse_stats:
+            try:
+                parse_stats = json.loads(task_model.parse_stats)
+            except Exception as e:
+                print(f"解析统计数据失败: {e}")
+        
+        probe = None
+        if task_model.probe:
+            try:
+                probe = json.loads(task_model.probe)
+            except Exception as e:
+                print(f"解析文件探测数据失败: {e}")
+        
+        partial_result = None
+        if task_model.partial_result:
+            try:
+                partial_result = ResumeInfo(**json.loads(task_model.partial_result))
+            except Exception as e:
+                print(f"解析部分结果数据失败: {e}")
+        
         return UploadTask(
             id=task_model.id,
             filename=task_model.filename,
@@ -211,9 +347,38 @@ class DatabaseService:
             error=task_model.error,
             created_at=task_model.created_at,
             updated_at=task_model.updated_at,
-            completed_at=task_model.completed_at
+            completed_at=task_model.completed_at,
+            batch_id=task_model.batch_id,
+            file_hash=task_model.file_hash,
+            storage_codec=task_model.storage_codec,
+            stored_size=task_model.stored_size,
+            download_count=task_model.download_count,
+            last_downloaded_at=task_model.last_downloaded_at,
+            llm_model=task_model.llm_model,
+            parse_stats=parse_stats,
+            partial_result=partial_result,
+            prompt_version=task_model.prompt_version,
+            llm_tier=task_model.llm_tier,
+            lane=task_model.lane,
+            cost_class=task_model.cost_class,
+            probe=probe
         )
     
+    def _format_status_row(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        """规范化任务状态行的时间格式"""
+        def to_iso(value):
+            return datetime.fromisoformat(value).isoformat() if value else None
+        
+        return {
+            "task_id": row["id"],
+            "status": row["status"],
+            "progress": row["progress"] or 0,
+            "error": row["error"],
+            "created_at": to_iso(row["created_at"]),
+            "updated_at": to_iso(row["updated_at"]),
+            "completed_at": to_iso(row["completed_at"])
+        }
+    
     def _convert_resume_info_to_dict(self, resume_info: ResumeInfo) -> Dict[str, Any]:
         """将ResumeInfo对象转换为字典"""
         data = {}
@@ -261,8 +426,9 @@ class DatabaseService:
             # 创建简历信息记录
             self.create_resume_info(task_id, resume_info)
             
-            # 创建候选人记录
-            self.create_candidate(task_id, resume_info)
+            # 创建候选人记录（更新简历或重新解析时候选人已存在，由调用方更新）
+            if not self.candidate_repo.get_by_task_id(task_id):
+                self.create_candidate(task_id, resume_info)
             
             print(f"✅ 为任务 {task_id} 创建了简历信息和候选人记录")
         except Exception as e:
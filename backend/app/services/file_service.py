@@ -2,47 +2,410 @@
 文件处理服务
 """
 import os
-import shutil
-from typing import Optional
+import time
+import uuid
+import asyncio
+import hashlib
+import zipfile
+from typing import Optional, List, Dict, Any, Tuple, BinaryIO, AsyncIterator
 from fastapi import UploadFile
 from app.core.config import settings
+from app.services.storage_backend import StorageBackend, get_storage_backend
+from app.utils.compression import CODEC_ZSTD, ZSTD_SUFFIX, decompress_zstd_stream
+from app.utils.file_probe import probe_file
+
+# 支持的简历文件扩展名及对应的MIME类型
+EXTENSION_CONTENT_TYPES = {
+    ".pdf": "application/pdf",
+    ".doc": "application/msword",
+    ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".png": "image/png",
+}
+
+# ZIP压缩包的MIME类型
+ZIP_CONTENT_TYPES = {"application/zip", "application/x-zip-compressed", "multipart/x-zip"}
+
+# 流式写入的块大小
+CHUNK_SIZE = 1024 * 1024
+
+# 内容寻址存储的子目录
+BLOB_DIR_NAME = "blobs"
+
+# 文件头魔数签名
+MAGIC_SIGNATURES = [
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"PK\x03\x04", "application/zip"),
+    (b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1", "application/x-ole-storage"),
+]
+
+# 各扩展名允许的文件头类型（DOCX为ZIP容器，DOC为OLE复合文档）
+EXTENSION_MAGIC_TYPES = {
+    ".pdf": {"application/pdf"},
+    ".doc": {"application/x-ole-storage"},
+    ".docx": {"application/zip"},
+    ".jpg": {"image/jpeg", "image/png"},
+    ".jpeg": {"image/jpeg", "image/png"},
+    ".png": {"image/png", "image/jpeg"},
+}
+
+class FileValidationError(ValueError):
+    """上传文件校验失败（大小超限、内容与类型不符等）"""
+    pass
+
+def sniff_file_type(header: bytes) -> Optional[str]:
+    """
+    根据文件头魔数识别文件类型
+    
+    Args:
+        header: 文件开头的字节
+        
+    Returns:
+        识别出的MIME类型，无法识别时返回None
+    """
+    for signature, content_type in MAGIC_SIGNATURES:
+        if header.startswith(signature):
+            return content_type
+    # PDF规范允许文件头前存在少量垃圾字节
+    if b"%PDF-" in header[:1024]:
+        return "application/pdf"
+    return None
 
 class FileService:
     """文件处理服务类"""
     
-    def __init__(self):
+    def __init__(self, storage: Optional[StorageBackend] = None):
+        # 上传目录用于暂存写入中的临时文件；本地存储时也是正式文件的根目录
         self.upload_dir = settings.UPLOAD_DIR
+        self.storage = storage or get_storage_backend()
         self.ensure_upload_dir()
     
     def ensure_upload_dir(self):
         """确保上传目录存在"""
         os.makedirs(self.upload_dir, exist_ok=True)
     
-    async def save_upload_file(self, file: UploadFile, task_id: str) -> str:
+    async def save_upload_file(self, file: UploadFile, task_id: str) -> Dict[str, Any]:
         """
-        保存上传的文件
+        流式保存上传的文件
+        
+        分块读取并写入临时文件，同时计算SHA-256、校验文件头魔数，
+        超过 MAX_FILE_SIZE 时立即中止；写入完成后先在本地临时文件上探测解析成本，
+        再按内容哈希提交到存储后端，相同内容只保存一份。
+        所有磁盘操作都在线程中执行，不阻塞事件循环。
         
         Args:
             file: 上传的文件对象
             task_id: 任务ID
             
         Returns:
-            保存后的文件路径
+            保存结果：file_path（存储键）、file_size、file_hash、detected_type、deduplicated、
+            probe（解析成本探测结果，见 app.utils.file_probe）
+            
+        Raises:
+            FileValidationError: 文件为空、超过大小限制或内容与类型不符
         """
         # 获取文件扩展名
-        file_extension = os.path.splitext(file.filename)[1]
-        saved_filename = f"{task_id}{file_extension}"
-        file_path = os.path.join(self.upload_dir, saved_filename)
+        file_extension = os.path.splitext(file.filename or "")[1].lower()
+        temp_path = self._temp_path(os.path.join(self.upload_dir, f"{task_id}{file_extension}"))
+        
+        hasher = hashlib.sha256()
+        file_size = 0
+        detected_type = None
+        
+        buffer = await asyncio.to_thread(open, temp_path, "wb")
+        try:
+            while True:
+                chunk = await file.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                
+                if file_size == 0:
+                    detected_type = self._check_file_header(chunk, file_extension)
+                
+                file_size += len(chunk)
+                if file_size > settings.MAX_FILE_SIZE:
+                    raise FileValidationError(
+                        f"文件大小超过限制。最大允许: {settings.MAX_FILE_SIZE // (1024*1024)}MB"
+                    )
+                
+                hasher.update(chunk)
+                await asyncio.to_thread(buffer.write, chunk)
+            
+            if file_size == 0:
+                raise FileValidationError("文件内容为空")
+            
+            await asyncio.to_thread(buffer.close)
+            file_hash = hasher.hexdigest()
+            probe = await asyncio.to_thread(probe_file, temp_path, file_extension)
+            file_path, deduplicated = await self.commit_blob(temp_path, file_hash, file_extension)
+        except BaseException:
+            await asyncio.to_thread(self._discard_partial, buffer, temp_path)
+            raise
+        
+        return {
+            "file_path": file_path,
+            "file_size": file_size,
+            "file_hash": file_hash,
+            "detected_type": detected_type,
+            "deduplicated": deduplicated,
+            "probe": probe
+        }
+    
+    def blob_key(self, file_hash: str, file_extension: str) -> str:
+        """
+        获取内容对应的存储键
+        
+        Args:
+            file_hash: 文件内容SHA-256
+            file_extension: 文件扩展名（解析器按扩展名选择解析方式）
+            
+        Returns:
+            形如 blobs/ab/abcdef....pdf 的存储键
+        """
+        return f"{BLOB_DIR_NAME}/{file_hash[:2]}/{file_hash}{file_extension.lower()}"
+    
+    def is_blob_key(self, file_path: str) -> bool:
+        """判断存储键（或历史记录中的本地路径）是否位于内容寻址存储中"""
+        normalized = file_path.replace(os.sep, "/")
+        if normalized.startswith(f"{BLOB_DIR_NAME}/"):
+            return True
+        blob_root = os.path.abspath(os.path.join(self.upload_dir, BLOB_DIR_NAME))
+        return os.path.abspath(file_path).startswith(blob_root + os.sep)
+    
+    async def commit_blob(self, temp_path: str, file_hash: str, file_extension: str) -> Tuple[str, bool]:
+        """
+        将已写完的本地临时文件提交到存储后端
+        
+        Returns:
+            (存储键, 是否命中已有内容)
+        """
+        key = self.blob_key(file_hash, file_extension)
+        try:
+            if await self.storage.exists(key):
+                # 刷新修改时间，避免刚被复用的文件被并发删除或回收
+                await self.storage.touch(key)
+                await asyncio.to_thread(self.delete_file, temp_path)
+                return key, True
+            
+            await self.storage.put(key, temp_path)
+        except BaseException:
+            await asyncio.to_thread(self.delete_file, temp_path)
+            raise
+        return key, False
+    
+    async def read_file(self, file_path: str, codec: Optional[str] = None) -> bytes:
+        """
+        从存储后端读取完整文件内容，压缩存储的文件透明解压
+        
+        Args:
+            file_path: 存储键
+            codec: 任务记录中的存储编码
+        """
+        if codec == CODEC_ZSTD:
+            return b"".join([chunk async for chunk in self.stream_file(file_path, codec)])
+        return await self.storage.get(file_path)
+    
+    def stream_file(self, file_path: str, codec: Optional[str] = None) -> AsyncIterator[bytes]:
+        """流式读取文件，压缩存储的文件边读边解压"""
+        if codec == CODEC_ZSTD:
+            return decompress_zstd_stream(self.storage.stream(file_path))
+        return self.storage.stream(file_path)
+    
+    def source_extension(self, file_path: str) -> str:
+        """原始文件扩展名（去掉压缩后缀），解析器据此选择解析方式"""
+        if file_path.lower().endswith(ZSTD_SUFFIX):
+            file_path = file_path[:-len(ZSTD_SUFFIX)]
+        return os.path.splitext(file_path)[1].lower()
+    
+    async def file_exists(self, file_path: str) -> bool:
+        """判断存储后端中文件是否存在"""
+        return await self.storage.exists(file_path)
+    
+    async def release_file(self, file_path: str) -> bool:
+        """
+        释放已无任务引用的文件
+        
+        内容寻址存储中刚被复用（修改时间在宽限期内）的文件暂不删除，
+        避免与并发上传竞争，留给垃圾回收处理。
+        
+        Args:
+            file_path: 存储键（调用方需确认已无任务引用）
+            
+        Returns:
+            是否删除成功
+        """
+        if self.is_blob_key(file_path):
+            info = await self.storage.stat(file_path)
+            if info is None:
+                return False
+            if time.time() - info["modified"] < settings.BLOB_DELETE_GRACE_SECONDS:
+                return False
+        return await self.storage.delete(file_path)
+    
+    def _temp_path(self, file_path: str) -> str:
+        """写入中的临时文件路径（位于上传目录，本地存储时与正式文件同一文件系统，保证重命名是原子的）"""
+        directory, filename = os.path.split(file_path)
+        return os.path.join(directory, f".{filename}.part")
+    
+    def _check_file_header(self, header: bytes, file_extension: str) -> Optional[str]:
+        """校验文件头魔数是否与扩展名匹配"""
+        detected_type = sniff_file_type(header)
+        allowed_types = EXTENSION_MAGIC_TYPES.get(file_extension)
+        if allowed_types is not None and detected_type not in allowed_types:
+            raise FileValidationError("文件内容与文件类型不符")
+        return detected_type
+    
+    def _discard_partial(self, buffer: BinaryIO, temp_path: str):
+        """关闭并删除未完成的临时文件"""
+        try:
+            buffer.close()
+        except Exception:
+            pass
+        self.delete_file(temp_path)
+    
+    def is_zip_upload(self, file: UploadFile) -> bool:
+        """判断上传文件是否为ZIP压缩包"""
+        extension = os.path.splitext(file.filename or "")[1].lower()
+        return file.content_type in ZIP_CONTENT_TYPES or extension == ".zip"
+    
+    async def extract_zip_upload(self, file: UploadFile,
+                                 max_files: int) -> Tuple[List[Dict[str, Any]], List[Dict[str, str]]]:
+        """
+        流式解压ZIP压缩包中的简历文件并提交到存储后端
+        
+        Args:
+            file: 上传的ZIP文件对象
+            max_files: 最多解压的文件数
+            
+        Returns:
+            (已保存文件列表（含解析成本探测结果 probe）, 被拒绝文件列表)
+        """
+        extracted, rejected = await asyncio.to_thread(
+            self._extract_zip, file.file, file.filename or "archive.zip", max_files
+        )
+        
+        saved = []
+        for index, item in enumerate(extracted):
+            temp_path = item.pop("temp_path")
+            extension = os.path.splitext(item["filename"])[1].lower()
+            try:
+                item["file_path"], _ = await self.commit_blob(temp_path, item["file_hash"], extension)
+            except Exception as e:
+                rejected.append({"filename": item["filename"], "reason": f"保存失败: {e}"})
+                continue
+            except BaseException:
+                # 请求被取消时清理尚未提交的临时文件
+                for pending in extracted[index + 1:]:
+                    await asyncio.to_thread(self.delete_file, pending["temp_path"])
+                raise
+            saved.append(item)
         
-        # 保存文件
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        return saved, rejected
+    
+    def _extract_zip(self, fileobj: BinaryIO, archive_name: str,
+                     max_files: int) -> Tuple[List[Dict[str, Any]], List[Dict[str, str]]]:
+        """逐个成员流式解压到临时文件（在线程中执行）"""
+        saved = []
+        rejected = []
+        
+        # 按实际接收的字节数校验（分块上传时客户端不声明大小）
+        fileobj.seek(0, os.SEEK_END)
+        archive_size = fileobj.tell()
+        fileobj.seek(0)
+        if archive_size > settings.BATCH_MAX_ARCHIVE_SIZE:
+            return [], [{"filename": archive_name, "reason": "压缩包大小超过限制"}]
+        
+        try:
+            archive = zipfile.ZipFile(fileobj)
+        except zipfile.BadZipFile:
+            return [], [{"filename": archive_name, "reason": "无效的ZIP压缩包"}]
+        
+        with archive:
+            for info in archive.infolist():
+                if info.is_dir():
+                    continue
+                
+                filename = os.path.basename(self._decode_zip_filename(info))
+                # 跳过macOS元数据和隐藏文件
+                if not filename or filename.startswith(".") or info.filename.startswith("__MACOSX/"):
+                    continue
+                
+                extension = os.path.splitext(filename)[1].lower()
+                if extension not in EXTENSION_CONTENT_TYPES:
+                    rejected.append({"filename": filename, "reason": "不支持的文件类型"})
+                    continue
+                
+                if len(saved) >= max_files:
+                    rejected.append({"filename": filename, "reason": f"超过单批次最多 {max_files} 个文件的限制"})
+                    continue
+                
+                if info.file_size > settings.MAX_FILE_SIZE:
+                    rejected.append({"filename": filename, "reason": "文件大小超过限制"})
+                    continue
+                
+                task_id = str(uuid.uuid4())
+                temp_path = self._temp_path(os.path.join(self.upload_dir, f"{task_id}{extension}"))
+                
+                try:
+                    file_size, file_hash = self._copy_zip_member(archive, info, temp_path, extension)
+                except FileValidationError as e:
+                    rejected.append({"filename": filename, "reason": str(e)})
+                    continue
+                except Exception as e:
+                    rejected.append({"filename": filename, "reason": f"解压失败: {e}"})
+                    continue
+                
+                saved.append({
+                    "task_id": task_id,
+                    "filename": filename,
+                    "temp_path": temp_path,
+                    "file_size": file_size,
+                    "file_type": EXTENSION_CONTENT_TYPES[extension],
+                    "file_hash": file_hash,
+                    "probe": probe_file(temp_path, extension)
+                })
         
-        return file_path
+        return saved, rejected
+    
+    def _copy_zip_member(self, archive: zipfile.ZipFile, info: zipfile.ZipInfo,
+                         temp_path: str, file_extension: str) -> Tuple[int, str]:
+        """分块复制压缩包成员到临时文件，实际解压大小超限时中止（防止伪造的头部大小）"""
+        hasher = hashlib.sha256()
+        written = 0
+        try:
+            with archive.open(info) as source, open(temp_path, "wb") as target:
+                while True:
+                    chunk = source.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    if written == 0:
+                        self._check_file_header(chunk, file_extension)
+                    written += len(chunk)
+                    if written > settings.MAX_FILE_SIZE:
+                        raise FileValidationError("文件大小超过限制")
+                    hasher.update(chunk)
+                    target.write(chunk)
+            if written == 0:
+                raise FileValidationError("文件内容为空")
+        except Exception:
+            self.delete_file(temp_path)
+            raise
+        return written, hasher.hexdigest()
+    
+    def _decode_zip_filename(self, info: zipfile.ZipInfo) -> str:
+        """解码ZIP成员文件名（Windows下打包的中文文件名通常为GBK编码）"""
+        if info.flag_bits & 0x800:
+            return info.filename
+        try:
+            return info.filename.encode("cp437").decode("gbk")
+        except (UnicodeEncodeError, UnicodeDecodeError):
+            return info.filename
     
     def delete_file(self, file_path: str) -> bool:
         """
-        删除文件
+        删除本地文件（临时文件等）
         
         Args:
             file_path: 文件路径
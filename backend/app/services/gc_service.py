@@ -0,0 +1,229 @@
+"""
+存储垃圾回收服务
+分批增量扫描存储和任务表并相互核对：
+- 存储中无任务引用的孤儿文件、中断上传遗留的临时文件，超过宽限期后删除
+- 任务引用的文件已不存在时，未完成的任务标记为失败
+- 超过保留期的失败任务连同文件一起删除
+支持试运行和限速（批次间暂停、单轮删除上限），可在业务时间运行
+"""
+import os
+import time
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from app.core.config import settings
+from app.models.resume import TaskStatus
+from app.services.database_service import db_service
+from app.services.file_service import FileService
+from app.services.task_service import TaskService
+
+# 单批最多核对的文件数（受SQLite参数个数限制）
+MAX_GC_BATCH_SIZE = 400
+
+class GarbageCollectionService:
+    """存储垃圾回收服务类"""
+
+    def __init__(self):
+        self.file_service = FileService()
+        self.task_service = TaskService()
+        self.storage = self.file_service.storage
+        self._lock = asyncio.Lock()
+
+    async def run(self, dry_run: bool = False, batch_size: Optional[int] = None,
+                  pause_seconds: Optional[float] = None, max_deletes: Optional[int] = None) -> Dict[str, Any]:
+        """
+        执行一轮垃圾回收
+
+        Args:
+            dry_run: 仅统计，不删除文件、不修改任务
+            batch_size: 每批核对的文件/任务数
+            pause_seconds: 批次间暂停时间（限速）
+            max_deletes: 本轮最多删除的文件和任务数
+
+        Returns:
+            统计：scanned_files、orphan_files、orphan_bytes、deleted_files、scanned_tasks、
+            missing_files、failed_missing、expired_tasks、deleted_tasks、errors；
+            已有一轮在运行时返回 None
+        """
+        if self._lock.locked():
+            print("垃圾回收正在运行，跳过本次")
+            return None
+
+        async with self._lock:
+            return await self._run(dry_run, batch_size, pause_seconds, max_deletes)
+
+    async def _run(self, dry_run: bool, batch_size: Optional[int],
+                   pause_seconds: Optional[float], max_deletes: Optional[int]) -> Dict[str, Any]:
+        """执行一轮垃圾回收（持有锁）"""
+        self.dry_run = dry_run
+        self.batch_size = max(1, min(batch_size or settings.GC_BATCH_SIZE, MAX_GC_BATCH_SIZE))
+        self.pause_seconds = settings.GC_BATCH_PAUSE_SECONDS if pause_seconds is None else pause_seconds
+        self.delete_budget = settings.GC_MAX_DELETES_PER_RUN if max_deletes is None else max_deletes
+        self.stats = {
+            "scanned_files": 0,
+            "orphan_files": 0,
+            "orphan_bytes": 0,
+            "deleted_files": 0,
+            "scanned_tasks": 0,
+            "missing_files": 0,
+            "failed_missing": 0,
+            "expired_tasks": 0,
+            "deleted_tasks": 0,
+            "errors": 0
+        }
+
+        print(f"🧹 开始垃圾回收{'（试运行）' if dry_run else ''}")
+        await self._collect_orphan_files()
+        await self._reconcile_tasks()
+        await self._purge_failed_tasks()
+
+        print(f"🧹 垃圾回收完成: 孤儿文件 {self.stats['orphan_files']}（删除 {self.stats['deleted_files']}），"
+              f"文件缺失任务 {self.stats['missing_files']}，过期失败任务 {self.stats['expired_tasks']}"
+              f"（删除 {self.stats['deleted_tasks']}）")
+        return self.stats
+
+    async def _collect_orphan_files(self):
+        """扫描存储，删除超过宽限期且无任务引用的文件"""
+        batch: List[Dict[str, Any]] = []
+        async for item in self.storage.iter_objects():
+            batch.append(item)
+            if len(batch) >= self.batch_size:
+                await self._process_file_batch(batch)
+                batch = []
+                await self._pause()
+        if batch:
+            await self._process_file_batch(batch)
+
+    async def _process_file_batch(self, items: List[Dict[str, Any]]):
+        """核对一批存储文件"""
+        self.stats["scanned_files"] += len(items)
+        cutoff = time.time() - settings.GC_ORPHAN_GRACE_HOURS * 3600
+
+        candidates = {}
+        for item in items:
+            if item["modified"] >= cutoff:
+                # 宽限期内的文件可能属于正在进行的上传，暂不处理
+                continue
+            candidates[item["key"]] = item
+
+        if not candidates:
+            return
+
+        # 历史记录中本地文件可能以包含上传目录的路径保存
+        forms = {}
+        for key in candidates:
+            forms[key] = [key]
+            if self.storage.local_path(key) is not None:
+                forms[key].append(os.path.join(self.file_service.upload_dir, key))
+
+        referenced = db_service.get_referenced_paths([form for values in forms.values() for form in values])
+
+        for key, item in candidates.items():
+            if any(form in referenced for form in forms[key]):
+                continue
+
+            self.stats["orphan_files"] += 1
+            self.stats["orphan_bytes"] += item["size"]
+            if self.dry_run:
+                continue
+
+            # 列出后文件可能刚被去重上传复用（会刷新修改时间），删除前再次确认
+            info = await self.storage.stat(key)
+            if info is None or info["modified"] >= cutoff or not self._take_budget():
+                continue
+
+            if await self.storage.delete(key):
+                self.stats["deleted_files"] += 1
+            else:
+                self.stats["errors"] += 1
+
+    async def _reconcile_tasks(self):
+        """扫描任务表，找出引用的文件已不存在的任务"""
+        stale_before = datetime.now() - timedelta(hours=settings.GC_ORPHAN_GRACE_HOURS)
+        last_id = ""
+        while True:
+            refs = db_service.get_file_refs_after(last_id, self.batch_size)
+            if not refs:
+                break
+
+            for ref in refs:
+                last_id = ref["id"]
+                self.stats["scanned_tasks"] += 1
+                if not ref["file_path"]:
+                    continue
+
+                try:
+                    if await self.storage.exists(ref["file_path"]):
+                        continue
+                except Exception as e:
+                    self.stats["errors"] += 1
+                    print(f"检查文件失败 {ref['file_path']}: {e}")
+                    continue
+
+                self.stats["missing_files"] += 1
+                print(f"⚠️  任务 {ref['id']} 的文件不存在: {ref['file_path']}")
+
+                # 已完成的任务保留解析结果；长时间未完成的任务无法再解析，标记为失败
+                if ref["status"] not in (TaskStatus.UPLOADED.value, TaskStatus.PARSING.value):
+                    continue
+                created_at = datetime.fromisoformat(ref["created_at"]) if ref["created_at"] else None
+                if created_at and created_at > stale_before:
+                    continue
+
+                self.stats["failed_missing"] += 1
+                if not self.dry_run:
+                    await self.task_service.update_task_status(
+                        ref["id"], TaskStatus.FAILED, error="文件不存在，无法解析"
+                    )
+
+            await self._pause()
+
+    async def _purge_failed_tasks(self):
+        """删除超过保留期的失败任务及其文件"""
+        if settings.GC_FAILED_TASK_RETENTION_DAYS <= 0:
+            return
+
+        created_before = datetime.now() - timedelta(days=settings.GC_FAILED_TASK_RETENTION_DAYS)
+        last_id = ""
+        while True:
+            task_ids = db_service.get_failed_task_ids_before(created_before, last_id, self.batch_size)
+            if not task_ids:
+                break
+
+            for task_id in task_ids:
+                last_id = task_id
+                self.stats["expired_tasks"] += 1
+                if self.dry_run or not self._take_budget():
+                    continue
+
+                if await self.task_service.delete_task(task_id):
+                    self.stats["deleted_tasks"] += 1
+                else:
+                    self.stats["errors"] += 1
+
+            await self._pause()
+
+    def _take_budget(self) -> bool:
+        """消耗一次删除配额，配额用完后本轮只统计不删除"""
+        if self.delete_budget <= 0:
+            return False
+        self.delete_budget -= 1
+        return True
+
+    async def _pause(self):
+        """批次间暂停，降低对磁盘、对象存储和数据库的压力"""
+        if self.pause_seconds > 0:
+            await asyncio.sleep(self.pause_seconds)
+
+    async def run_periodically(self):
+        """后台定期执行垃圾回收"""
+        interval = max(1, settings.GC_INTERVAL_HOURS) * 3600
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.run()
+            except Exception as e:
+                print(f"垃圾回收任务失败: {e}")
+
+# 创建全局垃圾回收服务实例
+gc_service = GarbageCollectionService()
@@ -0,0 +1,203 @@
+"""
+LLM调用客户端
+对一个服务端点的请求都经过这里：可重试的错误（429、5xx、连接失败、超时）按带抖动的指数退避重试，
+优先遵循服务商返回的 Retry-After；连续失败达到阈值后熔断，冷却结束后只放行一个探测请求，成功后恢复。
+端点的选择、故障转移和熔断期间的等待由 llm_router 负责
+"""
+import time
+import random
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional
+import requests
+from app.core.config import settings
+
+# 可重试的HTTP状态码
+RETRYABLE_STATUSES = {408, 409, 425, 429, 500, 502, 503, 504}
+
+# 熔断器状态
+BREAKER_CLOSED = "closed"
+BREAKER_OPEN = "open"
+BREAKER_HALF_OPEN = "half_open"
+
+class CircuitOpenError(Exception):
+    """LLM服务熔断中，请求未发出"""
+
+class LLMClient:
+    """带重试和熔断的LLM客户端（对应一个服务端点）"""
+
+    def __init__(self, name: str = "default", url: Optional[str] = None, api_key: Optional[str] = None):
+        self.name = name
+        self.url = url or settings.SILICONFLOW_API_URL
+        self.api_key = settings.SILICONFLOW_API_KEY if api_key is None else api_key
+        self._state = BREAKER_CLOSED
+        self._failures = 0          # 连续失败的请求次数（含重试）
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self.metrics: Dict[str, Any] = {
+            "requests": 0,
+            "succeeded": 0,
+            "failed": 0,
+            "retries": 0,
+            "rejected": 0,          # 熔断期间被拒绝的请求
+            "breaker_opened": 0,
+            "last_error": None,
+            "last_opened_at": None
+        }
+
+    @property
+    def state(self) -> str:
+        """熔断器状态，冷却结束后进入半开状态"""
+        if self._state == BREAKER_OPEN and time.monotonic() - self._opened_at >= settings.LLM_BREAKER_COOLDOWN:
+            self._state = BREAKER_HALF_OPEN
+        return self._state
+
+    @property
+    def available(self) -> bool:
+        """是否可以发出请求（未熔断，或冷却结束且没有探测请求在途）"""
+        state = self.state
+        return state == BREAKER_CLOSED or (state == BREAKER_HALF_OPEN and not self._probe_in_flight)
+
+    def _retry_delay(self, attempt: int, response: Optional[requests.Response]) -> float:
+        """重试等待时间：服务商给出 Retry-After 时遵循，否则指数退避加随机抖动"""
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.strip().isdigit():
+            return min(float(retry_after), settings.LLM_RETRY_MAX_DELAY)
+        delay = min(settings.LLM_RETRY_BASE_DELAY * 2 ** attempt, settings.LLM_RETRY_MAX_DELAY)
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def _record_success(self):
+        if self._state != BREAKER_CLOSED:
+            print(f"✅ LLM服务 {self.name} 已恢复，熔断器关闭")
+        self._state = BREAKER_CLOSED
+        self._failures = 0
+        self._probe_in_flight = False
+        self.metrics["succeeded"] += 1
+
+    def _record_failure(self, error: str):
+        self._failures += 1
+        self._probe_in_flight = False
+        self.metrics["last_error"] = error
+        if self._state == BREAKER_HALF_OPEN or (
+            self._state == BREAKER_CLOSED and self._failures >= settings.LLM_BREAKER_FAILURE_THRESHOLD
+        ):
+            self._state = BREAKER_OPEN
+            self._opened_at = time.monotonic()
+            self.metrics["breaker_opened"] += 1
+            self.metrics["last_opened_at"] = time.time()
+            print(f"🚫 LLM服务 {self.name} 连续失败 {self._failures} 次，熔断 {settings.LLM_BREAKER_COOLDOWN} 秒: {error}")
+
+    async def _acquire(self, wait: bool):
+        """
+        熔断检查，返回本次请求是否为探测请求
+
+        Args:
+            wait: 熔断时是否等待恢复（解析任务等待，交互请求直接失败）
+        """
+        deadline = time.monotonic() + settings.LLM_BREAKER_MAX_WAIT
+        while True:
+            state = self.state
+            if state == BREAKER_CLOSED:
+                return False
+            if state == BREAKER_HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            if not wait or time.monotonic() >= deadline:
+                self.metrics["rejected"] += 1
+                raise CircuitOpenError(f"LLM服务 {self.name} 暂不可用（熔断中），请稍后重试")
+            await asyncio.sleep(1)
+
+    async def post(self, payload: Dict[str, Any], stream: bool = False, wait: bool = True,
+                   max_retries: Optional[int] = None, timeout: Optional[float] = None,
+                   stats: Optional[Dict[str, Any]] = None,
+                   before_send: Optional[Callable[[], Awaitable[Any]]] = None) -> requests.Response:
+        """
+        发送LLM请求
+
+        Args:
+            payload: 请求体
+            stream: 是否流式读取响应
+            wait: 熔断时是否等待恢复
+            max_retries: 最大重试次数，默认 LLM_MAX_RETRIES
+            timeout: 请求超时（秒），默认 LLM_REQUEST_TIMEOUT
+            stats: 用于回传重试次数的字典（可选）
+            before_send: 每次实际发出请求（含重试）前等待的回调，用于按配额排队（可选）
+
+        Returns:
+            最后一次请求的响应（不可重试的错误状态由调用方处理）
+
+        Raises:
+            CircuitOpenError: 熔断中且不等待或等待超时
+            requests.RequestException: 重试后仍连接失败或超时
+        """
+        probe = await self._acquire(wait)
+        max_retries = settings.LLM_MAX_RETRIES if max_retries is None else max_retries
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        self.metrics["requests"] += 1
+
+        attempt = 0
+        while True:
+            response = None
+            try:
+                if before_send:
+                    await before_send()
+                # 在线程中执行HTTP请求，避免阻塞事件循环
+                response = await asyncio.to_thread(
+                    requests.post, self.url, json=payload, headers=headers,
+                    timeout=timeout or settings.LLM_REQUEST_TIMEOUT, stream=stream
+                )
+                if response.status_code not in RETRYABLE_STATUSES:
+                    # 其他4xx是请求本身的问题，不代表服务不可用
+                    self._record_success()
+                    return response
+                error = f"HTTP {response.status_code}"
+            except requests.RequestException as e:
+                error = str(e)
+                self._record_failure(error)
+                if attempt >= max_retries or probe:
+                    self.metrics["failed"] += 1
+                    raise
+            except BaseException:
+                # 取消等意外中断时释放探测名额
+                if probe:
+                    self._probe_in_flight = False
+                raise
+            else:
+                self._record_failure(error)
+
+            if attempt >= max_retries or probe:
+                self.metrics["failed"] += 1
+                return response
+
+            # 本次或其他请求的失败已触发熔断时不再重试，转为等待恢复
+            if self.state != BREAKER_CLOSED:
+                if response is not None:
+                    response.close()
+                probe = await self._acquire(wait)
+                attempt = 0
+                continue
+
+            delay = self._retry_delay(attempt, response)
+            if response is not None:
+                response.close()
+            attempt += 1
+            self.metrics["retries"] += 1
+            if stats is not None:
+                stats["llm_retries"] = stats.get("llm_retries", 0) + 1
+            print(f"⚠️  LLM服务 {self.name} 请求失败（{error}），{delay:.1f} 秒后第 {attempt}/{max_retries} 次重试")
+            await asyncio.sleep(delay)
+
+    def get_status(self) -> Dict[str, Any]:
+        """熔断器状态和调用统计"""
+        state = self.state
+        cooldown = 0.0
+        if state == BREAKER_OPEN:
+            cooldown = max(0.0, settings.LLM_BREAKER_COOLDOWN - (time.monotonic() - self._opened_at))
+        return {
+            "name": self.name,
+            "state": state,
+            "consecutive_failures": self._failures,
+            "cooldown_remaining": round(cooldown, 1),
+            **self.metrics
+        }
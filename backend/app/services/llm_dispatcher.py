@@ -0,0 +1,190 @@
+"""
+LLM请求调度
+所有简历解析的LLM请求在发出前经过这里，按服务商的每分钟请求数（LLM_RPM）和每分钟token数（LLM_TPM）配额匀速放行，
+避免批量上传时请求同时涌向服务商触发429。
+
+请求按到达顺序排队，队首请求等到两个令牌桶的额度都足够时放行，持续吞吐量等于配额而不会忽高忽低；
+放行时按 prompt 估算加 max_tokens 预留token，请求完成后按实际用量结算，多预留的token退回桶中。
+
+一次解析调用可能发出多次实际请求（端点上的重试、转移到其他端点、去掉输出格式约束后重发），
+DispatchSession 在每次实际发出请求前重新排队，每次请求都计入配额
+"""
+import time
+import asyncio
+from typing import Any, Dict, Optional
+from app.core.config import settings
+
+# 令牌桶容量对应的秒数（允许的突发量 = 每秒速率 × 该秒数）
+BURST_SECONDS = 5
+
+# 排队时重新检查额度的最长间隔（秒）
+POLL_INTERVAL = 0.25
+
+class TokenBucket:
+    """令牌桶"""
+
+    def __init__(self, per_minute: int, burst_seconds: float = BURST_SECONDS):
+        self.per_minute = per_minute
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self.level = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def time_until(self, amount: float, now: float) -> float:
+        """距离可以取出 amount 还需等待的秒数（超过容量的请求在桶满时即可取出）"""
+        self._refill(now)
+        return max(0.0, (min(amount, self.capacity) - self.level) / self.rate)
+
+    def take(self, amount: float, now: float):
+        """取出额度（可透支）"""
+        self._refill(now)
+        self.level -= amount
+
+    def refund(self, amount: float, now: float):
+        """退回（amount 为负时补扣）额度"""
+        self._refill(now)
+        self.level = min(self.capacity, self.level + amount)
+
+    def to_dict(self) -> Dict[str, Any]:
+        self._refill(time.monotonic())
+        return {
+            "per_minute": self.per_minute,
+            "capacity": round(self.capacity, 1),
+            "level": round(self.level, 1)
+        }
+
+class DispatchTicket:
+    """一次放行的请求"""
+
+    def __init__(self, tokens: int, waited: float):
+        self.tokens = tokens    # 预留的token数
+        self.waited = waited    # 排队等待的秒数
+
+class DispatchSession:
+    """一次LLM调用的配额占用，其中每次实际发出的请求（含重试、转移、重发）各自排队放行"""
+
+    def __init__(self, dispatcher: "LLMDispatcher", prompt_tokens: int, max_tokens: int):
+        self.dispatcher = dispatcher
+        self.prompt_tokens = prompt_tokens
+        self.max_tokens = max_tokens
+        self.ticket: Optional[DispatchTicket] = None
+        self.requests = 0       # 实际发出的请求数
+        self.waited = 0.0       # 累计排队等待的秒数
+        self._sent = False      # 当前凭证是否已用于发出请求
+
+    async def acquire(self):
+        """
+        为下一次实际请求排队放行（已放行但尚未发出请求时直接返回）；
+        上一次请求未成功（将要重试、转移或重发）时，按只消耗prompt结算它的预留
+        """
+        if self.ticket is not None:
+            if not self._sent:
+                return
+            self.dispatcher.settle(self.ticket, self.prompt_tokens)
+        self.ticket = await self.dispatcher.acquire(self.prompt_tokens + self.max_tokens)
+        self.waited += self.ticket.waited
+        self._sent = False
+
+    async def before_send(self):
+        """每次实际发出请求前调用（由 LLMClient 在每次尝试前调用）"""
+        await self.acquire()
+        self._sent = True
+        self.requests += 1
+
+    def settle(self, used_tokens: int):
+        """调用结束后按最后一次请求的实际用量结算"""
+        if self.ticket is not None:
+            self.dispatcher.settle(self.ticket, used_tokens)
+            self.ticket = None
+
+class LLMDispatcher:
+    """按RPM/TPM配额匀速放行LLM请求"""
+
+    def __init__(self, rpm: Optional[int] = None, tpm: Optional[int] = None):
+        rpm = settings.LLM_RPM if rpm is None else rpm
+        tpm = settings.LLM_TPM if tpm is None else tpm
+        self.rpm_bucket = TokenBucket(rpm) if rpm > 0 else None
+        self.tpm_bucket = TokenBucket(tpm) if tpm > 0 else None
+        self.queued = 0
+        self._lock = asyncio.Lock()
+        self.metrics: Dict[str, Any] = {
+            "dispatched": 0,
+            "delayed": 0,
+            "total_wait_seconds": 0.0,
+            "max_wait_seconds": 0.0
+        }
+
+    async def acquire(self, tokens: int) -> DispatchTicket:
+        """
+        等待配额放行一个请求
+
+        Args:
+            tokens: 预计消耗的token数（prompt估算加上 max_tokens）
+
+        Returns:
+            放行凭证，请求完成后交给 settle 结算
+        """
+        started = time.monotonic()
+        self.queued += 1
+        try:
+            # 锁按等待顺序唤醒：只有队首的请求在等额度，其余按到达顺序排在后面
+            async with self._lock:
+                while True:
+                    now = time.monotonic()
+                    delay = max(
+                        self.rpm_bucket.time_until(1, now) if self.rpm_bucket else 0.0,
+                        self.tpm_bucket.time_until(tokens, now) if self.tpm_bucket else 0.0
+                    )
+                    if delay <= 0:
+                        break
+                    # 等待期间完成的请求会退回多预留的token，分段等待以便及时放行
+                    await asyncio.sleep(min(delay, POLL_INTERVAL))
+                if self.rpm_bucket:
+                    self.rpm_bucket.take(1, now)
+                if self.tpm_bucket:
+                    self.tpm_bucket.take(tokens, now)
+        finally:
+            self.queued -= 1
+
+        delay = time.monotonic() - started
+        if delay > 0.01:
+            self.metrics["delayed"] += 1
+        self.metrics["dispatched"] += 1
+        self.metrics["total_wait_seconds"] += delay
+        self.metrics["max_wait_seconds"] = max(self.metrics["max_wait_seconds"], delay)
+        return DispatchTicket(tokens, delay)
+
+    def settle(self, ticket: DispatchTicket, used_tokens: int):
+        """按实际用量结算，多预留的token退回桶中"""
+        if self.tpm_bucket:
+            self.tpm_bucket.refund(ticket.tokens - used_tokens, time.monotonic())
+
+    def session(self, prompt_tokens: int, max_tokens: int) -> DispatchSession:
+        """
+        创建一次LLM调用的配额会话
+
+        Args:
+            prompt_tokens: 估算的prompt token数
+            max_tokens: 输出token上限
+        """
+        return DispatchSession(self, prompt_tokens, max_tokens)
+
+    def get_status(self) -> Dict[str, Any]:
+        """配额、桶余量、排队数和等待统计"""
+        dispatched = self.metrics["dispatched"]
+        return {
+            "rpm": self.rpm_bucket.to_dict() if self.rpm_bucket else None,
+            "tpm": self.tpm_bucket.to_dict() if self.tpm_bucket else None,
+            "queued": self.queued,
+            **self.metrics,
+            "total_wait_seconds": round(self.metrics["total_wait_seconds"], 2),
+            "max_wait_seconds": round(self.metrics["max_wait_seconds"], 2),
+            "avg_wait_seconds": round(self.metrics["total_wait_seconds"] / dispatched, 2) if dispatched else 0.0
+        }
+
+# 全局LLM调度器实例
+llm_dispatcher = LLMDispatcher()
@@ -0,0 +1,120 @@
+"""
+LLM请求合并
+批量导入时大部分简历是单页的短文本，逐份请求会反复发送很长的系统提示词并承担每个请求的固定开销。
+批量上传和重新解析作业中的短文本先在这里排队，在很短的等待窗口内凑满token预算或份数上限后
+合并为一个请求（经过 llm_dispatcher 按配额放行），模型按序号输出各份简历的结果，再拆分回各自的任务；
+合并请求失败或某份结果缺失时，相应的简历改为单独请求。
+
+交互上传的单份简历不经过这里，仍然流式解析并推送部分结果
+"""
+import asyncio
+from typing import Any, Dict, List, Optional
+from app.core.config import settings
+from app.utils.tokens import estimate_tokens
+
+class PackedItem:
+    """等待合并的一份简历"""
+
+    def __init__(self, text: str, stats: Optional[Dict[str, Any]], output_tokens: int):
+        self.text = text
+        self.stats = stats
+        self.tokens = estimate_tokens(text)
+        self.output_tokens = output_tokens     # 该份简历预计的输出token数
+        self.future = asyncio.get_running_loop().create_future()
+
+class LLMRequestPacker:
+    """把多份短简历合并为一个LLM请求"""
+
+    def __init__(self):
+        self._pending: List[PackedItem] = []
+        self._parser = None
+        self._runners = set()
+        self.metrics: Dict[str, int] = {
+            "requests": 0,      # 发出的合并请求数（含只凑到一份、按单份请求的情况）
+            "items": 0,         # 经过合并队列的简历数
+            "packed_items": 0   # 实际与其他简历合并发送的简历数
+        }
+
+    def accepts(self, text: str) -> bool:
+        """该文本是否参与合并（已启用且足够短）"""
+        return settings.LLM_PACK_ENABLED and estimate_tokens(text) <= settings.LLM_PACK_MAX_ITEM_TOKENS
+
+    async def submit(self, parser, text: str, stats: Optional[Dict[str, Any]] = None):
+        """
+        加入合并队列并等待该份简历的解析结果
+
+        Args:
+            parser: 简历解析器（ResumeParser），由它发出合并请求和单独请求
+            text: 简历文本
+            stats: 用于回传解析统计的字典（可选）
+        """
+        item = PackedItem(text, stats, parser._output_budget(text))
+        if self._pending and not self._fits(item):
+            self._flush()
+
+        self._pending.append(item)
+        self._parser = parser
+        self.metrics["items"] += 1
+        if len(self._pending) >= settings.LLM_PACK_MAX_ITEMS:
+            self._flush()
+        elif len(self._pending) == 1:
+            self._spawn(self._flush_later(self._pending))
+        return await item.future
+
+    def _fits(self, item: PackedItem) -> bool:
+        """加入后是否仍在输入token预算和输出上限（MAX_TOKENS）之内"""
+        input_tokens = sum(pending.tokens for pending in self._pending) + item.tokens
+        output_tokens = sum(pending.output_tokens for pending in self._pending) + item.output_tokens
+        return input_tokens <= settings.LLM_PACK_TOKEN_BUDGET and output_tokens <= settings.MAX_TOKENS
+
+    async def _flush_later(self, batch: List[PackedItem]):
+        """等待窗口结束后发出未凑满的批次"""
+        await asyncio.sleep(settings.LLM_PACK_WINDOW)
+        if self._pending is batch:
+            self._flush()
+
+    def _flush(self):
+        """发出当前批次"""
+        batch, self._pending = self._pending, []
+        if batch:
+            self._spawn(self._run(self._parser, batch))
+
+    def _spawn(self, coroutine):
+        # 持有后台任务引用，避免执行中被回收
+        runner = asyncio.create_task(coroutine)
+        self._runners.add(runner)
+        runner.add_done_callback(self._runners.discard)
+
+    async def _run(self, parser, batch: List[PackedItem]):
+        """发送合并请求并把结果分发给各份简历"""
+        self.metrics["requests"] += 1
+        if len(batch) > 1:
+            self.metrics["packed_items"] += len(batch)
+            print(f"📦 合并 {len(batch)} 份简历为一个LLM请求（约 {sum(item.tokens for item in batch)} tokens）")
+
+        try:
+            results = await parser.parse_packed([item.text for item in batch], [item.stats for item in batch])
+        except Exception as e:
+            results = [e] * len(batch)
+
+        for item, result in zip(batch, results):
+            if item.future.done():
+                continue
+            if isinstance(result, BaseException):
+                item.future.set_exception(result)
+            else:
+                item.future.set_result(result)
+
+    def get_status(self) -> Dict[str, Any]:
+        """合并配置、排队数和统计"""
+        return {
+            "enabled": settings.LLM_PACK_ENABLED,
+            "token_budget": settings.LLM_PACK_TOKEN_BUDGET,
+            "max_item_tokens": settings.LLM_PACK_MAX_ITEM_TOKENS,
+            "max_items": settings.LLM_PACK_MAX_ITEMS,
+            "pending": len(self._pending),
+            **self.metrics
+        }
+
+# 全局LLM请求合并实例
+llm_packer = LLMRequestPacker()
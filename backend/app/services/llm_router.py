@@ -0,0 +1,264 @@
+"""
+LLM请求路由
+在多个兼容OpenAI接口的服务端点之间分配请求：
+- 按“在途请求数 / 权重”选择最空闲的端点（least outstanding requests），相同时选延迟EWMA更低的
+- 每个端点可设置并发上限和每分钟token预算，已满的端点暂不参与分配
+- 端点出错（可重试的状态码、连接失败、熔断）时转移到其他端点；所有端点都不可用时解析请求排队等待
+
+端点通过 LLM_ENDPOINTS 配置（JSON数组），未配置时使用 SILICONFLOW_API_URL / LLM_MODEL 作为唯一端点
+"""
+import json
+import time
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, List, Optional, Set, Tuple
+import requests
+from app.core.config import settings
+from app.services.llm_client import LLMClient, CircuitOpenError, RETRYABLE_STATUSES
+from app.utils.tokens import estimate_tokens
+
+# 延迟EWMA的平滑系数
+LATENCY_EWMA_ALPHA = 0.3
+
+# 没有可用端点时重新检查的间隔（秒）
+SELECT_POLL_INTERVAL = 0.1
+
+# token预算的统计窗口（秒）
+TPM_WINDOW = 60
+
+class LLMEndpoint:
+    """一个LLM服务端点及其负载状态"""
+
+    def __init__(self, name: str, url: str, model: str, api_key: Optional[str] = None,
+                 weight: float = 1.0, max_concurrency: int = 0, tpm: int = 0):
+        self.name = name
+        self.model = model
+        self.weight = max(float(weight), 0.01)
+        self.max_concurrency = max_concurrency   # 0 表示不限制
+        self.tpm = tpm                           # 每分钟token预算，0 表示不限制
+        self.client = LLMClient(name, url, api_key)
+        self.outstanding = 0
+        self.latency_ewma: Optional[float] = None
+        self.served = 0
+        self.failovers = 0                       # 在该端点失败后转移到其他端点的次数
+        self._token_log: Deque[Tuple[float, int]] = deque()
+
+    def tokens_in_window(self, now: float) -> int:
+        """统计窗口内已分配的token数"""
+        while self._token_log and now - self._token_log[0][0] >= TPM_WINDOW:
+            self._token_log.popleft()
+        return sum(tokens for _, tokens in self._token_log)
+
+    def has_capacity(self, tokens: int, now: float) -> bool:
+        """是否可以接收一个请求（未熔断、未达并发上限、token预算足够）"""
+        if not self.client.available:
+            return False
+        if self.max_concurrency and self.outstanding >= self.max_concurrency:
+            return False
+        if self.tpm:
+            used = self.tokens_in_window(now)
+            # 窗口为空时总是放行，避免超出预算的单个请求永远无法发出
+            if used and used + tokens > self.tpm:
+                return False
+        return True
+
+    def load(self) -> Tuple[float, float]:
+        """负载排序键：在途请求数/权重，其次是延迟"""
+        return (self.outstanding + 1) / self.weight, self.latency_ewma or 0.0
+
+    def acquire(self, tokens: int):
+        self.outstanding += 1
+        if self.tpm:
+            self._token_log.append((time.monotonic(), tokens))
+
+    def release(self, latency: Optional[float] = None):
+        self.outstanding -= 1
+        if latency is None:
+            return
+        self.served += 1
+        if self.latency_ewma is None:
+            self.latency_ewma = latency
+        else:
+            self.latency_ewma = LATENCY_EWMA_ALPHA * latency + (1 - LATENCY_EWMA_ALPHA) * self.latency_ewma
+
+    def to_dict(self) -> Dict[str, Any]:
+        """端点状态（不含密钥）"""
+        return {
+            **self.client.get_status(),
+            "url": self.client.url,
+            "model": self.model,
+            "weight": self.weight,
+            "max_concurrency": self.max_concurrency,
+            "tpm": self.tpm,
+            "tokens_last_minute": self.tokens_in_window(time.monotonic()),
+            "outstanding": self.outstanding,
+            "served": self.served,
+            "failovers": self.failovers,
+            "latency_ewma": round(self.latency_ewma, 3) if self.latency_ewma is not None else None
+        }
+
+def load_endpoints(config: Optional[str] = None) -> List[LLMEndpoint]:
+    """
+    解析端点配置
+
+    Args:
+        config: JSON数组，元素字段为 url（必填）、name、model、api_key、weight、max_concurrency、tpm；
+                默认读取 LLM_ENDPOINTS
+    """
+    config = settings.LLM_ENDPOINTS if config is None else config
+    if config.strip():
+        try:
+            items = json.loads(config)
+            endpoints = [
+                LLMEndpoint(
+                    name=item.get("name") or f"endpoint-{index + 1}",
+                    url=item["url"],
+                    model=item.get("model") or settings.LLM_MODEL,
+                    api_key=item.get("api_key", ""),
+                    weight=item.get("weight", 1),
+                    max_concurrency=int(item.get("max_concurrency", 0)),
+                    tpm=int(item.get("tpm", 0))
+                )
+                for index, item in enumerate(items)
+            ]
+            if endpoints:
+                return endpoints
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            print(f"⚠️  LLM_ENDPOINTS 配置无效，使用默认端点: {e}")
+
+    return [LLMEndpoint("default", settings.SILICONFLOW_API_URL, settings.LLM_MODEL, settings.SILICONFLOW_API_KEY)]
+
+class LLMRouter:
+    """LLM请求路由"""
+
+    def __init__(self, endpoints: Optional[List[LLMEndpoint]] = None):
+        self.endpoints = endpoints if endpoints is not None else load_endpoints()
+
+    @property
+    def configured(self) -> bool:
+        """是否配置了可用的LLM服务（未配置时解析返回模拟数据）"""
+        return bool(settings.LLM_ENDPOINTS.strip() or settings.SILICONFLOW_API_KEY)
+
+    def _pool(self, model: Optional[str]) -> List[LLMEndpoint]:
+        """
+        可处理该模型的端点：优先使用配置了该模型的端点，
+        没有时由所有端点按请求的模型处理（同一服务商通常提供多个模型）
+        """
+        if not model:
+            return self.endpoints
+        return [endpoint for endpoint in self.endpoints if endpoint.model == model] or self.endpoints
+
+    def _select(self, pool: List[LLMEndpoint], tokens: int, exclude: Set[str]) -> Optional[LLMEndpoint]:
+        """选择负载最低的可用端点"""
+        now = time.monotonic()
+        candidates = [
+            endpoint for endpoint in pool
+            if endpoint.name not in exclude and endpoint.has_capacity(tokens, now)
+        ]
+        return min(candidates, key=LLMEndpoint.load) if candidates else None
+
+    async def _dispatch(self, payload: Dict[str, Any], stream: bool, wait: bool, max_retries: Optional[int],
+                        timeout: Optional[float], stats: Dict[str, Any],
+                        before_send: Optional[Callable[[], Awaitable[Any]]]) -> Tuple[LLMEndpoint, requests.Response, float]:
+        """
+        选择端点并发出请求，失败时转移到其他端点
+
+        Returns:
+            (所用端点, 响应, 请求开始时间)
+        """
+        tokens = sum(estimate_tokens(message.get("content") or "") for message in payload.get("messages", []))
+        tokens += payload.get("max_tokens") or 0
+        model = payload.get("model")
+        pool = self._pool(model)
+
+        deadline = time.monotonic() + settings.LLM_BREAKER_MAX_WAIT
+        tried: Set[str] = set()
+        while True:
+            endpoint = self._select(pool, tokens, tried)
+            if endpoint is None:
+                if not wait or time.monotonic() >= deadline:
+                    raise CircuitOpenError("没有可用的LLM服务（均已熔断或达到并发、token上限），请稍后重试")
+                if len(tried) == len(pool):
+                    # 所有端点都已尝试过，等待其中任一恢复
+                    tried.clear()
+                await asyncio.sleep(SELECT_POLL_INTERVAL)
+                continue
+
+            tried.add(endpoint.name)
+            # 还有其他端点可以转移时不在当前端点上重试
+            can_failover = len(tried) < len(pool)
+            endpoint.acquire(tokens)
+            started = time.monotonic()
+            try:
+                response = await endpoint.client.post(
+                    {**payload, "model": model or endpoint.model}, stream=stream, wait=False,
+                    max_retries=0 if can_failover else max_retries, timeout=timeout, stats=stats,
+                    before_send=before_send
+                )
+            except (requests.RequestException, CircuitOpenError) as e:
+                endpoint.release()
+                if can_failover:
+                    self._record_failover(endpoint, str(e), stats)
+                elif not isinstance(e, CircuitOpenError):
+                    raise
+                # 熔断时回到选择，等待任一端点恢复
+                continue
+            except BaseException:
+                endpoint.release()
+                raise
+
+            if response.status_code in RETRYABLE_STATUSES and can_failover:
+                response.close()
+                endpoint.release()
+                self._record_failover(endpoint, f"HTTP {response.status_code}", stats)
+                continue
+            return endpoint, response, started
+
+    def _record_failover(self, endpoint: LLMEndpoint, error: str, stats: Dict[str, Any]):
+        endpoint.failovers += 1
+        stats["llm_failovers"] = stats.get("llm_failovers", 0) + 1
+        print(f"↪️  LLM服务 {endpoint.name} 请求失败（{error}），转移到其他端点")
+
+    @asynccontextmanager
+    async def request(self, payload: Dict[str, Any], stream: bool = False, wait: bool = True,
+                      max_retries: Optional[int] = None, timeout: Optional[float] = None,
+                      stats: Optional[Dict[str, Any]] = None,
+                      before_send: Optional[Callable[[], Awaitable[Any]]] = None) -> AsyncIterator[requests.Response]:
+        """
+        发送LLM请求，响应读取完毕（退出上下文）后才释放端点的并发名额
+
+        Args:
+            payload: 请求体（未指定 model 时使用所选端点配置的模型）
+            stream: 是否流式读取响应
+            wait: 没有可用端点时是否排队等待（解析任务等待，交互请求直接失败）
+            max_retries: 单个端点上的最大重试次数，默认 LLM_MAX_RETRIES
+            timeout: 请求超时（秒），默认 LLM_REQUEST_TIMEOUT
+            stats: 用于回传所用端点、模型、重试和转移次数的字典（可选）
+            before_send: 每次实际发出请求（含重试、转移）前等待的回调，用于按配额排队（可选）
+
+        Raises:
+            CircuitOpenError: 没有可用端点且不等待或等待超时
+            requests.RequestException: 所有端点都连接失败或超时
+        """
+        stats = {} if stats is None else stats
+        endpoint, response, started = await self._dispatch(
+            payload, stream, wait, max_retries, timeout, stats, before_send
+        )
+        stats["llm_endpoint"] = endpoint.name
+        stats["llm_model"] = payload.get("model") or endpoint.model
+
+        succeeded = False
+        try:
+            yield response
+            succeeded = response.ok
+        finally:
+            response.close()
+            endpoint.release(time.monotonic() - started if succeeded else None)
+
+    def get_status(self) -> List[Dict[str, Any]]:
+        """各端点的熔断、负载和延迟状态"""
+        return [endpoint.to_dict() for endpoint in self.endpoints]
+
+# 全局LLM路由实例
+llm_router = LLMRouter()
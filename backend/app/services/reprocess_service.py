@@ -0,0 +1,240 @@
+"""
+简历重新解析服务
+基于已保存的提取文本仅重跑LLM解析，不再读取文件、不再做PDF提取和OCR；
+用于更换模型、调整提示词后批量刷新结果，或重试LLM解析失败的任务
+"""
+import uuid
+import asyncio
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from app.core.config import settings
+from app.models.resume import TaskStatus
+from app.services.database_service import db_service
+from app.services.task_service import TaskService
+from app.services.task_events import task_event_broker
+from app.services.resume_service import ResumeService
+from app.services.llm_router import llm_router
+from app.utils.rule_extractor import extract_rules, apply_rules
+from app.utils.text_compactor import compact_text
+from app.utils.tokens import estimate_tokens
+
+# 内存中保留的已结束作业数
+MAX_FINISHED_JOBS = 50
+
+class ReprocessService:
+    """简历重新解析服务类"""
+
+    def __init__(self):
+        self.task_service = TaskService()
+        self.resume_service = ResumeService()
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+        self._cancelled = set()
+        self._runners = set()
+
+    def select_tasks(self, filters: Dict[str, Any], limit: Optional[int] = None) -> List[str]:
+        """
+        按条件选出可重新解析的任务（已保存提取文本且不在解析中）
+
+        Args:
+            filters: created_from / created_to（日期或ISO时间）、failed_only、llm_model（仅该模型解析的任务）、
+                     prompt_version（仅该提示词版本解析的任务）、outdated_only（仅非当前模型或提示词版本解析的任务）
+            limit: 最多选出的任务数
+        """
+        query = {
+            "created_from": self._format_time(filters.get("created_from")),
+            "created_to": self._format_time(filters.get("created_to")),
+            "failed_only": filters.get("failed_only", False),
+            "llm_model": filters.get("llm_model"),
+            "prompt_version": filters.get("prompt_version"),
+            "exclude_llm_models": self._current_models() if filters.get("outdated_only") else None,
+            "exclude_prompt_version": self.resume_service.parser.prompt.version
+        }
+        return db_service.get_reprocess_task_ids(query, limit)
+
+    def _current_models(self) -> List[str]:
+        """当前使用的模型（各端点配置的模型和级联中的快速模型），由其中任一解析的结果都不算过时"""
+        models = {endpoint.model for endpoint in llm_router.endpoints}
+        if settings.LLM_FAST_MODEL:
+            models.add(settings.LLM_FAST_MODEL)
+        return sorted(models)
+
+    def _format_time(self, value) -> Optional[str]:
+        """时间条件统一为ISO字符串（与任务的 created_at 存储格式一致）"""
+        if isinstance(value, datetime):
+            return value.replace(tzinfo=None).isoformat()
+        return value
+
+    def start_job(self, filters: Dict[str, Any], limit: Optional[int] = None,
+                  concurrency: Optional[int] = None) -> Dict[str, Any]:
+        """
+        创建重新解析作业并在后台执行
+
+        Returns:
+            作业信息
+        """
+        job = self.create_job(filters, limit, concurrency)
+        # 持有后台任务引用，避免执行中被回收
+        runner = asyncio.create_task(self.run_job(job["job_id"]))
+        self._runners.add(runner)
+        runner.add_done_callback(self._runners.discard)
+        return job
+
+    def create_job(self, filters: Dict[str, Any], limit: Optional[int] = None,
+                   concurrency: Optional[int] = None) -> Dict[str, Any]:
+        """选出任务并登记作业（不执行）"""
+        task_ids = self.select_tasks(filters, limit)
+        job_id = uuid.uuid4().hex
+        job = {
+            "job_id": job_id,
+            "status": "pending",
+            "filters": {key: value for key, value in filters.items() if value not in (None, False)},
+            "concurrency": max(1, concurrency or settings.REPROCESS_CONCURRENCY),
+            "llm_model": settings.LLM_MODEL,
+            "prompt_version": self.resume_service.parser.prompt.version,
+            "total": len(task_ids),
+            "processed": 0,
+            "succeeded": 0,
+            "failed": 0,
+            "errors": [],
+            "created_at": datetime.now().isoformat(),
+            "started_at": None,
+            "finished_at": None,
+            "task_ids": task_ids
+        }
+        self._prune_jobs()
+        self.jobs[job_id] = job
+        return self._public(job)
+
+    async def run_job(self, job_id: str, progress_callback=None) -> Optional[Dict[str, Any]]:
+        """
+        执行作业，并发数受作业的 concurrency 限制
+
+        Args:
+            job_id: 作业ID
+            progress_callback: 每处理完一个任务后调用，参数为作业信息（可选）
+        """
+        job = self.jobs.get(job_id)
+        if not job:
+            return None
+
+        job["status"] = "running"
+        job["started_at"] = datetime.now().isoformat()
+        print(f"🔁 开始重新解析作业 {job_id}，共 {job['total']} 个任务，并发 {job['concurrency']}")
+
+        semaphore = asyncio.Semaphore(job["concurrency"])
+
+        async def run(task_id: str):
+            async with semaphore:
+                if job_id in self._cancelled:
+                    return
+                ok, error = await self._reprocess_task(task_id)
+                job["processed"] += 1
+                if ok:
+                    job["succeeded"] += 1
+                else:
+                    job["failed"] += 1
+                    if len(job["errors"]) < 20:
+                        job["errors"].append({"task_id": task_id, "error": error})
+                if progress_callback:
+                    progress_callback(self._public(job))
+
+        await asyncio.gather(*(run(task_id) for task_id in job["task_ids"]))
+
+        job["status"] = "cancelled" if job_id in self._cancelled else "completed"
+        job["finished_at"] = datetime.now().isoformat()
+        self._cancelled.discard(job_id)
+        print(f"🔁 重新解析作业 {job_id} 结束: 成功 {job['succeeded']}，失败 {job['failed']}")
+        return self._public(job)
+
+    async def _reprocess_task(self, task_id: str):
+        """
+        基于保存的文本重新解析单个任务
+
+        解析失败时保留任务原有状态和结果，已失败的任务更新错误信息
+
+        Returns:
+            (是否成功, 错误信息)
+        """
+        task = await self.task_service.get_task(task_id)
+        if not task:
+            return False, "任务不存在"
+        if task.status in (TaskStatus.UPLOADED, TaskStatus.PARSING):
+            return False, "任务正在解析"
+
+        text = db_service.get_resume_text(task_id)
+        if text is None:
+            return False, "未保存提取文本"
+
+        # 不携带状态，避免订阅方把任务原有的终态当作本次重新解析结束
+        task_event_broker.publish(task_id, "progress", {"stage": "reprocessing"})
+
+        compacted = compact_text(text, self.resume_service.parser.input_char_limit(text))
+        db_service.update_task_parse_stats(task_id, {
+            "tokens_before_compaction": estimate_tokens(text),
+            "tokens_after_compaction": estimate_tokens(compacted)
+        })
+
+        llm_stats = {}
+        try:
+            result = await self.resume_service.parser.parse_text(
+                compacted, source_name=task.file_path, stats=llm_stats, packable=True
+            )
+        except Exception as e:
+            print(f"重新解析失败 {task_id}: {e}")
+            if llm_stats:
+                db_service.update_task_parse_stats(task_id, llm_stats)
+            if task.status == TaskStatus.FAILED:
+                await self.task_service.update_task_status(task_id, TaskStatus.FAILED, error=str(e))
+            return False, str(e)
+
+        result = apply_rules(result, extract_rules(text), text)
+
+        # 已有候选人时同步更新（新候选人由完成状态更新时创建）
+        candidate = db_service.get_candidate_by_task_id(task_id)
+        if candidate:
+            self.resume_service._update_candidate_from_resume(candidate, result)
+            db_service.update_candidate(candidate)
+
+        await self.task_service.update_task_status(
+            task_id, TaskStatus.COMPLETED, progress=100, result=result
+        )
+        db_service.update_task_llm_model(
+            task_id, llm_stats.get("llm_model", settings.LLM_MODEL), self.resume_service.parser.prompt.version,
+            llm_stats.get("llm_tier")
+        )
+        db_service.update_task_parse_stats(task_id, llm_stats)
+        return True, None
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """获取作业信息"""
+        job = self.jobs.get(job_id)
+        return self._public(job) if job else None
+
+    def list_jobs(self) -> List[Dict[str, Any]]:
+        """获取所有作业信息（按创建时间倒序）"""
+        jobs = sorted(self.jobs.values(), key=lambda job: job["created_at"], reverse=True)
+        return [self._public(job) for job in jobs]
+
+    def cancel_job(self, job_id: str) -> bool:
+        """取消作业，正在解析的任务会继续完成，未开始的任务不再处理"""
+        job = self.jobs.get(job_id)
+        if not job or job["status"] not in ("pending", "running"):
+            return False
+        self._cancelled.add(job_id)
+        return True
+
+    def _prune_jobs(self):
+        """只保留最近的已结束作业"""
+        finished = [job for job in self.jobs.values() if job["status"] in ("completed", "cancelled")]
+        finished.sort(key=lambda job: job["created_at"])
+        for job in finished[:max(0, len(finished) - MAX_FINISHED_JOBS + 1)]:
+            self.jobs.pop(job["job_id"], None)
+
+    def _public(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        """作业信息（不含任务ID列表）"""
+        info = {key: value for key, value in job.items() if key != "task_ids"}
+        info["errors"] = list(job["errors"])
+        return info
+
+# 创建全局重新解析服务实例
+reprocess_service = ReprocessService()
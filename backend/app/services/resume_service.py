@@ -1,25 +1,117 @@
 """
 简历解析服务
 """
-from app.models.resume import TaskStatus, ResumeInfo
+import time
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from app.core.config import settings
+from app.models.resume import TaskStatus, ResumeInfo, UploadTask
 from app.services.task_service import TaskService
 from app.services.database_service import db_service
+from app.services.file_service import FileService
 from app.utils.resume_parser import ResumeParser
+from app.utils.resume_sections import HEADER_SECTION, plan_incremental_parse, merge_resume_info
+from app.utils.rule_extractor import extract_rules, apply_rules, has_rule_data
+from app.utils.text_compactor import compact_text
+from app.utils.tokens import estimate_tokens
+
+class ParseSingleflight:
+    """
+    进行中解析的去重：相同文件内容（同一提示词版本）的并发解析只执行一次，
+    后到的任务等待先到任务的解析结果（重复点击上传、多人同时上传同一份简历）；
+    等待期间执行方的阶段进度和部分结果也转发给等待方
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, Tuple[str, asyncio.Future]] = {}
+        self._followers: Dict[str, List[str]] = {}  # 执行方任务ID -> 等待其结果的任务ID
+        self.metrics: Dict[str, int] = {
+            "executed": 0,     # 实际执行的解析次数
+            "coalesced": 0     # 共用进行中解析结果的次数
+        }
+
+    def leader_of(self, key: str) -> Optional[str]:
+        """正在解析该内容的任务ID"""
+        inflight = self._inflight.get(key)
+        return inflight[0] if inflight else None
+
+    def followers_of(self, task_id: str) -> List[str]:
+        """正在等待该任务解析结果的任务ID"""
+        return list(self._followers.get(task_id, ()))
+
+    async def run(self, key: str, task_id: str,
+                  parse: Callable[[], Awaitable[ResumeInfo]]) -> Tuple[ResumeInfo, Optional[str]]:
+        """
+        执行解析，已有相同内容的解析在进行时等待其结果；执行方被取消时由等待方接替执行
+
+        Args:
+            key: 去重键（文件哈希与提示词版本）
+            task_id: 当前任务ID
+            parse: 执行解析的函数
+
+        Returns:
+            (解析结果, 共用其结果的任务ID；由当前任务执行时为 None)
+        """
+        while key in self._inflight:
+            leader_id, future = self._inflight[key]
+            self.metrics["coalesced"] += 1
+            followers = self._followers.setdefault(leader_id, [])
+            followers.append(task_id)
+            try:
+                # 等待方被取消时不影响执行方
+                return await asyncio.shield(future), leader_id
+            except asyncio.CancelledError:
+                # 执行方被取消（服务关闭、任务被中止）不代表等待方被取消，不能让取消传给等待方，
+                # 否则等待方的任务会一直停在解析中；重新检查，由第一个醒来的等待方接替执行解析
+                if not future.cancelled():
+                    raise
+                self.metrics["coalesced"] -= 1
+                print(f"⚠️  任务 {leader_id} 的解析已取消，任务 {task_id} 重新解析")
+            finally:
+                followers.remove(task_id)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = (task_id, future)
+        self.metrics["executed"] += 1
+        try:
+            result = await parse()
+        except Exception as e:
+            future.set_exception(e)
+            # 没有等待方时不提示异常未被读取
+            future.exception()
+            raise
+        except BaseException:
+            future.cancel()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+            self._followers.pop(task_id, None)
+        future.set_result(result)
+        return result, None
+
+    def get_status(self) -> Dict[str, Any]:
+        """进行中的解析数和去重次数"""
+        return {"in_flight": len(self._inflight), **self.metrics}
+
+# 全局解析去重实例（解析服务按请求创建，去重需跨实例共享）
+parse_singleflight = ParseSingleflight()
 
 class ResumeService:
     """简历解析服务类"""
     
     def __init__(self):
         self.task_service = TaskService()
+        self.file_service = FileService()
         self.parser = ResumeParser()
     
-    async def process_resume(self, task_id: str, force_update: bool = False):
+    async def process_resume(self, task_id: str, force_update: bool = False, bulk: bool = False):
         """
         处理简历解析任务
         
         Args:
             task_id: 任务ID
             force_update: 是否强制更新已存在的候选人
+            bulk: 是否为批量导入（短简历可与其他简历合并为一个LLM请求）
         """
         try:
             # 获取任务信息
@@ -30,13 +122,13 @@ class ResumeService:
             
             # 更新状态为解析中
             await self.task_service.update_task_status(
-                task_id, TaskStatus.PARSING, progress=0
+                task_id, TaskStatus.PARSING, progress=0, stage="started"
             )
             
             print(f"开始解析任务: {task_id}")
             
-            # 解析文件
-            result = await self.parser.parse_file(task.file_path)
+            # 从存储后端读取并解析文件（相同文件正在解析时共用其结果）
+            result = await self._parse_task_file_once(task, bulk)
 
             print(result)
             
@@ -68,6 +160,210 @@ class ResumeService:
                 task_id, TaskStatus.FAILED, error=str(e)
             )
     
+    async def _parse_task_file_once(self, task: UploadTask, bulk: bool = False) -> ResumeInfo:
+        """
+        按文件内容去重解析：同一文件已有任务在解析时不再重复提取、OCR和调用LLM，
+        等待其结果后复制提取文本和所用模型，并记录共用的任务
+        """
+        if not task.file_hash:
+            return await self._parse_task_file(task, bulk)
+        
+        key = f"{task.file_hash}:{self.parser.prompt.version}"
+        leader_id = parse_singleflight.leader_of(key)
+        if leader_id:
+            print(f"🔗 任务 {task.id} 与进行中的任务 {leader_id} 文件相同，等待其解析结果")
+            # 先推送执行方当前的进度和部分结果，之后的进度和部分结果由执行方转发
+            leader = db_service.get_task(leader_id)
+            await self.task_service.report_progress(
+                task.id, "waiting_duplicate", max(10, leader.progress if leader else 0)
+            )
+            if leader and leader.partial_result:
+                await self.task_service.report_partial_result(task.id, leader.partial_result, source="coalesced")
+        
+        result, leader_id = await parse_singleflight.run(key, task.id, lambda: self._parse_task_file(task, bulk))
+        if leader_id:
+            self._copy_parse_metadata(leader_id, task.id)
+        return result
+    
+    def _copy_parse_metadata(self, source_id: str, task_id: str):
+        """复制共用结果的任务的提取文本和所用模型（token用量和费用只记在执行解析的任务上）"""
+        text = db_service.get_resume_text(source_id)
+        if text is not None:
+            db_service.save_resume_text(task_id, text)
+        source = db_service.get_task(source_id)
+        if source and source.llm_model:
+            db_service.update_task_llm_model(task_id, source.llm_model, source.prompt_version, source.llm_tier)
+        db_service.update_task_parse_stats(task_id, {"mode": "coalesced", "coalesced_with": source_id})
+    
+    async def _parse_task_file(self, task: UploadTask, bulk: bool = False) -> ResumeInfo:
+        """
+        从存储后端读取任务文件并解析（文件可位于本地或对象存储）
+        
+        提取的文本在调用LLM之前保存，LLM解析失败或更换模型后可仅重跑LLM；
+        规则提取结果先作为部分结果推送，LLM流式输出的字段经规则校验后陆续推送；
+        规则结果再用于校验LLM最终输出，LLM不可用时作为降级结果
+        """
+        text = await self._extract_task_text(task)
+        rules = await self._report_rule_result(task.id, text)
+        
+        result = await self._call_llm(
+            task, text, fallback_available=has_rule_data(rules),
+            present_partial=lambda partial: apply_rules(partial, rules, text), packable=bulk
+        )
+        tokens = estimate_tokens(text)
+        db_service.update_task_parse_stats(task.id, {
+            "mode": "full", "input_tokens": tokens, "full_input_tokens": tokens, "tokens_saved": 0
+        })
+        return apply_rules(result, rules, text) if result else rules
+    
+    async def _extract_task_text(self, task: UploadTask) -> str:
+        """读取任务文件并提取文本，提取结果随即保存"""
+        if not await self.file_service.file_exists(task.file_path):
+            raise FileNotFoundError(f"文件不存在: {task.file_path}")
+        
+        content = await self.file_service.read_file(task.file_path, task.storage_codec)
+        text = await self.parser.extract_text(
+            content,
+            self.file_service.source_extension(task.file_path),
+            progress_callback=self._progress_reporter(task.id),
+            source_name=task.file_path
+        )
+        
+        if not db_service.save_resume_text(task.id, text):
+            print(f"⚠️  保存任务 {task.id} 的提取文本失败")
+        return text
+    
+    async def _report_rule_result(self, task_id: str, text: str) -> ResumeInfo:
+        """规则提取联系方式和教育经历，立即作为部分结果推送"""
+        rules = extract_rules(text)
+        if has_rule_data(rules):
+            await self._report_partial(task_id, rules, source="rules")
+        return rules
+    
+    async def _report_partial(self, task_id: str, partial: ResumeInfo, source: str):
+        """推送部分结果，同时转发给等待该任务解析结果的任务"""
+        await self.task_service.report_partial_result(task_id, partial, source=source)
+        for follower_id in parse_singleflight.followers_of(task_id):
+            await self.task_service.report_partial_result(follower_id, partial, source=source)
+    
+    async def _call_llm(self, task: UploadTask, text: str, fallback_available: bool,
+                        present_partial: Optional[Callable[[ResumeInfo], ResumeInfo]] = None,
+                        packable: bool = False, require_name: bool = True) -> Optional[ResumeInfo]:
+        """
+        压缩文本后调用LLM解析，记录压缩前后的token数、LLM耗时和输出修复情况
+        
+        Args:
+            task: 任务
+            text: 发送给LLM的文本
+            fallback_available: 是否有可降级使用的结果（规则提取或上一版结果）
+            present_partial: 将流式输出的部分结果整理为可展示结果的函数，提供时推送部分结果
+            packable: 是否允许与其他短简历合并为一个请求
+            require_name: 模型级联校验时是否要求有姓名（只发送部分段落且不含开头部分时为 False）
+            
+        Returns:
+            解析结果；LLM不可用或超时且可降级时返回 None
+        """
+        compacted = compact_text(text, self.parser.input_char_limit(text))
+        db_service.update_task_parse_stats(task.id, {
+            "tokens_before_compaction": estimate_tokens(text),
+            "tokens_after_compaction": estimate_tokens(compacted)
+        })
+        
+        partial_callback = None
+        if present_partial:
+            async def partial_callback(partial: ResumeInfo):
+                await self._report_partial(task.id, present_partial(partial), source="llm")
+        
+        started = time.monotonic()
+        llm_stats = {}
+        try:
+            result = await self.parser.parse_text(
+                compacted, progress_callback=self._progress_reporter(task.id), source_name=task.file_path,
+                stats=llm_stats, partial_callback=partial_callback, packable=packable,
+                require_name=require_name
+            )
+        except Exception as e:
+            if not fallback_available:
+                if llm_stats:
+                    db_service.update_task_parse_stats(task.id, llm_stats)
+                raise
+            print(f"⚠️  任务 {task.id} LLM解析失败，降级为规则提取结果: {e}")
+            db_service.update_task_parse_stats(task.id, {**llm_stats, "rules_only": True, "llm_error": str(e)})
+            return None
+        
+        db_service.update_task_llm_model(
+            task.id, llm_stats.get("llm_model", settings.LLM_MODEL), self.parser.prompt.version, llm_stats.get("llm_tier")
+        )
+        db_service.update_task_parse_stats(task.id, {**llm_stats, "llm_seconds": round(time.monotonic() - started, 2)})
+        return result
+    
+    async def _parse_update_file(self, task: UploadTask, previous: Optional[UploadTask]) -> ResumeInfo:
+        """
+        增量解析候选人的新版简历
+        
+        - 文件哈希与上一版相同：不提取、不调用LLM，直接复用上一版结果
+        - 否则按段落比对新旧文本，只把变化的段落交给LLM，再合并到上一版结果
+        - 上一版没有保存文本或结果、识别不出段落、变化过大时完整解析
+        """
+        previous_result = previous.result if previous and previous.status == TaskStatus.COMPLETED else None
+        if not settings.INCREMENTAL_PARSE_ENABLED or not previous_result:
+            return await self._parse_task_file(task)
+        
+        previous_text = db_service.get_resume_text(previous.id)
+        
+        if task.file_hash and task.file_hash == previous.file_hash:
+            if previous_text is not None:
+                db_service.save_resume_text(task.id, previous_text)
+            if previous.llm_model:
+                db_service.update_task_llm_model(task.id, previous.llm_model, previous.prompt_version, previous.llm_tier)
+            self._record_incremental_stats(task.id, "unchanged", previous_text or "", "", [])
+            return previous_result
+        
+        if previous_text is None:
+            return await self._parse_task_file(task)
+        
+        text = await self._extract_task_text(task)
+        rules = await self._report_rule_result(task.id, text)
+        plan = plan_incremental_parse(previous_text, text, settings.INCREMENTAL_PARSE_MAX_CHANGED_RATIO)
+        
+        if plan is None:
+            result = await self._call_llm(
+                task, text, fallback_available=has_rule_data(rules),
+                present_partial=lambda partial: apply_rules(partial, rules, text)
+            )
+            self._record_incremental_stats(task.id, "full", text, text, [])
+            return apply_rules(result, rules, text) if result else rules
+        
+        partial = None
+        if plan["changed"]:
+            # LLM不可用时保留上一版结果，再用规则结果修正联系方式和教育经历；
+            # 姓名在开头部分，开头没有变化时发送的段落中本来就没有姓名，不因此升级模型
+            partial = await self._call_llm(
+                task, plan["text"], fallback_available=True, require_name=HEADER_SECTION in plan["changed"]
+            )
+        elif previous.llm_model:
+            db_service.update_task_llm_model(task.id, previous.llm_model, previous.prompt_version, previous.llm_tier)
+        
+        result = merge_resume_info(previous_result, partial, plan["changed"] if partial else [], plan["removed"])
+        self._record_incremental_stats(task.id, "incremental", text, plan["text"], plan["changed"], plan["removed"])
+        return apply_rules(result, rules, text)
+    
+    def _record_incremental_stats(self, task_id: str, mode: str, full_text: str, sent_text: str,
+                                  changed: List[str], removed: Optional[List[str]] = None):
+        """记录增量解析统计（发送给LLM的token数与节省的token数）"""
+        full_tokens = estimate_tokens(full_text)
+        input_tokens = estimate_tokens(sent_text)
+        db_service.update_task_parse_stats(task_id, {
+            "mode": mode,
+            "changed_sections": changed,
+            "removed_sections": removed or [],
+            "input_tokens": input_tokens,
+            "full_input_tokens": full_tokens,
+            "tokens_saved": full_tokens - input_tokens
+        })
+        print(f"♻️  任务 {task_id} 增量解析（{mode}）: 变化段落 {changed or '无'}，"
+              f"节省约 {full_tokens - input_tokens} tokens")
+    
     async def process_resume_update(self, task_id: str, candidate_id: int):
         """
         处理简历更新任务 - 更新已存在的候选人
@@ -94,13 +390,14 @@ class ResumeService:
             
             # 更新状态为解析中
             await self.task_service.update_task_status(
-                task_id, TaskStatus.PARSING, progress=0
+                task_id, TaskStatus.PARSING, progress=0, stage="started"
             )
             
             print(f"开始更新候选人 {candidate.name} (ID: {candidate_id}) 的简历")
             
-            # 解析文件
-            result = await self.parser.parse_file(task.file_path)
+            # 与候选人上一版简历比对，只解析变化的部分
+            previous = await self.task_service.get_task(candidate.task_id) if candidate.task_id else None
+            result = await self._parse_update_file(task, previous)
             
             # 更新候选人信息
             self._update_candidate_from_resume(candidate, result)
@@ -128,6 +425,14 @@ class ResumeService:
                 task_id, TaskStatus.FAILED, error=str(e)
             )
     
+    def _progress_reporter(self, task_id: str):
+        """创建解析阶段进度回调（同时转发给等待该任务解析结果的任务）"""
+        async def report(stage: str, progress: int):
+            await self.task_service.report_progress(task_id, stage, progress)
+            for follower_id in parse_singleflight.followers_of(task_id):
+                await self.task_service.report_progress(follower_id, stage, progress)
+        return report
+    
     def _update_candidate_from_resume(self, candidate, resume_info: ResumeInfo):
         """从解析的简历信息更新候选人记录"""
         import json
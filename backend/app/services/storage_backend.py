@@ -0,0 +1,330 @@
+"""
+文件存储后端
+统一的对象存储接口（put/get/stream/delete/exists），提供本地文件系统和S3兼容对象存储两种实现，
+解析任务和下载接口都通过存储键访问文件，便于多台机器共享同一份简历文件
+"""
+import os
+import time
+import asyncio
+from typing import Any, AsyncIterator, Dict, List, Optional
+from app.core.config import settings
+
+# 流式读取的块大小
+STREAM_CHUNK_SIZE = 64 * 1024
+
+class StorageBackend:
+    """存储后端基类 - 以存储键（如 blobs/ab/abcdef....pdf）寻址文件"""
+
+    name = "base"
+
+    async def put(self, key: str, source_path: str):
+        """将本地临时文件写入存储（成功后源文件不再保留）"""
+        raise NotImplementedError("子类必须实现 put 方法")
+
+    async def get(self, key: str) -> bytes:
+        """读取完整文件内容"""
+        raise NotImplementedError("子类必须实现 get 方法")
+
+    def stream(self, key: str, start: int = 0, end: Optional[int] = None) -> AsyncIterator[bytes]:
+        """按块流式读取文件的 [start, end] 闭区间，end 为 None 时读到文件末尾"""
+        raise NotImplementedError("子类必须实现 stream 方法")
+
+    async def delete(self, key: str) -> bool:
+        """删除文件，返回是否删除成功"""
+        raise NotImplementedError("子类必须实现 delete 方法")
+
+    async def exists(self, key: str) -> bool:
+        """判断文件是否存在"""
+        raise NotImplementedError("子类必须实现 exists 方法")
+
+    async def stat(self, key: str) -> Optional[Dict[str, Any]]:
+        """获取文件元信息：size（字节）、modified（时间戳），不存在时返回 None"""
+        raise NotImplementedError("子类必须实现 stat 方法")
+
+    async def touch(self, key: str):
+        """刷新文件修改时间（内容被复用时调用，避免被并发删除或回收）"""
+        raise NotImplementedError("子类必须实现 touch 方法")
+
+    def iter_objects(self, prefix: str = "") -> AsyncIterator[Dict[str, Any]]:
+        """逐个列出存储中的文件：key、size、modified（按目录/分页增量读取，不一次性加载全部）"""
+        raise NotImplementedError("子类必须实现 iter_objects 方法")
+
+    def local_path(self, key: str) -> Optional[str]:
+        """文件在本机的路径，非本地存储返回 None"""
+        return None
+
+class LocalStorageBackend(StorageBackend):
+    """本地文件系统存储"""
+
+    name = "local"
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(self.root, exist_ok=True)
+
+    def local_path(self, key: str) -> str:
+        """
+        将存储键解析为本地路径
+
+        历史任务记录中保存的是包含上传目录的路径（如 uploads/xxx.pdf），原样使用
+        """
+        root_prefix = os.path.normpath(self.root) + os.sep
+        if os.path.isabs(key) or os.path.normpath(key).startswith(root_prefix):
+            return key
+        return os.path.join(self.root, key)
+
+    async def put(self, key: str, source_path: str):
+        await asyncio.to_thread(self._put, key, source_path)
+
+    def _put(self, key: str, source_path: str):
+        path = self.local_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # 临时文件位于同一文件系统，重命名是原子的
+        os.replace(source_path, path)
+
+    async def get(self, key: str) -> bytes:
+        return await asyncio.to_thread(self._read, key)
+
+    def _read(self, key: str) -> bytes:
+        with open(self.local_path(key), "rb") as f:
+            return f.read()
+
+    async def stream(self, key: str, start: int = 0, end: Optional[int] = None) -> AsyncIterator[bytes]:
+        handle = await asyncio.to_thread(open, self.local_path(key), "rb")
+        try:
+            await asyncio.to_thread(handle.seek, start)
+            remaining = None if end is None else end - start + 1
+            while remaining is None or remaining > 0:
+                size = STREAM_CHUNK_SIZE if remaining is None else min(STREAM_CHUNK_SIZE, remaining)
+                chunk = await asyncio.to_thread(handle.read, size)
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+        finally:
+            await asyncio.to_thread(handle.close)
+
+    async def delete(self, key: str) -> bool:
+        return await asyncio.to_thread(self._delete, key)
+
+    def _delete(self, key: str) -> bool:
+        try:
+            os.remove(self.local_path(key))
+            return True
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            print(f"删除文件失败: {e}")
+            return False
+
+    async def exists(self, key: str) -> bool:
+        return await asyncio.to_thread(os.path.exists, self.local_path(key))
+
+    async def stat(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            stat_result = await asyncio.to_thread(os.stat, self.local_path(key))
+        except OSError:
+            return None
+        return {"size": stat_result.st_size, "modified": stat_result.st_mtime}
+
+    async def touch(self, key: str):
+        try:
+            await asyncio.to_thread(os.utime, self.local_path(key))
+        except OSError:
+            pass
+
+    async def iter_objects(self, prefix: str = "") -> AsyncIterator[Dict[str, Any]]:
+        pending = [os.path.join(self.root, prefix) if prefix else self.root]
+        while pending:
+            directory = pending.pop()
+            entries = await asyncio.to_thread(self._scan_directory, directory)
+            for path, is_dir, size, modified in entries:
+                if is_dir:
+                    pending.append(path)
+                    continue
+                yield {
+                    "key": os.path.relpath(path, self.root).replace(os.sep, "/"),
+                    "size": size,
+                    "modified": modified
+                }
+
+    def _scan_directory(self, directory: str) -> List[tuple]:
+        """读取单个目录的条目（在线程中执行）"""
+        entries = []
+        try:
+            with os.scandir(directory) as iterator:
+                for entry in iterator:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            entries.append((entry.path, True, 0, 0.0))
+                        elif entry.is_file(follow_symlinks=False):
+                            stat_result = entry.stat(follow_symlinks=False)
+                            entries.append((entry.path, False, stat_result.st_size, stat_result.st_mtime))
+                    except OSError:
+                        continue
+        except FileNotFoundError:
+            pass
+        entries.sort()
+        return entries
+
+class S3StorageBackend(StorageBackend):
+    """
+    S3兼容对象存储（AWS S3、MinIO等）
+
+    大文件自动使用分片上传；读取支持 Range，下载接口可直接按需转发分段内容。
+    依赖 boto3（可选依赖，仅在启用时导入）。
+    """
+
+    name = "s3"
+
+    def __init__(self, bucket: str, prefix: str = "", endpoint_url: Optional[str] = None,
+                 access_key: Optional[str] = None, secret_key: Optional[str] = None,
+                 region: Optional[str] = None):
+        try:
+            import boto3
+            from boto3.s3.transfer import TransferConfig
+            from botocore.config import Config
+            from botocore.exceptions import ClientError
+        except ImportError:
+            raise RuntimeError("使用S3存储需要安装 boto3: pip install boto3")
+
+        if not bucket:
+            raise ValueError("使用S3存储必须配置 S3_BUCKET")
+
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self._client_error = ClientError
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=endpoint_url or None,
+            aws_access_key_id=access_key or None,
+            aws_secret_access_key=secret_key or None,
+            region_name=region or None,
+            # MinIO等自建服务通常不支持虚拟主机风格的桶地址
+            config=Config(s3={"addressing_style": "path"} if endpoint_url else {})
+        )
+        self.transfer_config = TransferConfig(
+            multipart_threshold=settings.S3_MULTIPART_THRESHOLD,
+            multipart_chunksize=settings.S3_MULTIPART_CHUNK_SIZE
+        )
+
+    def _object_key(self, key: str) -> str:
+        key = key.replace(os.sep, "/").lstrip("/")
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    def _is_not_found(self, error: Exception) -> bool:
+        code = str(error.response.get("Error", {}).get("Code", ""))
+        return code in ("404", "NoSuchKey", "NotFound")
+
+    async def put(self, key: str, source_path: str):
+        # upload_file 超过阈值时自动切换为并发分片上传
+        await asyncio.to_thread(
+            self.client.upload_file, source_path, self.bucket, self._object_key(key),
+            Config=self.transfer_config
+        )
+        await asyncio.to_thread(os.remove, source_path)
+
+    async def get(self, key: str) -> bytes:
+        def read() -> bytes:
+            response = self.client.get_object(Bucket=self.bucket, Key=self._object_key(key))
+            return response["Body"].read()
+        return await asyncio.to_thread(read)
+
+    async def stream(self, key: str, start: int = 0, end: Optional[int] = None) -> AsyncIterator[bytes]:
+        byte_range = f"bytes={start}-{'' if end is None else end}"
+        response = await asyncio.to_thread(
+            self.client.get_object, Bucket=self.bucket, Key=self._object_key(key), Range=byte_range
+        )
+        body = response["Body"]
+        try:
+            while True:
+                chunk = await asyncio.to_thread(body.read, STREAM_CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            await asyncio.to_thread(body.close)
+
+    async def delete(self, key: str) -> bool:
+        try:
+            await asyncio.to_thread(
+                self.client.delete_object, Bucket=self.bucket, Key=self._object_key(key)
+            )
+            return True
+        except Exception as e:
+            print(f"删除对象失败: {e}")
+            return False
+
+    async def exists(self, key: str) -> bool:
+        return await self.stat(key) is not None
+
+    async def stat(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            response = await asyncio.to_thread(
+                self.client.head_object, Bucket=self.bucket, Key=self._object_key(key)
+            )
+        except self._client_error as e:
+            if self._is_not_found(e):
+                return None
+            raise
+        return {"size": response["ContentLength"], "modified": response["LastModified"].timestamp()}
+
+    async def touch(self, key: str):
+        # 对象存储没有utime，原地复制并替换元数据以刷新 LastModified
+        object_key = self._object_key(key)
+        try:
+            await asyncio.to_thread(
+                self.client.copy_object,
+                Bucket=self.bucket,
+                Key=object_key,
+                CopySource={"Bucket": self.bucket, "Key": object_key},
+                Metadata={"touched-at": str(int(time.time()))},
+                MetadataDirective="REPLACE"
+            )
+        except Exception as e:
+            print(f"刷新对象时间失败: {e}")
+
+    async def iter_objects(self, prefix: str = "") -> AsyncIterator[Dict[str, Any]]:
+        object_prefix = self._object_key(prefix) if prefix else (f"{self.prefix}/" if self.prefix else "")
+        strip = len(f"{self.prefix}/") if self.prefix else 0
+        continuation_token = None
+        while True:
+            params = {"Bucket": self.bucket, "Prefix": object_prefix}
+            if continuation_token:
+                params["ContinuationToken"] = continuation_token
+            response = await asyncio.to_thread(self.client.list_objects_v2, **params)
+            for item in response.get("Contents", []):
+                yield {
+                    "key": item["Key"][strip:],
+                    "size": item["Size"],
+                    "modified": item["LastModified"].timestamp()
+                }
+            if not response.get("IsTruncated"):
+                break
+            continuation_token = response.get("NextContinuationToken")
+
+def create_storage_backend() -> StorageBackend:
+    """根据 STORAGE_BACKEND 配置创建存储后端"""
+    backend = settings.STORAGE_BACKEND.lower()
+    if backend == "local":
+        return LocalStorageBackend(settings.UPLOAD_DIR)
+    if backend == "s3":
+        return S3StorageBackend(
+            bucket=settings.S3_BUCKET,
+            prefix=settings.S3_PREFIX,
+            endpoint_url=settings.S3_ENDPOINT_URL,
+            access_key=settings.S3_ACCESS_KEY,
+            secret_key=settings.S3_SECRET_KEY,
+            region=settings.S3_REGION
+        )
+    raise ValueError(f"不支持的存储后端: {settings.STORAGE_BACKEND}")
+
+_storage_backend: Optional[StorageBackend] = None
+
+def get_storage_backend() -> StorageBackend:
+    """获取全局存储后端实例（首次使用时创建，未启用S3时不会导入boto3）"""
+    global _storage_backend
+    if _storage_backend is None:
+        _storage_backend = create_storage_backend()
+    return _storage_backend
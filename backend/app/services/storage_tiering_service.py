@@ -0,0 +1,178 @@
+"""
+冷文件分层压缩服务
+定期找出上传已久且从未被下载的简历文件，压缩收益明显时改为 zstd 压缩存储
+"""
+import os
+import uuid
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Tuple
+from app.core.config import settings
+from app.services.database_service import db_service
+from app.services.file_service import FileService
+from app.utils.compression import (
+    CODEC_IDENTITY, CODEC_ZSTD, ZSTD_SUFFIX, compress_file_zstd, is_zstd_available
+)
+
+class StorageTieringService:
+    """冷文件分层压缩服务类"""
+
+    def __init__(self):
+        self.file_service = FileService()
+        self.storage = self.file_service.storage
+
+    async def run(self, dry_run: bool = False, max_files: Optional[int] = None,
+                  batch_size: Optional[int] = None) -> Dict[str, Any]:
+        """
+        执行一轮冷文件压缩
+
+        Args:
+            dry_run: 仅评估压缩收益，不修改存储和任务记录
+            max_files: 本轮最多处理的文件数
+            batch_size: 每批扫描的文件数
+
+        Returns:
+            本轮统计：scanned、compressed、skipped、failed、original_bytes、stored_bytes、bytes_saved
+        """
+        stats = {
+            "scanned": 0,
+            "compressed": 0,
+            "skipped": 0,
+            "failed": 0,
+            "original_bytes": 0,
+            "stored_bytes": 0,
+            "bytes_saved": 0
+        }
+
+        if not is_zstd_available():
+            print("⚠️  未安装 zstandard，跳过冷文件压缩")
+            return stats
+
+        created_before = datetime.now() - timedelta(days=settings.TIERING_MIN_AGE_DAYS)
+        batch_size = batch_size or settings.TIERING_BATCH_SIZE
+        last_path = ""
+
+        while max_files is None or stats["scanned"] < max_files:
+            limit = batch_size if max_files is None else min(batch_size, max_files - stats["scanned"])
+            refs = db_service.get_cold_files(last_path, created_before, limit)
+            if not refs:
+                break
+
+            for ref in refs:
+                last_path = ref["file_path"]
+                stats["scanned"] += 1
+                try:
+                    codec, original_size, stored_size = await self._tier_file(ref["file_path"], dry_run)
+                except Exception as e:
+                    stats["failed"] += 1
+                    print(f"❌ 压缩文件失败 {ref['file_path']}: {e}")
+                    continue
+
+                if codec != CODEC_ZSTD:
+                    stats["skipped"] += 1
+                    continue
+
+                stats["compressed"] += 1
+                stats["original_bytes"] += original_size
+                stats["stored_bytes"] += stored_size
+                stats["bytes_saved"] += original_size - stored_size
+
+        print(f"🧊 冷文件压缩完成: 扫描 {stats['scanned']}，压缩 {stats['compressed']}，"
+              f"节省 {stats['bytes_saved'] / (1024 * 1024):.2f} MB")
+        return stats
+
+    async def _tier_file(self, file_path: str, dry_run: bool) -> Tuple[str, int, int]:
+        """
+        压缩单个文件
+
+        先压缩到本地临时文件比较大小，收益不足时标记为原样存储；
+        否则写入压缩版本、更新所有引用它的任务，再释放原文件。
+
+        Returns:
+            (存储编码, 原始大小, 存储大小)
+        """
+        if self.file_service.source_extension(file_path) not in settings.TIERING_EXTENSIONS:
+            if not dry_run:
+                db_service.update_storage_codec(file_path, file_path, CODEC_IDENTITY)
+            return CODEC_IDENTITY, 0, 0
+
+        temp_id = uuid.uuid4().hex
+        local_path = self.storage.local_path(file_path)
+        raw_path = local_path or os.path.join(self.file_service.upload_dir, f".{temp_id}.raw.part")
+        compressed_path = os.path.join(self.file_service.upload_dir, f".{temp_id}{ZSTD_SUFFIX}.part")
+
+        try:
+            if local_path is None:
+                await self._download_to(file_path, raw_path)
+
+            original_size = await asyncio.to_thread(os.path.getsize, raw_path)
+            stored_size = await asyncio.to_thread(
+                compress_file_zstd, raw_path, compressed_path, settings.TIERING_ZSTD_LEVEL
+            )
+
+            if stored_size > original_size * (1 - settings.TIERING_MIN_SAVING_RATIO):
+                # PNG、DOCX本身已压缩，收益通常很小，原样保留并不再重复评估
+                if not dry_run:
+                    db_service.update_storage_codec(file_path, file_path, CODEC_IDENTITY)
+                return CODEC_IDENTITY, original_size, original_size
+
+            if dry_run:
+                return CODEC_ZSTD, original_size, stored_size
+
+            compressed_key = f"{file_path}{ZSTD_SUFFIX}"
+            await self.storage.put(compressed_key, compressed_path)
+
+            updated = db_service.update_storage_codec(file_path, compressed_key, CODEC_ZSTD, stored_size)
+            if updated == 0:
+                # 扫描后任务被删除或重新进入解析，放弃本次压缩
+                await self.storage.delete(compressed_key)
+                return CODEC_IDENTITY, original_size, original_size
+
+            # 新上传的相同内容仍可能引用原文件，只在无引用且超过宽限期时删除
+            if db_service.count_file_references(file_path) == 0:
+                await self.file_service.release_file(file_path)
+
+            return CODEC_ZSTD, original_size, stored_size
+        finally:
+            if local_path is None:
+                await asyncio.to_thread(self.file_service.delete_file, raw_path)
+            await asyncio.to_thread(self.file_service.delete_file, compressed_path)
+
+    async def _download_to(self, file_path: str, target_path: str):
+        """将对象存储中的文件流式下载到本地临时文件"""
+        handle = await asyncio.to_thread(open, target_path, "wb")
+        try:
+            async for chunk in self.storage.stream(file_path):
+                await asyncio.to_thread(handle.write, chunk)
+        finally:
+            await asyncio.to_thread(handle.close)
+
+    def get_report(self) -> Dict[str, Any]:
+        """
+        获取存储分层报告
+
+        Returns:
+            按存储编码的文件数和大小，以及压缩累计节省的字节数
+        """
+        codecs = db_service.get_storage_statistics()
+        original_bytes = sum(item["original_bytes"] for item in codecs.values())
+        stored_bytes = sum(item["stored_bytes"] for item in codecs.values())
+        return {
+            "codecs": codecs,
+            "original_bytes": original_bytes,
+            "stored_bytes": stored_bytes,
+            "bytes_saved": original_bytes - stored_bytes
+        }
+
+    async def run_periodically(self):
+        """后台定期执行冷文件压缩"""
+        interval = max(1, settings.TIERING_INTERVAL_HOURS) * 3600
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.run()
+            except Exception as e:
+                print(f"冷文件压缩任务失败: {e}")
+
+# 创建全局冷文件压缩服务实例
+storage_tiering_service = StorageTieringService()
@@ -0,0 +1,119 @@
+"""
+任务事件发布/订阅服务
+进程内的轻量级 pub/sub，用于将任务状态和阶段进度实时推送给 SSE 客户端
+"""
+import asyncio
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set
+
+class TaskEventBroker:
+    """任务事件代理 - 按任务ID分发事件到订阅者队列"""
+
+    # 单个订阅者队列的最大长度，慢客户端溢出时丢弃最旧事件
+    MAX_QUEUE_SIZE = 100
+
+    def __init__(self):
+        self._subscribers: Dict[str, Set["TaskSubscription"]] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, task_ids: List[str]) -> "TaskSubscription":
+        """
+        订阅一个或多个任务的事件
+
+        Args:
+            task_ids: 任务ID列表
+
+        Returns:
+            订阅对象，使用完毕后需调用 close()
+        """
+        subscription = TaskSubscription(self, task_ids, asyncio.get_running_loop())
+        with self._lock:
+            for task_id in subscription.task_ids:
+                self._subscribers.setdefault(task_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: "TaskSubscription"):
+        """取消订阅"""
+        with self._lock:
+            for task_id in subscription.task_ids:
+                subscribers = self._subscribers.get(task_id)
+                if not subscribers:
+                    continue
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[task_id]
+
+    def publish(self, task_id: str, event: str, data: Dict[str, Any]):
+        """
+        发布任务事件（线程安全，可在后台线程中调用）
+
+        Args:
+            task_id: 任务ID
+            event: 事件类型（status / progress 等）
+            data: 事件数据
+        """
+        with self._lock:
+            subscribers = list(self._subscribers.get(task_id, ()))
+
+        if not subscribers:
+            return
+
+        message = {
+            "event": event,
+            "data": {
+                "task_id": task_id,
+                "timestamp": datetime.now().isoformat(),
+                **data
+            }
+        }
+        for subscription in subscribers:
+            subscription.put(message)
+
+    def subscriber_count(self, task_id: Optional[str] = None) -> int:
+        """获取订阅者数量"""
+        with self._lock:
+            if task_id is not None:
+                return len(self._subscribers.get(task_id, ()))
+            return len({s for subs in self._subscribers.values() for s in subs})
+
+class TaskSubscription:
+    """任务事件订阅"""
+
+    def __init__(self, broker: TaskEventBroker, task_ids: List[str], loop: asyncio.AbstractEventLoop):
+        self.broker = broker
+        self.task_ids = list(dict.fromkeys(task_ids))
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=TaskEventBroker.MAX_QUEUE_SIZE)
+
+    def put(self, message: Dict[str, Any]):
+        """投递事件到订阅队列"""
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+
+        if running_loop is self.loop:
+            self._put_nowait(message)
+        else:
+            self.loop.call_soon_threadsafe(self._put_nowait, message)
+
+    def _put_nowait(self, message: Dict[str, Any]):
+        if self.queue.full():
+            # 丢弃最旧的事件，保证最新状态一定能送达
+            self.queue.get_nowait()
+        self.queue.put_nowait(message)
+
+    async def get(self, timeout: float) -> Optional[Dict[str, Any]]:
+        """等待下一个事件，超时返回 None"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        """关闭订阅"""
+        self.broker.unsubscribe(self)
+
+# 创建全局任务事件代理实例
+task_event_broker = TaskEventBroker()
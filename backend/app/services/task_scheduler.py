@@ -0,0 +1,199 @@
+"""
+解析任务调度
+上传的解析任务按上传时探测的成本分配到两个工作池，各有固定数量的工作协程：
+- text：有文本层的PDF、Word，解析很快
+- ocr：扫描件、图片，OCR占用大量CPU；单独成池后一批扫描件不会占满所有工作协程
+
+每个工作池内按优先级通道排队：
+- interactive：招聘人员在页面上等待的单份上传、简历更新
+- bulk：批量上传和ZIP导入
+
+通道之间按权重公平调度（权重越高分到的执行机会越多，空闲通道不积累额度），
+另有一部分工作协程只执行 interactive 任务，大批量导入时单份上传也不必排在积压之后
+"""
+import time
+import asyncio
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+from app.core.config import settings
+from app.services.database_service import db_service
+
+LANE_INTERACTIVE = "interactive"
+LANE_BULK = "bulk"
+LANES = (LANE_INTERACTIVE, LANE_BULK)
+
+# 工作池（与上传时探测的成本类别同名）
+POOL_TEXT = "text"
+POOL_OCR = "ocr"
+POOLS = (POOL_TEXT, POOL_OCR)
+
+class ScheduledJob:
+    """排队中的解析任务"""
+
+    def __init__(self, lane: str, func: Callable[..., Awaitable[Any]], args: tuple, kwargs: Dict[str, Any],
+                 task_id: Optional[str] = None):
+        self.lane = lane
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.task_id = task_id
+        self.enqueued_at = time.monotonic()
+
+def parse_lane_weights(config: str) -> Dict[str, float]:
+    """解析通道权重配置（如 "interactive:4,bulk:1"），未配置的通道权重为1"""
+    weights = {lane: 1.0 for lane in LANES}
+    for item in config.split(","):
+        lane, _, weight = item.partition(":")
+        try:
+            if lane.strip() in weights:
+                weights[lane.strip()] = max(float(weight), 0.01)
+        except ValueError:
+            print(f"⚠️  通道权重配置无效: {item}")
+    return weights
+
+class WorkerPool:
+    """一组工作协程，按优先级通道加权公平调度"""
+
+    def __init__(self, name: str, workers: int, reserved: Optional[int] = None,
+                 weights: Optional[Dict[str, float]] = None):
+        self.name = name
+        self.workers = max(1, workers)
+        reserved = settings.SCHEDULER_INTERACTIVE_RESERVED if reserved is None else reserved
+        # 至少保留一个可执行 bulk 任务的工作协程
+        self.reserved = min(max(0, reserved), self.workers - 1)
+        self.weights = weights or parse_lane_weights(settings.SCHEDULER_LANE_WEIGHTS)
+        self.queues: Dict[str, Deque[ScheduledJob]] = {lane: deque() for lane in LANES}
+        # 各通道的虚拟时间：每执行一个任务前进 1/权重，选择虚拟时间最小的非空通道
+        self._pass: Dict[str, float] = {lane: 0.0 for lane in LANES}
+        self._virtual_time = 0.0
+        self._wakeup: Optional[asyncio.Event] = None
+        self._runners: List[asyncio.Task] = []
+        self.metrics: Dict[str, Dict[str, Any]] = {
+            lane: {"submitted": 0, "running": 0, "completed": 0, "total_wait_seconds": 0.0, "max_wait_seconds": 0.0}
+            for lane in LANES
+        }
+
+    @property
+    def started(self) -> bool:
+        return bool(self._runners)
+
+    def start(self):
+        """启动工作协程"""
+        if self.started:
+            return
+        self._wakeup = asyncio.Event()
+        for index in range(self.workers):
+            lanes = (LANE_INTERACTIVE,) if index < self.reserved else LANES
+            self._runners.append(asyncio.create_task(self._work(lanes)))
+
+    def submit(self, job: ScheduledJob):
+        """任务进入所在通道的队列"""
+        self.start()
+
+        queue = self.queues[job.lane]
+        if not queue:
+            # 空闲后重新排队的通道从当前虚拟时间开始，不能用空闲期间积累的额度抢占其他通道
+            self._pass[job.lane] = max(self._pass[job.lane], self._virtual_time)
+        queue.append(job)
+        self.metrics[job.lane]["submitted"] += 1
+        self._wakeup.set()
+
+    def _next(self, lanes: Tuple[str, ...]) -> Optional[ScheduledJob]:
+        """从允许的通道中取出虚拟时间最小的通道的队首任务"""
+        candidates = [lane for lane in lanes if self.queues[lane]]
+        if not candidates:
+            return None
+        lane = min(candidates, key=lambda name: (self._pass[name], -self.weights[name]))
+        self._virtual_time = self._pass[lane]
+        self._pass[lane] += 1.0 / self.weights[lane]
+        return self.queues[lane].popleft()
+
+    async def _work(self, lanes: Tuple[str, ...]):
+        """工作协程：循环取出任务执行"""
+        while True:
+            job = self._next(lanes)
+            if job is None:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            waited = time.monotonic() - job.enqueued_at
+            metrics = self.metrics[job.lane]
+            metrics["running"] += 1
+            metrics["total_wait_seconds"] += waited
+            metrics["max_wait_seconds"] = max(metrics["max_wait_seconds"], waited)
+            if job.task_id:
+                db_service.update_task_parse_stats(job.task_id, {
+                    "pool": self.name, "lane": job.lane, "lane_wait_seconds": round(waited, 2)
+                })
+            try:
+                await job.func(*job.args, **job.kwargs)
+            except Exception as e:
+                print(f"⚠️  {self.name} 工作池 {job.lane} 通道任务执行失败 {job.task_id or ''}: {e}")
+            finally:
+                metrics["running"] -= 1
+                metrics["completed"] += 1
+
+    def get_status(self) -> Dict[str, Any]:
+        """各通道的权重、排队数、执行数和排队等待时间"""
+        now = time.monotonic()
+        lanes = {}
+        for lane in LANES:
+            metrics = self.metrics[lane]
+            queue = self.queues[lane]
+            started = metrics["completed"] + metrics["running"]
+            lanes[lane] = {
+                "weight": self.weights[lane],
+                "queued": len(queue),
+                **metrics,
+                "total_wait_seconds": round(metrics["total_wait_seconds"], 2),
+                "max_wait_seconds": round(metrics["max_wait_seconds"], 2),
+                "avg_wait_seconds": round(metrics["total_wait_seconds"] / started, 2) if started else 0.0,
+                "oldest_wait_seconds": round(now - queue[0].enqueued_at, 2) if queue else 0.0
+            }
+        return {
+            "workers": self.workers,
+            "reserved_interactive": self.reserved,
+            "lanes": lanes
+        }
+
+class TaskScheduler:
+    """按成本类别把解析任务分配到 text / ocr 工作池"""
+
+    def __init__(self, text_workers: Optional[int] = None, ocr_workers: Optional[int] = None):
+        self.pools: Dict[str, WorkerPool] = {
+            POOL_TEXT: WorkerPool(POOL_TEXT, text_workers or settings.MAX_CONCURRENT_TASKS),
+            POOL_OCR: WorkerPool(POOL_OCR, ocr_workers or settings.SCHEDULER_OCR_WORKERS)
+        }
+
+    @property
+    def workers(self) -> int:
+        return sum(pool.workers for pool in self.pools.values())
+
+    def start(self):
+        """启动所有工作池（应用启动时调用，首次提交任务时也会自动启动）"""
+        for pool in self.pools.values():
+            pool.start()
+
+    def submit(self, lane: str, func: Callable[..., Awaitable[Any]], *args, pool: Optional[str] = None,
+               task_id: Optional[str] = None, **kwargs):
+        """
+        提交解析任务
+
+        Args:
+            lane: 优先级通道（interactive / bulk）
+            func: 执行任务的协程函数
+            pool: 工作池（上传时探测的成本类别 text / ocr），未知时使用 text
+            task_id: 对应的上传任务ID，用于记录排队时间（可选）
+        """
+        if lane not in LANES:
+            raise ValueError(f"未知的调度通道: {lane}")
+        target = self.pools.get(pool or POOL_TEXT, self.pools[POOL_TEXT])
+        target.submit(ScheduledJob(lane, func, args, kwargs, task_id))
+
+    def get_status(self) -> Dict[str, Any]:
+        """各工作池、各通道的排队数、执行数和排队等待时间"""
+        return {name: pool.get_status() for name, pool in self.pools.items()}
+
+# 全局任务调度实例
+task_scheduler = TaskScheduler()
@@ -1,10 +1,18 @@
 """
 任务管理服务
 """
-from typing import List, Optional
+import time
+from typing import Dict, List, Optional, Tuple
+from app.core.config import settings
 from app.models.resume import UploadTask, TaskStatus
 from app.services.database_service import db_service
 from app.services.file_service import FileService
+from app.services.task_events import task_event_broker
+
+# 阶段进度和部分结果每次都推送事件，但只在阶段切换或间隔 TASK_PROGRESS_PERSIST_INTERVAL 后写库，
+# 避免流式解析一份简历产生几十次 SQLite 写入；记录各任务最近一次写库的时间（和阶段）
+_progress_persisted: Dict[str, Tuple[float, str]] = {}
+_partial_persisted: Dict[str, float] = {}
 
 class TaskService:
     """任务管理服务类"""
@@ -25,6 +33,18 @@ class TaskService:
         """
         return self.db_service.create_task(task)
     
+    async def create_tasks(self, tasks: List[UploadTask]) -> bool:
+        """
+        批量创建任务（单个事务）
+        
+        Args:
+            tasks: 任务对象列表
+            
+        Returns:
+            是否创建成功
+        """
+        return self.db_service.create_tasks(tasks)
+    
     async def get_task(self, task_id: str) -> Optional[UploadTask]:
         """
         获取任务详情
@@ -50,10 +70,24 @@ class TaskService:
         """
         return self.db_service.get_all_tasks(limit=limit, offset=offset)
     
+    async def get_task_statuses(self, task_ids: List[str], changed_since=None) -> dict:
+        """
+        批量获取任务状态
+        
+        Args:
+            task_ids: 任务ID列表
+            changed_since: 仅返回此时间之后有变化的任务
+            
+        Returns:
+            包含 tasks 与 missing 的字典
+        """
+        return self.db_service.get_task_statuses(task_ids, changed_since)
+    
     async def update_task_status(self, task_id: str, status: TaskStatus, 
-                                progress: int = None, result=None, error: str = None) -> bool:
+                                progress: int = None, result=None, error: str = None,
+                                stage: str = None) -> bool:
         """
-        更新任务状态
+        更新任务状态，并向订阅者推送事件
         
         Args:
             task_id: 任务ID
@@ -61,11 +95,86 @@ class TaskService:
             progress: 进度
             result: 解析结果
             error: 错误信息
+            stage: 当前处理阶段（可选，仅用于事件推送）
+            
+        Returns:
+            是否更新成功
+        """
+        success = self.db_service.update_task_status(task_id, status, progress, result, error)
+        
+        if status in (TaskStatus.COMPLETED, TaskStatus.FAILED):
+            _progress_persisted.pop(task_id, None)
+            _partial_persisted.pop(task_id, None)
+        
+        if success:
+            event_data = {"status": status.value}
+            if progress is not None:
+                event_data["progress"] = progress
+            if stage:
+                event_data["stage"] = stage
+            if error:
+                event_data["error"] = error
+            if result is not None:
+                event_data["result"] = result.dict()
+            task_event_broker.publish(task_id, "status", event_data)
+        
+        return success
+    
+    async def report_progress(self, task_id: str, stage: str, progress: int) -> bool:
+        """
+        上报解析阶段进度（每次都推送事件，阶段切换时或距上次写库超过间隔时才写库）
+        
+        Args:
+            task_id: 任务ID
+            stage: 阶段名称（extracting / ocr / llm 等）
+            progress: 进度百分比
             
         Returns:
             是否更新成功
         """
-        return self.db_service.update_task_status(task_id, status, progress, result, error)
+        now = time.monotonic()
+        last = _progress_persisted.get(task_id)
+        if last is None or last[1] != stage or now - last[0] >= settings.TASK_PROGRESS_PERSIST_INTERVAL:
+            _progress_persisted[task_id] = (now, stage)
+            return await self.update_task_status(
+                task_id, TaskStatus.PARSING, progress=progress, stage=stage
+            )
+        
+        task_event_broker.publish(task_id, "status", {
+            "status": TaskStatus.PARSING.value,
+            "progress": progress,
+            "stage": stage
+        })
+        return True
+    
+    async def report_partial_result(self, task_id: str, partial_result, source: str) -> bool:
+        """
+        推送并保存解析中的部分结果（LLM完成前即可展示）
+        
+        每次都推送事件；距上次写库超过间隔时才写库（供稍后连接的订阅者读取快照）
+        
+        Args:
+            task_id: 任务ID
+            partial_result: 部分简历信息
+            source: 结果来源（rules：规则提取；llm：LLM流式输出；coalesced：共用的进行中解析）
+            
+        Returns:
+            是否保存成功
+        """
+        success = True
+        now = time.monotonic()
+        last = _partial_persisted.get(task_id)
+        if last is None or now - last >= settings.TASK_PROGRESS_PERSIST_INTERVAL:
+            _partial_persisted[task_id] = now
+            success = self.db_service.update_task_partial_result(task_id, partial_result)
+        
+        if success:
+            task_event_broker.publish(task_id, "partial", {
+                "source": source,
+                "partial_result": partial_result.dict()
+            })
+        
+        return success
     
     async def delete_task(self, task_id: str) -> bool:
         """
@@ -82,12 +191,41 @@ class TaskService:
         if not task:
             return False
         
-        # 删除文件
-        if task.file_path:
-            self.file_service.delete_file(task.file_path)
-        
         # 删除数据库记录（包括相关的简历信息和候选人记录）
-        return self.db_service.delete_task(task_id)
+        success = self.db_service.delete_task(task_id)
+        
+        # 文件按内容共享，仅在最后一个引用删除后才删除文件
+        if success and task.file_path:
+            await self.release_file(task.file_path, task.file_hash)
+        
+        return success
+    
+    async def release_file(self, file_path: str, file_hash: Optional[str] = None) -> bool:
+        """
+        删除已无任务引用的文件
+        
+        Args:
+            file_path: 存储键
+            file_hash: 文件内容哈希
+            
+        Returns:
+            是否删除了文件
+        """
+        if self.db_service.count_file_references(file_path, file_hash) > 0:
+            return False
+        return await self.file_service.release_file(file_path)
+    
+    async def get_batch_progress(self, batch_id: str) -> Optional[dict]:
+        """
+        获取批次聚合进度
+        
+        Args:
+            batch_id: 批次ID
+            
+        Returns:
+            聚合进度字典，批次不存在时返回None
+        """
+        return self.db_service.get_batch_statistics(batch_id)
     
     async def get_task_statistics(self) -> dict:
         """
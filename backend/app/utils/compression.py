@@ -0,0 +1,52 @@
+"""
+文件压缩工具
+冷文件分层存储使用 zstd 压缩，依赖 zstandard（可选依赖，未安装时不压缩）
+"""
+from typing import AsyncIterator
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# 存储编码
+CODEC_IDENTITY = "identity"  # 已评估，压缩收益不足，原样存储
+CODEC_ZSTD = "zstd"
+
+# 压缩文件存储键的后缀
+ZSTD_SUFFIX = ".zst"
+
+def is_zstd_available() -> bool:
+    """是否已安装 zstandard"""
+    return zstandard is not None
+
+def compress_file_zstd(source_path: str, target_path: str, level: int = 19) -> int:
+    """
+    流式压缩文件（同步，调用方应在线程中执行）
+
+    Args:
+        source_path: 源文件路径
+        target_path: 压缩文件路径
+        level: 压缩级别
+
+    Returns:
+        压缩后的大小（字节）
+    """
+    if zstandard is None:
+        raise RuntimeError("zstd压缩需要安装 zstandard: pip install zstandard")
+
+    compressor = zstandard.ZstdCompressor(level=level)
+    with open(source_path, "rb") as source, open(target_path, "wb") as target:
+        _, written = compressor.copy_stream(source, target)
+    return written
+
+async def decompress_zstd_stream(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """流式解压 zstd 数据块，不需要把整个文件读入内存"""
+    if zstandard is None:
+        raise RuntimeError("读取zstd压缩文件需要安装 zstandard: pip install zstandard")
+
+    decompressor = zstandard.ZstdDecompressor().decompressobj()
+    async for chunk in chunks:
+        data = decompressor.decompress(chunk)
+        if data:
+            yield data
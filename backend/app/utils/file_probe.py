@@ -0,0 +1,89 @@
+"""
+上传文件探测
+上传时在文件提交到存储后端之前，直接读取本地临时文件的结构（页数、PDF前几页是否有文本层、图片尺寸），
+不提取全文也不做OCR，据此预估解析成本：需要OCR的任务交给CPU密集的OCR工作池，有文本层的任务交给轻量的文本工作池
+"""
+import io
+import time
+from typing import Any, Dict, Union
+import fitz  # PyMuPDF
+from PIL import Image
+
+# 成本类别（与解析工作池同名）
+COST_TEXT = "text"
+COST_OCR = "ocr"
+
+# 检查文本层的PDF页数
+PROBE_PDF_PAGES = 3
+
+# 页面文本少于该字符数视为没有文本层（扫描件常只有页码、水印）
+MIN_TEXT_LAYER_CHARS = 20
+
+# OCR时PDF页面的渲染倍数（与 ResumeParser._extract_pdf_with_ocr 一致）
+OCR_RENDER_SCALE = 2.0
+
+def _probe_pdf(source: Union[bytes, str]) -> Dict[str, Any]:
+    if isinstance(source, str):
+        # 临时文件扩展名为 .part，需指定类型
+        doc = fitz.open(source, filetype="pdf")
+    else:
+        doc = fitz.open(stream=source, filetype="pdf")
+    try:
+        pages = len(doc)
+        checked = min(pages, PROBE_PDF_PAGES)
+        text_pages = 0
+        megapixels = 0.0
+        for page_num in range(pages):
+            page = doc.load_page(page_num)
+            if page_num < checked and len(page.get_text().strip()) >= MIN_TEXT_LAYER_CHARS:
+                text_pages += 1
+            megapixels += page.rect.width * page.rect.height * OCR_RENDER_SCALE ** 2 / 1e6
+        return {
+            "kind": "pdf",
+            "pages": pages,
+            "text_layer": text_pages > 0,
+            "text_pages_checked": f"{text_pages}/{checked}",
+            "megapixels": round(megapixels, 2)
+        }
+    finally:
+        doc.close()
+
+def _probe_image(source: Union[bytes, str]) -> Dict[str, Any]:
+    # 只解析图片头部，不解码像素
+    with Image.open(source if isinstance(source, str) else io.BytesIO(source)) as image:
+        width, height = image.size
+    return {
+        "kind": "image",
+        "pages": 1,
+        "text_layer": False,
+        "megapixels": round(width * height / 1e6, 2)
+    }
+
+def probe_file(source: Union[bytes, str], file_extension: str) -> Dict[str, Any]:
+    """
+    探测文件的解析成本（同步执行，调用方应在线程中调用）
+
+    Args:
+        source: 本地文件路径或文件内容
+        file_extension: 文件扩展名（如 .pdf）
+
+    Returns:
+        kind、pages、text_layer、megapixels（OCR需处理的像素，百万）、cost_class（text / ocr）、probe_seconds；
+        探测失败时 cost_class 为 text 并附带 error（文件损坏时解析会很快失败）
+    """
+    started = time.monotonic()
+    file_extension = file_extension.lower()
+    try:
+        if file_extension == ".pdf":
+            probe = _probe_pdf(source)
+        elif file_extension in (".jpg", ".jpeg", ".png"):
+            probe = _probe_image(source)
+        elif file_extension in (".doc", ".docx"):
+            probe = {"kind": "word", "pages": None, "text_layer": True, "megapixels": 0.0}
+        else:
+            probe = {"kind": file_extension.lstrip(".") or "unknown", "text_layer": True}
+        probe["cost_class"] = COST_TEXT if probe["text_layer"] else COST_OCR
+    except Exception as e:
+        probe = {"kind": file_extension.lstrip("."), "cost_class": COST_TEXT, "error": str(e)}
+    probe["probe_seconds"] = round(time.monotonic() - started, 3)
+    return probe
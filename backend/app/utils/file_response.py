@@ -0,0 +1,275 @@
+"""
+文件下载响应工具
+支持 Range 分段请求、ETag / Last-Modified 条件请求，文件内容从本地或对象存储流式发送
+"""
+import os
+import asyncio
+from email.utils import formatdate, parsedate_to_datetime
+from typing import AsyncGenerator, Dict, Optional, Tuple
+from fastapi import Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from app.services.storage_backend import StorageBackend
+from app.utils.compression import CODEC_ZSTD, decompress_zstd_stream
+
+# 流式发送的块大小
+STREAM_CHUNK_SIZE = 64 * 1024
+
+def parse_range_header(range_header: str, file_size: int) -> Optional[Tuple[int, int]]:
+    """
+    解析单段 Range 请求头
+
+    Args:
+        range_header: Range 请求头，如 "bytes=0-1023"、"bytes=1024-"、"bytes=-500"
+        file_size: 文件大小
+
+    Returns:
+        (起始字节, 结束字节)，均为闭区间；多段请求或格式无法识别时返回 None（按完整响应处理）
+
+    Raises:
+        ValueError: 范围无法满足（应返回416）
+    """
+    unit, _, ranges = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in ranges:
+        return None
+
+    start_text, sep, end_text = ranges.strip().partition("-")
+    if not sep:
+        return None
+
+    start_text, end_text = start_text.strip(), end_text.strip()
+    if not (start_text or end_text):
+        return None
+    if (start_text and not start_text.isdigit()) or (end_text and not end_text.isdigit()):
+        return None
+
+    if not start_text:
+        # 后缀范围：最后 N 个字节
+        suffix_length = int(end_text)
+        if suffix_length == 0:
+            raise ValueError("Range范围无法满足")
+        start = max(file_size - suffix_length, 0)
+        end = file_size - 1
+    else:
+        start = int(start_text)
+        end = int(end_text) if end_text else file_size - 1
+
+    end = min(end, file_size - 1)
+    if start > end or start >= file_size:
+        raise ValueError("Range范围无法满足")
+
+    return start, end
+
+def _etag_matches(header_value: str, etag: str) -> bool:
+    """判断 If-None-Match / If-Range 是否匹配当前ETag（弱比较）"""
+    if header_value.strip() == "*":
+        return True
+    current = etag[2:] if etag.startswith("W/") else etag
+    for candidate in header_value.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == current:
+            return True
+    return False
+
+def _not_modified(request: Request, etag: str, last_modified: float) -> bool:
+    """判断条件请求是否命中缓存"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, etag)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return int(last_modified) <= int(since)
+
+    return False
+
+async def _iter_file_range(file_path: str, start: int, end: int) -> AsyncGenerator[bytes, None]:
+    """按块读取文件的指定范围（磁盘读取在线程中执行）"""
+    handle = await asyncio.to_thread(open, file_path, "rb")
+    try:
+        await asyncio.to_thread(handle.seek, start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = await asyncio.to_thread(handle.read, min(STREAM_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+    finally:
+        await asyncio.to_thread(handle.close)
+
+def _conditional_response(request: Request, file_size: int, last_modified: float,
+                          headers: Optional[Dict[str, str]],
+                          content_hash: Optional[str],
+                          allow_range: bool = True) -> Tuple[Optional[Response], Dict[str, str], Optional[Tuple[int, int]]]:
+    """
+    处理缓存校验和 Range 请求头（allow_range 为 False 时忽略 Range，按完整响应处理）
+
+    Returns:
+        (可直接返回的 304/416 响应, 响应头, 请求的字节范围)
+    """
+    if content_hash:
+        etag = f'"{content_hash}"'
+    else:
+        etag = f'W/"{int(last_modified)}-{file_size}"'
+
+    response_headers = dict(headers or {})
+    response_headers.update({
+        "ETag": etag,
+        "Last-Modified": formatdate(last_modified, usegmt=True),
+        "Accept-Ranges": "bytes" if allow_range else "none",
+        "Cache-Control": "private, no-cache"
+    })
+
+    if _not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers={
+            key: value for key, value in response_headers.items()
+            if key in ("ETag", "Last-Modified", "Cache-Control")
+        }), response_headers, None
+
+    range_header = request.headers.get("range") if allow_range else None
+    if_range = request.headers.get("if-range")
+    if range_header and (if_range is None or _etag_matches(if_range, etag)):
+        try:
+            byte_range = parse_range_header(range_header, file_size)
+        except ValueError:
+            return Response(
+                status_code=416, headers={"Content-Range": f"bytes */{file_size}"}
+            ), response_headers, None
+
+        if byte_range is not None:
+            start, end = byte_range
+            response_headers.update({
+                "Content-Range": f"bytes {start}-{end}/{file_size}",
+                "Content-Length": str(end - start + 1)
+            })
+            return None, response_headers, byte_range
+
+    return None, response_headers, None
+
+def build_file_response(request: Request, file_path: str, media_type: str,
+                        headers: Optional[Dict[str, str]] = None,
+                        content_hash: Optional[str] = None) -> Response:
+    """
+    构建本地文件下载响应
+
+    - 完整下载使用 FileResponse 分块发送，不把文件读入内存
+    - 支持单段 Range 请求（206），供PDF阅读器按需加载
+    - ETag 优先使用内容哈希，缺失时退化为基于修改时间和大小的弱ETag
+    - 支持 If-None-Match / If-Modified-Since（304）和 If-Range
+
+    Args:
+        request: 当前请求
+        file_path: 文件路径
+        media_type: 媒体类型
+        headers: 额外响应头（如 Content-Disposition）
+        content_hash: 文件内容哈希
+
+    Returns:
+        响应对象
+    """
+    stat_result = os.stat(file_path)
+    early_response, response_headers, byte_range = _conditional_response(
+        request, stat_result.st_size, stat_result.st_mtime, headers, content_hash
+    )
+    if early_response is not None:
+        return early_response
+
+    if byte_range is not None:
+        start, end = byte_range
+        return StreamingResponse(
+            _iter_file_range(file_path, start, end),
+            status_code=206,
+            media_type=media_type,
+            headers=response_headers
+        )
+
+    return FileResponse(
+        file_path,
+        media_type=media_type,
+        headers=response_headers,
+        stat_result=stat_result
+    )
+
+async def build_storage_response(request: Request, storage: StorageBackend, key: str, media_type: str,
+                                 headers: Optional[Dict[str, str]] = None,
+                                 content_hash: Optional[str] = None,
+                                 codec: Optional[str] = None,
+                                 original_size: Optional[int] = None) -> Optional[Response]:
+    """
+    构建存储后端中文件的下载响应
+
+    本地存储直接使用 build_file_response（sendfile）；对象存储按请求的范围
+    转发分段读取的内容，同样支持 Range 和条件请求。
+    zstd 压缩存储的冷文件边读边解压，以完整响应（200）发送，不支持 Range。
+
+    Args:
+        codec: 任务记录中的存储编码
+        original_size: 压缩前的文件大小（用于 Content-Length）
+
+    Returns:
+        响应对象，文件不存在时返回 None
+    """
+    if codec == CODEC_ZSTD:
+        return await _build_decompressed_response(
+            request, storage, key, media_type, headers, content_hash, original_size
+        )
+
+    local_path = storage.local_path(key)
+    if local_path is not None:
+        if not await asyncio.to_thread(os.path.exists, local_path):
+            return None
+        return build_file_response(request, local_path, media_type, headers=headers, content_hash=content_hash)
+
+    info = await storage.stat(key)
+    if info is None:
+        return None
+
+    early_response, response_headers, byte_range = _conditional_response(
+        request, info["size"], info["modified"], headers, content_hash
+    )
+    if early_response is not None:
+        return early_response
+
+    if byte_range is not None:
+        start, end = byte_range
+        return StreamingResponse(
+            storage.stream(key, start, end),
+            status_code=206,
+            media_type=media_type,
+            headers=response_headers
+        )
+
+    response_headers["Content-Length"] = str(info["size"])
+    return StreamingResponse(
+        storage.stream(key),
+        media_type=media_type,
+        headers=response_headers
+    )
+
+async def _build_decompressed_response(request: Request, storage: StorageBackend, key: str, media_type: str,
+                                       headers: Optional[Dict[str, str]], content_hash: Optional[str],
+                                       original_size: Optional[int]) -> Optional[Response]:
+    """构建压缩存储文件的流式解压响应"""
+    info = await storage.stat(key)
+    if info is None:
+        return None
+
+    early_response, response_headers, _ = _conditional_response(
+        request, original_size or info["size"], info["modified"], headers, content_hash, allow_range=False
+    )
+    if early_response is not None:
+        return early_response
+
+    if original_size:
+        response_headers["Content-Length"] = str(original_size)
+    return StreamingResponse(
+        decompress_zstd_stream(storage.stream(key)),
+        media_type=media_type,
+        headers=response_headers
+    )
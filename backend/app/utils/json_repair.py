@@ -0,0 +1,324 @@
+"""
+容错JSON解析工具
+LLM输出的JSON常见问题：包裹在代码块或说明文字中、尾随逗号、Python字面量（None/True/False）、
+字符串中的裸换行、因 max_tokens 截断而不完整。
+TolerantJsonParser 逐块读入文本并在读入时修复这些问题，随时可以取出当前能解析出的最大完整结果，
+既用于一次性解析，也用于流式输出的增量解析
+"""
+import re
+import json
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+# 裸词（字符串之外的字母序列）替换
+_BAREWORDS = {
+    "None": "null",
+    "True": "true",
+    "False": "false",
+    "NaN": "null",
+    "null": "null",
+    "true": "true",
+    "false": "false",
+}
+
+# 截断后逐个丢弃不完整成员的最大次数
+MAX_TRIM_ATTEMPTS = 200
+
+_JSON_STRING = r'"(?:[^"\\]|\\.)*"'
+# 已写完的对象成员：键、冒号，值以引号、括号或完整字面量结尾（数字可能只写了一部分）
+_COMPLETE_OBJECT_MEMBER = re.compile(rf'^{_JSON_STRING}\s*:\s*.*(?:["}}\]]|\btrue|\bfalse|\bnull)$', re.DOTALL)
+_COMPLETE_ARRAY_ITEM = re.compile(r'^.*(?:["}\]]|\btrue|\bfalse|\bnull)$', re.DOTALL)
+
+def _closing_suffix(text: str) -> Tuple[str, bool]:
+    """扫描已修复的文本，返回闭合所有未结束结构所需的后缀，以及是否停在字符串中"""
+    stack: List[str] = []
+    in_string = False
+    escape = False
+    for char in text:
+        if in_string:
+            if escape:
+                escape = False
+            elif char == "\\":
+                escape = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in "{[":
+            stack.append("}" if char == "{" else "]")
+        elif char in "}]" and stack:
+            stack.pop()
+
+    suffix = '"' if in_string else ""
+    return suffix + "".join(reversed(stack)), in_string
+
+def _open_member_cut(text: str) -> Optional[int]:
+    """
+    截断的文本中，最内层未闭合结构的最后一个成员是否还没写完（停在字符串中、只有键、数字可能不完整）
+
+    Returns:
+        丢弃该成员应截取到的位置；最后一个成员已完整时返回 None
+    """
+    containers: List[List[int]] = []  # [开括号位置, 最后一个逗号或开括号位置]
+    in_string = False
+    escape = False
+    for index, char in enumerate(text):
+        if in_string:
+            if escape:
+                escape = False
+            elif char == "\\":
+                escape = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in "{[":
+            containers.append([index, index])
+        elif char in "}]":
+            if containers:
+                containers.pop()
+        elif char == "," and containers:
+            containers[-1][1] = index
+
+    if not containers:
+        return None
+    start, separator = containers[-1]
+    member = text[separator + 1:].strip()
+    if not member:
+        return None
+    if not in_string:
+        pattern = _COMPLETE_OBJECT_MEMBER if text[start] == "{" else _COMPLETE_ARRAY_ITEM
+        if pattern.match(member):
+            return None
+    return separator if text[separator] == "," else separator + 1
+
+def _drop_empty_tail(data: Any) -> Any:
+    """去掉数组末尾的空对象（截断在新元素开头时补全出的 {}）"""
+    if isinstance(data, dict):
+        for value in data.values():
+            _drop_empty_tail(value)
+    elif isinstance(data, list):
+        while data and data[-1] == {}:
+            data.pop()
+        for item in data:
+            _drop_empty_tail(item)
+    return data
+
+class TolerantJsonParser:
+    """容错的增量JSON解析器"""
+
+    def __init__(self):
+        self.started = False      # 是否已读到根对象的 {
+        self.closed = False       # 根对象是否已闭合
+        self.complete = False     # 根对象已闭合且修复后是合法JSON（缺逗号、表达式等无法修复时为 False）
+        self.repairs: Set[str] = set()
+        self.fields_completed = 0  # 已完整读入的顶层字段数
+        self._out: List[str] = []
+        self._length = 0
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._bareword = ""
+        self._separators: List[int] = []  # 字符串之外的 , { [ 在输出中的位置，用于截断时回退
+        self._field_end = 0  # 最后一个完整顶层字段之后（顶层逗号）在输出中的位置
+
+    def feed(self, chunk: str):
+        """读入一段文本"""
+        for char in chunk:
+            if self.closed:
+                return
+            if not self.started:
+                # 跳过代码块标记和说明文字
+                if char == "{":
+                    self.started = True
+                    self._open("{")
+                elif not char.isspace():
+                    self.repairs.add("prefix")
+                continue
+            self._feed_char(char)
+
+    def _emit(self, text: str):
+        self._out.append(text)
+        self._length += len(text)
+
+    def _open(self, char: str):
+        self._separators.append(self._length)
+        self._emit(char)
+        self._stack.append("}" if char == "{" else "]")
+
+    def _flush_bareword(self):
+        if not self._bareword:
+            return
+        word = self._bareword
+        self._bareword = ""
+        replacement = _BAREWORDS.get(word)
+        if replacement is None:
+            # 未知裸词按字符串处理
+            replacement = json.dumps(word, ensure_ascii=False)
+            self.repairs.add("bareword")
+        elif replacement != word:
+            self.repairs.add("literal")
+        self._emit(replacement)
+
+    def _strip_trailing_comma(self):
+        """去掉闭合括号前的尾随逗号"""
+        while self._out and self._out[-1].isspace():
+            self._length -= len(self._out.pop())
+        if self._out and self._out[-1] == ",":
+            self._length -= len(self._out.pop())
+            self._separators.pop()
+            self.repairs.add("trailing_comma")
+
+    def _feed_char(self, char: str):
+        if self._in_string:
+            if self._escape:
+                self._escape = False
+                self._emit(char)
+            elif char == "\\":
+                self._escape = True
+                self._emit(char)
+            elif char == '"':
+                self._in_string = False
+                self._emit(char)
+            elif char == "\n":
+                self.repairs.add("control_char")
+                self._emit("\\n")
+            elif char == "\r":
+                self.repairs.add("control_char")
+            elif char == "\t":
+                self.repairs.add("control_char")
+                self._emit("\\t")
+            else:
+                self._emit(char)
+            return
+
+        # 数字的指数部分（如 1e5）不是裸词
+        is_exponent = char in "eE" and not self._bareword and self._out and self._out[-1][-1:].isdigit()
+        if (char.isalpha() and not is_exponent) or (self._bareword and char.isdigit()):
+            self._bareword += char
+            return
+        self._flush_bareword()
+
+        if char == '"':
+            self._in_string = True
+            self._emit(char)
+        elif char in "{[":
+            self._open(char)
+        elif char in "}]":
+            if not self._stack:
+                return
+            self._strip_trailing_comma()
+            self._emit(self._stack.pop())
+            if not self._stack:
+                self._close_root()
+        elif char == ",":
+            if len(self._stack) == 1:
+                self._field_end = self._length
+                self.fields_completed += 1
+            self._separators.append(self._length)
+            self._emit(char)
+        elif char == "`":
+            # 字符串之外的反引号只可能来自代码块标记
+            self.repairs.add("code_fence")
+        else:
+            self._emit(char)
+
+    def _close_root(self):
+        """根对象闭合：最后一个字段计入已完成字段数，并检查修复后的文本能否解析"""
+        self.closed = True
+        text = self.text
+        # 最后一个顶层逗号（或根对象的 {）之后还有内容才是一个新字段；尾随逗号已在闭合前去掉
+        last_start = self._field_end + 1 if self._field_end else 1
+        if text[last_start:-1].strip():
+            self.fields_completed += 1
+        try:
+            json.loads(text)
+            self.complete = True
+        except json.JSONDecodeError:
+            # 成员之间缺逗号、值为表达式（如 3.8/4.0）等无法修复的错误，解析时会丢弃出错的成员
+            self.repairs.add("malformed")
+
+    @property
+    def text(self) -> str:
+        """当前已修复的文本（未闭合）"""
+        return "".join(self._out)
+
+    def snapshot(self) -> Optional[Dict[str, Any]]:
+        """
+        取出当前能解析出的结果
+
+        未闭合的结构会被补全：还没写完的最后一个成员（如截断在 "phone": "138 处）整个丢弃，
+        不会当作完整的值保留；数组末尾补全出的空对象也会去掉。补全后仍无法解析时，
+        从末尾逐个丢弃不完整的成员直到可以解析
+
+        Returns:
+            解析出的对象；尚未读到任何JSON对象时返回 None
+        """
+        if not self.started:
+            return None
+
+        text = self.text
+        if self._bareword and not self._in_string and self._bareword in _BAREWORDS:
+            text += _BAREWORDS[self._bareword]
+        # 截断在字面量或裸词中间（如 nul、Pyth）时不补全，作为未写完的成员丢弃
+
+        if not self.closed:
+            cut = _open_member_cut(text)
+            if cut is not None:
+                text = text[:cut]
+
+        separators = list(self._separators)
+        for _ in range(MAX_TRIM_ATTEMPTS):
+            candidate = text.rstrip()
+            _, in_string = _closing_suffix(candidate)
+            if in_string:
+                # 截断在转义符中间时去掉不完整的转义
+                if (len(candidate) - len(candidate.rstrip("\\"))) % 2:
+                    candidate = candidate[:-1]
+            else:
+                candidate = candidate.rstrip(",").rstrip()
+            suffix, _ = _closing_suffix(candidate)
+            try:
+                data = json.loads(candidate + suffix)
+                if suffix or candidate != self.text:
+                    # 已闭合的根对象丢弃的是出错的成员（已记为 malformed），不是截断
+                    if not self.closed:
+                        self.repairs.add("truncated")
+                    _drop_empty_tail(data)
+                return data if isinstance(data, dict) else None
+            except json.JSONDecodeError:
+                pass
+
+            # 丢弃最后一个（可能不完整的）成员
+            separators = [pos for pos in separators if pos < len(text)]
+            if not separators:
+                return None
+            pos = separators.pop()
+            text = text[:pos] if text[pos] == "," else text[:pos + 1]
+
+        return None
+
+    def completed_fields(self) -> Dict[str, Any]:
+        """
+        取出根对象中已完整读入的顶层字段（不含正在输出的字段），用于流式输出时推送部分结果
+        """
+        if self.closed:
+            return self.snapshot() or {}
+        if not self._field_end:
+            return {}
+        try:
+            data = json.loads(self.text[:self._field_end] + "}")
+        except json.JSONDecodeError:
+            return {}
+        return data if isinstance(data, dict) else {}
+
+def parse_json_tolerant(text: str) -> Tuple[Optional[Dict[str, Any]], bool, Set[str]]:
+    """
+    容错解析一段LLM输出中的JSON对象
+
+    Returns:
+        (解析结果, 根对象是否完整, 做过的修复)
+    """
+    parser = TolerantJsonParser()
+    parser.feed(text or "")
+    data = parser.snapshot()
+    return data, parser.complete, parser.repairs
@@ -2,9 +2,11 @@
 简历解析工具
 """
 import os
+import re
 import json
+import time
 import asyncio
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple, Callable, Awaitable
 import requests
 from rapidocr import RapidOCR
 import fitz  # PyMuPDF
@@ -14,161 +16,215 @@ import io
 
 from app.core.config import settings
 from app.models.resume import ResumeInfo, ContactInfo, EducationInfo, WorkExperience, ProjectInfo
+from app.utils.rule_extractor import EDUCATION_KEYWORDS, validate_resume
+from app.utils.json_repair import TolerantJsonParser
+from app.services.llm_router import llm_router
+from app.services.llm_dispatcher import llm_dispatcher, DispatchSession
+from app.services.llm_packer import llm_packer
+from app.utils.tokens import estimate_tokens
+from app.utils.text_compactor import compact_text
+from app.utils.resume_sections import plan_section_parse, merge_section_results
+from app.prompts import get_prompt
+from app.prompts.section_prompts import SECTION_PROMPTS
+
+# 解析进度回调：(阶段名称, 进度百分比)
+ProgressCallback = Callable[[str, int], Awaitable[Any]]
+
+# 部分结果回调：流式输出时每读完一个顶层字段调用一次
+PartialCallback = Callable[[ResumeInfo], Awaitable[Any]]
+
+# 表示输出因长度限制被截断的结束原因（OpenAI兼容接口 / Anthropic接口）
+TRUNCATED_FINISH_REASONS = ("length", "max_tokens")
+
+# 服务商不支持输出格式约束时，400错误信息中会提到的参数名
+RESPONSE_FORMAT_ERROR = re.compile(r"response_format|json_object|json_schema", re.IGNORECASE)
+
+# 流式输出时按已完成的顶层字段数推进进度（40% → 85%），对应 ResumeInfo 的字段数
+STREAM_PROGRESS_FIELDS = len(ResumeInfo.model_fields)
+
+# 按输入长度估算输出上限：max_tokens = 输入token数 × 比例 + 基数（不超过 MAX_TOKENS）
+OUTPUT_TOKEN_RATIO = 1.2
+OUTPUT_TOKEN_BASE = 512
+
+# 合并请求的说明：多份简历按序号分隔，输出 {"resumes": [...]}
+PACKED_PROMPT = (
+    "以下共有 {count} 份简历，每份以“<<<简历 序号>>>”开始、以“<<<简历 序号 结束>>>”结束。"
+    "请按系统提示的字段结构分别解析每份简历，只输出一个JSON对象：{{\"resumes\": [...]}}，"
+    "数组中每份简历一个对象并按序号排列，每个对象增加 \"index\" 字段填写该简历的序号。"
+    "各份简历的信息不要互相混用。"
+)
+
+# 合并请求的统计中由各份简历共享的字段
+PACKED_SHARED_STATS = ("llm_endpoint", "llm_model", "queue_wait_seconds", "llm_retries", "llm_failovers",
+                       "json_complete", "json_repairs", "finish_reason")
+
+# 分段解析时各组统计中累加到任务统计的字段
+SECTION_SUMMED_STATS = ("llm_tokens", "llm_cost", "llm_retries", "llm_failovers", "queue_wait_seconds", "continuations")
+
+# 请求续写被截断的JSON
+CONTINUATION_PROMPT = "输出被截断，请从断点处继续输出剩余的JSON，不要重复已输出的内容。"
 
 class ResumeParser:
     """简历解析器"""
     
     def __init__(self):
-        self.api_key = settings.SILICONFLOW_API_KEY
-        self.api_url = settings.SILICONFLOW_API_URL
         self.ocr = RapidOCR()
         
-        # 系统提示词
-        self.system_prompt = """
-你是一个专业的简历信息提取专家。你的任务是从OCR工具提取的简历文本中，准确识别并结构化候选人的关键信息。OCR文本可能包含拼写错误、格式混乱或缺失内容，请基于上下文进行智能解析和标准化。
-
-请从输入文本中提取以下信息，并以JSON格式输出。如果某些信息无法找到，请使用`null`或空字符串表示。输出必须严格遵循下面的JSON结构。
-
-**重要提示**：
-- 教育背景：请提取所有教育经历，包括本科、硕士、博士等，按时间倒序排列（最新的在前）
-- 时间格式：入学时间和毕业时间请使用4位年份格式（如"2018"、"2021"）
-- 学位信息：请准确识别学位类型（如"学士学位"、"硕士学位"、"博士学位"等）
-- 学校名称：请提取完整的学校名称
-- GPA信息：如果简历中有GPA或成绩信息，请一并提取
-
-需要提取的字段：
-- **姓名**（全名）
-- **联系方式**：包括电话和邮箱（如果多个，取主要的一个）
-- **教育背景**：列表形式，每个项目包括学位、学校、专业、入学时间、毕业时间、GPA（如有）
-- **工作经历**：列表形式，每个项目包括职位、公司、工作时间、工作描述（简要）
-- **项目经验**：列表形式，每个项目包括项目名称、描述、技术栈
-- **技能**：数组形式，列出关键技能（如编程语言、工具等）
-- **语言能力**：数组形式
-- **证书**：数组形式
-- **个人简介**：简要描述
-- **其他信息**：如证书、项目经验、语言能力等（可选，如有则包含）
-
-输出示例：
-{
-    "name": "张三",
-    "contact": {
-        "phone": "13800138000",
-        "email": "zhangsan@example.com",
-        "address": "北京市朝阳区"
-    },
-    "education": [
-        {
-            "degree": "硕士学位",
-            "institution": "清华大学",
-            "major": "计算机科学与技术",
-            "start_year": "2018",
-            "end_year": "2021",
-            "gpa": "3.8/4.0"
-        },
-        {
-            "degree": "学士学位",
-            "institution": "北京理工大学",
-            "major": "软件工程",
-            "start_year": "2014",
-            "end_year": "2018",
-            "gpa": "3.6/4.0"
-        }
-    ],
-    "experience": [
-        {
-            "title": "软件工程师",
-            "company": "科技公司",
-            "start_date": "2020-07",
-            "end_date": "2022-12",
-            "description": "负责开发Web应用...",
-            "location": "北京"
-        }
-    ],
-    "projects": [
-        {
-            "name": "电商系统",
-            "description": "开发了一个完整的电商平台",
-            "technologies": ["React", "Node.js", "MongoDB"],
-            "start_date": "2021-01",
-            "end_date": "2021-06"
-        }
-    ],
-    "skills": ["Python", "Java", "机器学习"],
-    "languages": ["英语六级", "普通话"],
-    "certifications": ["PMP证书"],
-    "summary": "具有3年软件开发经验...",
-    "other": "其他相关信息"
-}
-
-请开始处理输入文本，并输出JSON结果。
-"""
+        # 系统提示词（注册表中只加载一次，内容固定以便服务商做前缀缓存）
+        self.prompt = get_prompt()
+        
+        # 输出格式约束，服务商明确不支持时该次请求退回不约束
+        self._response_format = self._build_response_format()
     
-    async def parse_file(self, file_path: str) -> ResumeInfo:
+    async def parse_file(self, file_path: str, progress_callback: Optional[ProgressCallback] = None) -> ResumeInfo:
         """
         解析简历文件
         
         Args:
             file_path: 文件路径
+            progress_callback: 阶段进度回调（可选）
             
         Returns:
             解析后的简历信息
         """
-        print(f"开始解析文件: {file_path}")
-        
         # 检查文件是否存在
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"文件不存在: {file_path}")
         
-        # 根据文件类型选择解析方法
+        with open(file_path, "rb") as f:
+            content = f.read()
+        
         file_extension = os.path.splitext(file_path)[1].lower()
+        return await self.parse_content(content, file_extension, progress_callback, source_name=file_path)
+    
+    async def parse_content(self, content: bytes, file_extension: str,
+                            progress_callback: Optional[ProgressCallback] = None,
+                            source_name: str = "") -> ResumeInfo:
+        """
+        解析简历文件内容（文件可来自本地或对象存储）
+        
+        Args:
+            content: 文件内容
+            file_extension: 文件扩展名（如 .pdf）
+            progress_callback: 阶段进度回调（可选）
+            source_name: 用于日志的文件标识
+            
+        Returns:
+            解析后的简历信息
+        """
+        text = await self.extract_text(content, file_extension, progress_callback, source_name)
+        return await self.parse_text(text, progress_callback, source_name)
+    
+    async def extract_text(self, content: bytes, file_extension: str,
+                           progress_callback: Optional[ProgressCallback] = None,
+                           source_name: str = "") -> str:
+        """
+        从简历文件内容中提取文本（PDF文本层/OCR、Word、图片OCR）
+        
+        Args:
+            content: 文件内容
+            file_extension: 文件扩展名（如 .pdf）
+            progress_callback: 阶段进度回调（可选）
+            source_name: 用于日志的文件标识
+            
+        Returns:
+            提取的文本
+        """
+        print(f"开始解析文件: {source_name}")
+        
+        async def report(stage: str, progress: int):
+            if progress_callback:
+                await progress_callback(stage, progress)
+        
+        # 根据文件类型选择解析方法
+        file_extension = file_extension.lower()
         
         try:
+            await report("extracting", 10)
+            
             if file_extension == '.pdf':
-                text = await self._extract_pdf_text(file_path)
+                text = await self._extract_pdf_text(content)
             elif file_extension in ['.doc', '.docx']:
-                text = await self._extract_word_text(file_path)
+                text = await self._extract_word_text(content)
             elif file_extension in ['.jpg', '.jpeg', '.png']:
-                text = await self._extract_image_text(file_path)
+                await report("ocr", 15)
+                text = await self._extract_image_text(content)
             else:
                 raise ValueError(f"不支持的文件类型: {file_extension}")
             
             if not text.strip():
                 raise ValueError("未能从文件中提取到任何文本内容")
             
-            print(text)
-            
-            # 使用LLM解析文本
-            resume_info = await self._parse_with_llm(text)
-            
-            print(f"文件解析完成: {file_path}")
-            return resume_info
+            print(f"文本提取完成: {source_name}，共 {len(text)} 字符")
+            return text
             
         except Exception as e:
-            print(f"解析文件失败 {file_path}: {e}")
+            print(f"解析文件失败 {source_name}: {e}")
             raise
     
-    async def _extract_pdf_text(self, file_path: str) -> str:
+    async def parse_text(self, text: str, progress_callback: Optional[ProgressCallback] = None,
+                         source_name: str = "", stats: Optional[Dict[str, Any]] = None,
+                         partial_callback: Optional[PartialCallback] = None, packable: bool = False,
+                         require_name: bool = True) -> ResumeInfo:
+        """
+        使用LLM将已提取的文本解析为结构化简历信息
+        
+        Args:
+            text: 简历文本
+            progress_callback: 阶段进度回调（可选）
+            source_name: 用于日志的文件标识
+            stats: 用于回传LLM输出统计（JSON修复、续写次数等）的字典（可选）
+            partial_callback: 流式输出时的部分结果回调（可选）
+            packable: 是否允许与其他短简历合并为一个请求（批量导入、重新解析；合并时不推送部分结果）
+            require_name: 模型级联校验结果时是否要求有姓名（增量解析只发送变化的段落时可能不含姓名）
+            
+        Returns:
+            解析后的简历信息
+        """
+        if progress_callback:
+            await progress_callback("llm", 40)
+        
+        # 使用LLM解析文本
+        if packable and llm_packer.accepts(text):
+            resume_info = await llm_packer.submit(self, text, stats)
+        else:
+            resume_info = await self._parse_with_llm(
+                text, stats, progress_callback, partial_callback, require_name=require_name
+            )
+        
+        if progress_callback:
+            await progress_callback("llm_done", 90)
+        
+        print(f"文件解析完成: {source_name}")
+        return resume_info
+    
+    async def _extract_pdf_text(self, content: bytes) -> str:
         """提取PDF文本"""
         try:
-            doc = fitz.open(file_path)
-            text = ""
+            doc = fitz.open(stream=content, filetype="pdf")
+            pages = []
             
             for page_num in range(len(doc)):
                 page = doc.load_page(page_num)
-                text += page.get_text()
+                pages.append(page.get_text())
             
             doc.close()
-            return text
             
         except Exception as e:
             print(f"PDF文本提取失败: {e}")
             # 如果文本提取失败，尝试OCR
-            return await self._extract_pdf_with_ocr(file_path)
+            return await self._extract_pdf_with_ocr(content)
+        
+        if not "".join(pages).strip():
+            # 扫描件没有文本层，改用OCR
+            return await self._extract_pdf_with_ocr(content)
+        # 用分页符分隔各页，便于压缩时识别页眉页脚
+        return "\f".join(pages)
     
-    async def _extract_pdf_with_ocr(self, file_path: str) -> str:
+    async def _extract_pdf_with_ocr(self, content: bytes) -> str:
         """使用OCR提取PDF文本"""
         try:
-            doc = fitz.open(file_path)
+            doc = fitz.open(stream=content, filetype="pdf")
             all_text = []
             
             for page_num in range(len(doc)):
@@ -179,10 +235,10 @@ class ResumeParser:
                 pix = page.get_pixmap(matrix=mat)
                 img_data = pix.tobytes("png")
                 
-                # 使用OCR识别
-                result = self.ocr(img_data)
+                # 使用OCR识别（在线程中执行，避免阻塞事件循环）
+                result = await asyncio.to_thread(self.ocr, img_data)
                 if result and len(result) > 0:
-                    page_text = ' '.join([item[1] for item in result[0]])
+                    page_text = '\n'.join([item[1] for item in result[0]])
                     all_text.append(f"=== 第{page_num + 1}页 ===\n{page_text}")
             
             doc.close()
@@ -192,10 +248,10 @@ class ResumeParser:
             print(f"PDF OCR提取失败: {e}")
             raise
     
-    async def _extract_word_text(self, file_path: str) -> str:
+    async def _extract_word_text(self, content: bytes) -> str:
         """提取Word文档文本"""
         try:
-            doc = Document(file_path)
+            doc = Document(io.BytesIO(content))
             text = ""
             
             for paragraph in doc.paragraphs:
@@ -207,14 +263,14 @@ class ResumeParser:
             print(f"Word文档文本提取失败: {e}")
             raise
     
-    async def _extract_image_text(self, file_path: str) -> str:
+    async def _extract_image_text(self, content: bytes) -> str:
         """提取图片文本"""
         try:
-            result = self.ocr(file_path)
+            result = await asyncio.to_thread(self.ocr, content)
             
             if result and len(result) > 0:
-                # 合并所有识别到的文本
-                all_text = ' '.join([item[1] for item in result[0]])
+                # 合并所有识别到的文本（每个文本块一行，保留版面结构）
+                all_text = '\n'.join([item[1] for item in result[0]])
                 return all_text
             else:
                 return ""
@@ -225,84 +281,289 @@ class ResumeParser:
     
     def _enhance_education_extraction(self, text: str) -> str:
         """增强教育背景提取的预处理"""
-        # 添加教育背景相关的关键词提示
-        education_keywords = [
-            "教育背景", "教育经历", "学历", "学位", "毕业", "入学", "大学", "学院", "学校",
-            "本科", "硕士", "博士", "学士", "研究生", "GPA", "成绩", "专业", "院系"
-        ]
-        
         # 检查文本中是否包含教育相关信息
-        has_education = any(keyword in text for keyword in education_keywords)
+        has_education = any(keyword in text for keyword in EDUCATION_KEYWORDS)
         
         if has_education:
             return text + "\n\n[注意：请仔细提取所有教育经历，包括完整的入学时间、毕业时间、学位、学校、专业和GPA信息]"
         
         return text
 
-    async def _parse_with_llm(self, text: str) -> ResumeInfo:
-        """使用LLM解析文本"""
-        if not self.api_key:
-            print("警告: SILICONFLOW_API_KEY环境变量未设置，返回模拟数据")
+    def _build_response_format(self) -> Optional[Dict[str, Any]]:
+        """根据配置生成 response_format 参数"""
+        mode = settings.LLM_RESPONSE_FORMAT.lower()
+        if mode == "json_object":
+            return {"type": "json_object"}
+        if mode == "json_schema":
+            return {
+                "type": "json_schema",
+                "json_schema": {"name": "resume_info", "schema": ResumeInfo.model_json_schema()}
+            }
+        return None
+
+    def _packed_response_format(self) -> Optional[Dict[str, Any]]:
+        """合并请求的输出格式：{"resumes": [带序号的各份简历结果]}"""
+        if not self._response_format or self._response_format["type"] != "json_schema":
+            return self._response_format
+        schema = ResumeInfo.model_json_schema()
+        definitions = schema.pop("$defs", {})
+        schema["properties"] = {"index": {"type": "integer"}, **schema["properties"]}
+        return {
+            "type": "json_schema",
+            "json_schema": {
+                "name": "resume_batch",
+                "schema": {
+                    "type": "object",
+                    "properties": {"resumes": {"type": "array", "items": schema}},
+                    "required": ["resumes"],
+                    "$defs": definitions
+                }
+            }
+        }
+
+    async def _request_completion(self, messages: List[Dict[str, str]], model: Optional[str] = None,
+                                  max_tokens: Optional[int] = None, constrained: bool = True, packed: bool = False,
+                                  on_delta: Optional[Callable[[str], Awaitable[Any]]] = None,
+                                  stats: Optional[Dict[str, Any]] = None) -> Tuple[str, Optional[str]]:
+        """
+        调用LLM接口
+
+        Args:
+            messages: 对话消息
+            model: 模型，默认使用所选端点配置的模型
+            max_tokens: 输出token上限，默认 MAX_TOKENS
+            constrained: 是否附带 response_format
+            packed: 是否为多份简历的合并请求（输出格式为结果数组）
+            on_delta: 流式输出回调，提供时以流式模式请求，每收到一段文本调用一次
+            stats: 用于回传所用端点、排队时间、重试和转移次数、token用量和费用的字典（可选）
+
+        Returns:
+            (LLM返回的文本, 结束原因)
+        """
+        payload = {
+            "messages": messages,
+            "max_tokens": max_tokens or settings.MAX_TOKENS,
+            "temperature": settings.LLM_EXTRACTION_TEMPERATURE,
+            "top_p": settings.LLM_TOP_P
+        }
+        if model:
+            payload["model"] = model
+        response_format = None
+        if constrained:
+            response_format = self._packed_response_format() if packed else self._response_format
+        if response_format:
+            payload["response_format"] = response_format
+        stream = on_delta is not None and settings.LLM_STREAM_ENABLED
+        if stream:
+            payload["stream"] = True
+
+        # 按RPM/TPM配额排队（选择端点之前先排队）；重试、转移、重发的每次实际请求都重新排队，
+        # 完成后按实际用量结算
+        prompt_tokens = sum(estimate_tokens(message["content"]) for message in messages)
+        session = llm_dispatcher.session(prompt_tokens, payload["max_tokens"])
+        await session.acquire()
+        
+        completion = ("", None)
+        try:
+            completion = await self._send_completion(payload, response_format, stream, on_delta, stats, session)
+            return completion
+        finally:
+            used_tokens = prompt_tokens + estimate_tokens(completion[0])
+            session.settle(used_tokens)
+            if stats is not None:
+                stats["queue_wait_seconds"] = round(stats.get("queue_wait_seconds", 0) + session.waited, 2)
+                stats["llm_tokens"] = stats.get("llm_tokens", 0) + used_tokens
+                stats["llm_cost"] = round(stats.get("llm_cost", 0) + used_tokens * self._model_price(model) / 1e6, 6)
+
+    def _model_price(self, model: Optional[str]) -> float:
+        """模型单价（元/百万token）"""
+        if model and model == settings.LLM_FAST_MODEL:
+            return settings.LLM_FAST_MODEL_PRICE
+        return settings.LLM_MODEL_PRICE
+
+    async def _send_completion(self, payload: Dict[str, Any], response_format: Optional[Dict[str, Any]],
+                               stream: bool, on_delta: Optional[Callable[[str], Awaitable[Any]]],
+                               stats: Optional[Dict[str, Any]], session: DispatchSession) -> Tuple[str, Optional[str]]:
+        """发送请求并读取响应，服务商不支持 response_format 时去掉后重发"""
+        # 请求在线程中执行，不阻塞事件循环（保证进度事件能及时推送）；
+        # 由路由选择端点，可重试的错误退避重试或转移到其他端点
+        async with llm_router.request(payload, stream=stream, stats=stats, before_send=session.before_send) as response:
+            if not (response_format and response.status_code == 400
+                    and RESPONSE_FORMAT_ERROR.search(response.text or "")):
+                return await self._read_completion(response, stream, on_delta)
+        
+        # 服务商或模型不支持该输出格式（错误信息中提到 response_format），本次请求去掉约束重发；
+        # 其他400错误（如参数、内容问题）照常抛出
+        print(f"⚠️  LLM服务不支持 response_format={response_format['type']}，本次请求不约束输出格式")
+        payload = {key: value for key, value in payload.items() if key != "response_format"}
+        async with llm_router.request(payload, stream=stream, stats=stats, before_send=session.before_send) as response:
+            return await self._read_completion(response, stream, on_delta)
+
+    async def _read_completion(self, response, stream: bool,
+                               on_delta: Optional[Callable[[str], Awaitable[Any]]]) -> Tuple[str, Optional[str]]:
+        """读取LLM响应，返回 (文本, 结束原因)"""
+        response.raise_for_status()
+
+        # 服务商可能忽略 stream 参数直接返回完整响应
+        if stream and "text/event-stream" in response.headers.get("Content-Type", ""):
+            return await self._read_stream(response, on_delta)
+
+        result = response.json()
+
+        # 提取LLM返回的文本
+        if 'choices' in result and len(result['choices']) > 0:
+            choice = result['choices'][0]
+            return choice['message']['content'] or "", choice.get('finish_reason')
+        if 'content' in result and len(result['content']) > 0:
+            return result['content'][0]['text'], result.get('stop_reason')
+        raise ValueError("LLM响应格式不正确")
+
+    async def _read_stream(self, response, on_delta: Callable[[str], Awaitable[Any]]) -> Tuple[str, Optional[str]]:
+        """
+        读取流式响应（SSE），兼容OpenAI的 choices[].delta 和Anthropic的 content_block_delta 格式
+
+        Returns:
+            (完整文本, 结束原因)
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+
+        def pump():
+            # 在线程中读取响应，逐行交给事件循环
+            try:
+                for line in response.iter_lines():
+                    loop.call_soon_threadsafe(queue.put_nowait, line)
+                loop.call_soon_threadsafe(queue.put_nowait, None)
+            except Exception as e:
+                loop.call_soon_threadsafe(queue.put_nowait, e)
+            finally:
+                response.close()
+
+        reader = loop.run_in_executor(None, pump)
+        parts: List[str] = []
+        finish_reason = None
+        try:
+            while True:
+                line = await queue.get()
+                if line is None:
+                    break
+                if isinstance(line, Exception):
+                    raise line
+                line = line.decode("utf-8", errors="replace").strip()
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+
+                event = json.loads(data)
+                delta = None
+                if event.get("choices"):
+                    choice = event["choices"][0]
+                    delta = (choice.get("delta") or {}).get("content")
+                    finish_reason = choice.get("finish_reason") or finish_reason
+                elif event.get("type") == "content_block_delta":
+                    delta = event.get("delta", {}).get("text")
+                elif event.get("type") == "message_delta":
+                    finish_reason = event.get("delta", {}).get("stop_reason") or finish_reason
+
+                if delta:
+                    parts.append(delta)
+                    await on_delta(delta)
+        finally:
+            response.close()
+            await asyncio.wait([reader])
+
+        return "".join(parts), finish_reason
+
+    def plan_sections(self, text: str) -> Optional[Dict[str, str]]:
+        """长简历的分段解析计划（分组名 → 段落文本）；未启用、文本不够长或识别不出段落时为 None"""
+        if not settings.LLM_SECTION_PARSE_ENABLED or estimate_tokens(text) < settings.LLM_SECTION_PARSE_MIN_TOKENS:
+            return None
+        return plan_section_parse(text)
+
+    def input_char_limit(self, text: str) -> int:
+        """发送给LLM的文本的字符上限：分段解析的长简历不整体截断，由各组分别截断"""
+        return 0 if self.plan_sections(text) else settings.LLM_INPUT_MAX_CHARS
+
+    def _cascade_tiers(self) -> List[Tuple[str, Optional[str]]]:
+        """模型级联：(级别, 模型)；配置了快速模型时先用快速模型，校验不通过再升级到主模型"""
+        tiers = [("strong", None)]
+        if settings.LLM_FAST_MODEL:
+            tiers.insert(0, ("fast", settings.LLM_FAST_MODEL))
+        return tiers
+
+    def _output_budget(self, text: str) -> int:
+        """按输入长度确定 max_tokens：输出的JSON与输入文本的长度大致成正比，不超过 MAX_TOKENS"""
+        budget = int(estimate_tokens(text) * OUTPUT_TOKEN_RATIO) + OUTPUT_TOKEN_BASE
+        return min(settings.MAX_TOKENS, budget)
+
+    async def _parse_with_llm(self, text: str, stats: Optional[Dict[str, Any]] = None,
+                              progress_callback: Optional[ProgressCallback] = None,
+                              partial_callback: Optional[PartialCallback] = None,
+                              tiers: Optional[List[Tuple[str, Optional[str]]]] = None,
+                              require_name: bool = True) -> ResumeInfo:
+        """
+        使用LLM解析文本
+
+        配置了 LLM_FAST_MODEL 时先用快速模型解析，结果校验不通过（缺少姓名、联系方式格式无效、
+        教育年份不合理）或解析失败时再交给主模型；max_tokens 按输入长度确定；
+        超过 LLM_SECTION_PARSE_MIN_TOKENS 的长简历按段落分组并行解析
+
+        Args:
+            text: 简历文本
+            stats: 用于回传解析统计的字典（可选）
+            progress_callback: 阶段进度回调（可选）
+            partial_callback: 部分结果回调（可选）
+            tiers: 依次尝试的模型级别，默认完整的级联
+            require_name: 校验结果时是否要求有姓名
+        """
+        if not llm_router.configured:
+            print("警告: SILICONFLOW_API_KEY 和 LLM_ENDPOINTS 均未设置，返回模拟数据")
             return self._get_mock_resume_info()
         
+        stats = {} if stats is None else stats
         try:
             # 增强教育背景提取
             enhanced_text = self._enhance_education_extraction(text)
             
-            payload = {
-                "model": settings.LLM_MODEL,
-                "messages": [
-                    {
-                        "role": "system",
-                        "content": self.system_prompt
-                    },
-                    {
-                        "role": "user",
-                        "content": enhanced_text
-                    }
-                ],
-                "max_tokens": settings.MAX_TOKENS,
-                "temperature": settings.LLM_TEMPERATURE,
-                "top_p": settings.LLM_TOP_P
-            }
-            
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json"
-            }
-            
-            response = requests.post(self.api_url, json=payload, headers=headers)
-            response.raise_for_status()
+            messages = [
+                {
+                    "role": "system",
+                    "content": self.prompt.system
+                },
+                {
+                    "role": "user",
+                    "content": enhanced_text
+                }
+            ]
+            max_tokens = self._output_budget(enhanced_text)
+            groups = self.plan_sections(text)
             
-            result = response.json()
-            
-            # 提取LLM返回的文本
-            if 'choices' in result and len(result['choices']) > 0:
-                llm_text = result['choices'][0]['message']['content']
-            elif 'content' in result and len(result['content']) > 0:
-                llm_text = result['content'][0]['text']
-            else:
-                raise ValueError("LLM响应格式不正确")
-            
-            # 尝试解析JSON
-            try:
-                # 清理LLM返回的文本，提取JSON部分
-                json_start = llm_text.find('{')
-                json_end = llm_text.rfind('}') + 1
-                
-                if json_start != -1 and json_end > json_start:
-                    json_text = llm_text[json_start:json_end]
-                    parsed_data = json.loads(json_text)
+            tiers = tiers or self._cascade_tiers()
+            for index, (tier, model) in enumerate(tiers):
+                is_last = index == len(tiers) - 1
+                # 升级后不再推送进度，避免进度回退
+                tier_progress = progress_callback if index == 0 else None
+                try:
+                    if groups:
+                        result = await self._extract_sections(groups, model, stats, tier_progress, partial_callback)
+                    else:
+                        result = await self._extract_with_model(
+                            messages, model, max_tokens, stats, tier_progress, partial_callback
+                        )
+                except Exception as e:
+                    if is_last:
+                        raise
+                    issues = [f"解析失败: {e}"]
                 else:
-                    raise ValueError("未找到有效的JSON格式")
+                    issues = [] if is_last else validate_resume(result, require_name)
+                    if not issues:
+                        stats["llm_tier"] = tier
+                        return result
                 
-            except json.JSONDecodeError as e:
-                print(f"JSON解析失败: {e}")
-                print(f"LLM返回的文本: {llm_text}")
-                raise ValueError(f"LLM返回的文本不是有效的JSON格式: {e}")
-            
-            # 转换为ResumeInfo对象
-            return self._convert_to_resume_info(parsed_data)
+                print(f"⬆️  {tier} 模型结果未通过校验，升级到下一级模型: {'; '.join(issues)}")
+                stats.setdefault("cascade_escalations", []).append({"tier": tier, "issues": issues})
             
         except requests.RequestException as e:
             print(f"LLM API请求失败: {e}")
@@ -310,7 +571,251 @@ class ResumeParser:
         except Exception as e:
             print(f"LLM解析失败: {e}")
             raise
-    
+
+    async def _extract_with_model(self, messages: List[Dict[str, str]], model: Optional[str], max_tokens: int,
+                                  stats: Dict[str, Any], progress_callback: Optional[ProgressCallback],
+                                  partial_callback: Optional[PartialCallback]) -> ResumeInfo:
+        """
+        用指定模型解析一次
+
+        有回调时以流式模式请求，边接收边解析，每读完一个顶层字段（姓名、联系方式、教育背景……）
+        就推送一次部分结果和进度；
+        输出被 max_tokens 截断时请求模型从断点续写，而不是整体重试；
+        续写后仍不完整或格式有误的JSON由容错解析器修复
+        """
+        response_format = self._response_format
+        parser = TolerantJsonParser()
+        started = time.monotonic()
+        streamed = {"fields": 0, "first_field_seconds": None, "chunks": 0}
+        
+        async def on_delta(chunk: str):
+            streamed["chunks"] += 1
+            parser.feed(chunk)
+            if parser.fields_completed <= streamed["fields"]:
+                return
+            streamed["fields"] = parser.fields_completed
+            if streamed["first_field_seconds"] is None:
+                streamed["first_field_seconds"] = round(time.monotonic() - started, 2)
+            if partial_callback:
+                # 部分结果只用于提前展示，字段值暂时无法转换（如类型不符）时跳过这一次推送，不中断解析
+                try:
+                    partial = self._convert_to_resume_info(parser.completed_fields())
+                except Exception as e:
+                    print(f"⚠️  部分结果转换失败，跳过推送: {e}")
+                else:
+                    await partial_callback(partial)
+            if progress_callback:
+                done = min(parser.fields_completed, STREAM_PROGRESS_FIELDS)
+                await progress_callback("llm_streaming", 40 + 45 * done // STREAM_PROGRESS_FIELDS)
+        
+        llm_text, finish_reason = await self._request_completion(
+            messages, model, max_tokens, on_delta=on_delta if progress_callback or partial_callback else None,
+            stats=stats
+        )
+        if not streamed["chunks"]:
+            parser.feed(llm_text)
+        
+        continuations = 0
+        while (finish_reason in TRUNCATED_FINISH_REASONS and not parser.closed
+               and continuations < settings.LLM_MAX_CONTINUATIONS):
+            continuations += 1
+            print(f"LLM输出被截断（{len(llm_text)} 字符），请求续写 {continuations}/{settings.LLM_MAX_CONTINUATIONS}")
+            continuation, finish_reason = await self._request_completion(messages + [
+                {"role": "assistant", "content": llm_text},
+                {"role": "user", "content": CONTINUATION_PROMPT}
+            ], model, max_tokens, constrained=False, stats=stats)
+            
+            continuation = continuation.lstrip()
+            if continuation.startswith("```"):
+                continuation = continuation.split("\n", 1)[1] if "\n" in continuation else ""
+            
+            # 模型没有续写而是重新输出了完整JSON时直接采用；
+            # 续写的剩余部分中也可能有完整的嵌套对象（如一段工作经历），要求包含已输出的顶层字段
+            restarted = TolerantJsonParser()
+            restarted.feed(continuation)
+            if (continuation.startswith("{") and restarted.complete
+                    and set(parser.snapshot() or {}) <= set(restarted.snapshot() or {})):
+                llm_text, parser = continuation, restarted
+                break
+            
+            llm_text += continuation
+            parser.feed(continuation)
+        
+        parsed_data = parser.snapshot()
+        stats.update({
+            "json_complete": parser.complete,
+            "json_repairs": sorted(parser.repairs),
+            "continuations": continuations,
+            "finish_reason": finish_reason,
+            "response_format": response_format["type"] if response_format else None,
+            "streamed": bool(streamed["chunks"]),
+            "first_field_seconds": streamed["first_field_seconds"]
+        })
+        
+        if not parsed_data:
+            print(f"LLM返回的文本: {llm_text}")
+            raise ValueError("LLM返回的文本中未找到有效的JSON")
+        if parser.repairs - {"prefix", "code_fence"}:
+            print(f"LLM返回的JSON已修复: {', '.join(sorted(parser.repairs))}")
+        
+        # 转换为ResumeInfo对象
+        return self._convert_to_resume_info(parsed_data)
+        
+
+    async def _extract_sections(self, groups: Dict[str, str], model: Optional[str], stats: Dict[str, Any],
+                                progress_callback: Optional[ProgressCallback],
+                                partial_callback: Optional[PartialCallback]) -> ResumeInfo:
+        """
+        分段并行解析：每组段落用只描述该组字段的提示词单独请求，全部并行发出后合并结果，
+        耗时取决于最慢的一组；每完成一组推送一次合并后的部分结果
+        """
+        started = time.monotonic()
+        results: Dict[str, ResumeInfo] = {}
+        group_stats: Dict[str, Dict[str, Any]] = {}
+        
+        async def run(group: str, group_text: str):
+            group_text = compact_text(group_text, settings.LLM_INPUT_MAX_CHARS)
+            if group == "education":
+                group_text = self._enhance_education_extraction(group_text)
+            messages = [
+                {"role": "system", "content": SECTION_PROMPTS[group]},
+                {"role": "user", "content": group_text}
+            ]
+            group_stats[group] = {}
+            result = await self._extract_with_model(
+                messages, model, self._output_budget(group_text), group_stats[group], None, None
+            )
+            group_stats[group]["seconds"] = round(time.monotonic() - started, 2)
+            results[group] = result
+            if partial_callback:
+                await partial_callback(merge_section_results(results))
+            if progress_callback:
+                await progress_callback("llm_sections", 40 + 45 * len(results) // len(groups))
+        
+        print(f"📑 长简历分 {len(groups)} 组并行解析: {', '.join(groups)}")
+        try:
+            await asyncio.gather(*(run(group, group_text) for group, group_text in groups.items()))
+        finally:
+            self._fold_section_stats(group_stats, stats)
+        return merge_section_results(results)
+
+    def _fold_section_stats(self, group_stats: Dict[str, Dict[str, Any]], stats: Dict[str, Any]):
+        """把各组请求的统计汇总到任务的统计中"""
+        for key in SECTION_SUMMED_STATS:
+            total = sum(group.get(key, 0) for group in group_stats.values()) + stats.get(key, 0)
+            if total:
+                stats[key] = round(total, 6)
+        for group in group_stats.values():
+            for key in ("llm_endpoint", "llm_model", "response_format"):
+                if key in group:
+                    stats[key] = group[key]
+        stats.update({
+            "section_groups": {
+                name: {"seconds": group.get("seconds"), "json_complete": group.get("json_complete")}
+                for name, group in group_stats.items()
+            },
+            "json_complete": all(group.get("json_complete", False) for group in group_stats.values()),
+            "json_repairs": sorted({repair for group in group_stats.values() for repair in group.get("json_repairs", [])})
+        })
+
+    async def parse_packed(self, texts: List[str], stats_list: List[Optional[Dict[str, Any]]]) -> List[Any]:
+        """
+        合并解析多份短简历：所有文本放进同一个请求，只发送一次系统提示词，再按序号拆分结果
+
+        合并请求失败或某份结果缺失时该份简历单独请求；
+        级联中快速模型的结果未通过校验时，该份简历单独交给主模型
+
+        Args:
+            texts: 简历文本
+            stats_list: 与 texts 对应的统计字典（合并请求的token数和费用按各份文本长度分摊）
+
+        Returns:
+            与 texts 对应的解析结果，单独请求仍失败的位置为异常对象
+        """
+        stats_list = [{} if stats is None else stats for stats in stats_list]
+        if len(texts) == 1:
+            results = await asyncio.gather(self._parse_with_llm(texts[0], stats_list[0]), return_exceptions=True)
+            return list(results)
+        
+        tiers = self._cascade_tiers()
+        tier, model = tiers[0]
+        batch_stats: Dict[str, Any] = {}
+        try:
+            parsed = await self._extract_packed(texts, model, batch_stats)
+        except Exception as e:
+            print(f"⚠️  合并请求（{len(texts)} 份简历）失败，改为逐份请求: {e}")
+            parsed = [None] * len(texts)
+        
+        total_tokens = sum(estimate_tokens(text) for text in texts) or 1
+        
+        async def finish(text: str, stats: Dict[str, Any], result: Optional[ResumeInfo]) -> ResumeInfo:
+            share = estimate_tokens(text) / total_tokens
+            stats.update({
+                "packed": len(texts),
+                "llm_tokens": round(batch_stats.get("llm_tokens", 0) * share),
+                "llm_cost": round(batch_stats.get("llm_cost", 0) * share, 6),
+                **{key: batch_stats[key] for key in PACKED_SHARED_STATS if key in batch_stats}
+            })
+            if result is None:
+                stats["packed_fallback"] = "missing"
+                return await self._parse_with_llm(text, stats)
+            
+            issues = validate_resume(result) if len(tiers) > 1 else []
+            if issues:
+                stats["packed_fallback"] = "escalated"
+                stats.setdefault("cascade_escalations", []).append({"tier": tier, "issues": issues})
+                return await self._parse_with_llm(text, stats, tiers=tiers[1:])
+            
+            stats["llm_tier"] = tier
+            return result
+        
+        results = await asyncio.gather(
+            *(finish(text, stats, result) for text, stats, result in zip(texts, stats_list, parsed)),
+            return_exceptions=True
+        )
+        return list(results)
+
+    async def _extract_packed(self, texts: List[str], model: Optional[str],
+                              stats: Dict[str, Any]) -> List[Optional[ResumeInfo]]:
+        """发送合并请求，按序号拆分结果；缺失或可能被截断的结果为 None"""
+        sections = [
+            f"<<<简历 {index}>>>\n{self._enhance_education_extraction(text)}\n<<<简历 {index} 结束>>>"
+            for index, text in enumerate(texts, 1)
+        ]
+        messages = [
+            {"role": "system", "content": self.prompt.system},
+            {"role": "user", "content": PACKED_PROMPT.format(count=len(texts)) + "\n\n" + "\n\n".join(sections)}
+        ]
+        max_tokens = min(settings.MAX_TOKENS, sum(self._output_budget(text) for text in texts))
+        llm_text, finish_reason = await self._request_completion(
+            messages, model, max_tokens, packed=True, stats=stats
+        )
+        
+        parser = TolerantJsonParser()
+        parser.feed(llm_text)
+        data = parser.snapshot()
+        items = data.get("resumes") if isinstance(data, dict) else data
+        if not isinstance(items, list):
+            raise ValueError("合并请求的输出中未找到结果数组")
+        if not parser.complete:
+            # 输出被截断时最后一份结果可能不完整，交给单独请求
+            items = items[:-1]
+        stats.update({
+            "json_complete": parser.complete,
+            "json_repairs": sorted(parser.repairs),
+            "finish_reason": finish_reason
+        })
+        
+        results: List[Optional[ResumeInfo]] = [None] * len(texts)
+        for position, item in enumerate(items):
+            if not isinstance(item, dict):
+                continue
+            index = item.pop("index", None)
+            slot = index - 1 if isinstance(index, int) and 0 < index <= len(texts) else position
+            if slot < len(texts) and results[slot] is None and any(value for value in item.values()):
+                results[slot] = self._convert_to_resume_info(item)
+        return results
+
     def _normalize_name(self, name: Optional[str]) -> Optional[str]:
         """
         规范化姓名
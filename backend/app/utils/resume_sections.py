@@ -0,0 +1,185 @@
+"""
+简历文本分段与比对工具
+按常见的段落标题（教育背景、工作经历等）切分简历文本，比对新旧两版的差异，
+用于简历更新时只把变化的段落交给LLM解析，再合并到原有的结构化结果中；
+长简历按段落分组后并行解析，再合并为一份结果
+"""
+import re
+from typing import Dict, List, Optional
+from app.models.resume import ResumeInfo, ContactInfo
+
+# 标题之前的内容（姓名、联系方式等）
+HEADER_SECTION = "header"
+
+# 段落标题关键词（小写比较）
+SECTION_HEADINGS = {
+    HEADER_SECTION: ["基本信息", "个人信息", "联系方式", "personal information", "contact"],
+    "summary": ["个人简介", "自我评价", "个人评价", "个人总结", "自我介绍", "个人优势", "summary", "profile", "about me"],
+    "education": ["教育背景", "教育经历", "学历背景", "学习经历", "education"],
+    "experience": ["工作经历", "工作经验", "实习经历", "职业经历", "任职经历", "work experience", "experience", "employment"],
+    "projects": ["项目经历", "项目经验", "项目", "projects", "project experience"],
+    "skills": ["专业技能", "技能特长", "技能", "技术栈", "skills", "technical skills"],
+    "languages": ["语言能力", "外语能力", "languages"],
+    "certifications": ["资格证书", "证书", "certifications", "certificates"],
+    "other": ["荣誉奖项", "获奖情况", "获奖经历", "兴趣爱好", "其他", "awards", "interests"],
+}
+
+# 段落对应的 ResumeInfo 字段
+SECTION_FIELDS = {
+    HEADER_SECTION: ["name", "contact"],
+    "summary": ["summary"],
+    "education": ["education"],
+    "experience": ["experience"],
+    "projects": ["projects"],
+    "skills": ["skills"],
+    "languages": ["languages"],
+    "certifications": ["certifications"],
+    "other": ["other"],
+}
+
+# 长简历分段并行解析时的分组：同组段落合并为一个请求，由该请求负责组内段落对应的字段
+SECTION_GROUPS = {
+    "profile": [HEADER_SECTION, "summary", "skills", "languages", "certifications", "other"],
+    "education": ["education"],
+    "experience": ["experience"],
+    "projects": ["projects"],
+}
+
+# 标题行最大长度（超过则视为正文）
+MAX_HEADING_LENGTH = 24
+
+# 标题行前后常见的装饰字符和序号
+_HEADING_DECORATION = re.compile(r"^[\s#*•·\-—_=|【\[(（<《]*(?:[一二三四五六七八九十\d]+[、.．)）]\s*)?|[\s:：#*•·\-—_=|】\])）>》]*$")
+
+_HEADING_LOOKUP = {
+    keyword: section
+    for section, keywords in SECTION_HEADINGS.items()
+    for keyword in keywords
+}
+
+def match_heading(line: str) -> Optional[str]:
+    """判断一行是否为段落标题（允许“技能：Python”这种标题后直接跟内容），返回段落名"""
+    title = re.split(r"[:：]", line.strip(), maxsplit=1)[0]
+    if not title or len(title) > MAX_HEADING_LENGTH:
+        return None
+    title = _HEADING_DECORATION.sub("", title).lower()
+    return _HEADING_LOOKUP.get(title)
+
+def split_sections(text: str) -> Dict[str, str]:
+    """
+    按段落标题切分简历文本
+
+    Args:
+        text: 简历文本
+
+    Returns:
+        段落名到段落文本（含标题行）的映射；首个标题之前的内容归入 header，
+        同名段落出现多次时依次拼接
+    """
+    sections: Dict[str, List[str]] = {}
+    current = HEADER_SECTION
+    for line in text.splitlines():
+        section = match_heading(line)
+        if section:
+            current = section
+        sections.setdefault(current, []).append(line)
+    return {name: "\n".join(lines).strip() for name, lines in sections.items() if "\n".join(lines).strip()}
+
+def group_fields(group: str) -> List[str]:
+    """分组负责的 ResumeInfo 字段"""
+    return [field for section in SECTION_GROUPS[group] for field in SECTION_FIELDS[section]]
+
+def plan_section_parse(text: str) -> Optional[Dict[str, str]]:
+    """
+    规划长简历的分段并行解析
+
+    Args:
+        text: 简历文本
+
+    Returns:
+        分组名到该组段落文本的映射；识别出的分组少于两个时返回 None（分段没有意义）
+    """
+    sections = split_sections(text)
+    groups = {}
+    for group, names in SECTION_GROUPS.items():
+        parts = [sections[name] for name in names if name in sections]
+        if parts:
+            groups[group] = "\n\n".join(parts)
+    return groups if len(groups) >= 2 else None
+
+def merge_section_results(results: Dict[str, ResumeInfo]) -> ResumeInfo:
+    """合并各分组的解析结果，每个字段只取负责该字段的分组的结果"""
+    data = ResumeInfo().dict()
+    for group, result in results.items():
+        partial = result.dict()
+        for field in group_fields(group):
+            data[field] = partial[field]
+    return ResumeInfo(**data)
+
+def _normalize(text: str) -> str:
+    """比对时忽略空白差异（OCR和排版导致的换行、空格变化）"""
+    return re.sub(r"\s+", "", text or "")
+
+def plan_incremental_parse(old_text: str, new_text: str, max_changed_ratio: float = 0.6) -> Optional[Dict]:
+    """
+    比对新旧简历文本，规划增量解析
+
+    Args:
+        old_text: 上一版提取的文本
+        new_text: 新版提取的文本
+        max_changed_ratio: 变化段落占新文本的比例超过该值时改为完整解析
+
+    Returns:
+        None 表示需要完整解析；否则返回 changed（需LLM解析的段落）、
+        removed（新版已删除的段落）和 text（发送给LLM的文本）
+    """
+    old_sections = split_sections(old_text)
+    new_sections = split_sections(new_text)
+
+    # 识别不出段落结构时无法可靠地比对
+    if len(old_sections) < 2 or len(new_sections) < 2:
+        return None
+
+    changed = [
+        name for name in SECTION_FIELDS
+        if name in new_sections and _normalize(new_sections[name]) != _normalize(old_sections.get(name))
+    ]
+    removed = [name for name in SECTION_FIELDS if name in old_sections and name not in new_sections]
+
+    changed_text = "\n\n".join(new_sections[name] for name in changed)
+    if len(_normalize(changed_text)) > len(_normalize(new_text)) * max_changed_ratio:
+        return None
+
+    return {"changed": changed, "removed": removed, "text": changed_text}
+
+def merge_resume_info(previous: ResumeInfo, partial: Optional[ResumeInfo],
+                      changed: List[str], removed: List[str]) -> ResumeInfo:
+    """
+    将变化段落的解析结果合并到原有的结构化数据
+
+    - 变化段落对应的字段使用新结果
+    - 已删除段落对应的字段清空
+    - 姓名和联系方式只在新结果有值时覆盖（标题区常被OCR截断）
+    """
+    data = previous.dict()
+
+    for section in removed:
+        if section == HEADER_SECTION:
+            continue
+        for field in SECTION_FIELDS[section]:
+            data[field] = None
+
+    if partial:
+        partial_data = partial.dict()
+        for section in changed:
+            for field in SECTION_FIELDS[section]:
+                if field == "name":
+                    data[field] = partial_data[field] or data[field]
+                elif field == "contact":
+                    contact = dict(data[field] or {})
+                    contact.update({key: value for key, value in (partial_data[field] or {}).items() if value})
+                    data[field] = ContactInfo(**contact) if contact else None
+                else:
+                    data[field] = partial_data[field]
+
+    return ResumeInfo(**data)
@@ -0,0 +1,267 @@
+"""
+基于规则的简历字段快速提取
+用正则和词典确定性地提取手机号、邮箱、教育经历（学校、学位、年份），
+不依赖LLM，毫秒内完成；结果作为解析中的部分结果推送，并用于校验、修正LLM输出，
+LLM不可用时作为降级结果
+"""
+import re
+from datetime import date
+from typing import Dict, List, Optional
+from app.models.resume import ResumeInfo, ContactInfo, EducationInfo
+
+# 教育背景相关关键词
+EDUCATION_KEYWORDS = [
+    "教育背景", "教育经历", "学历", "学位", "毕业", "入学", "大学", "学院", "学校",
+    "本科", "硕士", "博士", "学士", "研究生", "GPA", "成绩", "专业", "院系"
+]
+
+# 学位关键词（按优先级，先匹配到的生效）
+DEGREE_KEYWORDS = [
+    ("博士后", "博士后"),
+    ("博士", "博士学位"),
+    ("硕士", "硕士学位"),
+    ("研究生", "硕士学位"),
+    ("学士", "学士学位"),
+    ("本科", "学士学位"),
+    ("大专", "大专"),
+    ("专科", "大专"),
+    ("PhD", "博士学位"),
+    ("Ph.D", "博士学位"),
+    ("Master", "硕士学位"),
+    ("Bachelor", "学士学位"),
+]
+
+# 985 高校
+SCHOOLS_985 = {
+    "北京大学", "清华大学", "中国人民大学", "北京航空航天大学", "北京理工大学", "中国农业大学",
+    "北京师范大学", "中央民族大学", "南开大学", "天津大学", "大连理工大学", "东北大学",
+    "吉林大学", "哈尔滨工业大学", "复旦大学", "同济大学", "上海交通大学", "华东师范大学",
+    "南京大学", "东南大学", "浙江大学", "中国科学技术大学", "厦门大学", "山东大学",
+    "中国海洋大学", "武汉大学", "华中科技大学", "湖南大学", "中南大学", "中山大学",
+    "华南理工大学", "四川大学", "电子科技大学", "重庆大学", "西安交通大学", "西北工业大学",
+    "西北农林科技大学", "兰州大学", "国防科技大学",
+}
+
+# 211 高校（不含 985）
+SCHOOLS_211 = {
+    "北京交通大学", "北京工业大学", "北京科技大学", "北京化工大学", "北京邮电大学", "北京林业大学",
+    "北京中医药大学", "北京外国语大学", "中国传媒大学", "中央财经大学", "对外经济贸易大学",
+    "北京体育大学", "中央音乐学院", "中国政法大学", "华北电力大学", "中国矿业大学", "中国石油大学",
+    "中国地质大学", "天津医科大学", "河北工业大学", "太原理工大学", "内蒙古大学", "辽宁大学",
+    "大连海事大学", "延边大学", "东北师范大学", "哈尔滨工程大学", "东北农业大学", "东北林业大学",
+    "华东理工大学", "东华大学", "上海外国语大学", "上海财经大学", "上海大学", "苏州大学",
+    "南京航空航天大学", "南京理工大学", "河海大学", "江南大学", "南京农业大学", "中国药科大学",
+    "南京师范大学", "安徽大学", "合肥工业大学", "福州大学", "南昌大学", "郑州大学",
+    "武汉理工大学", "华中农业大学", "华中师范大学", "中南财经政法大学", "湖南师范大学", "暨南大学",
+    "华南师范大学", "广西大学", "海南大学", "西南交通大学", "四川农业大学", "西南财经大学",
+    "西南大学", "贵州大学", "云南大学", "西藏大学", "西北大学", "西安电子科技大学", "长安大学",
+    "陕西师范大学", "青海大学", "宁夏大学", "新疆大学", "石河子大学", "海军军医大学", "空军军医大学",
+}
+
+# 按名称长度倒序匹配，避免“北京大学”先于“北京师范大学”等更长名称命中的歧义
+_KNOWN_SCHOOLS = sorted(SCHOOLS_985 | SCHOOLS_211, key=len, reverse=True)
+
+_PHONE_PATTERN = re.compile(r"(?<!\d)(?:\+?86[-\s]?)?(1[3-9]\d)[-\s]?(\d{4})[-\s]?(\d{4})(?!\d)")
+_EMAIL_PATTERN = re.compile(r"[A-Za-z0-9._%+\-]+@[A-Za-z0-9.\-]+\.[A-Za-z]{2,}")
+_YEAR_PATTERN = re.compile(r"(?<!\d)(19[5-9]\d|20[0-4]\d)(?!\d)")
+_SCHOOL_PATTERN = re.compile(r"[一-龥]{2,16}?(?:大学|学院)")
+_NAME_LABEL_PATTERN = re.compile(r"姓\s*名\s*[:：]?\s*([一-龥]{2,4})")
+_NAME_LINE_PATTERN = re.compile(r"^[一-龥]{2,4}$")
+_PHONE_LIKE_PATTERN = re.compile(r"^\+?[\d\s\-()]{7,20}$")
+_FOUR_DIGITS_PATTERN = re.compile(r"(?<!\d)\d{4}(?!\d)")
+
+# 教育经历年份的合理范围：最早入学年份，以及最晚预计毕业年份距今的年数
+MIN_EDUCATION_YEAR = 1950
+MAX_GRADUATION_YEARS_AHEAD = 8
+
+# 姓名候选行中常见的非姓名词
+_NOT_NAMES = {"个人简历", "简历", "求职简历", "基本信息", "个人信息", "联系方式", "教育背景", "工作经历"}
+
+def normalize_phone(phone: Optional[str]) -> Optional[str]:
+    """规范化手机号（去掉国家码和分隔符），无法识别时返回 None"""
+    if not phone:
+        return None
+    match = _PHONE_PATTERN.search(phone)
+    return "".join(match.groups()) if match else None
+
+def extract_phones(text: str) -> List[str]:
+    """提取手机号（去重，保持出现顺序）"""
+    return list(dict.fromkeys("".join(match.groups()) for match in _PHONE_PATTERN.finditer(text)))
+
+def extract_emails(text: str) -> List[str]:
+    """提取邮箱（去重，保持出现顺序）"""
+    return list(dict.fromkeys(match.group(0).rstrip(".").lower() for match in _EMAIL_PATTERN.finditer(text)))
+
+def _find_school(line: str) -> Optional[str]:
+    """在一行中查找学校名称，优先匹配 985/211 词典"""
+    compact = re.sub(r"\s+", "", line)
+    for school in _KNOWN_SCHOOLS:
+        if school in compact:
+            return school
+    match = _SCHOOL_PATTERN.search(compact)
+    return match.group(0) if match else None
+
+def _find_degree(text: str) -> Optional[str]:
+    """查找学位关键词"""
+    for keyword, degree in DEGREE_KEYWORDS:
+        if keyword in text:
+            return degree
+    return None
+
+def extract_education(text: str) -> List[EducationInfo]:
+    """
+    提取教育经历候选
+
+    以包含学校名称的行为锚点，在该行及前后各一行中查找学位和年份；
+    结果按毕业年份倒序（最新的在前）
+    """
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    entries: Dict[str, EducationInfo] = {}
+
+    for index, line in enumerate(lines):
+        school = _find_school(line)
+        if not school or school in entries:
+            continue
+
+        # 同一行的信息最可靠，不足时再参考相邻行
+        degree = _find_degree(line)
+        years = _YEAR_PATTERN.findall(line)
+        for neighbor in (lines[index + 1] if index + 1 < len(lines) else "", lines[index - 1] if index > 0 else ""):
+            if _find_school(neighbor):
+                continue
+            degree = degree or _find_degree(neighbor)
+            if len(years) < 2:
+                years += _YEAR_PATTERN.findall(neighbor)
+
+        years = sorted(set(years))
+        entries[school] = EducationInfo(
+            institution=school,
+            degree=degree,
+            start_year=years[0] if len(years) >= 2 else None,
+            end_year=years[-1] if years else None
+        )
+
+    return sorted(entries.values(), key=lambda item: item.end_year or "", reverse=True)
+
+def extract_name(text: str) -> Optional[str]:
+    """提取姓名：优先“姓名：”标注，其次开头几行中单独成行的 2-4 个汉字"""
+    match = _NAME_LABEL_PATTERN.search(text)
+    if match:
+        return match.group(1)
+
+    for line in text.splitlines()[:5]:
+        candidate = re.sub(r"\s+", "", line)
+        if _NAME_LINE_PATTERN.match(candidate) and candidate not in _NOT_NAMES:
+            return candidate
+    return None
+
+def extract_rules(text: str) -> ResumeInfo:
+    """
+    基于规则提取简历字段
+
+    Returns:
+        只包含姓名、联系方式和教育经历的部分简历信息
+    """
+    phones = extract_phones(text)
+    emails = extract_emails(text)
+    contact = ContactInfo(phone=phones[0] if phones else None, email=emails[0] if emails else None)
+    education = extract_education(text)
+
+    return ResumeInfo(
+        name=extract_name(text),
+        contact=contact if (contact.phone or contact.email) else None,
+        education=education or None
+    )
+
+def has_rule_data(rules: Optional[ResumeInfo]) -> bool:
+    """规则提取是否得到了任何字段"""
+    return bool(rules and (rules.name or rules.contact or rules.education))
+
+def apply_rules(result: ResumeInfo, rules: ResumeInfo, text: str) -> ResumeInfo:
+    """
+    用规则提取结果校验、修正LLM输出
+
+    - 手机号、邮箱：LLM给出的值不在原文中时用规则结果替换，缺失时补全
+    - 教育经历：LLM未提取到时使用规则结果；同一学校的学位、年份缺失时补全，
+      年份不在原文中时（模型臆造）用规则结果替换
+    - 姓名：仅在LLM未提取到时补全
+    """
+    data = result.dict()
+
+    phones = extract_phones(text)
+    emails = extract_emails(text)
+    contact = dict(data.get("contact") or {})
+    if phones and normalize_phone(contact.get("phone")) not in phones:
+        contact["phone"] = phones[0]
+    if emails and (contact.get("email") or "").lower() not in emails:
+        contact["email"] = emails[0]
+    data["contact"] = contact or None
+
+    if not data.get("name"):
+        data["name"] = rules.name
+
+    rule_education = {item.institution: item for item in (rules.education or [])}
+    if not data.get("education"):
+        data["education"] = [item.dict() for item in rule_education.values()] or None
+    else:
+        text_years = set(_YEAR_PATTERN.findall(text))
+        for entry in data["education"]:
+            matched = next(
+                (item for name, item in rule_education.items()
+                 if entry.get("institution") and (name in entry["institution"] or entry["institution"] in name)),
+                None
+            )
+            if not matched:
+                continue
+            entry["degree"] = entry.get("degree") or matched.degree
+            for field in ("start_year", "end_year"):
+                value = entry.get(field)
+                year = _YEAR_PATTERN.search(value or "")
+                if matched.dict()[field] and (not year or year.group(0) not in text_years):
+                    entry[field] = matched.dict()[field]
+
+    return ResumeInfo(**data)
+
+def _education_year(value: Optional[str]) -> Optional[int]:
+    """取出年份字段中的4位年份；“至今”等无数字的值返回 None，含数字但无4位年份时返回 0"""
+    if not value or not re.search(r"\d", value):
+        return None
+    match = _FOUR_DIGITS_PATTERN.search(value)
+    return int(match.group(0)) if match else 0
+
+def validate_resume(result: ResumeInfo, require_name: bool = True) -> List[str]:
+    """
+    校验LLM解析结果的基本合理性，用于决定是否升级到更强的模型
+
+    - 姓名必须存在（只解析部分段落、不含姓名所在的开头部分时不要求）
+    - 手机号、邮箱有值时格式必须有效
+    - 教育经历的年份必须是合理范围内的4位年份，且入学不晚于毕业
+
+    Returns:
+        发现的问题列表，为空表示通过
+    """
+    issues = []
+    if require_name and not (result.name or "").strip():
+        issues.append("缺少姓名")
+
+    contact = result.contact
+    if contact and contact.phone:
+        digits = re.sub(r"\D", "", contact.phone)
+        if not normalize_phone(contact.phone) and not (
+            _PHONE_LIKE_PATTERN.match(contact.phone.strip()) and 7 <= len(digits) <= 15
+        ):
+            issues.append(f"手机号格式无效: {contact.phone}")
+    if contact and contact.email and not _EMAIL_PATTERN.fullmatch(contact.email.strip()):
+        issues.append(f"邮箱格式无效: {contact.email}")
+
+    max_year = date.today().year + MAX_GRADUATION_YEARS_AHEAD
+    for entry in result.education or []:
+        start = _education_year(entry.start_year)
+        end = _education_year(entry.end_year)
+        for value, year in ((entry.start_year, start), (entry.end_year, end)):
+            if year is not None and not MIN_EDUCATION_YEAR <= year <= max_year:
+                issues.append(f"教育经历年份不合理: {entry.institution or ''} {value}")
+        if start and end and start > end:
+            issues.append(f"教育经历入学晚于毕业: {entry.institution or ''} {entry.start_year}-{entry.end_year}")
+
+    return issues
@@ -0,0 +1,159 @@
+"""
+LLM输入文本压缩工具
+在调用LLM之前规范化提取的文本，去掉对解析无用的内容以减少prompt token：
+分页标记、各页重复的页眉页脚、页码、OCR噪声行、多余空白和相邻的重复行，并限制超长输入
+"""
+import re
+from typing import List, Optional, Set, Tuple
+
+# 超长输入截断后附加的提示
+TRUNCATED_MARKER = "[文本过长，以下内容已截断]"
+
+# 页眉页脚只在每页开头和结尾的若干行中查找
+EDGE_LINES = 3
+
+_PAGE_BANNER = re.compile(r"^=+\s*第\s*\d+\s*页\s*=+$")
+# 明确的页码写法（第N页、第N页/共M页、Page N of M、N/M、- N -）
+_PAGE_NUMBER_TOKEN = (
+    r"第\s*\d+\s*页(?:\s*[/,，]?\s*共\s*\d+\s*页)?|page\s*\d+(?:\s*of\s*\d+)?"
+    r"|(?<!\d)\d{1,3}\s*/\s*\d{1,3}(?!\d)|[-—]\s*\d{1,3}\s*[-—]"
+)
+_PAGE_NUMBER = re.compile(rf"^(?:{_PAGE_NUMBER_TOKEN})$", re.IGNORECASE)
+_PAGE_NUMBER_IN_LINE = re.compile(_PAGE_NUMBER_TOKEN, re.IGNORECASE)
+# 单独一行的数字只有在页面首行或末行时才视为页码（正文中可能是年龄、年限等）
+_BARE_NUMBER = re.compile(r"^\d{1,3}$")
+# 含日期、电话、邮箱的行不作为页眉页脚去掉（不同经历的时间行可能完全相同）
+_PROTECTED = re.compile(
+    r"\d{4}\s*(?:[./\-年]\s*\d{1,2}|[-–—~～至])|至今|\+?\d[\d -]{8,}\d|[\w.+-]+@[\w-]+\.[\w.-]+"
+)
+_MEANINGFUL_CHAR = re.compile(r"[0-9A-Za-z一-龥]")
+_SYMBOL_RUN = re.compile(r"([^\w\s])\1{2,}")
+_WHITESPACE = re.compile(r"[ \t　\xa0]+")
+
+def _split_pages(text: str) -> List[List[str]]:
+    """按分页符或OCR分页标记切分页面"""
+    pages: List[List[str]] = [[]]
+    for line in text.replace("\r\n", "\n").replace("\r", "\n").split("\n"):
+        if "\f" in line:
+            parts = line.split("\f")
+            pages[-1].append(parts[0])
+            for part in parts[1:]:
+                pages.append([part])
+            continue
+        if _PAGE_BANNER.match(line.strip()):
+            if any(item.strip() for item in pages[-1]):
+                pages.append([])
+            continue
+        pages[-1].append(line)
+    return [page for page in pages if any(line.strip() for line in page)]
+
+def _normalize_line(line: str) -> str:
+    """合并连续空白，压缩重复符号（如“------”“······”）"""
+    line = _WHITESPACE.sub(" ", line).strip()
+    return _SYMBOL_RUN.sub(r"\1", line)
+
+def _is_noise(line: str) -> bool:
+    """空行、明确的页码、纯符号行（孤立的单个字母、数字保留，如技能列表中的“C”“R”）"""
+    if not line:
+        return True
+    if _PAGE_NUMBER.match(line):
+        return True
+    return not _MEANINGFUL_CHAR.search(line)
+
+def _strip_bare_page_numbers(page: List[str]) -> List[str]:
+    """去掉页面首行、末行单独的数字（页码）"""
+    if page and _BARE_NUMBER.match(page[-1]):
+        page = page[:-1]
+    if page and _BARE_NUMBER.match(page[0]):
+        page = page[1:]
+    return page
+
+def _is_protected(line: str) -> bool:
+    """含日期、电话、邮箱的行"""
+    return bool(_PROTECTED.search(line))
+
+def _edge_key(line: str) -> Optional[str]:
+    """
+    页眉页脚的比较键：只有文字完全相同的行才视为重复，唯一的例外是行内明确的页码（如“张三 第1页”）；
+    含日期、电话、邮箱的行不参与比较，返回 None
+    """
+    if _is_protected(line):
+        return None
+    return _PAGE_NUMBER_IN_LINE.sub("#", line)
+
+def _edge_positions(page: List[str], index: int) -> List[Tuple[str, int]]:
+    """行在页面中的边缘位置：距页首或页尾的行数（只考虑首尾 EDGE_LINES 行）"""
+    positions = []
+    if index < EDGE_LINES:
+        positions.append(("head", index))
+    if len(page) - 1 - index < EDGE_LINES:
+        positions.append(("foot", len(page) - 1 - index))
+    return positions
+
+def _repeated_edge_lines(pages: List[List[str]]) -> Set[Tuple[str, int, str]]:
+    """
+    找出在多数页面的相同边缘位置重复出现的行（页眉页脚）
+
+    Returns:
+        (head / foot, 距页首或页尾的行数, 比较键) 的集合
+    """
+    if len(pages) < 2:
+        return set()
+
+    counts = {}
+    for page in pages:
+        edges = set()
+        for index, line in enumerate(page):
+            key = _edge_key(line)
+            if key is None:
+                continue
+            edges.update((edge, offset, key) for edge, offset in _edge_positions(page, index))
+        for item in edges:
+            counts[item] = counts.get(item, 0) + 1
+
+    threshold = max(2, (len(pages) + 1) // 2)
+    return {item for item, count in counts.items() if count >= threshold}
+
+def compact_text(text: str, max_chars: int = 0) -> str:
+    """
+    压缩LLM输入文本
+
+    Args:
+        text: 提取的简历文本
+        max_chars: 最大字符数，超过时在行边界截断（0 表示不限制）
+
+    Returns:
+        压缩后的文本
+    """
+    # 先按原始位置去掉首末行的页码，再过滤噪声行（避免噪声行去掉后正文中的数字落到页尾）
+    pages = [
+        [line for line in _strip_bare_page_numbers([line for line in map(_normalize_line, page) if line])
+         if not _is_noise(line)]
+        for page in _split_pages(text or "")
+    ]
+
+    # 只去掉页眉页脚和相邻的重复行（OCR重复识别、跨页重复的行）；
+    # 不相邻的相同行可能是不同经历下合理重复的职责、技术栈描述，保留
+    repeated = _repeated_edge_lines(pages)
+    kept_edges = set()
+    lines: List[str] = []
+    for page in pages:
+        for index, line in enumerate(page):
+            if _is_protected(line):
+                lines.append(line)
+                continue
+            key = _edge_key(line)
+            if any((edge, offset, key) in repeated for edge, offset in _edge_positions(page, index)):
+                # 页眉常含姓名，保留第一次出现
+                if key in kept_edges:
+                    continue
+                kept_edges.add(key)
+            if lines and line == lines[-1]:
+                continue
+            lines.append(line)
+
+    compacted = "\n".join(lines)
+    if max_chars and len(compacted) > max_chars:
+        cut = compacted.rfind("\n", 0, max_chars)
+        compacted = compacted[:cut if cut > 0 else max_chars] + "\n" + TRUNCATED_MARKER
+    return compacted
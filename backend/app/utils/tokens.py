@@ -0,0 +1,28 @@
+"""
+Token 数估算工具
+不依赖具体模型的分词器，按字符类别粗略估算，用于统计和比较LLM输入规模
+"""
+import re
+
+# 中日韩字符（含全角标点），通常约 1 个字符 1 个 token
+_CJK_PATTERN = re.compile(r"[　-〿぀-ヿ㐀-䶿一-鿿가-힯＀-￯]")
+
+# 其他字符（英文、数字、半角标点）约 4 个字符 1 个 token
+CHARS_PER_TOKEN = 4
+
+def estimate_tokens(text: str) -> int:
+    """
+    估算文本的 token 数
+
+    Args:
+        text: 文本
+
+    Returns:
+        估算的 token 数
+    """
+    if not text:
+        return 0
+
+    cjk_count = len(_CJK_PATTERN.findall(text))
+    other_count = len(text) - cjk_count - text.count(" ") - text.count("\n")
+    return cjk_count + (max(0, other_count) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
@@ -38,6 +38,10 @@ def check_key_configs():
         print(f"  数据库URL: {settings.DATABASE_URL}")
         print(f"  LLM模型: {settings.LLM_MODEL}")
         print(f"  API Key: {'已设置' if settings.SILICONFLOW_API_KEY else '❌ 未设置'}")
+        if settings.LLM_ENDPOINTS.strip():
+            from app.services.llm_router import load_endpoints
+            endpoints = load_endpoints()
+            print(f"  LLM端点: {', '.join(f'{endpoint.name}({endpoint.model})' for endpoint in endpoints)}")
         print(f"  调试模式: {settings.DEBUG}")
         print(f"  环境: {settings.ENVIRONMENT}")
         
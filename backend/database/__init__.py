@@ -8,7 +8,8 @@ from .repositories import (
     UploadTaskRepository,
     ResumeInfoRepository,
     CandidateRepository,
-    UserRepository
+    UserRepository,
+    ResumeTextRepository
 )
 
 # 创建全局实例
@@ -17,6 +18,7 @@ upload_task_repo = UploadTaskRepository()
 resume_info_repo = ResumeInfoRepository()
 candidate_repo = CandidateRepository()
 user_repo = UserRepository()
+resume_text_repo = ResumeTextRepository()
 
 def init_database():
     """初始化数据库"""
@@ -51,6 +53,7 @@ __all__ = [
     "upload_task_repo",
     "resume_info_repo",
     "candidate_repo",
+    "resume_text_repo",
     "init_database",
     "get_database_info",
     "get_migration_status"
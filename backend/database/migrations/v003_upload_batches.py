@@ -0,0 +1,13 @@
+"""
+批量上传支持
+版本: v003
+"""
+MIGRATION_NAME = "Upload Batches"
+
+SQL_COMMANDS = [
+    # 上传任务所属批次
+    "ALTER TABLE upload_tasks ADD COLUMN batch_id TEXT",
+    
+    # 批次进度聚合查询索引
+    "CREATE INDEX IF NOT EXISTS idx_tasks_batch_id ON upload_tasks(batch_id)",
+]
@@ -0,0 +1,12 @@
+"""
+上传文件内容哈希
+版本: v004
+"""
+MIGRATION_NAME = "Upload File Hash"
+
+SQL_COMMANDS = [
+    # 文件内容SHA-256
+    "ALTER TABLE upload_tasks ADD COLUMN file_hash TEXT",
+    
+    "CREATE INDEX IF NOT EXISTS idx_tasks_file_hash ON upload_tasks(file_hash)",
+]
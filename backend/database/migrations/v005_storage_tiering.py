@@ -0,0 +1,19 @@
+"""
+冷文件分层压缩
+版本: v005
+"""
+MIGRATION_NAME = "Storage Tiering"
+
+SQL_COMMANDS = [
+    # 文件存储编码：NULL 未评估，identity 原样存储（压缩收益不足），zstd 已压缩
+    "ALTER TABLE upload_tasks ADD COLUMN storage_codec TEXT",
+    
+    # 存储中的实际大小（压缩后），未压缩时为 NULL
+    "ALTER TABLE upload_tasks ADD COLUMN stored_size INTEGER",
+    
+    # 下载统计，用于识别冷文件
+    "ALTER TABLE upload_tasks ADD COLUMN download_count INTEGER DEFAULT 0",
+    "ALTER TABLE upload_tasks ADD COLUMN last_downloaded_at TIMESTAMP",
+    
+    "CREATE INDEX IF NOT EXISTS idx_tasks_file_path ON upload_tasks(file_path)",
+]
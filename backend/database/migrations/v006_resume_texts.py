@@ -0,0 +1,25 @@
+"""
+保存提取的简历文本，支持仅重跑LLM解析
+版本: v006
+"""
+MIGRATION_NAME = "Resume Texts"
+
+SQL_COMMANDS = [
+    # 提取的简历文本（压缩存储，每个任务一条）
+    """
+    CREATE TABLE IF NOT EXISTS resume_texts (
+        task_id TEXT PRIMARY KEY,
+        codec TEXT NOT NULL DEFAULT 'zlib',
+        content BLOB NOT NULL,
+        text_length INTEGER,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (task_id) REFERENCES upload_tasks (id) ON DELETE CASCADE
+    )
+    """,
+    
+    # 生成解析结果所用的LLM模型
+    "ALTER TABLE upload_tasks ADD COLUMN llm_model TEXT",
+    
+    "CREATE INDEX IF NOT EXISTS idx_tasks_llm_model ON upload_tasks(llm_model)",
+]
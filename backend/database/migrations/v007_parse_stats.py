@@ -0,0 +1,10 @@
+"""
+记录任务的解析统计（增量解析、token用量等）
+版本: v007
+"""
+MIGRATION_NAME = "Parse Stats"
+
+SQL_COMMANDS = [
+    # 解析统计（JSON）
+    "ALTER TABLE upload_tasks ADD COLUMN parse_stats TEXT",
+]
@@ -0,0 +1,10 @@
+"""
+记录解析过程中的部分结果（规则提取等），供前端在LLM完成前展示
+版本: v008
+"""
+MIGRATION_NAME = "Partial Results"
+
+SQL_COMMANDS = [
+    # 部分解析结果（JSON，结构同 result）
+    "ALTER TABLE upload_tasks ADD COLUMN partial_result TEXT",
+]
@@ -0,0 +1,12 @@
+"""
+记录生成解析结果所用的提示词版本
+版本: v009
+"""
+MIGRATION_NAME = "Prompt Version"
+
+SQL_COMMANDS = [
+    "ALTER TABLE upload_tasks ADD COLUMN prompt_version TEXT",
+    
+    # 此前的结果均由内置提示词（即 resume-v1）生成
+    "UPDATE upload_tasks SET prompt_version = 'resume-v1' WHERE llm_model IS NOT NULL",
+]
@@ -0,0 +1,9 @@
+"""
+记录解析结果由模型级联中的哪一级生成
+版本: v010
+"""
+MIGRATION_NAME = "LLM Tier"
+
+SQL_COMMANDS = [
+    "ALTER TABLE upload_tasks ADD COLUMN llm_tier TEXT",
+]
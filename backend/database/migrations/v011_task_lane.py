@@ -0,0 +1,9 @@
+"""
+记录任务所在的调度优先级通道（interactive / bulk）
+版本: v011
+"""
+MIGRATION_NAME = "Task Lane"
+
+SQL_COMMANDS = [
+    "ALTER TABLE upload_tasks ADD COLUMN lane TEXT",
+]
@@ -0,0 +1,10 @@
+"""
+记录上传时探测的解析成本（页数、文本层、图片像素）和据此分配的工作池
+版本: v012
+"""
+MIGRATION_NAME = "Task Probe"
+
+SQL_COMMANDS = [
+    "ALTER TABLE upload_tasks ADD COLUMN cost_class TEXT",
+    "ALTER TABLE upload_tasks ADD COLUMN probe TEXT",
+]
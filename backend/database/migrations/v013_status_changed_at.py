@@ -0,0 +1,11 @@
+"""
+记录任务状态或进度最后一次变化的时间（UTC），供批量状态查询判断任务是否有变化；
+updated_at 会被下载计数、存储编码、解析统计等写入刷新，不能用于判断状态变化
+版本: v013
+"""
+MIGRATION_NAME = "Task Status Changed At"
+
+SQL_COMMANDS = [
+    "ALTER TABLE upload_tasks ADD COLUMN status_changed_at TIMESTAMP",
+    "UPDATE upload_tasks SET status_changed_at = COALESCE(updated_at, CURRENT_TIMESTAMP)",
+]
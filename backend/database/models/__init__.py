@@ -6,11 +6,13 @@ from .upload_task import UploadTaskModel
 from .resume_info import ResumeInfoModel
 from .candidate import CandidateModel
 from .user import UserModel
+from .resume_text import ResumeTextModel
 
 __all__ = [
     "BaseModel",
     "UploadTaskModel", 
     "ResumeInfoModel",
     "CandidateModel",
-    "UserModel"
+    "UserModel",
+    "ResumeTextModel"
 ]
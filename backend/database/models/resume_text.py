@@ -0,0 +1,92 @@
+"""
+简历文本模型
+"""
+import zlib
+from datetime import datetime
+from typing import Optional, Dict, Any
+from database.models.base import BaseModel
+
+# 文本压缩编码
+TEXT_CODEC_ZLIB = "zlib"
+
+class ResumeTextModel(BaseModel):
+    """提取的简历文本数据库模型（内容压缩存储）"""
+    
+    def __init__(self,
+                 task_id: str,
+                 content: bytes,
+                 codec: str = TEXT_CODEC_ZLIB,
+                 text_length: Optional[int] = None,
+                 created_at: Optional[datetime] = None,
+                 updated_at: Optional[datetime] = None,
+                 **kwargs):
+        super().__init__(**kwargs)
+        self.task_id = task_id
+        self.content = content
+        self.codec = codec
+        self.text_length = text_length
+        self.created_at = created_at or datetime.now()
+        self.updated_at = updated_at or datetime.now()
+    
+    @classmethod
+    def from_text(cls, task_id: str, text: str) -> 'ResumeTextModel':
+        """压缩文本并创建实例"""
+        return cls(
+            task_id=task_id,
+            content=zlib.compress(text.encode("utf-8"), 6),
+            codec=TEXT_CODEC_ZLIB,
+            text_length=len(text)
+        )
+    
+    @property
+    def text(self) -> str:
+        """解压后的文本"""
+        if self.codec == TEXT_CODEC_ZLIB:
+            return zlib.decompress(self.content).decode("utf-8")
+        return bytes(self.content).decode("utf-8")
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典（返回解压后的文本）"""
+        return {
+            "task_id": self.task_id,
+            "text": self.text,
+            "text_length": self.text_length,
+            "stored_size": len(self.content) if self.content else 0,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ResumeTextModel':
+        """从字典创建实例"""
+        if "text" in data and "content" not in data:
+            return cls.from_text(data["task_id"], data["text"])
+        return cls(
+            task_id=data["task_id"],
+            content=data["content"],
+            codec=data.get("codec", TEXT_CODEC_ZLIB),
+            text_length=data.get("text_length")
+        )
+    
+    def to_tuple(self) -> tuple:
+        """转换为元组（用于数据库插入）"""
+        return (
+            self.task_id,
+            self.codec,
+            self.content,
+            self.text_length,
+            self.created_at.isoformat(),
+            self.updated_at.isoformat()
+        )
+    
+    @classmethod
+    def from_row(cls, row) -> 'ResumeTextModel':
+        """从数据库行创建实例"""
+        return cls(
+            task_id=row["task_id"],
+            content=row["content"],
+            codec=row["codec"],
+            text_length=row["text_length"],
+            created_at=datetime.fromisoformat(row["created_at"]) if row["created_at"] else None,
+            updated_at=datetime.fromisoformat(row["updated_at"]) if row["updated_at"] else None
+        )
@@ -22,6 +22,20 @@ class UploadTaskModel(BaseModel):
                  created_at: Optional[datetime] = None,
                  updated_at: Optional[datetime] = None,
                  completed_at: Optional[datetime] = None,
+                 batch_id: Optional[str] = None,
+                 file_hash: Optional[str] = None,
+                 storage_codec: Optional[str] = None,
+                 stored_size: Optional[int] = None,
+                 download_count: int = 0,
+                 last_downloaded_at: Optional[datetime] = None,
+                 llm_model: Optional[str] = None,
+                 parse_stats: Optional[str] = None,
+                 partial_result: Optional[str] = None,
+                 prompt_version: Optional[str] = None,
+                 llm_tier: Optional[str] = None,
+                 lane: Optional[str] = None,
+                 cost_class: Optional[str] = None,
+                 probe: Optional[str] = None,
                  **kwargs):
         super().__init__(**kwargs)
         self.id = id
@@ -36,6 +50,20 @@ class UploadTaskModel(BaseModel):
         self.created_at = created_at or datetime.now()
         self.updated_at = updated_at
         self.completed_at = completed_at
+        self.batch_id = batch_id
+        self.file_hash = file_hash
+        self.storage_codec = storage_codec
+        self.stored_size = stored_size
+        self.download_count = download_count or 0
+        self.last_downloaded_at = last_downloaded_at
+        self.llm_model = llm_model
+        self.parse_stats = parse_stats
+        self.partial_result = partial_result
+        self.prompt_version = prompt_version
+        self.llm_tier = llm_tier
+        self.lane = lane
+        self.cost_class = cost_class
+        self.probe = probe
     
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典"""
@@ -51,7 +79,21 @@ class UploadTaskModel(BaseModel):
             "error": self.error,
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "updated_at": self.updated_at.isoformat() if self.updated_at else None,
-            "completed_at": self.completed_at.isoformat() if self.completed_at else None
+            "completed_at": self.completed_at.isoformat() if self.completed_at else None,
+            "batch_id": self.batch_id,
+            "file_hash": self.file_hash,
+            "storage_codec": self.storage_codec,
+            "stored_size": self.stored_size,
+            "download_count": self.download_count,
+            "last_downloaded_at": self.last_downloaded_at.isoformat() if self.last_downloaded_at else None,
+            "llm_model": self.llm_model,
+            "parse_stats": self.parse_stats,
+            "partial_result": self.partial_result,
+            "prompt_version": self.prompt_version,
+            "llm_tier": self.llm_tier,
+            "lane": self.lane,
+            "cost_class": self.cost_class,
+            "probe": self.probe
         }
     
     @classmethod
@@ -79,6 +121,13 @@ class UploadTaskModel(BaseModel):
             else:
                 completed_at = data["completed_at"]
         
+        last_downloaded_at = None
+        if data.get("last_downloaded_at"):
+            if isinstance(data["last_downloaded_at"], str):
+                last_downloaded_at = datetime.fromisoformat(data["last_downloaded_at"])
+            else:
+                last_downloaded_at = data["last_downloaded_at"]
+        
         return cls(
             id=data["id"],
             filename=data["filename"],
@@ -91,7 +140,21 @@ class UploadTaskModel(BaseModel):
             error=data.get("error"),
             created_at=created_at,
             updated_at=updated_at,
-            completed_at=completed_at
+            completed_at=completed_at,
+            batch_id=data.get("batch_id"),
+            file_hash=data.get("file_hash"),
+            storage_codec=data.get("storage_codec"),
+            stored_size=data.get("stored_size"),
+            download_count=data.get("download_count", 0),
+            last_downloaded_at=last_downloaded_at,
+            llm_model=data.get("llm_model"),
+            parse_stats=data.get("parse_stats"),
+            partial_result=data.get("partial_result"),
+            prompt_version=data.get("prompt_version"),
+            llm_tier=data.get("llm_tier"),
+            lane=data.get("lane"),
+            cost_class=data.get("cost_class"),
+            probe=data.get("probe")
         )
     
     def to_tuple(self) -> tuple:
@@ -108,7 +171,12 @@ class UploadTaskModel(BaseModel):
             self.error,
             self.created_at.isoformat(),
             self.updated_at.isoformat() if self.updated_at else None,
-            self.completed_at.isoformat() if self.completed_at else None
+            self.completed_at.isoformat() if self.completed_at else None,
+            self.batch_id,
+            self.file_hash,
+            self.lane,
+            self.cost_class,
+            self.probe
         )
     
     @classmethod
@@ -126,7 +194,21 @@ class UploadTaskModel(BaseModel):
             error=row["error"],
             created_at=datetime.fromisoformat(row["created_at"]) if row["created_at"] else None,
             updated_at=datetime.fromisoformat(row["updated_at"]) if row["updated_at"] else None,
-            completed_at=datetime.fromisoformat(row["completed_at"]) if row["completed_at"] else None
+            completed_at=datetime.fromisoformat(row["completed_at"]) if row["completed_at"] else None,
+            batch_id=row["batch_id"],
+            file_hash=row["file_hash"],
+            storage_codec=row["storage_codec"],
+            stored_size=row["stored_size"],
+            download_count=row["download_count"],
+            last_downloaded_at=datetime.fromisoformat(row["last_downloaded_at"]) if row["last_downloaded_at"] else None,
+            llm_model=row["llm_model"],
+            parse_stats=row["parse_stats"],
+            partial_result=row["partial_result"],
+            prompt_version=row["prompt_version"],
+            llm_tier=row["llm_tier"],
+            lane=row["lane"],
+            cost_class=row["cost_class"],
+            probe=row["probe"]
         )
     
     def update_status(self, status: str, progress: int = None, 
@@ -6,11 +6,13 @@ from .upload_task_repository import UploadTaskRepository
 from .resume_info_repository import ResumeInfoRepository
 from .candidate_repository import CandidateRepository
 from .user_repository import UserRepository
+from .resume_text_repository import ResumeTextRepository
 
 __all__ = [
     "BaseRepository",
     "UploadTaskRepository",
     "ResumeInfoRepository", 
     "CandidateRepository",
-    "UserRepository"
+    "UserRepository",
+    "ResumeTextRepository"
 ]
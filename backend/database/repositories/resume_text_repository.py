@@ -0,0 +1,101 @@
+"""
+简历文本数据访问层
+"""
+from typing import List, Optional, Dict, Any
+from database.repositories.base_repository import BaseRepository
+from database.models.resume_text import ResumeTextModel
+
+class ResumeTextRepository(BaseRepository[ResumeTextModel]):
+    """简历文本数据访问层"""
+    
+    def __init__(self):
+        super().__init__(ResumeTextModel)
+        self.table_name = "resume_texts"
+    
+    def create(self, model: ResumeTextModel) -> bool:
+        """保存简历文本（已存在时覆盖）"""
+        sql = f"""
+        INSERT INTO {self.table_name} (task_id, codec, content, text_length, created_at, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT(task_id) DO UPDATE SET
+            codec = excluded.codec,
+            content = excluded.content,
+            text_length = excluded.text_length,
+            updated_at = excluded.updated_at
+        """
+        try:
+            self.connection.execute_update(sql, model.to_tuple())
+            return True
+        except Exception as e:
+            print(f"保存简历文本失败: {e}")
+            return False
+    
+    def get_by_id(self, id: str) -> Optional[ResumeTextModel]:
+        """根据任务ID获取简历文本"""
+        sql = f"SELECT * FROM {self.table_name} WHERE task_id = ?"
+        try:
+            rows = self.connection.execute_query(sql, (id,))
+            if rows:
+                return ResumeTextModel.from_row(rows[0])
+            return None
+        except Exception as e:
+            print(f"获取简历文本失败: {e}")
+            return None
+    
+    def get_all(self, limit: int = 100, offset: int = 0) -> List[ResumeTextModel]:
+        """获取所有简历文本"""
+        sql = f"""
+        SELECT * FROM {self.table_name}
+        ORDER BY created_at DESC
+        LIMIT ? OFFSET ?
+        """
+        try:
+            rows = self.connection.execute_query(sql, (limit, offset))
+            return [ResumeTextModel.from_row(row) for row in rows]
+        except Exception as e:
+            print(f"获取简历文本列表失败: {e}")
+            return []
+    
+    def update(self, model: ResumeTextModel) -> bool:
+        """更新简历文本"""
+        return self.create(model)
+    
+    def delete(self, id: str) -> bool:
+        """根据任务ID删除简历文本"""
+        sql = f"DELETE FROM {self.table_name} WHERE task_id = ?"
+        try:
+            affected_rows = self.connection.execute_update(sql, (id,))
+            return affected_rows > 0
+        except Exception as e:
+            print(f"删除简历文本失败: {e}")
+            return False
+    
+    def count(self) -> int:
+        """获取简历文本总数"""
+        sql = f"SELECT COUNT(*) as count FROM {self.table_name}"
+        try:
+            rows = self.connection.execute_query(sql)
+            return rows[0]["count"] if rows else 0
+        except Exception as e:
+            print(f"获取简历文本总数失败: {e}")
+            return 0
+    
+    def get_statistics(self) -> Dict[str, Any]:
+        """获取文本存储统计（原始字符数与压缩后字节数）"""
+        sql = f"""
+        SELECT COUNT(*) as count,
+               SUM(COALESCE(text_length, 0)) as text_length,
+               SUM(LENGTH(content)) as stored_size
+        FROM {self.table_name}
+        """
+        try:
+            rows = self.connection.execute_query(sql)
+            row = rows[0] if rows else None
+            return {
+                "count": row["count"] if row else 0,
+                "text_length": (row["text_length"] or 0) if row else 0,
+                "stored_size": (row["stored_size"] or 0) if row else 0
+            }
+        except Exception as e:
+            print(f"获取简历文本统计失败: {e}")
+            return {"count": 0, "text_length": 0, "stored_size": 0}
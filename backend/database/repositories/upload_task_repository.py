@@ -1,7 +1,9 @@
 """
 上传任务数据访问层
 """
-from typing import List, Optional, Dict, Any
+import json
+from datetime import datetime
+from typing import List, Optional, Dict, Any, Set
 from database.repositories.base_repository import BaseRepository
 from database.models.upload_task import UploadTaskModel
 from app.models.resume import TaskStatus
@@ -13,20 +15,35 @@ class UploadTaskRepository(BaseRepository[UploadTaskModel]):
         super().__init__(UploadTaskModel)
         self.table_name = "upload_tasks"
     
-    def create(self, model: UploadTaskModel) -> bool:
-        """创建任务记录"""
-        sql = f"""
+    def _insert_sql(self) -> str:
+        """任务插入语句（status_changed_at 由数据库以UTC写入）"""
+        return f"""
         INSERT INTO {self.table_name} 
-        (id, filename, file_path, file_size, file_type, status, progress, result, error, created_at, updated_at, completed_at)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        (id, filename, file_path, file_size, file_type, status, progress, result, error, created_at, updated_at, completed_at,
+         batch_id, file_hash, lane, cost_class, probe, status_changed_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
         """
+    
+    def create(self, model: UploadTaskModel) -> bool:
+        """创建任务记录"""
         try:
-            self.connection.execute_update(sql, model.to_tuple())
+            self.connection.execute_update(self._insert_sql(), model.to_tuple())
             return True
         except Exception as e:
             print(f"创建任务失败: {e}")
             return False
     
+    def create_many(self, models: List[UploadTaskModel]) -> bool:
+        """在单个事务中批量创建任务记录"""
+        if not models:
+            return True
+        try:
+            self.connection.execute_many(self._insert_sql(), [model.to_tuple() for model in models])
+            return True
+        except Exception as e:
+            print(f"批量创建任务失败: {e}")
+            return False
+    
     def get_by_id(self, id: str) -> Optional[UploadTaskModel]:
         """根据ID获取任务"""
         sql = f"SELECT * FROM {self.table_name} WHERE id = ?"
@@ -54,12 +71,12 @@ class UploadTaskRepository(BaseRepository[UploadTaskModel]):
             return []
     
     def update(self, model: UploadTaskModel) -> bool:
-        """更新任务"""
+        """更新任务（状态、进度变化，同时以UTC记录 status_changed_at）"""
         sql = f"""
         UPDATE {self.table_name} 
         SET filename = ?, file_path = ?, file_size = ?, file_type = ?, 
             status = ?, progress = ?, result = ?, error = ?, 
-            updated_at = ?, completed_at = ?
+            updated_at = ?, completed_at = ?, status_changed_at = CURRENT_TIMESTAMP
         WHERE id = ?
         """
         try:
@@ -164,6 +181,305 @@ class UploadTaskRepository(BaseRepository[UploadTaskModel]):
             print(f"获取处理中任务失败: {e}")
             return []
     
+    def get_status_by_ids(self, ids: List[str], changed_since: str = None) -> List[Dict[str, Any]]:
+        """
+        批量获取任务状态（单次 IN 查询，仅读取状态相关字段）
+        
+        Args:
+            ids: 任务ID列表
+            changed_since: 变化时间基准（UTC，SQLite时间格式），提供时每行附带 changed 标记
+            
+        Returns:
+            任务状态字典列表
+        """
+        if not ids:
+            return []
+        
+        placeholders = ", ".join("?" for _ in ids)
+        params = []
+        changed_column = "1 AS changed"
+        if changed_since:
+            # 只比较状态、进度的变化时间（下载计数、解析统计等写入不算）；
+            # status_changed_at 为秒级精度，使用>=避免漏掉同一秒内的变化
+            changed_column = "datetime(status_changed_at) >= datetime(?) AS changed"
+            params.append(changed_since)
+        params.extend(ids)
+        
+        sql = f"""
+        SELECT id, status, progress, error, created_at, updated_at, completed_at, {changed_column}
+        FROM {self.table_name}
+        WHERE id IN ({placeholders})
+        """
+        try:
+            rows = self.connection.execute_query(sql, tuple(params))
+            return [dict(row) for row in rows]
+        except Exception as e:
+            print(f"批量获取任务状态失败: {e}")
+            return []
+    
+    def count_by_file_path(self, file_path: str, file_hash: Optional[str] = None) -> int:
+        """
+        统计引用指定文件的任务数（内容寻址存储的引用计数）
+
+        同一内容在历史记录中可能以不同形式的路径保存（如 uploads/blobs/... 与存储键 blobs/...），
+        提供内容哈希时同时按哈希统计，宁可多计也不误删
+        """
+        if file_hash:
+            sql = f"SELECT COUNT(*) as count FROM {self.table_name} WHERE file_path = ? OR file_hash = ?"
+            params = (file_path, file_hash)
+        else:
+            sql = f"SELECT COUNT(*) as count FROM {self.table_name} WHERE file_path = ?"
+            params = (file_path,)
+        try:
+            rows = self.connection.execute_query(sql, params)
+            return rows[0]["count"] if rows else 0
+        except Exception as e:
+            print(f"统计文件引用失败: {e}")
+            # 查询失败时按仍被引用处理，避免误删
+            return 1
+    
+    def get_file_refs_after(self, last_id: str = "", limit: int = 500) -> List[Dict[str, Any]]:
+        """按ID顺序分批获取任务的文件引用（键集分页）"""
+        sql = f"""
+        SELECT id, filename, file_path, file_hash, status, created_at
+        FROM {self.table_name}
+        WHERE id > ?
+        ORDER BY id
+        LIMIT ?
+        """
+        try:
+            rows = self.connection.execute_query(sql, (last_id, limit))
+            return [dict(row) for row in rows]
+        except Exception as e:
+            print(f"获取文件引用失败: {e}")
+            return []
+    
+    def get_referenced_paths(self, file_paths: List[str]) -> Set[str]:
+        """返回给定文件路径中仍被任务引用的部分（单次IN查询）"""
+        if not file_paths:
+            return set()
+        placeholders = ", ".join("?" for _ in file_paths)
+        sql = f"SELECT DISTINCT file_path FROM {self.table_name} WHERE file_path IN ({placeholders})"
+        try:
+            rows = self.connection.execute_query(sql, tuple(file_paths))
+            return {row["file_path"] for row in rows}
+        except Exception as e:
+            print(f"查询文件引用失败: {e}")
+            # 查询失败时按全部仍被引用处理，避免误删
+            return set(file_paths)
+    
+    def get_failed_ids_before(self, created_before: str, last_id: str = "", limit: int = 200) -> List[str]:
+        """按ID顺序分批获取早于指定时间创建的失败任务ID（键集分页）"""
+        sql = f"""
+        SELECT id FROM {self.table_name}
+        WHERE status = ? AND datetime(created_at) < datetime(?) AND id > ?
+        ORDER BY id
+        LIMIT ?
+        """
+        try:
+            rows = self.connection.execute_query(sql, (TaskStatus.FAILED.value, created_before, last_id, limit))
+            return [row["id"] for row in rows]
+        except Exception as e:
+            print(f"获取过期失败任务失败: {e}")
+            return []
+    
+    def update_file_location(self, id: str, file_path: str, file_hash: str) -> bool:
+        """更新任务的文件路径和内容哈希"""
+        sql = f"UPDATE {self.table_name} SET file_path = ?, file_hash = ? WHERE id = ?"
+        try:
+            affected_rows = self.connection.execute_update(sql, (file_path, file_hash, id))
+            return affected_rows > 0
+        except Exception as e:
+            print(f"更新文件路径失败: {e}")
+            return False
+    
+    def record_download(self, id: str) -> bool:
+        """记录一次文件下载"""
+        sql = f"""
+        UPDATE {self.table_name}
+        SET download_count = COALESCE(download_count, 0) + 1, last_downloaded_at = ?
+        WHERE id = ?
+        """
+        try:
+            affected_rows = self.connection.execute_update(sql, (datetime.now().isoformat(), id))
+            return affected_rows > 0
+        except Exception as e:
+            print(f"记录下载失败: {e}")
+            return False
+    
+    def get_cold_files(self, after_path: str, created_before: str, limit: int = 200) -> List[Dict[str, Any]]:
+        """
+        按文件路径分批获取冷文件（键集分页）
+        
+        冷文件：尚未评估压缩，引用它的所有任务都早于指定时间、从未被下载且不在解析中
+        """
+        sql = f"""
+        SELECT file_path, MAX(file_hash) as file_hash, MAX(file_size) as file_size, COUNT(*) as refs
+        FROM {self.table_name}
+        WHERE file_path > ? AND storage_codec IS NULL
+        GROUP BY file_path
+        HAVING MAX(datetime(created_at)) < datetime(?)
+           AND MAX(COALESCE(download_count, 0)) = 0
+           AND SUM(CASE WHEN status IN (?, ?) THEN 1 ELSE 0 END) = 0
+        ORDER BY file_path
+        LIMIT ?
+        """
+        try:
+            rows = self.connection.execute_query(sql, (
+                after_path, created_before,
+                TaskStatus.UPLOADED.value, TaskStatus.PARSING.value,
+                limit
+            ))
+            return [dict(row) for row in rows]
+        except Exception as e:
+            print(f"获取冷文件失败: {e}")
+            return []
+    
+    def update_storage_codec(self, old_path: str, new_path: str, codec: str,
+                             stored_size: Optional[int] = None) -> int:
+        """
+        更新引用某文件的所有任务的存储位置和编码
+        
+        再次确认任务不在解析中，避免解析过程中文件被替换
+        
+        Returns:
+            更新的任务数
+        """
+        sql = f"""
+        UPDATE {self.table_name}
+        SET file_path = ?, storage_codec = ?, stored_size = ?
+        WHERE file_path = ? AND storage_codec IS NULL AND status NOT IN (?, ?)
+        """
+        try:
+            return self.connection.execute_update(sql, (
+                new_path, codec, stored_size, old_path,
+                TaskStatus.UPLOADED.value, TaskStatus.PARSING.value
+            ))
+        except Exception as e:
+            print(f"更新存储编码失败: {e}")
+            return 0
+    
+    def get_storage_statistics(self) -> Dict[str, Dict[str, int]]:
+        """按存储编码统计文件数、原始大小和实际存储大小（同一文件只计一次）"""
+        sql = f"""
+        SELECT COALESCE(storage_codec, 'pending') as codec,
+               COUNT(*) as files,
+               SUM(COALESCE(file_size, 0)) as original_bytes,
+               SUM(COALESCE(stored_size, file_size, 0)) as stored_bytes
+        FROM (
+            SELECT file_path, MAX(storage_codec) as storage_codec,
+                   MAX(file_size) as file_size, MAX(stored_size) as stored_size
+            FROM {self.table_name}
+            GROUP BY file_path
+        )
+        GROUP BY COALESCE(storage_codec, 'pending')
+        """
+        try:
+            rows = self.connection.execute_query(sql)
+            return {
+                row["codec"]: {
+                    "files": row["files"],
+                    "original_bytes": row["original_bytes"] or 0,
+                    "stored_bytes": row["stored_bytes"] or 0
+                }
+                for row in rows
+            }
+        except Exception as e:
+            print(f"获取存储统计失败: {e}")
+            return {}
+    
+    def update_llm_model(self, id: str, llm_model: str, prompt_version: Optional[str] = None,
+                         llm_tier: Optional[str] = None) -> bool:
+        """记录生成解析结果的LLM模型、提示词版本和模型级别"""
+        sql = f"UPDATE {self.table_name} SET llm_model = ?, prompt_version = ?, llm_tier = ? WHERE id = ?"
+        try:
+            affected_rows = self.connection.execute_update(sql, (llm_model, prompt_version, llm_tier, id))
+            return affected_rows > 0
+        except Exception as e:
+            print(f"更新LLM模型失败: {e}")
+            return False
+    
+    def update_parse_stats(self, id: str, stats: Dict[str, Any]) -> bool:
+        """将统计项合并写入任务的解析统计（JSON），同名项覆盖"""
+        sql = f"""
+        UPDATE {self.table_name}
+        SET parse_stats = json_patch(COALESCE(parse_stats, '{{}}'), ?)
+        WHERE id = ?
+        """
+        try:
+            affected_rows = self.connection.execute_update(sql, (json.dumps(stats, ensure_ascii=False), id))
+            return affected_rows > 0
+        except Exception as e:
+            print(f"更新解析统计失败: {e}")
+            return False
+    
+    def update_partial_result(self, id: str, partial_result: str) -> bool:
+        """保存解析中的部分结果（JSON）"""
+        sql = f"UPDATE {self.table_name} SET partial_result = ? WHERE id = ?"
+        try:
+            affected_rows = self.connection.execute_update(sql, (partial_result, id))
+            return affected_rows > 0
+        except Exception as e:
+            print(f"更新部分结果失败: {e}")
+            return False
+    
+    def get_reprocess_candidates(self, filters: Dict[str, Any], limit: Optional[int] = None) -> List[str]:
+        """
+        获取可仅重跑LLM解析的任务ID（已保存提取文本且不在解析中）
+        
+        Args:
+            filters: created_from / created_to（ISO时间）、failed_only、llm_model、prompt_version、
+                     exclude_llm_models / exclude_prompt_version（排除已由这些模型之一和该提示词版本解析的任务）
+            limit: 最多返回数量
+        """
+        where_conditions = ["t.status NOT IN (?, ?)"]
+        params: List[Any] = [TaskStatus.UPLOADED.value, TaskStatus.PARSING.value]
+        
+        if filters.get("created_from"):
+            where_conditions.append("datetime(t.created_at) >= datetime(?)")
+            params.append(filters["created_from"])
+        
+        if filters.get("created_to"):
+            where_conditions.append("datetime(t.created_at) < datetime(?)")
+            params.append(filters["created_to"])
+        
+        if filters.get("failed_only"):
+            where_conditions.append("t.status = ?")
+            params.append(TaskStatus.FAILED.value)
+        
+        if filters.get("llm_model"):
+            where_conditions.append("t.llm_model = ?")
+            params.append(filters["llm_model"])
+        
+        if filters.get("prompt_version"):
+            where_conditions.append("t.prompt_version = ?")
+            params.append(filters["prompt_version"])
+        
+        if filters.get("exclude_llm_models"):
+            models = list(filters["exclude_llm_models"])
+            where_conditions.append(
+                f"(t.llm_model IS NULL OR t.llm_model NOT IN ({', '.join('?' * len(models))}) "
+                "OR t.prompt_version IS NULL OR t.prompt_version != ?)"
+            )
+            params.extend(models + [filters.get("exclude_prompt_version")])
+        
+        sql = f"""
+        SELECT t.id FROM {self.table_name} t
+        JOIN resume_texts r ON r.task_id = t.id
+        WHERE {' AND '.join(where_conditions)}
+        ORDER BY t.created_at
+        """
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        
+        try:
+            rows = self.connection.execute_query(sql, tuple(params))
+            return [row["id"] for row in rows]
+        except Exception as e:
+            print(f"获取待重新解析任务失败: {e}")
+            return []
+    
     def update_status(self, id: str, status: TaskStatus, progress: int = None, 
                      result: str = None, error: str = None) -> bool:
         """更新任务状态"""
@@ -174,6 +490,101 @@ class UploadTaskRepository(BaseRepository[UploadTaskModel]):
         task.update_status(status.value, progress, result, error)
         return self.update(task)
     
+    def get_llm_usage_statistics(self, since: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        按模型级别统计LLM解析的任务数、平均耗时、平均token数和费用
+        
+        Args:
+            since: 只统计该时间（ISO）之后创建的任务
+        """
+        where_conditions = ["llm_tier IS NOT NULL", "status = ?"]
+        params: List[Any] = [TaskStatus.COMPLETED.value]
+        if since:
+            where_conditions.append("datetime(created_at) >= datetime(?)")
+            params.append(since)
+        
+        sql = f"""
+        SELECT 
+            llm_tier,
+            COUNT(*) as tasks,
+            SUM(CASE WHEN json_extract(parse_stats, '$.cascade_escalations') IS NOT NULL THEN 1 ELSE 0 END) as escalated,
+            AVG(json_extract(parse_stats, '$.llm_seconds')) as avg_llm_seconds,
+            AVG(json_extract(parse_stats, '$.llm_tokens')) as avg_tokens,
+            AVG(json_extract(parse_stats, '$.llm_cost')) as avg_cost,
+            SUM(json_extract(parse_stats, '$.llm_cost')) as total_cost
+        FROM {self.table_name}
+        WHERE {' AND '.join(where_conditions)}
+        GROUP BY llm_tier
+        ORDER BY llm_tier
+        """
+        try:
+            rows = self.connection.execute_query(sql, tuple(params))
+            return [
+                {
+                    "llm_tier": row["llm_tier"],
+                    "tasks": row["tasks"],
+                    "escalated": row["escalated"] or 0,
+                    "avg_llm_seconds": round(row["avg_llm_seconds"], 2) if row["avg_llm_seconds"] is not None else None,
+                    "avg_tokens": round(row["avg_tokens"]) if row["avg_tokens"] is not None else None,
+                    "avg_cost": round(row["avg_cost"], 6) if row["avg_cost"] is not None else None,
+                    "total_cost": round(row["total_cost"], 4) if row["total_cost"] is not None else None
+                }
+                for row in rows
+            ]
+        except Exception as e:
+            print(f"获取LLM用量统计失败: {e}")
+            return []
+    
+    def get_batch_statistics(self, batch_id: str) -> Optional[Dict[str, Any]]:
+        """获取批次的聚合进度"""
+        sql = f"""
+        SELECT 
+            COUNT(*) as total,
+            SUM(CASE WHEN status = ? THEN 1 ELSE 0 END) as uploaded,
+            SUM(CASE WHEN status = ? THEN 1 ELSE 0 END) as parsing,
+            SUM(CASE WHEN status = ? THEN 1 ELSE 0 END) as completed,
+            SUM(CASE WHEN status = ? THEN 1 ELSE 0 END) as failed,
+            SUM(CASE WHEN status IN (?, ?) THEN 100 ELSE COALESCE(progress, 0) END) as progress_sum,
+            MIN(created_at) as created_at,
+            MAX(completed_at) as last_completed_at
+        FROM {self.table_name}
+        WHERE batch_id = ?
+        """
+        try:
+            rows = self.connection.execute_query(sql, (
+                TaskStatus.UPLOADED.value,
+                TaskStatus.PARSING.value,
+                TaskStatus.COMPLETED.value,
+                TaskStatus.FAILED.value,
+                TaskStatus.COMPLETED.value,
+                TaskStatus.FAILED.value,
+                batch_id
+            ))
+            
+            if not rows or not rows[0]["total"]:
+                return None
+            
+            row = rows[0]
+            total = row["total"]
+            completed = row["completed"] or 0
+            failed = row["failed"] or 0
+            
+            return {
+                "batch_id": batch_id,
+                "total": total,
+                "uploaded": row["uploaded"] or 0,
+                "parsing": row["parsing"] or 0,
+                "completed": completed,
+                "failed": failed,
+                "progress": round((row["progress_sum"] or 0) / total, 2),
+                "finished": completed + failed == total,
+                "created_at": row["created_at"],
+                "last_completed_at": row["last_completed_at"]
+            }
+        except Exception as e:
+            print(f"获取批次统计失败: {e}")
+            return None
+    
     def get_statistics(self) -> Dict[str, int]:
         """获取任务统计信息"""
         sql = f"""
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+上传目录去重迁移脚本
+将历史上传文件（uploads/{task_id}.ext）原地迁移到按内容哈希寻址的存储中，
+相同内容只保留一份，并回写任务的文件路径和哈希
+
+用法:
+    python dedupe_uploads.py              # 执行迁移
+    python dedupe_uploads.py --dry-run    # 仅统计，不做任何修改
+"""
+
+import os
+import sys
+import shutil
+import hashlib
+import argparse
+
+from app.core.config import settings
+from app.services.file_service import FileService, CHUNK_SIZE
+from database import upload_task_repo
+
+def hash_file(file_path: str) -> str:
+    """分块计算文件SHA-256"""
+    hasher = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+def migrate_file(file_service: FileService, task_id: str, file_path: str, file_hash: str) -> str:
+    """
+    迁移单个文件
+
+    先以硬链接（不支持时复制）建立内容存储文件，再更新任务记录，最后删除原文件，
+    任一步骤中断都不会让任务指向不存在的文件。
+    """
+    extension = os.path.splitext(file_path)[1]
+    blob_key = file_service.blob_key(file_hash, extension)
+    blob_path = file_service.storage.local_path(blob_key)
+
+    if not os.path.exists(blob_path):
+        os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+        try:
+            os.link(file_path, blob_path)
+        except OSError:
+            shutil.copy2(file_path, blob_path)
+
+    if not upload_task_repo.update_file_location(task_id, blob_key, file_hash):
+        raise RuntimeError("更新任务记录失败")
+
+    file_service.delete_file(file_path)
+    return blob_key
+
+def dedupe_uploads(dry_run: bool = False, batch_size: int = 500) -> dict:
+    """按批扫描任务表并迁移文件"""
+    file_service = FileService()
+    seen_blobs = set()
+    stats = {
+        "scanned": 0,
+        "migrated": 0,
+        "deduplicated": 0,
+        "already_migrated": 0,
+        "missing": 0,
+        "failed": 0,
+        "bytes_saved": 0
+    }
+
+    last_id = ""
+    while True:
+        refs = upload_task_repo.get_file_refs_after(last_id, batch_size)
+        if not refs:
+            break
+
+        for ref in refs:
+            last_id = ref["id"]
+            stats["scanned"] += 1
+            file_path = ref["file_path"]
+
+            if not file_path or file_service.is_blob_key(file_path):
+                stats["already_migrated"] += 1
+                continue
+
+            if not os.path.exists(file_path):
+                stats["missing"] += 1
+                print(f"⚠️  文件不存在: {file_path} (任务 {ref['id']})")
+                continue
+
+            try:
+                file_hash = ref["file_hash"] or hash_file(file_path)
+                blob_path = file_service.storage.local_path(
+                    file_service.blob_key(file_hash, os.path.splitext(file_path)[1])
+                )
+                file_size = os.path.getsize(file_path)
+
+                if blob_path in seen_blobs or os.path.exists(blob_path):
+                    stats["deduplicated"] += 1
+                    stats["bytes_saved"] += file_size
+                seen_blobs.add(blob_path)
+
+                if not dry_run:
+                    migrate_file(file_service, ref["id"], file_path, file_hash)
+                stats["migrated"] += 1
+            except Exception as e:
+                stats["failed"] += 1
+                print(f"❌ 迁移失败: {file_path} (任务 {ref['id']}): {e}")
+
+        print(f"🔄 已扫描 {stats['scanned']} 个任务...")
+
+    return stats
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="上传目录内容去重迁移")
+    parser.add_argument("--dry-run", action="store_true", help="仅统计，不做任何修改")
+    parser.add_argument("--batch-size", type=int, default=500, help="每批扫描的任务数")
+    args = parser.parse_args()
+
+    print("🦝 JianLi Tanuki 上传文件去重")
+    print("=" * 40)
+    if args.dry_run:
+        print("（试运行模式，不会修改任何文件）")
+
+    if settings.STORAGE_BACKEND.lower() != "local":
+        print("❌ 该脚本仅用于迁移本地上传目录，请在 STORAGE_BACKEND=local 时运行")
+        return False
+
+    stats = dedupe_uploads(dry_run=args.dry_run, batch_size=args.batch_size)
+
+    print("\n" + "=" * 40)
+    print(f"  扫描任务: {stats['scanned']}")
+    print(f"  迁移文件: {stats['migrated']}")
+    print(f"  重复内容: {stats['deduplicated']}")
+    print(f"  已是新格式: {stats['already_migrated']}")
+    print(f"  文件缺失: {stats['missing']}")
+    print(f"  迁移失败: {stats['failed']}")
+    print(f"  节省空间: {stats['bytes_saved'] / (1024 * 1024):.2f} MB")
+
+    return stats["failed"] == 0
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+存储垃圾回收脚本
+清理无任务引用的孤儿文件、标记文件缺失的任务、删除过期的失败任务
+
+用法:
+    python gc_uploads.py                       # 执行一轮回收
+    python gc_uploads.py --dry-run             # 仅统计，不做任何修改
+    python gc_uploads.py --pause 2 --max-deletes 100   # 限速运行
+"""
+
+import sys
+import asyncio
+import argparse
+
+from app.core.config import settings
+from app.services.database_service import db_service
+from app.services.gc_service import gc_service
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="存储垃圾回收")
+    parser.add_argument("--dry-run", action="store_true", help="仅统计，不删除文件、不修改任务")
+    parser.add_argument("--batch-size", type=int, default=None, help="每批核对的文件/任务数")
+    parser.add_argument("--pause", type=float, default=None, help="批次间暂停秒数（限速）")
+    parser.add_argument("--max-deletes", type=int, default=None, help="本次最多删除的文件和任务数")
+    args = parser.parse_args()
+
+    print("🦝 JianLi Tanuki 存储垃圾回收")
+    print("=" * 40)
+    print(f"存储后端: {settings.STORAGE_BACKEND}")
+    print(f"孤儿文件宽限期: {settings.GC_ORPHAN_GRACE_HOURS} 小时")
+    print(f"失败任务保留期: {settings.GC_FAILED_TASK_RETENTION_DAYS} 天")
+    if args.dry_run:
+        print("（试运行模式，不会修改任何文件）")
+
+    db_service.init_database()
+
+    stats = asyncio.run(gc_service.run(
+        dry_run=args.dry_run,
+        batch_size=args.batch_size,
+        pause_seconds=args.pause,
+        max_deletes=args.max_deletes
+    ))
+
+    print("\n" + "=" * 40)
+    print(f"  扫描文件: {stats['scanned_files']}")
+    print(f"  孤儿文件: {stats['orphan_files']} ({stats['orphan_bytes'] / (1024 * 1024):.2f} MB)")
+    print(f"  删除文件: {stats['deleted_files']}")
+    print(f"  扫描任务: {stats['scanned_tasks']}")
+    print(f"  文件缺失: {stats['missing_files']}（标记失败 {stats['failed_missing']}）")
+    print(f"  过期失败任务: {stats['expired_tasks']}（删除 {stats['deleted_tasks']}）")
+    print(f"  错误: {stats['errors']}")
+
+    return stats["errors"] == 0
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+本地LLM替身服务
+提供兼容OpenAI的 /v1/chat/completions 接口，返回固定的简历解析结果，
+可模拟延迟、错误率、限流和输出截断，用于在本地验证多端点路由、故障转移、熔断和续写，不消耗真实额度
+
+用法:
+    python mock_llm_server.py --port 9001 --latency 0.5
+    python mock_llm_server.py --port 9002 --latency 2 --error-rate 0.3 --error-status 503
+    python mock_llm_server.py --port 9003 --truncate-at 200
+    LLM_ENDPOINTS='[{"name":"a","url":"http://127.0.0.1:9001/v1/chat/completions","max_concurrency":2},
+                    {"name":"b","url":"http://127.0.0.1:9002/v1/chat/completions"}]' python start.py
+"""
+
+import sys
+import json
+import time
+import random
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 返回的解析结果
+MOCK_RESULT = {
+    "name": "张三",
+    "contact": {"phone": "13800138000", "email": "zhangsan@example.com", "address": "北京市海淀区"},
+    "education": [
+        {"degree": "硕士学位", "institution": "清华大学", "major": "计算机科学与技术",
+         "start_year": "2018", "end_year": "2021", "gpa": None}
+    ],
+    "experience": [
+        {"company": "某科技公司", "title": "后端工程师", "start_date": "2021-07", "end_date": "至今",
+         "description": "负责简历解析服务的开发"}
+    ],
+    "projects": None,
+    "skills": ["Python", "FastAPI", "SQLite"],
+    "languages": ["英语"],
+    "certifications": None,
+    "summary": None,
+    "other": None
+}
+
+def make_handler(args):
+    """创建请求处理类"""
+
+    class MockLLMHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *log_args):
+            if args.verbose:
+                super().log_message(format, *log_args)
+
+        def _send_json(self, status: int, body: dict, headers: dict = None):
+            data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            time.sleep(args.latency * random.uniform(0.8, 1.2))
+
+            if random.random() < args.error_rate:
+                headers = {"Retry-After": str(args.retry_after)} if args.error_status == 429 else None
+                self._send_json(args.error_status, {"error": {"message": "mock error"}}, headers)
+                return
+
+            content = json.dumps(MOCK_RESULT, ensure_ascii=False)
+            finish_reason = "stop"
+            # 续写请求（带有之前输出的 assistant 消息）从断点处返回剩余内容
+            written = "".join(message.get("content", "") for message in request.get("messages", [])
+                              if message.get("role") == "assistant")
+            if written and content.startswith(written):
+                content = content[len(written):]
+            elif args.truncate_at and len(content) > args.truncate_at:
+                content = content[:args.truncate_at]
+                finish_reason = "length"
+
+            if request.get("stream"):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.end_headers()
+                for index in range(0, len(content), 16):
+                    chunk = {"choices": [{"delta": {"content": content[index:index + 16]}, "finish_reason": None}]}
+                    self.wfile.write(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode("utf-8"))
+                    self.wfile.flush()
+                    time.sleep(args.chunk_delay)
+                done = {"choices": [{"delta": {}, "finish_reason": finish_reason}]}
+                self.wfile.write(f"data: {json.dumps(done)}\n\ndata: [DONE]\n\n".encode("utf-8"))
+                return
+
+            self._send_json(200, {
+                "model": request.get("model"),
+                "choices": [{"message": {"role": "assistant", "content": content}, "finish_reason": finish_reason}]
+            })
+
+    return MockLLMHandler
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="本地LLM替身服务")
+    parser.add_argument("--host", default="127.0.0.1", help="监听地址")
+    parser.add_argument("--port", type=int, default=9001, help="监听端口")
+    parser.add_argument("--latency", type=float, default=0.5, help="每个请求的平均延迟（秒）")
+    parser.add_argument("--chunk-delay", type=float, default=0.05, help="流式输出每段的间隔（秒）")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="返回错误的比例（0-1）")
+    parser.add_argument("--error-status", type=int, default=503, help="错误时返回的状态码")
+    parser.add_argument("--retry-after", type=int, default=1, help="返回429时的 Retry-After（秒）")
+    parser.add_argument("--truncate-at", type=int, default=0, help="首次输出超过该字符数时截断（finish_reason=length），0不截断")
+    parser.add_argument("--verbose", action="store_true", help="输出请求日志")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(args))
+    print(f"🦝 LLM替身服务: http://{args.host}:{args.port}/v1/chat/completions")
+    print(f"   延迟 {args.latency}s，错误率 {args.error_rate:.0%}（HTTP {args.error_status}）")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
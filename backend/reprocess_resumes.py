@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+批量重新解析脚本
+基于已保存的提取文本仅重跑LLM解析，用于更换模型后刷新结果或重试失败任务
+
+用法:
+    python reprocess_resumes.py --failed-only                  # 重试LLM解析失败的任务
+    python reprocess_resumes.py --outdated --concurrency 5     # 用当前模型和提示词刷新旧结果
+    python reprocess_resumes.py --from 2024-01-01 --to 2024-02-01 --dry-run
+"""
+
+import sys
+import asyncio
+import argparse
+
+from app.core.config import settings
+from app.services.database_service import db_service
+from app.services.reprocess_service import reprocess_service
+
+def print_progress(job):
+    """输出作业进度"""
+    percent = job["processed"] * 100 // job["total"] if job["total"] else 100
+    print(f"\r  进度: {job['processed']}/{job['total']} ({percent}%)  "
+          f"成功 {job['succeeded']}  失败 {job['failed']}", end="", flush=True)
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="批量重新解析简历（仅重跑LLM）")
+    parser.add_argument("--from", dest="created_from", default=None, help="任务创建时间起，如 2024-01-01")
+    parser.add_argument("--to", dest="created_to", default=None, help="任务创建时间止（不含）")
+    parser.add_argument("--failed-only", action="store_true", help="仅重新解析失败的任务")
+    parser.add_argument("--model", default=None, help="仅重新解析由该模型解析的任务")
+    parser.add_argument("--prompt-version", default=None, help="仅重新解析由该提示词版本解析的任务")
+    parser.add_argument("--outdated", action="store_true", help="仅重新解析非当前模型或提示词版本解析的任务")
+    parser.add_argument("--concurrency", type=int, default=None, help="LLM并发数")
+    parser.add_argument("--limit", type=int, default=None, help="最多处理的任务数")
+    parser.add_argument("--dry-run", action="store_true", help="仅列出符合条件的任务数")
+    args = parser.parse_args()
+
+    print("🦝 JianLi Tanuki 批量重新解析")
+    print("=" * 40)
+    print(f"当前模型: {settings.LLM_MODEL}")
+    print(f"提示词版本: {settings.LLM_PROMPT_VERSION}")
+
+    db_service.init_database()
+
+    filters = {
+        "created_from": args.created_from,
+        "created_to": args.created_to,
+        "failed_only": args.failed_only,
+        "llm_model": args.model,
+        "prompt_version": args.prompt_version,
+        "outdated_only": args.outdated
+    }
+
+    if args.dry_run:
+        task_ids = reprocess_service.select_tasks(filters, args.limit)
+        print(f"符合条件的任务: {len(task_ids)}")
+        return True
+
+    job = reprocess_service.create_job(filters, args.limit, args.concurrency)
+    print(f"符合条件的任务: {job['total']}，并发 {job['concurrency']}")
+    if job["total"] == 0:
+        return True
+
+    job = asyncio.run(reprocess_service.run_job(job["job_id"], progress_callback=print_progress))
+
+    print("\n" + "=" * 40)
+    print(f"  成功: {job['succeeded']}")
+    print(f"  失败: {job['failed']}")
+    for item in job["errors"]:
+        print(f"  ❌ {item['task_id']}: {item['error']}")
+
+    return job["failed"] == 0
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
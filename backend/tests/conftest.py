@@ -0,0 +1,61 @@
+"""
+测试公共配置
+在导入应用模块之前把数据库和上传目录指向临时目录（.env 中的配置不会覆盖已设置的环境变量），
+并关闭刚复用文件的删除宽限期，测试中可以立即释放文件
+"""
+import os
+import sys
+import time
+import socket
+import tempfile
+import subprocess
+
+TEST_ROOT = tempfile.mkdtemp(prefix="jianli-tanuki-test-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(TEST_ROOT, 'test.db')}"
+os.environ["UPLOAD_DIR"] = os.path.join(TEST_ROOT, "uploads")
+os.environ["STORAGE_BACKEND"] = "local"
+os.environ["BLOB_DELETE_GRACE_SECONDS"] = "0"
+os.environ["DEBUG"] = "false"
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from database import init_database
+
+init_database()
+
+@pytest.fixture(scope="session")
+def mock_llm_server():
+    """
+    启动本地LLM替身服务（mock_llm_server.py）的工厂，返回接口地址；会话结束时关闭
+
+    用法: url = mock_llm_server(error_rate=1, truncate_at=200)，参数对应替身服务的命令行选项
+    """
+    processes = []
+
+    def start(**options) -> str:
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            port = probe.getsockname()[1]
+        options = {"latency": 0.05, "chunk_delay": 0, **options}
+        script = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "mock_llm_server.py")
+        command = [sys.executable, script, "--port", str(port)]
+        for key, value in options.items():
+            command += [f"--{key.replace('_', '-')}", str(value)]
+        processes.append(subprocess.Popen(command, stdout=subprocess.DEVNULL))
+
+        deadline = time.monotonic() + 10
+        while True:
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise RuntimeError("LLM替身服务启动超时")
+                time.sleep(0.05)
+        return f"http://127.0.0.1:{port}/v1/chat/completions"
+
+    yield start
+    for process in processes:
+        process.kill()
+        process.wait()
@@ -0,0 +1,132 @@
+"""
+批量上传测试：ZIP成员解压（GBK文件名、目录、嵌套压缩包、超限成员）、压缩包实际大小限制，
+以及任务记录创建失败时不排队解析
+"""
+import io
+import uuid
+import zipfile
+import fitz  # PyMuPDF
+import pytest
+from fastapi import HTTPException, UploadFile
+from app.api.api_v1.endpoints import upload as upload_endpoint
+from app.core.config import settings
+from app.services.file_service import FileService
+from app.services.task_service import TaskService
+
+def make_pdf(text: str) -> bytes:
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), text)
+    content = doc.tobytes()
+    doc.close()
+    return content
+
+def make_zip(members: dict, gbk_names: tuple = ()) -> bytes:
+    """
+    生成ZIP压缩包；gbk_names 中的文件名按GBK写入且不设置UTF-8标记（Windows压缩工具的做法）
+    """
+    placeholders = {}
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name, content in members.items():
+            if name in gbk_names:
+                placeholder = "x" * len(name.encode("gbk"))
+                placeholders[placeholder.encode("ascii")] = name.encode("gbk")
+                name = placeholder
+            archive.writestr(name, content)
+    data = buffer.getvalue()
+    for placeholder, raw in placeholders.items():
+        data = data.replace(placeholder, raw)
+    return data
+
+def zip_upload(content: bytes) -> UploadFile:
+    # 分块上传时客户端不声明大小
+    return UploadFile(file=io.BytesIO(content), filename="resumes.zip")
+
+async def release(saved: list):
+    file_service = FileService()
+    for item in saved:
+        await file_service.release_file(item["file_path"])
+
+async def test_extract_zip_members():
+    pdf = make_pdf(f"Zhang San {uuid.uuid4()}")
+    archive = make_zip({
+        "张三.pdf": pdf,
+        "简历/李四.pdf": make_pdf(f"Li Si {uuid.uuid4()}"),
+        "nested.zip": make_zip({"王五.pdf": pdf}),
+        "notes.txt": b"hello",
+        "__MACOSX/._张三.pdf": b"metadata",
+        "empty.pdf": b"",
+        "fake.pdf": b"not a pdf",
+    }, gbk_names=("张三.pdf",))
+
+    saved, rejected = await FileService().extract_zip_upload(zip_upload(archive), max_files=10)
+    await release(saved)
+
+    assert [item["filename"] for item in saved] == ["张三.pdf", "李四.pdf"]
+    assert all(item["probe"]["cost_class"] for item in saved)
+    reasons = {item["filename"]: item["reason"] for item in rejected}
+    # 嵌套的压缩包不会被递归解压
+    assert reasons["nested.zip"] == "不支持的文件类型"
+    assert reasons["notes.txt"] == "不支持的文件类型"
+    assert reasons["empty.pdf"] == "文件内容为空"
+    assert "不符" in reasons["fake.pdf"]
+    assert "._张三.pdf" not in reasons
+
+async def test_extract_zip_rejects_oversize_members_and_limits_count(monkeypatch):
+    small = [make_pdf(f"Resume {index} {uuid.uuid4()}") for index in range(3)]
+    monkeypatch.setattr(settings, "MAX_FILE_SIZE", max(len(content) for content in small) + 10)
+    archive = make_zip({
+        "a.pdf": small[0],
+        "big.pdf": b"%PDF-1.4\n" + b"0" * settings.MAX_FILE_SIZE,
+        "b.pdf": small[1],
+        "c.pdf": small[2],
+    })
+
+    saved, rejected = await FileService().extract_zip_upload(zip_upload(archive), max_files=2)
+    await release(saved)
+
+    assert [item["filename"] for item in saved] == ["a.pdf", "b.pdf"]
+    assert rejected == [
+        {"filename": "big.pdf", "reason": "文件大小超过限制"},
+        {"filename": "c.pdf", "reason": "超过单批次最多 2 个文件的限制"},
+    ]
+
+async def test_archive_size_is_checked_on_received_bytes(monkeypatch):
+    archive = make_zip({"a.pdf": make_pdf(f"Resume {uuid.uuid4()}")})
+    monkeypatch.setattr(settings, "BATCH_MAX_ARCHIVE_SIZE", len(archive) - 1)
+
+    upload = zip_upload(archive)
+    assert upload.size is None
+    saved, rejected = await FileService().extract_zip_upload(upload, max_files=10)
+
+    assert saved == []
+    assert rejected == [{"filename": "resumes.zip", "reason": "压缩包大小超过限制"}]
+
+async def test_upload_is_not_queued_without_task_record(monkeypatch):
+    submitted = []
+    monkeypatch.setattr(upload_endpoint.task_scheduler, "submit", lambda *args, **kwargs: submitted.append(args))
+
+    async def create_task(self, task):
+        return False
+
+    monkeypatch.setattr(TaskService, "create_task", create_task)
+    released = []
+    original_release = TaskService.release_file
+
+    async def release_file(self, file_path, file_hash=None):
+        released.append(file_path)
+        return await original_release(self, file_path, file_hash)
+
+    monkeypatch.setattr(TaskService, "release_file", release_file)
+    upload = UploadFile(
+        file=io.BytesIO(make_pdf(f"Resume {uuid.uuid4()}")), filename="a.pdf",
+        headers={"content-type": "application/pdf"}
+    )
+
+    with pytest.raises(HTTPException) as error:
+        await upload_endpoint.upload_resume(file=upload, force_update=False, lane="interactive")
+
+    assert error.value.status_code == 500
+    assert submitted == []
+    assert len(released) == 1
+    assert not await FileService().file_exists(released[0])
@@ -0,0 +1,65 @@
+"""
+上传文件探测测试：有文本层的PDF交给文本工作池，扫描件和图片交给OCR工作池
+"""
+import io
+
+import fitz  # PyMuPDF
+from PIL import Image
+
+from app.utils.file_probe import COST_OCR, COST_TEXT, probe_file
+
+def make_pdf(text_pages: int, scanned_pages: int) -> bytes:
+    doc = fitz.open()
+    for _ in range(text_pages):
+        page = doc.new_page()
+        page.insert_text((72, 72), "Zhang San  Backend Engineer  Python FastAPI SQLite")
+    for _ in range(scanned_pages):
+        # 扫描件：整页只有一张图片，没有文本层
+        page = doc.new_page()
+        pixmap = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 200, 200), False)
+        pixmap.clear_with(200)
+        page.insert_image(page.rect, pixmap=pixmap)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+def test_pdf_with_text_layer_goes_to_text_pool(tmp_path):
+    path = tmp_path / "resume.part"
+    path.write_bytes(make_pdf(text_pages=2, scanned_pages=0))
+
+    # 上传时探测的是扩展名为 .part 的临时文件
+    probe = probe_file(str(path), ".PDF")
+
+    assert probe["kind"] == "pdf"
+    assert probe["pages"] == 2
+    assert probe["text_layer"]
+    assert probe["text_pages_checked"] == "2/2"
+    assert probe["cost_class"] == COST_TEXT
+
+def test_scanned_pdf_goes_to_ocr_pool():
+    probe = probe_file(make_pdf(text_pages=0, scanned_pages=4), ".pdf")
+
+    assert probe["pages"] == 4
+    assert not probe["text_layer"]
+    # 只检查前几页的文本层，OCR像素按全部页面估算
+    assert probe["text_pages_checked"] == "0/3"
+    assert probe["megapixels"] > 0
+    assert probe["cost_class"] == COST_OCR
+
+def test_image_and_word_files():
+    buffer = io.BytesIO()
+    Image.new("RGB", (1000, 2000)).save(buffer, format="PNG")
+
+    image = probe_file(buffer.getvalue(), ".png")
+    assert image["kind"] == "image"
+    assert image["megapixels"] == 2.0
+    assert image["cost_class"] == COST_OCR
+
+    assert probe_file(b"", ".docx")["cost_class"] == COST_TEXT
+
+def test_corrupt_file_falls_back_to_text_pool():
+    probe = probe_file(b"not a pdf", ".pdf")
+
+    assert probe["cost_class"] == COST_TEXT
+    assert "error" in probe
+    assert probe["probe_seconds"] >= 0
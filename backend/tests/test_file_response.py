@@ -0,0 +1,79 @@
+"""
+文件下载测试：Range 分段（206/416）、ETag 条件请求（304）以及 Range 请求头解析
+"""
+import io
+import uuid
+import pytest
+from fastapi import UploadFile
+from starlette.requests import Request
+from app.api.api_v1.endpoints.upload import download_resume
+from app.models.resume import UploadTask
+from app.services.file_service import FileService
+from app.services.task_service import TaskService
+from app.utils.file_response import parse_range_header
+
+CONTENT = b"%PDF-1.4\n" + bytes(range(256)) * 40
+
+def make_request(**headers) -> Request:
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "headers": [(key.replace("_", "-").encode(), value.encode()) for key, value in headers.items()]
+    })
+
+async def read_body(response) -> bytes:
+    return b"".join([chunk async for chunk in response.body_iterator])
+
+@pytest.fixture
+async def task():
+    task_id = str(uuid.uuid4())
+    content = CONTENT + task_id.encode()
+    saved = await FileService().save_upload_file(UploadFile(file=io.BytesIO(content), filename="a.pdf"), task_id)
+    await TaskService().create_task(UploadTask(
+        id=task_id, filename="a.pdf", file_path=saved["file_path"], file_size=saved["file_size"],
+        file_type="application/pdf", file_hash=saved["file_hash"]
+    ))
+    yield task_id, content, saved["file_hash"]
+    await TaskService().delete_task(task_id)
+
+async def test_range_request_returns_partial_content(task):
+    task_id, content, _ = task
+    response = await download_resume(task_id, make_request(range="bytes=100-199"))
+
+    assert response.status_code == 206
+    assert response.headers["content-range"] == f"bytes 100-199/{len(content)}"
+    assert response.headers["content-length"] == "100"
+    assert await read_body(response) == content[100:200]
+
+async def test_unsatisfiable_range_returns_416(task):
+    task_id, content, _ = task
+    response = await download_resume(task_id, make_request(range=f"bytes={len(content)}-"))
+
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{len(content)}"
+
+async def test_matching_etag_returns_304(task):
+    task_id, _, file_hash = task
+    response = await download_resume(task_id, make_request(if_none_match=f'W/"{file_hash}"'))
+
+    assert response.status_code == 304
+    assert response.headers["etag"] == f'"{file_hash}"'
+
+    # ETag 已变化时 If-Range 不满足，返回完整文件
+    response = await download_resume(task_id, make_request(range="bytes=0-9", if_range='"stale"'))
+    assert response.status_code == 200
+    assert response.headers["accept-ranges"] == "bytes"
+
+def test_parse_range_header():
+    assert parse_range_header("bytes=0-9", 100) == (0, 9)
+    assert parse_range_header("bytes=90-", 100) == (90, 99)
+    assert parse_range_header("bytes=-10", 100) == (90, 99)
+    assert parse_range_header("bytes=50-500", 100) == (50, 99)
+    # 多段和无法识别的格式按完整响应处理
+    assert parse_range_header("bytes=0-9,20-29", 100) is None
+    assert parse_range_header("items=0-9", 100) is None
+    with pytest.raises(ValueError):
+        parse_range_header("bytes=100-", 100)
+    with pytest.raises(ValueError):
+        parse_range_header("bytes=-0", 100)
@@ -0,0 +1,60 @@
+"""
+内容寻址存储测试：相同内容只保存一份，按引用计数释放
+"""
+import io
+import uuid
+from fastapi import UploadFile
+from app.core.config import settings
+from app.models.resume import UploadTask
+from app.services.file_service import FileService
+from app.services.task_service import TaskService
+
+def upload(content: bytes, filename: str) -> UploadFile:
+    return UploadFile(file=io.BytesIO(content), filename=filename)
+
+async def create_task(saved: dict, filename: str) -> str:
+    task_id = str(uuid.uuid4())
+    await TaskService().create_task(UploadTask(
+        id=task_id, filename=filename, file_path=saved["file_path"], file_size=saved["file_size"],
+        file_type="application/pdf", file_hash=saved["file_hash"]
+    ))
+    return task_id
+
+async def test_shared_blob_is_released_with_last_reference():
+    content = f"%PDF-1.4 resume {uuid.uuid4()}".encode()
+    file_service = FileService()
+    task_service = TaskService()
+
+    first = await file_service.save_upload_file(upload(content, "a.pdf"), str(uuid.uuid4()))
+    second = await file_service.save_upload_file(upload(content, "b.PDF"), str(uuid.uuid4()))
+    first_id = await create_task(first, "a.pdf")
+    second_id = await create_task(second, "b.PDF")
+
+    assert first["file_path"] == second["file_path"]
+    assert (first["deduplicated"], second["deduplicated"]) == (False, True)
+    assert task_service.db_service.count_file_references(first["file_path"], first["file_hash"]) == 2
+
+    # 还有任务引用时保留文件，最后一个引用删除后才删除
+    await task_service.delete_task(first_id)
+    assert await file_service.file_exists(first["file_path"])
+    await task_service.delete_task(second_id)
+    assert not await file_service.file_exists(first["file_path"])
+
+async def test_release_keeps_referenced_file():
+    file_service = FileService()
+    task_service = TaskService()
+    saved = await file_service.save_upload_file(upload(f"%PDF-1.4 {uuid.uuid4()}".encode(), "a.pdf"), str(uuid.uuid4()))
+    task_id = await create_task(saved, "a.pdf")
+
+    assert not await task_service.release_file(saved["file_path"], saved["file_hash"])
+    assert await file_service.file_exists(saved["file_path"])
+    await task_service.delete_task(task_id)
+
+async def test_recently_reused_blob_is_not_deleted(monkeypatch):
+    monkeypatch.setattr(settings, "BLOB_DELETE_GRACE_SECONDS", 60)
+    file_service = FileService()
+    saved = await file_service.save_upload_file(upload(f"%PDF-1.4 {uuid.uuid4()}".encode(), "a.pdf"), str(uuid.uuid4()))
+
+    # 宽限期内的文件可能正被并发上传复用，留给垃圾回收处理
+    assert not await file_service.release_file(saved["file_path"])
+    assert await file_service.file_exists(saved["file_path"])
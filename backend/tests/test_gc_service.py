@@ -0,0 +1,81 @@
+"""
+垃圾回收测试：孤儿文件、文件丢失的未完成任务、过期的失败任务，以及试运行
+"""
+import io
+import uuid
+from fastapi import UploadFile
+from app.core.config import settings
+from app.models.resume import TaskStatus, UploadTask
+from app.services.file_service import FileService
+from app.services.gc_service import GarbageCollectionService
+from app.services.task_service import TaskService
+from database import upload_task_repo
+
+async def save(content: bytes) -> dict:
+    return await FileService().save_upload_file(UploadFile(file=io.BytesIO(content), filename="a.pdf"), str(uuid.uuid4()))
+
+async def create_task(file_path: str, status: TaskStatus = TaskStatus.UPLOADED, age: str = None) -> str:
+    task_id = str(uuid.uuid4())
+    await TaskService().create_task(UploadTask(id=task_id, filename="a.pdf", file_path=file_path, status=status))
+    if age:
+        upload_task_repo.connection.execute_update(
+            "UPDATE upload_tasks SET created_at = datetime('now', ?) WHERE id = ?", (age, task_id)
+        )
+    return task_id
+
+async def test_gc_deletes_only_orphan_files(monkeypatch):
+    monkeypatch.setattr(settings, "GC_ORPHAN_GRACE_HOURS", 0)
+    file_service = FileService()
+    referenced = await save(f"%PDF-1.4 referenced {uuid.uuid4()}".encode())
+    task_id = await create_task(referenced["file_path"], TaskStatus.COMPLETED)
+    # 上传后任务创建失败遗留的文件
+    orphan = await save(f"%PDF-1.4 orphan {uuid.uuid4()}".encode())
+
+    stats = await GarbageCollectionService().run(dry_run=True, pause_seconds=0)
+    assert stats["orphan_files"] >= 1 and stats["deleted_files"] == 0
+    assert await file_service.file_exists(orphan["file_path"])
+
+    stats = await GarbageCollectionService().run(pause_seconds=0)
+    assert stats["deleted_files"] >= 1
+    assert await file_service.file_exists(referenced["file_path"])
+    assert not await file_service.file_exists(orphan["file_path"])
+    await TaskService().delete_task(task_id)
+
+async def test_gc_respects_orphan_grace_period(monkeypatch):
+    monkeypatch.setattr(settings, "GC_ORPHAN_GRACE_HOURS", 1)
+    orphan = await save(f"%PDF-1.4 fresh orphan {uuid.uuid4()}".encode())
+
+    await GarbageCollectionService().run(pause_seconds=0)
+
+    # 刚写入的文件可能属于进行中的上传
+    assert await FileService().file_exists(orphan["file_path"])
+    await FileService().release_file(orphan["file_path"])
+
+async def test_gc_fails_stale_tasks_with_missing_files(monkeypatch):
+    monkeypatch.setattr(settings, "GC_ORPHAN_GRACE_HOURS", 1)
+    stale = await create_task("blobs/00/missing-stale.pdf", age="-2 hours")
+    recent = await create_task("blobs/00/missing-recent.pdf")
+    completed = await create_task("blobs/00/missing-done.pdf", TaskStatus.COMPLETED, age="-2 hours")
+
+    stats = await GarbageCollectionService().run(pause_seconds=0)
+
+    task_service = TaskService()
+    assert stats["missing_files"] >= 3
+    assert (await task_service.get_task(stale)).status == TaskStatus.FAILED
+    assert (await task_service.get_task(recent)).status == TaskStatus.UPLOADED
+    # 已完成的任务保留解析结果
+    assert (await task_service.get_task(completed)).status == TaskStatus.COMPLETED
+
+async def test_gc_purges_expired_failed_tasks(monkeypatch):
+    monkeypatch.setattr(settings, "GC_FAILED_TASK_RETENTION_DAYS", 30)
+    saved = await save(f"%PDF-1.4 failed {uuid.uuid4()}".encode())
+    expired = await create_task(saved["file_path"], TaskStatus.FAILED, age="-40 days")
+    kept = await create_task("blobs/00/kept.pdf", TaskStatus.FAILED, age="-10 days")
+
+    stats = await GarbageCollectionService().run(pause_seconds=0, max_deletes=100)
+
+    task_service = TaskService()
+    assert stats["deleted_tasks"] >= 1
+    assert await task_service.get_task(expired) is None
+    assert not await FileService().file_exists(saved["file_path"])
+    assert await task_service.get_task(kept) is not None
@@ -0,0 +1,77 @@
+"""
+容错JSON解析测试：LLM输出的常见格式问题和 max_tokens 截断
+"""
+from app.utils.json_repair import TolerantJsonParser, parse_json_tolerant
+
+def test_complete_json_with_common_defects():
+    text = '```json\n{"name": "张三", "skills": ["Python", "Go",], "gpa": None, "summary": "第一行\n第二行",}\n```'
+    data, complete, repairs = parse_json_tolerant(text)
+
+    assert complete
+    assert data == {"name": "张三", "skills": ["Python", "Go"], "gpa": None, "summary": "第一行\n第二行"}
+    assert {"prefix", "trailing_comma", "literal", "control_char"} <= repairs
+
+def test_truncated_string_value_is_dropped():
+    data, complete, repairs = parse_json_tolerant('{"name": "张三", "contact": {"email": "a@b.com", "phone": "138')
+
+    assert not complete
+    assert data == {"name": "张三", "contact": {"email": "a@b.com"}}
+    assert "truncated" in repairs
+
+def test_truncated_number_and_key_are_dropped():
+    assert parse_json_tolerant('{"name": "张三", "age": 2')[0] == {"name": "张三"}
+    assert parse_json_tolerant('{"name": "张三", "age"')[0] == {"name": "张三"}
+    assert parse_json_tolerant('{"name": "张三", "age":')[0] == {"name": "张三"}
+
+def test_complete_values_before_truncation_are_kept():
+    assert parse_json_tolerant('{"ok": true, "x": nul')[0] == {"ok": True}
+    assert parse_json_tolerant('{"skills": [1, 2')[0] == {"skills": [1]}
+    assert parse_json_tolerant('{"skills": ["Python", "Ja')[0] == {"skills": ["Python"]}
+
+def test_unfinished_array_item_does_not_become_empty_object():
+    data, _, _ = parse_json_tolerant('{"experience": [{"company": "A公司"}, {"comp')
+    assert data == {"experience": [{"company": "A公司"}]}
+
+    data, _, _ = parse_json_tolerant('{"experience": [{"company": "A公司"}, {"company": "B公司", "title": "工')
+    assert data == {"experience": [{"company": "A公司"}, {"company": "B公司"}]}
+
+def test_incremental_feed_and_completed_fields():
+    parser = TolerantJsonParser()
+    parser.feed('好的，结果如下：{"name": "张三", "contact": {"phone": "13800138000"}, "skills": ["Py')
+
+    assert parser.fields_completed == 2
+    assert parser.completed_fields() == {"name": "张三", "contact": {"phone": "13800138000"}}
+    assert parser.snapshot() == {"name": "张三", "contact": {"phone": "13800138000"}, "skills": []}
+
+    # 续写的内容接在截断处
+    parser.feed('thon", "Go"]}')
+    assert parser.complete
+    assert parser.snapshot()["skills"] == ["Python", "Go"]
+
+def test_no_json_object():
+    data, complete, _ = parse_json_tolerant("抱歉，无法解析该简历")
+    assert data is None
+    assert not complete
+
+def test_unrepairable_members_are_not_complete():
+    # 成员之间缺逗号、值为表达式：根对象已闭合，但丢弃了出错的成员，不能当作完整结果
+    for text in ('{"k": "v" "k2": "v2"}', '{"gpa": 3.8/4.0}'):
+        data, complete, repairs = parse_json_tolerant(text)
+
+        assert data == {}
+        assert not complete
+        assert "malformed" in repairs
+
+def test_fields_completed_counts_each_member_once():
+    parser = TolerantJsonParser()
+    parser.feed('{"name": "张三", "skills": ["Python"],}')
+    assert parser.complete
+    assert parser.fields_completed == 2
+
+    parser = TolerantJsonParser()
+    parser.feed('{"name": "张三", "skills": ["Python"]}')
+    assert parser.fields_completed == 2
+
+    parser = TolerantJsonParser()
+    parser.feed("{}")
+    assert parser.fields_completed == 0
@@ -0,0 +1,73 @@
+"""
+LLM客户端测试：使用本地LLM替身服务（mock_llm_server.py）验证重试、退避和熔断
+"""
+import pytest
+import requests
+
+from app.core.config import settings
+from app.services.llm_client import BREAKER_CLOSED, BREAKER_OPEN, CircuitOpenError, LLMClient
+
+PAYLOAD = {"messages": [{"role": "user", "content": "解析简历"}], "max_tokens": 100}
+
+async def test_retryable_status_is_retried_then_returned(mock_llm_server, monkeypatch):
+    monkeypatch.setattr(settings, "LLM_BREAKER_FAILURE_THRESHOLD", 10)
+    client = LLMClient("limited", mock_llm_server(error_rate=1, error_status=429, retry_after=0))
+
+    stats = {}
+    response = await client.post(PAYLOAD, max_retries=2, stats=stats)
+
+    # 重试用完后把最后一次响应交给调用方处理
+    assert response.status_code == 429
+    assert stats["llm_retries"] == 2
+    status = client.get_status()
+    assert status["requests"] == 1
+    assert status["retries"] == 2
+    assert status["failed"] == 1
+    assert status["state"] == BREAKER_CLOSED
+
+async def test_breaker_opens_and_rejects_without_waiting(mock_llm_server, monkeypatch):
+    monkeypatch.setattr(settings, "LLM_BREAKER_FAILURE_THRESHOLD", 2)
+    monkeypatch.setattr(settings, "LLM_BREAKER_COOLDOWN", 60)
+    client = LLMClient("broken", mock_llm_server(error_rate=1))
+
+    for _ in range(2):
+        assert (await client.post(PAYLOAD, max_retries=0)).status_code == 503
+    # 熔断后不等待的请求直接失败，不再发往故障端点
+    with pytest.raises(CircuitOpenError):
+        await client.post(PAYLOAD, wait=False)
+
+    status = client.get_status()
+    assert status["state"] == BREAKER_OPEN
+    assert status["requests"] == 2
+    assert status["rejected"] == 1
+    assert status["breaker_opened"] == 1
+    assert status["cooldown_remaining"] > 0
+
+async def test_successful_probe_closes_breaker(mock_llm_server, monkeypatch):
+    monkeypatch.setattr(settings, "LLM_BREAKER_FAILURE_THRESHOLD", 1)
+    monkeypatch.setattr(settings, "LLM_BREAKER_COOLDOWN", 0)
+    client = LLMClient("flaky", mock_llm_server(error_rate=1))
+    await client.post(PAYLOAD, max_retries=0)
+    assert client._state == BREAKER_OPEN
+
+    # 冷却结束后放行一个探测请求，成功则关闭熔断器
+    client.url = mock_llm_server()
+    response = await client.post(PAYLOAD, wait=False)
+
+    assert response.status_code == 200
+    assert client.state == BREAKER_CLOSED
+    assert client.get_status()["consecutive_failures"] == 0
+
+def test_retry_delay_follows_retry_after_and_caps_backoff(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_RETRY_BASE_DELAY", 1.0)
+    monkeypatch.setattr(settings, "LLM_RETRY_MAX_DELAY", 8.0)
+    client = LLMClient("delay")
+    response = requests.Response()
+
+    response.headers["Retry-After"] = "3"
+    assert client._retry_delay(0, response) == 3
+    response.headers["Retry-After"] = "120"
+    assert client._retry_delay(0, response) == 8
+    # 指数退避加抖动：[delay/2, delay]，不超过上限
+    assert 2 <= client._retry_delay(2, None) <= 4
+    assert 4 <= client._retry_delay(10, None) <= 8
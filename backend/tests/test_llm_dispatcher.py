@@ -0,0 +1,74 @@
+"""
+LLM请求调度测试：RPM/TPM令牌桶匀速放行、按实际用量结算、重试和重发各自计入配额
+"""
+import time
+import asyncio
+
+from app.services.llm_dispatcher import LLMDispatcher, TokenBucket
+
+def test_token_bucket_refill_and_overdraft():
+    bucket = TokenBucket(600, burst_seconds=1)  # 每秒10个，容量10
+    now = bucket._updated
+
+    assert bucket.time_until(10, now) == 0
+    bucket.take(15, now)  # 可透支
+    assert round(bucket.time_until(1, now), 2) == 0.6
+    assert round(bucket.time_until(1, now + 0.6), 2) == 0
+    bucket.refund(100, now + 0.6)
+    assert bucket.level == bucket.capacity
+
+async def test_unlimited_dispatcher_does_not_wait():
+    dispatcher = LLMDispatcher(rpm=0, tpm=0)
+
+    tickets = await asyncio.gather(*(dispatcher.acquire(10000) for _ in range(20)))
+
+    assert all(ticket.waited < 0.05 for ticket in tickets)
+    status = dispatcher.get_status()
+    assert status["rpm"] is None and status["tpm"] is None
+    assert status["dispatched"] == 20
+    assert status["delayed"] == 0
+
+async def test_rpm_paces_requests():
+    dispatcher = LLMDispatcher(rpm=600, tpm=0)
+    dispatcher.rpm_bucket = TokenBucket(600, burst_seconds=0.1)  # 每秒10个，不允许突发
+
+    started = time.monotonic()
+    tickets = await asyncio.gather(*(dispatcher.acquire(100) for _ in range(6)))
+    elapsed = time.monotonic() - started
+
+    # 首个请求立即放行，之后每0.1秒放行一个
+    assert 0.4 <= elapsed < 1.0
+    assert tickets[0].waited < 0.05
+    assert dispatcher.metrics["dispatched"] == 6
+    assert dispatcher.metrics["delayed"] == 5
+
+async def test_tpm_reserves_and_settles_actual_usage():
+    dispatcher = LLMDispatcher(rpm=0, tpm=60000)  # 容量5000
+    dispatcher.tpm_bucket.rate = 1e-9
+
+    ticket = await dispatcher.acquire(4000)
+    assert round(dispatcher.tpm_bucket.level) == 1000
+
+    dispatcher.settle(ticket, 1000)
+    # 多预留的3000退回桶中
+    assert round(dispatcher.tpm_bucket.level) == 4000
+
+async def test_session_charges_every_physical_request():
+    dispatcher = LLMDispatcher(rpm=6000, tpm=600000)  # 容量500请求、50000token
+    # 不随时间补充额度，便于精确核对扣除量
+    dispatcher.rpm_bucket.rate = dispatcher.tpm_bucket.rate = 1e-9
+
+    session = dispatcher.session(prompt_tokens=1000, max_tokens=2000)
+    await session.acquire()
+    # 第一次发送使用预先排到的凭证，之后的重试、转移、重发各自排队
+    await session.before_send()
+    await session.before_send()
+    await session.before_send()
+    session.settle(1500)
+
+    assert session.requests == 3
+    assert dispatcher.metrics["dispatched"] == 3
+    # 两次失败的请求按只消耗prompt结算，最后一次按实际用量结算
+    used = dispatcher.tpm_bucket.capacity - dispatcher.tpm_bucket.level
+    assert round(used) == 1000 + 1000 + 1500
+    assert round(dispatcher.rpm_bucket.capacity - dispatcher.rpm_bucket.level) == 3
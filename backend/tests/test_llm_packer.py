@@ -0,0 +1,128 @@
+"""
+LLM请求合并测试：短简历凑批、结果分发回各份简历，以及合并输出按序号拆分
+"""
+import asyncio
+import json
+
+import pytest
+
+from app.core.config import settings
+from app.models.resume import ResumeInfo
+from app.services.llm_packer import LLMRequestPacker
+from app.utils.resume_parser import ResumeParser
+
+class RecordingParser:
+    """记录每个合并批次，按文本返回结果"""
+
+    def __init__(self):
+        self.batches = []
+
+    def _output_budget(self, text: str) -> int:
+        return 100
+
+    async def parse_packed(self, texts, stats_list):
+        self.batches.append(list(texts))
+        return [ValueError(text) if text.startswith("坏") else f"结果:{text}" for text in texts]
+
+@pytest.fixture(scope="module")
+def parser():
+    return ResumeParser()
+
+@pytest.fixture
+def pack_settings(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_PACK_ENABLED", True)
+    monkeypatch.setattr(settings, "LLM_PACK_MAX_ITEMS", 3)
+    monkeypatch.setattr(settings, "LLM_PACK_TOKEN_BUDGET", 4000)
+    monkeypatch.setattr(settings, "LLM_PACK_WINDOW", 0.05)
+
+async def test_short_texts_are_packed_and_results_routed_back(pack_settings):
+    packer = LLMRequestPacker()
+    parser = RecordingParser()
+    texts = ["简历一", "简历二", "坏简历", "简历四", "简历五"]
+
+    results = await asyncio.gather(*(packer.submit(parser, text) for text in texts), return_exceptions=True)
+
+    # 凑满份数上限立即发出，剩下的在等待窗口结束后发出
+    assert parser.batches == [texts[:3], texts[3:]]
+    assert results[0] == "结果:简历一" and results[4] == "结果:简历五"
+    assert isinstance(results[2], ValueError)
+    assert packer.get_status()["requests"] == 2
+    assert packer.get_status()["packed_items"] == 5
+
+async def test_batch_is_flushed_before_exceeding_token_budget(pack_settings, monkeypatch):
+    monkeypatch.setattr(settings, "LLM_PACK_TOKEN_BUDGET", 30)
+    packer = LLMRequestPacker()
+    parser = RecordingParser()
+    texts = ["甲" * 20, "乙" * 20, "丙" * 5]
+
+    await asyncio.gather(*(packer.submit(parser, text) for text in texts))
+
+    assert parser.batches == [texts[:1], texts[1:]]
+
+def test_long_text_is_not_packed(pack_settings, monkeypatch):
+    monkeypatch.setattr(settings, "LLM_PACK_MAX_ITEM_TOKENS", 10)
+    packer = LLMRequestPacker()
+
+    assert packer.accepts("短简历")
+    assert not packer.accepts("长" * 100)
+
+async def test_packed_output_is_split_by_index(parser, monkeypatch):
+    output = json.dumps({"resumes": [
+        {"index": 2, "name": "李四", "skills": ["Go"]},
+        {"index": 1, "name": "张三", "skills": ["Python"]},
+        {"index": 3}
+    ]}, ensure_ascii=False)
+
+    async def request_completion(messages, model, max_tokens, **options):
+        assert options["packed"]
+        # 各份简历带序号标记放在同一个请求中
+        assert "<<<简历 3>>>" in messages[1]["content"]
+        return output, "stop"
+
+    monkeypatch.setattr(parser, "_request_completion", request_completion)
+
+    stats = {}
+    results = await parser._extract_packed(["张三简历", "李四简历", "王五简历"], None, stats)
+
+    assert [result.name if result else None for result in results] == ["张三", "李四", None]
+    assert results[1].skills == ["Go"]
+    assert stats["json_complete"]
+
+async def test_truncated_packed_output_drops_last_result(parser, monkeypatch):
+    output = '{"resumes": [{"index": 1, "name": "张三"}, {"index": 2, "name": "李四", "skills": ["G'
+
+    async def request_completion(*args, **options):
+        return output, "length"
+
+    monkeypatch.setattr(parser, "_request_completion", request_completion)
+
+    results = await parser._extract_packed(["张三简历", "李四简历"], None, {})
+
+    # 截断时最后一份结果可能不完整，交给单独请求
+    assert results[0].name == "张三"
+    assert results[1] is None
+
+async def test_missing_packed_results_fall_back_to_single_requests(parser, monkeypatch):
+    async def extract_packed(texts, model, stats):
+        stats.update({"llm_tokens": 300, "llm_cost": 0.3, "llm_endpoint": "mock"})
+        return [ResumeInfo(name="张三"), None]
+
+    singles = []
+
+    async def parse_with_llm(text, stats, *args, **options):
+        singles.append(text)
+        return ResumeInfo(name="李四")
+
+    monkeypatch.setattr(settings, "LLM_FAST_MODEL", "")
+    monkeypatch.setattr(parser, "_extract_packed", extract_packed)
+    monkeypatch.setattr(parser, "_parse_with_llm", parse_with_llm)
+
+    stats_list = [{}, {}]
+    results = await parser.parse_packed(["张三简历", "李四简历"], stats_list)
+
+    assert [result.name for result in results] == ["张三", "李四"]
+    assert singles == ["李四简历"]
+    assert stats_list[1]["packed_fallback"] == "missing"
+    # 合并请求的用量按文本长度分摊，端点等共享统计复制到每份
+    assert stats_list[0]["llm_tokens"] + stats_list[1]["llm_tokens"] == 300
+    assert stats_list[0]["llm_endpoint"] == "mock" and stats_list[0]["packed"] == 2
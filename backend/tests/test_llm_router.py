@@ -0,0 +1,97 @@
+"""
+LLM路由测试：端点选择、负载和token预算，以及使用本地LLM替身服务（mock_llm_server.py）的故障转移
+"""
+import json
+import time
+
+import pytest
+
+from app.core.config import settings
+from app.services.llm_client import CircuitOpenError
+from app.services.llm_router import LLMEndpoint, LLMRouter, load_endpoints
+
+PAYLOAD = {"messages": [{"role": "user", "content": "解析简历"}], "max_tokens": 100}
+
+def test_select_prefers_least_outstanding_per_weight():
+    small = LLMEndpoint("small", "http://small", "m", weight=1)
+    large = LLMEndpoint("large", "http://large", "m", weight=3)
+    router = LLMRouter([small, large])
+
+    large.outstanding = 1
+    # (1+1)/3 < (0+1)/1：权重高的端点可以承担更多在途请求
+    assert router._select(router.endpoints, 100, set()).name == "large"
+    large.outstanding = 3
+    assert router._select(router.endpoints, 100, set()).name == "small"
+    assert router._select(router.endpoints, 100, {"small"}).name == "large"
+
+    # 负载相同时选延迟更低的端点
+    large.outstanding = 2
+    small.latency_ewma, large.latency_ewma = 1.5, 0.5
+    assert router._select(router.endpoints, 100, set()).name == "large"
+
+def test_full_endpoints_are_skipped():
+    capped = LLMEndpoint("capped", "http://capped", "m", max_concurrency=1)
+    budget = LLMEndpoint("budget", "http://budget", "m", tpm=1000)
+    router = LLMRouter([capped, budget])
+
+    capped.acquire(100)
+    budget.acquire(800)
+    now = time.monotonic()
+    assert not capped.has_capacity(100, now)
+    assert budget.has_capacity(200, now)
+    assert not budget.has_capacity(300, now)
+    assert router._select(router.endpoints, 300, set()) is None
+
+    # 窗口为空时超出预算的单个请求也放行
+    assert LLMEndpoint("empty", "http://empty", "m", tpm=1000).has_capacity(5000, now)
+
+def test_model_pool_and_endpoint_config():
+    endpoints = load_endpoints(json.dumps([
+        {"name": "fast", "url": "http://fast", "model": "fast-model", "weight": 2},
+        {"url": "http://main", "model": "main-model", "max_concurrency": 4}
+    ]))
+    router = LLMRouter(endpoints)
+
+    assert [endpoint.name for endpoint in endpoints] == ["fast", "endpoint-2"]
+    assert endpoints[1].max_concurrency == 4
+    assert [endpoint.name for endpoint in router._pool("fast-model")] == ["fast"]
+    # 没有端点配置该模型时由所有端点处理
+    assert len(router._pool("other-model")) == 2
+
+    fallback = load_endpoints('[{"name": "missing-url"}]')
+    assert [endpoint.name for endpoint in fallback] == ["default"]
+
+async def test_failover_to_healthy_endpoint(mock_llm_server):
+    # 故障端点权重更高，先被选中
+    router = LLMRouter([
+        LLMEndpoint("broken", mock_llm_server(error_rate=1), "mock-model", weight=2),
+        LLMEndpoint("healthy", mock_llm_server(), "mock-model")
+    ])
+
+    stats = {}
+    async with router.request(PAYLOAD, stats=stats) as response:
+        body = response.json()
+
+    assert stats["llm_failovers"] == 1
+    assert stats["llm_endpoint"] == "healthy"
+    assert json.loads(body["choices"][0]["message"]["content"])["name"] == "张三"
+    assert router.endpoints[0].failovers == 1
+    # 退出上下文后释放并发名额，只有成功的请求计入延迟
+    assert [endpoint.outstanding for endpoint in router.endpoints] == [0, 0]
+    assert router.endpoints[1].served == 1 and router.endpoints[0].served == 0
+
+async def test_no_available_endpoint_fails_fast_without_waiting(mock_llm_server, monkeypatch):
+    monkeypatch.setattr(settings, "LLM_BREAKER_FAILURE_THRESHOLD", 1)
+    monkeypatch.setattr(settings, "LLM_BREAKER_COOLDOWN", 60)
+    router = LLMRouter([LLMEndpoint("broken", mock_llm_server(error_rate=1), "mock-model")])
+
+    async with router.request(PAYLOAD, max_retries=0) as response:
+        assert response.status_code == 503
+    with pytest.raises(CircuitOpenError):
+        async with router.request(PAYLOAD, wait=False):
+            pass
+
+    status = router.get_status()[0]
+    assert status["state"] == "open"
+    assert status["requests"] == 1
+    assert status["outstanding"] == 0
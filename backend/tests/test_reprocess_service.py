@@ -0,0 +1,83 @@
+"""
+重新解析测试：按条件选出已保存提取文本的任务，基于保存的文本仅重跑LLM解析
+"""
+import uuid
+import pytest
+from datetime import datetime
+from app.core.config import settings
+from app.models.resume import TaskStatus, UploadTask
+from app.services.database_service import db_service
+from app.services.reprocess_service import ReprocessService
+from app.services.task_service import TaskService
+from database import upload_task_repo
+
+RESUME_TEXT = "张三\n电话：13800138000\n教育背景\n清华大学 计算机科学与技术 硕士 2018-2021"
+
+@pytest.fixture
+def service():
+    return ReprocessService()
+
+@pytest.fixture
+def window():
+    """本测试的任务都放在一个独立的创建时间段内，与其他测试的任务隔开"""
+    day = uuid.uuid4().int % 28 + 1
+    return {
+        "created_from": datetime(1990, 1, day),
+        "created_to": datetime(1990, 1, day, 23, 59)
+    }
+
+async def create_task(window, status: TaskStatus, text: str = RESUME_TEXT,
+                      llm_model: str = None, prompt_version: str = None) -> str:
+    task_id = str(uuid.uuid4())
+    await TaskService().create_task(UploadTask(id=task_id, filename="a.pdf", file_path=f"{task_id}.pdf", status=status))
+    upload_task_repo.connection.execute_update(
+        "UPDATE upload_tasks SET created_at = ? WHERE id = ?",
+        (window["created_from"].replace(hour=12).isoformat(), task_id)
+    )
+    if text is not None:
+        db_service.save_resume_text(task_id, text)
+    if llm_model:
+        db_service.update_task_llm_model(task_id, llm_model, prompt_version)
+    return task_id
+
+async def test_select_tasks_by_filters(service, window):
+    current = service.resume_service.parser.prompt.version
+    old_model = await create_task(window, TaskStatus.COMPLETED, llm_model="old-model", prompt_version=current)
+    up_to_date = await create_task(window, TaskStatus.COMPLETED, llm_model=settings.LLM_MODEL, prompt_version=current)
+    old_prompt = await create_task(window, TaskStatus.COMPLETED, llm_model=settings.LLM_MODEL, prompt_version="v0")
+    failed = await create_task(window, TaskStatus.FAILED)
+    # 没有保存文本或正在解析的任务不能仅重跑LLM
+    await create_task(window, TaskStatus.COMPLETED, text=None)
+    await create_task(window, TaskStatus.PARSING)
+
+    assert set(service.select_tasks(window)) == {old_model, up_to_date, old_prompt, failed}
+    assert service.select_tasks({**window, "failed_only": True}) == [failed]
+    assert service.select_tasks({**window, "llm_model": "old-model"}) == [old_model]
+    assert service.select_tasks({**window, "prompt_version": "v0"}) == [old_prompt]
+    assert set(service.select_tasks({**window, "outdated_only": True})) == {old_model, old_prompt, failed}
+    assert len(service.select_tasks(window, limit=2)) == 2
+    assert service.select_tasks({"created_from": "1980-01-01", "created_to": "1980-01-02"}) == []
+
+async def test_job_reparses_saved_text(service, window):
+    failed = await create_task(window, TaskStatus.FAILED)
+    await create_task(window, TaskStatus.COMPLETED, text=None)
+
+    job = service.create_job({**window, "failed_only": True}, concurrency=2)
+    assert job["total"] == 1 and "task_ids" not in job
+
+    finished = await service.run_job(job["job_id"])
+    assert (finished["status"], finished["succeeded"], finished["failed"]) == ("completed", 1, 0)
+
+    task = await TaskService().get_task(failed)
+    assert task.status == TaskStatus.COMPLETED
+    assert task.result is not None
+    assert task.prompt_version == service.resume_service.parser.prompt.version
+    assert task.parse_stats["tokens_after_compaction"] > 0
+
+async def test_saved_text_round_trip(window):
+    text = RESUME_TEXT * 50
+    task_id = await create_task(window, TaskStatus.COMPLETED, text=None)
+
+    assert db_service.save_resume_text(task_id, text)
+    assert db_service.get_resume_text(task_id) == text
+    assert db_service.get_resume_text("missing") is None
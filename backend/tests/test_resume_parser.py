@@ -0,0 +1,187 @@
+"""
+简历解析器测试：LLM请求的输出格式约束回退、模型级联的升级判断，以及使用本地LLM替身服务（mock_llm_server.py）的流式解析和截断续写
+"""
+import json
+from contextlib import asynccontextmanager
+
+import pytest
+
+import app.utils.resume_parser as resume_parser_module
+from app.core.config import settings
+from app.services.llm_router import LLMRouter
+from app.models.resume import ResumeInfo
+from app.utils.resume_parser import ResumeParser
+
+RESUME_TEXT = "张三\n电话：13800138000\n邮箱：zhangsan@example.com\n教育背景\n清华大学 计算机科学与技术 硕士"
+
+class FakeResponse:
+    def __init__(self, status_code: int, body: dict):
+        self.status_code = status_code
+        self.body = body
+        self.headers = {"Content-Type": "application/json"}
+
+    @property
+    def text(self) -> str:
+        return str(self.body)
+
+    def json(self):
+        return self.body
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+class FakeRouter:
+    """按顺序返回预设响应，记录每次请求的参数"""
+
+    def __init__(self, *responses: FakeResponse):
+        self.responses = list(responses)
+        self.payloads = []
+
+    @asynccontextmanager
+    async def request(self, payload, **kwargs):
+        self.payloads.append(payload)
+        yield self.responses.pop(0)
+
+class FakeSession:
+    async def before_send(self):
+        return None
+
+COMPLETION = {"choices": [{"message": {"content": '{"name": "张三"}'}, "finish_reason": "stop"}]}
+
+@pytest.fixture(scope="module")
+def parser():
+    return ResumeParser()
+
+async def test_unsupported_response_format_falls_back_for_that_call_only(parser, monkeypatch):
+    unsupported = {"error": {"message": "response_format json_object is not supported by this model"}}
+    router = FakeRouter(FakeResponse(400, unsupported), FakeResponse(200, COMPLETION))
+    monkeypatch.setattr(resume_parser_module, "llm_router", router)
+    monkeypatch.setattr(parser, "_response_format", {"type": "json_object"})
+    payload = {"messages": [], "response_format": {"type": "json_object"}}
+
+    text, finish_reason = await parser._send_completion(
+        payload, {"type": "json_object"}, False, None, {}, FakeSession()
+    )
+
+    assert (text, finish_reason) == ('{"name": "张三"}', "stop")
+    assert "response_format" in router.payloads[0]
+    assert "response_format" not in router.payloads[1]
+    # 只影响这一次请求，之后的请求仍然带约束
+    assert parser._response_format == {"type": "json_object"}
+    assert "response_format" in payload
+
+async def test_other_bad_requests_are_not_retried(parser, monkeypatch):
+    router = FakeRouter(FakeResponse(400, {"error": {"message": "max_tokens is too large"}}))
+    monkeypatch.setattr(resume_parser_module, "llm_router", router)
+
+    with pytest.raises(RuntimeError, match="HTTP 400"):
+        await parser._send_completion(
+            {"messages": [], "response_format": {"type": "json_object"}}, {"type": "json_object"},
+            False, None, {}, FakeSession()
+        )
+    assert len(router.payloads) == 1
+
+def use_mock_llm(monkeypatch, url: str):
+    """让解析器只使用替身服务端点"""
+    monkeypatch.setattr(settings, "LLM_ENDPOINTS", json.dumps([{"name": "mock", "url": url}]))
+    monkeypatch.setattr(settings, "LLM_STREAM_ENABLED", True)
+    monkeypatch.setattr(resume_parser_module, "llm_router", LLMRouter())
+
+async def test_streaming_parse_pushes_partial_results(parser, mock_llm_server, monkeypatch):
+    use_mock_llm(monkeypatch, mock_llm_server())
+    partials, stages = [], []
+
+    async def on_partial(partial):
+        partials.append(partial)
+
+    async def on_progress(stage, progress):
+        stages.append((stage, progress))
+
+    stats = {}
+    resume = await parser.parse_text(RESUME_TEXT, progress_callback=on_progress, stats=stats,
+                                     partial_callback=on_partial)
+
+    assert resume.name == "张三"
+    assert resume.contact.email == "zhangsan@example.com"
+    assert resume.education[0].institution == "清华大学"
+    assert stats["streamed"] and stats["json_complete"]
+    assert stats["llm_endpoint"] == "mock"
+    # 每读完一个顶层字段推送一次，先推送的部分结果中还没有后面的字段
+    assert len(partials) > 1
+    assert partials[0].name == "张三" and not partials[0].skills
+    assert partials[-1].skills == ["Python", "FastAPI", "SQLite"]
+    streaming = [progress for stage, progress in stages if stage == "llm_streaming"]
+    assert streaming == sorted(streaming)
+
+async def test_partial_conversion_error_skips_only_that_push(parser, mock_llm_server, monkeypatch):
+    use_mock_llm(monkeypatch, mock_llm_server())
+    convert = parser._convert_to_resume_info
+    calls = []
+
+    def flaky_convert(data):
+        calls.append(data)
+        if len(calls) == 1:
+            raise ValueError("字段类型不符")
+        return convert(data)
+
+    monkeypatch.setattr(parser, "_convert_to_resume_info", flaky_convert)
+    partials = []
+
+    async def on_partial(partial):
+        partials.append(partial)
+
+    resume = await parser.parse_text(RESUME_TEXT, stats={}, partial_callback=on_partial)
+
+    assert resume.name == "张三"
+    # 第一次推送被跳过，后续推送和最终结果不受影响
+    assert len(partials) == len(calls) - 2
+
+async def test_truncated_output_is_continued(parser, mock_llm_server, monkeypatch):
+    use_mock_llm(monkeypatch, mock_llm_server(truncate_at=120))
+    monkeypatch.setattr(settings, "LLM_MAX_CONTINUATIONS", 1)
+
+    stats = {}
+    resume = await parser.parse_text(RESUME_TEXT, stats=stats)
+
+    # 从断点续写，而不是整体重试或只保留截断前的字段
+    assert stats["continuations"] == 1
+    assert stats["finish_reason"] == "stop"
+    assert stats["json_complete"]
+    assert resume.name == "张三"
+    assert resume.skills == ["Python", "FastAPI", "SQLite"]
+
+async def test_truncated_output_without_continuation_keeps_complete_fields(parser, mock_llm_server, monkeypatch):
+    use_mock_llm(monkeypatch, mock_llm_server(truncate_at=120))
+    monkeypatch.setattr(settings, "LLM_MAX_CONTINUATIONS", 0)
+
+    stats = {}
+    resume = await parser.parse_text(RESUME_TEXT, stats=stats)
+
+    assert stats["finish_reason"] == "length"
+    assert not stats["json_complete"]
+    assert "truncated" in stats["json_repairs"]
+    assert resume.name == "张三"
+    assert not resume.skills
+
+@pytest.mark.parametrize("require_name, tiers", [(True, ["fast", "strong"]), (False, ["fast"])])
+async def test_cascade_escalates_on_missing_name_only_when_required(parser, monkeypatch, require_name, tiers):
+    monkeypatch.setattr(settings, "LLM_FAST_MODEL", "fast-model")
+    monkeypatch.setattr(settings, "LLM_ENDPOINTS", '[{"url": "http://unused"}]')
+    models = []
+
+    async def extract_with_model(messages, model, *args):
+        models.append(model)
+        return ResumeInfo(skills=["Python"])
+
+    monkeypatch.setattr(parser, "_extract_with_model", extract_with_model)
+
+    stats = {}
+    await parser._parse_with_llm("专业技能\nPython", stats, require_name=require_name)
+
+    assert models == ["fast-model", None][:len(tiers)]
+    assert stats["llm_tier"] == tiers[-1]
+    if require_name:
+        assert stats["cascade_escalations"] == [{"tier": "fast", "issues": ["缺少姓名"]}]
+    else:
+        assert "cascade_escalations" not in stats
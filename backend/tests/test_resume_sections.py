@@ -0,0 +1,88 @@
+"""
+简历分段测试：按段落标题切分、长简历分组并行解析、更新时只解析变化的段落并合并到原有结果
+"""
+from app.models.resume import ContactInfo, EducationInfo, ResumeInfo, WorkExperience
+from app.utils.resume_sections import (match_heading, merge_resume_info, merge_section_results, plan_incremental_parse,
+                                       plan_section_parse, split_sections)
+
+RESUME_TEXT = """张三
+电话：13800138000
+【教育背景】
+清华大学 计算机科学与技术 硕士
+二、工作经历：
+某科技公司 后端工程师
+技能：Python、FastAPI
+"""
+
+def test_match_heading():
+    assert match_heading("【教育背景】") == "education"
+    assert match_heading("二、工作经历：") == "experience"
+    assert match_heading("Technical Skills") == "skills"
+    assert match_heading("技能：Python、FastAPI") == "skills"
+    assert match_heading("负责简历解析服务中工作经历模块的开发与维护工作") is None
+
+def test_split_sections_by_headings():
+    sections = split_sections(RESUME_TEXT)
+
+    assert list(sections) == ["header", "education", "experience", "skills"]
+    assert sections["header"] == "张三\n电话：13800138000"
+    assert sections["skills"] == "技能：Python、FastAPI"
+
+def test_incremental_parse_only_changed_sections():
+    new_text = RESUME_TEXT.replace("技能：Python、FastAPI", "技能：Python、FastAPI、SQLite")
+    plan = plan_incremental_parse(RESUME_TEXT, new_text)
+
+    assert plan == {"changed": ["skills"], "removed": [], "text": "技能：Python、FastAPI、SQLite"}
+
+    previous = ResumeInfo(name="张三", contact=ContactInfo(phone="13800138000"), skills=["Python", "FastAPI"])
+    merged = merge_resume_info(previous, ResumeInfo(skills=["Python", "FastAPI", "SQLite"]), plan["changed"], plan["removed"])
+    assert merged.skills == ["Python", "FastAPI", "SQLite"]
+    assert merged.name == "张三"
+    assert merged.contact.phone == "13800138000"
+
+def test_removed_sections_are_cleared_and_whitespace_ignored():
+    new_text = RESUME_TEXT.replace("技能：Python、FastAPI\n", "").replace("某科技公司 后端工程师", "某科技公司  后端工程师")
+    plan = plan_incremental_parse(RESUME_TEXT, new_text)
+    assert plan["changed"] == [] and plan["removed"] == ["skills"]
+
+    merged = merge_resume_info(ResumeInfo(name="张三", skills=["Python"]), None, plan["changed"], plan["removed"])
+    assert merged.skills is None and merged.name == "张三"
+
+def test_header_update_keeps_missing_contact_fields():
+    previous = ResumeInfo(name="张三", contact=ContactInfo(phone="13800138000", email="old@example.com"))
+    partial = ResumeInfo(name=None, contact=ContactInfo(email="new@example.com"))
+
+    merged = merge_resume_info(previous, partial, ["header"], [])
+    assert merged.name == "张三"
+    assert (merged.contact.phone, merged.contact.email) == ("13800138000", "new@example.com")
+
+def test_mostly_changed_or_unstructured_text_needs_full_parse():
+    assert plan_incremental_parse(RESUME_TEXT, "完全不同的简历内容\n没有段落标题") is None
+    rewritten = "李四\n【教育背景】\n北京大学 数学 本科\n工作经历\n另一家公司 算法工程师\n技能：C++"
+    assert plan_incremental_parse(RESUME_TEXT, rewritten) is None
+
+def test_section_parse_plan_groups_sections():
+    groups = plan_section_parse(RESUME_TEXT)
+
+    # 开头、技能等短段落合并为一组，教育和工作经历各自一组
+    assert groups == {
+        "profile": "张三\n电话：13800138000\n\n技能：Python、FastAPI",
+        "education": "【教育背景】\n清华大学 计算机科学与技术 硕士",
+        "experience": "二、工作经历：\n某科技公司 后端工程师",
+    }
+    # 识别不出两个以上分组时不分段
+    assert plan_section_parse("张三\n电话：13800138000\n技能：Python") is None
+
+def test_merge_section_results_takes_each_field_from_its_group():
+    results = {
+        "profile": ResumeInfo(name="张三", skills=["Python"], education=[EducationInfo(institution="猜测的学校")]),
+        "education": ResumeInfo(name="误识别", education=[EducationInfo(institution="清华大学")]),
+        "experience": ResumeInfo(experience=[WorkExperience(company="某科技公司")]),
+    }
+    merged = merge_section_results(results)
+
+    assert merged.name == "张三"
+    assert merged.skills == ["Python"]
+    assert [entry.institution for entry in merged.education] == ["清华大学"]
+    assert merged.experience[0].company == "某科技公司"
+    assert merged.projects is None
@@ -0,0 +1,175 @@
+"""
+简历解析服务测试：增量解析只发送变化段落时的模型级联校验，相同文件并发解析的去重
+"""
+import asyncio
+import uuid
+
+import pytest
+
+from app.core.config import settings
+from app.models.resume import ResumeInfo, TaskStatus, UploadTask
+from app.services.database_service import db_service
+from app.services.resume_service import ParseSingleflight, ResumeService, parse_singleflight
+from app.services.task_service import TaskService
+
+HEADER = "张三\n电话：13800138000\n邮箱：zhangsan@example.com"
+EDUCATION = "教育背景\n清华大学 计算机科学与技术 硕士 2018-2021"
+SKILLS = "专业技能\nPython FastAPI SQLite Redis Docker Kubernetes"
+EXPERIENCE = "工作经历\n某科技公司 后端工程师 2021-至今\n负责简历解析服务的开发，设计异步任务调度和存储分层"
+
+@pytest.fixture(scope="module")
+def service():
+    return ResumeService()
+
+async def create_task(status: TaskStatus, **fields) -> UploadTask:
+    task = UploadTask(id=str(uuid.uuid4()), filename="a.pdf", file_path="a.pdf", status=status, **fields)
+    await TaskService().create_task(task)
+    return task
+
+@pytest.mark.parametrize("new_header, require_name", [
+    (HEADER, False),
+    (HEADER.replace("13800138000", "13900139000"), True),
+])
+async def test_incremental_parse_requires_name_only_when_header_changed(service, monkeypatch,
+                                                                         new_header, require_name):
+    monkeypatch.setattr(settings, "INCREMENTAL_PARSE_ENABLED", True)
+    previous_text = "\n\n".join([HEADER, EDUCATION, SKILLS, EXPERIENCE])
+    new_text = "\n\n".join([new_header, EDUCATION, SKILLS.replace("Redis", "Redis Kafka"), EXPERIENCE])
+    previous = await create_task(TaskStatus.COMPLETED, file_hash="old",
+                                 result=ResumeInfo(name="张三", skills=["Python"]))
+    db_service.save_resume_text(previous.id, previous_text)
+    task = await create_task(TaskStatus.PARSING, file_hash="new")
+    calls = []
+
+    async def extract_task_text(_task):
+        return new_text
+
+    async def call_llm(_task, text, fallback_available, **options):
+        calls.append((text, options))
+        return ResumeInfo(skills=["Python", "Kafka"])
+
+    monkeypatch.setattr(service, "_extract_task_text", extract_task_text)
+    monkeypatch.setattr(service, "_call_llm", call_llm)
+
+    result = await service._parse_update_file(task, previous)
+
+    [(sent_text, options)] = calls
+    assert "专业技能" in sent_text and "工作经历" not in sent_text
+    # 开头部分（姓名所在）没有变化时，发送的段落中没有姓名不算解析结果有问题
+    assert options["require_name"] is require_name
+    assert result.name == "张三"
+    assert result.skills == ["Python", "Kafka"]
+
+async def test_singleflight_coalesces_concurrent_parses():
+    singleflight = ParseSingleflight()
+    release = asyncio.Event()
+    calls = []
+
+    async def parse():
+        calls.append(1)
+        await release.wait()
+        return ResumeInfo(name="张三")
+
+    leader = asyncio.create_task(singleflight.run("hash:v1", "leader", parse))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(singleflight.run("hash:v1", "follower", parse))
+    await asyncio.sleep(0)
+    assert singleflight.followers_of("leader") == ["follower"]
+
+    release.set()
+    (leader_result, leader_source), (follower_result, follower_source) = await asyncio.gather(leader, follower)
+
+    assert len(calls) == 1
+    assert leader_source is None and follower_source == "leader"
+    assert leader_result.name == follower_result.name == "张三"
+    assert singleflight.get_status() == {"in_flight": 0, "executed": 1, "coalesced": 1}
+    assert singleflight.followers_of("leader") == []
+
+async def test_cancelled_follower_does_not_affect_leader():
+    singleflight = ParseSingleflight()
+    release = asyncio.Event()
+
+    async def parse():
+        await release.wait()
+        return ResumeInfo(name="张三")
+
+    leader = asyncio.create_task(singleflight.run("hash:v1", "leader", parse))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(singleflight.run("hash:v1", "follower", parse))
+    await asyncio.sleep(0)
+    follower.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await follower
+
+    release.set()
+    assert (await leader)[0].name == "张三"
+
+async def test_follower_takes_over_when_leader_is_cancelled(service, monkeypatch):
+    file_hash = uuid.uuid4().hex
+    leader = await create_task(TaskStatus.UPLOADED, file_hash=file_hash)
+    follower = await create_task(TaskStatus.UPLOADED, file_hash=file_hash)
+    started = asyncio.Event()
+    parsed = []
+
+    async def parse_task_file(task, bulk=False):
+        parsed.append(task.id)
+        if task.id == leader.id:
+            started.set()
+            await asyncio.Event().wait()
+        return ResumeInfo(name="张三")
+
+    monkeypatch.setattr(service, "_parse_task_file", parse_task_file)
+
+    leader_run = asyncio.create_task(service.process_resume(leader.id))
+    await started.wait()
+    follower_run = asyncio.create_task(service.process_resume(follower.id))
+    await asyncio.sleep(0.05)
+    assert parse_singleflight.followers_of(leader.id) == [follower.id]
+
+    leader_run.cancel()
+    await follower_run
+
+    # 等待方没有随执行方一起被取消而停在解析中，而是自己完成了解析
+    assert parsed == [leader.id, follower.id]
+    task = db_service.get_task(follower.id)
+    assert task.status == TaskStatus.COMPLETED
+    assert task.result.name == "张三"
+
+async def test_leader_progress_and_partials_are_forwarded_to_followers(service, monkeypatch):
+    file_hash = uuid.uuid4().hex
+    leader = await create_task(TaskStatus.UPLOADED, file_hash=file_hash)
+    follower = await create_task(TaskStatus.UPLOADED, file_hash=file_hash)
+    joined = asyncio.Event()
+    progress, partials = [], []
+
+    async def report_progress(task_id, stage, value):
+        progress.append((task_id, stage, value))
+        return True
+
+    async def report_partial_result(task_id, partial, source):
+        partials.append((task_id, partial.name, source))
+        return True
+
+    async def parse_task_file(task, bulk=False):
+        await joined.wait()
+        await service._progress_reporter(task.id)("llm_streaming", 60)
+        await service._report_partial(task.id, ResumeInfo(name="张三"), source="llm")
+        return ResumeInfo(name="张三")
+
+    monkeypatch.setattr(service.task_service, "report_progress", report_progress)
+    monkeypatch.setattr(service.task_service, "report_partial_result", report_partial_result)
+    monkeypatch.setattr(service, "_parse_task_file", parse_task_file)
+
+    leader_run = asyncio.create_task(service._parse_task_file_once(leader))
+    await asyncio.sleep(0)
+    follower_run = asyncio.create_task(service._parse_task_file_once(follower))
+    await asyncio.sleep(0.05)
+    joined.set()
+    await asyncio.gather(leader_run, follower_run)
+
+    # 等待方先收到等待状态，之后的进度和部分结果由执行方转发
+    assert (follower.id, "waiting_duplicate", 10) in progress
+    assert (leader.id, "llm_streaming", 60) in progress
+    assert (follower.id, "llm_streaming", 60) in progress
+    assert partials == [(leader.id, "张三", "llm"), (follower.id, "张三", "llm")]
+    assert db_service.get_task(follower.id).parse_stats["coalesced_with"] == leader.id
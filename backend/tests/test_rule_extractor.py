@@ -0,0 +1,53 @@
+"""
+规则提取测试：联系方式、姓名、教育经历，以及对LLM输出的校验修正
+"""
+from app.models.resume import ContactInfo, EducationInfo, ResumeInfo
+from app.utils.rule_extractor import (
+    apply_rules, extract_education, extract_rules, has_rule_data, normalize_phone
+)
+
+RESUME_TEXT = """个人简历
+姓名：张三
+电话：+86 138-0013-8000  邮箱：ZhangSan@Example.com
+教育背景
+2018-2021 清华大学 计算机科学与技术 硕士
+2014-2018 某某理工学院 软件工程 本科
+"""
+
+def test_extract_contact_name_and_education():
+    rules = extract_rules(RESUME_TEXT)
+
+    assert rules.name == "张三"
+    assert rules.contact.phone == "13800138000"
+    assert rules.contact.email == "zhangsan@example.com"
+    # 按毕业年份倒序
+    assert [item.institution for item in rules.education] == ["清华大学", "某某理工学院"]
+    assert (rules.education[0].start_year, rules.education[0].end_year) == ("2018", "2021")
+    assert has_rule_data(rules)
+    assert not has_rule_data(extract_rules("没有可识别字段的文本"))
+
+def test_known_school_names_take_precedence():
+    # 词典中的学校名称优先于“xx大学”模式，避免把前缀的城市名等并入学校名称
+    education = extract_education("就读于北京师范大学 教育学 学士\n2012 2016")
+    assert education[0].institution == "北京师范大学"
+    assert education[0].degree is not None
+    assert (education[0].start_year, education[0].end_year) == ("2012", "2016")
+
+def test_normalize_phone():
+    assert normalize_phone("+86 138 0013 8000") == "13800138000"
+    assert normalize_phone("010-12345678") is None
+
+def test_apply_rules_replaces_values_not_in_text():
+    llm_result = ResumeInfo(
+        name=None,
+        contact=ContactInfo(phone="13900000000", email=None),
+        education=[EducationInfo(institution="清华大学", degree=None, start_year="2018", end_year="2022")]
+    )
+    fixed = apply_rules(llm_result, extract_rules(RESUME_TEXT), RESUME_TEXT)
+
+    # 原文中没有的手机号和年份视为模型臆造
+    assert fixed.contact.phone == "13800138000"
+    assert fixed.contact.email == "zhangsan@example.com"
+    assert fixed.education[0].end_year == "2021"
+    assert fixed.education[0].degree == extract_rules(RESUME_TEXT).education[0].degree
+    assert fixed.name == "张三"
@@ -0,0 +1,106 @@
+"""
+S3存储后端测试：使用 moto 模拟的S3服务（本地替身，不访问网络）验证上传、分段读取、
+刷新修改时间、删除和分页列举
+"""
+import io
+import os
+import uuid
+import pytest
+from fastapi import UploadFile
+from starlette.requests import Request
+
+moto = pytest.importorskip("moto")
+boto3 = pytest.importorskip("boto3")
+
+from app.services.file_service import FileService
+from app.services.storage_backend import S3StorageBackend
+from app.utils.file_response import build_storage_response
+
+BUCKET = "resumes"
+
+@pytest.fixture
+def backend(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    with moto.mock_aws():
+        boto3.client("s3", region_name="us-east-1").create_bucket(Bucket=BUCKET)
+        yield S3StorageBackend(BUCKET, prefix="uploads/", region="us-east-1")
+
+def write_source(tmp_path, content: bytes) -> str:
+    path = tmp_path / f"{uuid.uuid4()}.part"
+    path.write_bytes(content)
+    return str(path)
+
+async def read_stream(stream) -> bytes:
+    return b"".join([chunk async for chunk in stream])
+
+async def test_put_stat_stream_and_delete(backend, tmp_path):
+    content = bytes(range(256)) * 10
+    source = write_source(tmp_path, content)
+
+    await backend.put("blobs/ab/abc.pdf", source)
+
+    # 上传后删除本地临时文件，对象按前缀保存
+    assert not os.path.exists(source)
+    head = backend.client.head_object(Bucket=BUCKET, Key="uploads/blobs/ab/abc.pdf")
+    assert head["ContentLength"] == len(content)
+    assert (await backend.stat("blobs/ab/abc.pdf"))["size"] == len(content)
+    assert await backend.get("blobs/ab/abc.pdf") == content
+    assert await read_stream(backend.stream("blobs/ab/abc.pdf", 100, 199)) == content[100:200]
+    assert await read_stream(backend.stream("blobs/ab/abc.pdf", 2500)) == content[2500:]
+
+    assert await backend.delete("blobs/ab/abc.pdf")
+    assert not await backend.exists("blobs/ab/abc.pdf")
+    assert await backend.stat("blobs/ab/abc.pdf") is None
+
+async def test_touch_replaces_object_metadata(backend, tmp_path):
+    await backend.put("blobs/ab/abc.pdf", write_source(tmp_path, b"%PDF-1.4"))
+
+    await backend.touch("blobs/ab/abc.pdf")
+
+    head = backend.client.head_object(Bucket=BUCKET, Key="uploads/blobs/ab/abc.pdf")
+    assert "touched-at" in head["Metadata"]
+    assert await backend.get("blobs/ab/abc.pdf") == b"%PDF-1.4"
+    # 对象不存在时只记录日志
+    await backend.touch("blobs/missing.pdf")
+
+async def test_iter_objects_follows_pagination(backend, tmp_path, monkeypatch):
+    for index in range(5):
+        await backend.put(f"blobs/{index:02d}/{index}.pdf", write_source(tmp_path, b"x" * (index + 1)))
+    await backend.put("other/readme.txt", write_source(tmp_path, b"other"))
+
+    pages = []
+    list_objects = backend.client.list_objects_v2
+
+    def list_two_per_page(**params):
+        pages.append(params.get("ContinuationToken"))
+        return list_objects(MaxKeys=2, **params)
+
+    monkeypatch.setattr(backend.client, "list_objects_v2", list_two_per_page)
+
+    objects = [item async for item in backend.iter_objects("blobs/")]
+    assert [item["key"] for item in objects] == [f"blobs/{index:02d}/{index}.pdf" for index in range(5)]
+    assert [item["size"] for item in objects] == [1, 2, 3, 4, 5]
+    assert len(pages) == 3 and pages[0] is None and all(pages[1:])
+
+    assert len([item async for item in backend.iter_objects()]) == 6
+
+async def test_file_service_dedup_and_ranged_download(backend):
+    file_service = FileService(storage=backend)
+    content = b"%PDF-1.4\n" + uuid.uuid4().bytes * 100
+
+    first = await file_service.save_upload_file(UploadFile(file=io.BytesIO(content), filename="a.pdf"), "a")
+    second = await file_service.save_upload_file(UploadFile(file=io.BytesIO(content), filename="b.pdf"), "b")
+    assert first["file_path"] == second["file_path"]
+    assert second["deduplicated"]
+
+    request = Request({"type": "http", "method": "GET", "path": "/", "headers": [(b"range", b"bytes=9-24")]})
+    response = await build_storage_response(
+        request, backend, first["file_path"], "application/pdf", content_hash=first["file_hash"]
+    )
+    assert response.status_code == 206
+    assert response.headers["content-range"] == f"bytes 9-24/{len(content)}"
+    assert await read_stream(response.body_iterator) == content[9:25]
+
+    assert await file_service.release_file(first["file_path"])
+    assert await build_storage_response(request, backend, first["file_path"], "application/pdf") is None
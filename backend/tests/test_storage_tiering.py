@@ -0,0 +1,80 @@
+"""
+冷文件分层压缩测试：压缩后更新任务的存储编码并能透明解压读取，收益不足时原样保留，解析中的文件不处理
+"""
+import io
+import os
+import uuid
+import pytest
+from fastapi import UploadFile
+from starlette.requests import Request
+
+pytest.importorskip("zstandard")
+
+from app.models.resume import TaskStatus, UploadTask
+from app.services.file_service import FileService
+from app.services.storage_tiering_service import StorageTieringService
+from app.services.task_service import TaskService
+from app.utils.compression import CODEC_IDENTITY, CODEC_ZSTD, ZSTD_SUFFIX
+from app.utils.file_response import build_storage_response
+from database import upload_task_repo
+
+async def create_cold_task(content: bytes, status: TaskStatus = TaskStatus.COMPLETED) -> str:
+    task_id = str(uuid.uuid4())
+    saved = await FileService().save_upload_file(UploadFile(file=io.BytesIO(content), filename="a.pdf"), task_id)
+    await TaskService().create_task(UploadTask(
+        id=task_id, filename="a.pdf", file_path=saved["file_path"], file_size=saved["file_size"],
+        file_type="application/pdf", file_hash=saved["file_hash"], status=status
+    ))
+    upload_task_repo.connection.execute_update(
+        "UPDATE upload_tasks SET created_at = datetime('now', '-60 days') WHERE id = ?", (task_id,)
+    )
+    return task_id
+
+async def test_cold_file_is_compressed_and_read_back():
+    content = b"%PDF-1.4\n" + f"Zhang San {uuid.uuid4()} backend engineer\n".encode() * 500
+    task_id = await create_cold_task(content)
+    original_path = (await TaskService().get_task(task_id)).file_path
+
+    stats = await StorageTieringService().run()
+
+    task = await TaskService().get_task(task_id)
+    assert stats["compressed"] >= 1
+    assert task.storage_codec == CODEC_ZSTD
+    assert task.file_path == original_path + ZSTD_SUFFIX
+    assert task.stored_size < len(content) // 10
+    file_service = FileService()
+    assert not await file_service.file_exists(original_path)
+
+    # 读取和下载时透明解压
+    assert await file_service.read_file(task.file_path, task.storage_codec) == content
+    assert file_service.source_extension(task.file_path) == ".pdf"
+    response = await build_storage_response(
+        Request({"type": "http", "method": "GET", "path": "/", "headers": [(b"range", b"bytes=0-9")]}),
+        file_service.storage, task.file_path, "application/pdf",
+        content_hash=task.file_hash, codec=task.storage_codec, original_size=task.file_size
+    )
+    # 压缩存储的文件不支持 Range，返回完整内容
+    assert response.status_code == 200
+    assert response.headers["content-length"] == str(len(content))
+    assert b"".join([chunk async for chunk in response.body_iterator]) == content
+
+    await TaskService().delete_task(task_id)
+    assert not await file_service.file_exists(task.file_path)
+
+async def test_incompressible_file_is_marked_identity():
+    task_id = await create_cold_task(b"%PDF-1.4\n" + os.urandom(64 * 1024))
+    original_path = (await TaskService().get_task(task_id)).file_path
+
+    await StorageTieringService().run()
+
+    task = await TaskService().get_task(task_id)
+    assert task.storage_codec == CODEC_IDENTITY
+    assert task.file_path == original_path
+    assert await FileService().file_exists(original_path)
+
+async def test_file_in_parsing_is_not_tiered():
+    task_id = await create_cold_task(b"%PDF-1.4\n" + b"repeated line\n" * 1000, TaskStatus.PARSING)
+
+    await StorageTieringService().run()
+
+    assert (await TaskService().get_task(task_id)).storage_codec is None
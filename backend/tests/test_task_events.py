@@ -0,0 +1,96 @@
+"""
+任务事件推送测试：订阅队列溢出、跨线程发布，以及 SSE 事件流的快照、心跳和结束事件
+"""
+import json
+import uuid
+import asyncio
+import threading
+from app.api.api_v1.endpoints.tasks import _task_event_stream
+from app.core.config import settings
+from app.models.resume import TaskStatus, UploadTask
+from app.services.task_events import TaskEventBroker, task_event_broker
+from app.services.task_service import TaskService
+
+class FakeRequest:
+    """只提供 is_disconnected 的请求替身"""
+
+    def __init__(self):
+        self.disconnected = False
+
+    async def is_disconnected(self) -> bool:
+        return self.disconnected
+
+def parse_sse(chunk: str):
+    """解析一条SSE消息，返回 (事件名, 数据)；注释行返回 (None, 注释)"""
+    if chunk.startswith(":"):
+        return None, chunk.strip(": \n")
+    fields = dict(line.split(": ", 1) for line in chunk.strip().split("\n"))
+    return fields.get("event"), json.loads(fields["data"]) if "data" in fields else None
+
+async def create_task(status: TaskStatus = TaskStatus.UPLOADED) -> str:
+    task_id = str(uuid.uuid4())
+    await TaskService().create_task(UploadTask(
+        id=task_id, filename="resume.pdf", file_path=f"{task_id}.pdf", status=status
+    ))
+    return task_id
+
+async def test_slow_subscriber_drops_oldest_events():
+    broker = TaskEventBroker()
+    subscription = broker.subscribe(["task"])
+
+    for index in range(TaskEventBroker.MAX_QUEUE_SIZE + 5):
+        broker.publish("task", "status", {"progress": index})
+
+    assert subscription.queue.qsize() == TaskEventBroker.MAX_QUEUE_SIZE
+    first = await subscription.get(timeout=1)
+    assert first["data"]["progress"] == 5
+    subscription.close()
+    assert broker.subscriber_count() == 0
+
+async def test_publish_from_worker_thread():
+    broker = TaskEventBroker()
+    subscription = broker.subscribe(["task", "task"])
+    assert subscription.task_ids == ["task"]
+
+    # 解析线程中发布的事件经 call_soon_threadsafe 投递到订阅者的事件循环
+    thread = threading.Thread(target=broker.publish, args=("task", "progress", {"stage": "ocr"}))
+    thread.start()
+    thread.join()
+
+    message = await subscription.get(timeout=1)
+    assert message["event"] == "progress"
+    assert message["data"]["task_id"] == "task" and message["data"]["stage"] == "ocr"
+    assert broker.subscriber_count("other") == 0
+    subscription.close()
+
+async def test_event_stream_snapshot_heartbeat_and_end(monkeypatch):
+    monkeypatch.setattr(settings, "SSE_HEARTBEAT_INTERVAL", 0.05)
+    task_id = await create_task()
+    stream = _task_event_stream(FakeRequest(), [task_id, "missing"])
+
+    assert (await anext(stream)).startswith("retry:")
+    # 生成器已订阅，快照之前发布的事件也不会丢失
+    task_event_broker.publish(task_id, "status", {"status": "parsing", "stage": "llm", "progress": 40})
+
+    event, data = parse_sse(await anext(stream))
+    assert event == "status" and data["status"] == TaskStatus.UPLOADED.value
+    event, data = parse_sse(await anext(stream))
+    assert event == "error" and data["task_id"] == "missing"
+    event, data = parse_sse(await anext(stream))
+    assert event == "status" and data["stage"] == "llm"
+
+    assert parse_sse(await anext(stream)) == (None, "keep-alive")
+
+    await TaskService().update_task_status(task_id, TaskStatus.FAILED, error="解析失败")
+    event, data = parse_sse(await anext(stream))
+    assert event == "status" and data["status"] == TaskStatus.FAILED.value
+    event, data = parse_sse(await anext(stream))
+    assert event == "end" and data["task_ids"] == [task_id, "missing"]
+    assert [chunk async for chunk in stream] == []
+    assert task_event_broker.subscriber_count(task_id) == 0
+
+async def test_event_stream_ends_immediately_for_finished_tasks():
+    task_id = await create_task(TaskStatus.COMPLETED)
+    chunks = [chunk async for chunk in _task_event_stream(FakeRequest(), [task_id])]
+
+    assert [parse_sse(chunk)[0] for chunk in chunks[1:]] == ["status", "end"]
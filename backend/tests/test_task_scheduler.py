@@ -0,0 +1,113 @@
+"""
+解析任务调度测试：通道加权公平调度、interactive 保留工作协程、按成本类别分池
+"""
+import asyncio
+
+import pytest
+
+from app.services.task_scheduler import (
+    LANE_BULK, LANE_INTERACTIVE, POOL_OCR, POOL_TEXT, ScheduledJob, TaskScheduler, WorkerPool, parse_lane_weights
+)
+
+async def wait_until(condition, timeout: float = 2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "等待超时"
+        await asyncio.sleep(0.01)
+
+def test_parse_lane_weights():
+    assert parse_lane_weights("interactive:4,bulk:0.5") == {LANE_INTERACTIVE: 4.0, LANE_BULK: 0.5}
+    # 未配置、无效或未知的通道使用默认权重
+    assert parse_lane_weights("interactive:abc,urgent:9") == {LANE_INTERACTIVE: 1.0, LANE_BULK: 1.0}
+    assert parse_lane_weights("bulk:0")[LANE_BULK] == 0.01
+
+async def test_lanes_share_workers_by_weight():
+    pool = WorkerPool(POOL_TEXT, workers=1, reserved=0, weights={LANE_INTERACTIVE: 4, LANE_BULK: 1})
+    order = []
+
+    async def job(lane):
+        order.append(lane)
+
+    # 工作协程在第一次让出事件循环后才开始执行，两个通道都已积压
+    for _ in range(20):
+        pool.submit(ScheduledJob(LANE_BULK, job, (LANE_BULK,), {}))
+        pool.submit(ScheduledJob(LANE_INTERACTIVE, job, (LANE_INTERACTIVE,), {}))
+    await wait_until(lambda: len(order) == 40)
+
+    # 两个通道都有积压时按 4:1 交替执行，bulk 不会被饿死
+    assert order[:10].count(LANE_INTERACTIVE) == 8
+    assert order[:10].count(LANE_BULK) == 2
+    status = pool.get_status()
+    assert status["lanes"][LANE_BULK]["completed"] == 20
+    assert status["lanes"][LANE_INTERACTIVE]["queued"] == 0
+
+async def test_idle_lane_does_not_bank_credit():
+    pool = WorkerPool(POOL_TEXT, workers=1, reserved=0, weights={LANE_INTERACTIVE: 1, LANE_BULK: 1})
+    order = []
+
+    async def job(lane):
+        order.append(lane)
+
+    for _ in range(10):
+        pool.submit(ScheduledJob(LANE_BULK, job, (LANE_BULK,), {}))
+    await wait_until(lambda: len(order) == 10)
+
+    # interactive 空闲期间 bulk 执行了10个任务，interactive 重新排队时不能用空闲期间的额度连续抢占
+    for _ in range(4):
+        pool.submit(ScheduledJob(LANE_BULK, job, (LANE_BULK,), {}))
+        pool.submit(ScheduledJob(LANE_INTERACTIVE, job, (LANE_INTERACTIVE,), {}))
+    await wait_until(lambda: len(order) == 18)
+
+    assert order[10:].count(LANE_INTERACTIVE) == 4
+    assert LANE_BULK in order[10:14]
+
+async def test_reserved_worker_runs_interactive_during_bulk_backlog():
+    pool = WorkerPool(POOL_TEXT, workers=2, reserved=1)
+    release = asyncio.Event()
+    interactive_done = asyncio.Event()
+    running = []
+
+    async def bulk_job():
+        running.append(LANE_BULK)
+        await release.wait()
+
+    async def interactive_job():
+        interactive_done.set()
+
+    for _ in range(5):
+        pool.submit(ScheduledJob(LANE_BULK, bulk_job, (), {}))
+    await asyncio.sleep(0.05)
+    pool.submit(ScheduledJob(LANE_INTERACTIVE, interactive_job, (), {}))
+    await asyncio.wait_for(interactive_done.wait(), timeout=1)
+
+    # bulk 只占用非保留的工作协程，interactive 不必等待 bulk 积压
+    assert pool.reserved == 1
+    assert len(running) == 1
+    release.set()
+    await wait_until(lambda: len(running) == 5)
+
+def test_reserved_workers_leave_one_for_bulk():
+    assert WorkerPool(POOL_OCR, workers=1, reserved=3).reserved == 0
+    assert WorkerPool(POOL_TEXT, workers=3, reserved=5).reserved == 2
+
+async def test_scheduler_routes_jobs_by_pool():
+    scheduler = TaskScheduler(text_workers=1, ocr_workers=1)
+    done = []
+
+    async def job(name):
+        done.append(name)
+
+    scheduler.submit(LANE_BULK, job, "scan", pool=POOL_OCR)
+    scheduler.submit(LANE_INTERACTIVE, job, "pdf", pool=POOL_TEXT)
+    # 探测失败或未探测的任务交给文本工作池
+    scheduler.submit(LANE_INTERACTIVE, job, "unknown")
+    await wait_until(lambda: len(done) == 3)
+
+    status = scheduler.get_status()
+    assert status[POOL_OCR]["lanes"][LANE_BULK]["completed"] == 1
+    assert status[POOL_TEXT]["lanes"][LANE_INTERACTIVE]["completed"] == 2
+    assert scheduler.workers == 2
+
+def test_unknown_lane_is_rejected():
+    with pytest.raises(ValueError):
+        TaskScheduler(text_workers=1, ocr_workers=1).submit("urgent", lambda: None)
@@ -0,0 +1,63 @@
+"""
+批量任务状态测试：按 changed_since 只返回状态有变化的任务，以及批次聚合进度
+"""
+import uuid
+import pytest
+from datetime import datetime, timedelta, timezone
+from fastapi import HTTPException
+from app.api.api_v1.endpoints.tasks import get_batch_progress, get_task_statuses
+from app.models.resume import TaskStatus, TaskStatusQuery, UploadTask
+from app.services.task_service import TaskService
+from database import upload_task_repo
+
+async def create_task(batch_id: str = None) -> str:
+    task_id = str(uuid.uuid4())
+    await TaskService().create_task(UploadTask(
+        id=task_id, filename="resume.pdf", file_path=f"{task_id}.pdf", batch_id=batch_id
+    ))
+    return task_id
+
+def backdate_status_change(task_id: str):
+    upload_task_repo.connection.execute_update(
+        "UPDATE upload_tasks SET status_changed_at = datetime('now', '-1 hour') WHERE id = ?", (task_id,)
+    )
+
+async def test_changed_since_returns_only_status_changes():
+    idle, downloaded, progressed = [await create_task() for _ in range(3)]
+    for task_id in (idle, downloaded, progressed):
+        backdate_status_change(task_id)
+    since = datetime.now(timezone.utc) - timedelta(minutes=1)
+
+    # 下载计数等非状态写入不算变化
+    upload_task_repo.record_download(downloaded)
+    await TaskService().update_task_status(progressed, TaskStatus.PARSING, progress=40)
+
+    response = await get_task_statuses(TaskStatusQuery(
+        task_ids=[idle, downloaded, progressed, "missing"], changed_since=since
+    ))
+    assert [item.task_id for item in response.tasks] == [progressed]
+    assert response.tasks[0].status == TaskStatus.PARSING.value
+    assert response.tasks[0].progress == 40
+    assert response.missing == ["missing"]
+    assert response.server_time.endswith("Z")
+
+    # 不带 changed_since 时返回全部
+    response = await get_task_statuses(TaskStatusQuery(task_ids=[idle, downloaded, progressed]))
+    assert {item.task_id for item in response.tasks} == {idle, downloaded, progressed}
+
+async def test_batch_progress():
+    batch_id = str(uuid.uuid4())
+    first, second, third = [await create_task(batch_id) for _ in range(3)]
+    task_service = TaskService()
+    await task_service.update_task_status(first, TaskStatus.COMPLETED, progress=100)
+    await task_service.update_task_status(second, TaskStatus.FAILED, error="解析失败")
+    await task_service.update_task_status(third, TaskStatus.PARSING, progress=50)
+
+    progress = await get_batch_progress(batch_id)
+    assert (progress.total, progress.completed, progress.failed, progress.parsing) == (3, 1, 1, 1)
+    assert progress.progress == pytest.approx(250 / 3, abs=0.1)
+    assert not progress.finished
+
+    with pytest.raises(HTTPException) as error:
+        await get_batch_progress("missing")
+    assert error.value.status_code == 404
@@ -0,0 +1,88 @@
+"""
+LLM输入文本压缩测试：多页简历的页眉页脚、页码、OCR噪声和重复行
+"""
+from app.utils.text_compactor import TRUNCATED_MARKER, compact_text
+
+MULTI_PAGE_RESUME = """张三 | 个人简历
+电话：13800138000  邮箱：zhangsan@example.com
+技能
+C
+R
+Python
+·
+工作经历
+2018.07-2020.06
+某科技公司   后端工程师
+负责简历解析服务的开发与维护
+负责简历解析服务的开发与维护
+第1页/共2页
+\f张三 | 个人简历
+电话：13800138000  邮箱：zhangsan@example.com
+2020.07-2023.06
+另一家公司   高级工程师
+负责简历解析服务的开发与维护
+年龄
+28
+- 2 -
+"""
+
+def test_multi_page_resume():
+    lines = compact_text(MULTI_PAGE_RESUME).split("\n")
+
+    # 页眉只保留第一次出现，页码去掉
+    assert lines.count("张三 | 个人简历") == 1
+    assert not any("第1页" in line or line == "- 2 -" for line in lines)
+
+    # 第二页顶部的时间行与第一页的时间行不同，不能当作页眉去掉
+    assert "2018.07-2020.06" in lines
+    assert "2020.07-2023.06" in lines
+
+    # 含联系方式的行不参与页眉去重
+    assert lines.count("电话：13800138000 邮箱：zhangsan@example.com") == 2
+
+    # 单字母技能和正文中的数字保留，孤立符号去掉
+    assert "C" in lines and "R" in lines
+    assert "28" in lines
+    assert "·" not in lines
+
+    # 相邻的重复行去掉，不同经历下相同的职责描述保留；多余空白合并
+    assert lines.count("负责简历解析服务的开发与维护") == 2
+    assert "某科技公司 后端工程师" in lines
+
+def test_repeated_lines_under_different_jobs_are_kept():
+    text = (
+        "A公司 后端工程师\n技术栈：Python、FastAPI、PostgreSQL、Redis\n负责核心接口开发\n"
+        "B公司 后端工程师\n技术栈：Python、FastAPI、PostgreSQL、Redis\n负责核心接口开发"
+    )
+    assert compact_text(text) == text
+
+def test_identical_date_lines_are_kept():
+    text = "工作经历\n2020.07-2023.06\nA公司\n项目经历\n2020.07-2023.06\n简历解析平台"
+    assert compact_text(text).count("2020.07-2023.06") == 2
+
+def test_page_banners_and_bare_page_numbers():
+    text = "===== 第 1 页 =====\n张三\n教育背景\n1\n===== 第 2 页 =====\n工作经历\nA公司\n2"
+    assert compact_text(text) == "张三\n教育背景\n工作经历\nA公司"
+
+def test_truncates_at_line_boundary():
+    text = "\n".join(f"第{index}段经历的详细描述内容" for index in range(100))
+    compacted = compact_text(text, max_chars=200)
+
+    assert compacted.endswith(TRUNCATED_MARKER)
+    body = compacted[:-len(TRUNCATED_MARKER) - 1]
+    assert len(body) <= 200
+    assert body.split("\n")[-1].endswith("详细描述内容")
+
+def test_footer_at_same_position_is_removed():
+    pages = [
+        "\n".join([f"{company} 后端工程师"] + [f"{company}项目{item}" for item in range(index)]
+                  + ["负责核心接口开发"] + [f"{company}成果{item}" for item in range(8 - index)]
+                  + [f"张三的简历 第{index}页"])
+        for index, company in enumerate(["A公司", "B公司", "C公司"], 3)
+    ]
+    lines = compact_text("\f".join(pages)).split("\n")
+
+    # 页脚只保留第一次出现；不同页面正文中相同的职责描述保留
+    assert lines.count("张三的简历 第3页") == 1
+    assert not any(line.startswith(("张三的简历 第4页", "张三的简历 第5页")) for line in lines)
+    assert lines.count("负责核心接口开发") == 3
@@ -0,0 +1,61 @@
+"""
+流式上传写入测试：边写边计算哈希、超过大小限制时提前中止、文件头与扩展名不符时拒绝，失败时不留下临时文件
+"""
+import io
+import os
+import glob
+import uuid
+import hashlib
+import pytest
+from fastapi import UploadFile
+from app.core.config import settings
+from app.services.file_service import CHUNK_SIZE, FileService, FileValidationError
+
+class CountingReader(io.BytesIO):
+    """记录被读取了多少字节的上传流"""
+
+    def __init__(self, content: bytes):
+        super().__init__(content)
+        self.bytes_read = 0
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = super().read(size)
+        self.bytes_read += len(chunk)
+        return chunk
+
+def partial_files() -> list:
+    return glob.glob(os.path.join(settings.UPLOAD_DIR, ".*.part"))
+
+async def test_save_hashes_while_streaming():
+    content = b"%PDF-1.4\n" + uuid.uuid4().bytes * (CHUNK_SIZE // 8)
+    file_service = FileService()
+
+    saved = await file_service.save_upload_file(UploadFile(file=io.BytesIO(content), filename="a.PDF"), "task")
+    await file_service.release_file(saved["file_path"])
+
+    assert saved["file_size"] == len(content)
+    assert saved["file_hash"] == hashlib.sha256(content).hexdigest()
+    assert saved["file_path"].endswith(f"{saved['file_hash']}.pdf")
+    assert saved["detected_type"] == "application/pdf"
+    assert partial_files() == []
+
+async def test_oversize_upload_stops_early(monkeypatch):
+    monkeypatch.setattr(settings, "MAX_FILE_SIZE", CHUNK_SIZE * 2)
+    reader = CountingReader(b"%PDF-1.4\n" + b"0" * CHUNK_SIZE * 10)
+
+    with pytest.raises(FileValidationError):
+        await FileService().save_upload_file(UploadFile(file=reader, filename="big.pdf"), str(uuid.uuid4()))
+
+    # 超限后立即中止，不读完整个上传流
+    assert reader.bytes_read <= CHUNK_SIZE * 3
+    assert partial_files() == []
+
+@pytest.mark.parametrize("content, filename", [
+    (b"\x89PNG\r\n\x1a\n fake pdf", "a.pdf"),
+    (b"%PDF-1.4 fake docx", "a.docx"),
+    (b"", "a.pdf"),
+])
+async def test_rejects_mismatched_or_empty_content(content, filename):
+    with pytest.raises(FileValidationError):
+        await FileService().save_upload_file(UploadFile(file=io.BytesIO(content), filename=filename), str(uuid.uuid4()))
+    assert partial_files() == []
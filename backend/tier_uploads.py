@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+冷文件分层压缩脚本
+压缩上传已久且从未被下载的简历文件（zstd），并输出节省空间报告
+
+用法:
+    python tier_uploads.py                 # 执行一轮压缩
+    python tier_uploads.py --dry-run       # 仅评估压缩收益，不做任何修改
+    python tier_uploads.py --report        # 仅输出存储分层报告
+"""
+
+import sys
+import asyncio
+import argparse
+
+from app.core.config import settings
+from app.services.database_service import db_service
+from app.services.storage_tiering_service import storage_tiering_service
+
+def format_mb(size: int) -> str:
+    """格式化为MB"""
+    return f"{size / (1024 * 1024):.2f} MB"
+
+def print_report():
+    """输出存储分层报告"""
+    report = storage_tiering_service.get_report()
+    print("\n📦 存储分层报告")
+    print("-" * 40)
+    for codec, item in sorted(report["codecs"].items()):
+        print(f"  {codec:<10} 文件 {item['files']:>6}  原始 {format_mb(item['original_bytes']):>12}  "
+              f"存储 {format_mb(item['stored_bytes']):>12}")
+    print("-" * 40)
+    print(f"  原始总大小: {format_mb(report['original_bytes'])}")
+    print(f"  实际存储:   {format_mb(report['stored_bytes'])}")
+    print(f"  累计节省:   {format_mb(report['bytes_saved'])}")
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="冷文件分层压缩")
+    parser.add_argument("--dry-run", action="store_true", help="仅评估压缩收益，不做任何修改")
+    parser.add_argument("--max-files", type=int, default=None, help="本次最多处理的文件数")
+    parser.add_argument("--report", action="store_true", help="仅输出存储分层报告")
+    args = parser.parse_args()
+
+    print("🦝 JianLi Tanuki 冷文件分层压缩")
+    print("=" * 40)
+
+    db_service.init_database()
+
+    if args.report:
+        print_report()
+        return True
+
+    print(f"冷文件条件: 上传超过 {settings.TIERING_MIN_AGE_DAYS} 天且从未下载")
+    if args.dry_run:
+        print("（试运行模式，不会修改任何文件）")
+
+    stats = asyncio.run(storage_tiering_service.run(dry_run=args.dry_run, max_files=args.max_files))
+
+    print("\n" + "=" * 40)
+    print(f"  扫描文件: {stats['scanned']}")
+    print(f"  {'可压缩' if args.dry_run else '已压缩'}: {stats['compressed']}")
+    print(f"  收益不足: {stats['skipped']}")
+    print(f"  处理失败: {stats['failed']}")
+    print(f"  {'预计节省' if args.dry_run else '本次节省'}: {format_mb(stats['bytes_saved'])}")
+
+    if not args.dry_run:
+        print_report()
+
+    return stats["failed"] == 0
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -200,168 +200,144 @@ const UploadResumeModal: React.FC<UploadResumeModalProps> = ({
             message.success(`${fileList.length} 个文件上传成功，正在后台解析中...`);
 
             // 开始监控解析状态
-            onParsingStart?.();
-            startParsingMonitoring(results);
-
-            resetState();
-            onSuccess?.();
-            onClose();
-        } catch (error) {
-            console.error('上传失败:', error);
-            message.error('上传失败，请重试');
-        } finally {
-            setUploading(false);
-        }
-    };
-
-    // 处理重复确认 - 创建新记录
-    const handleCreateNew = async () => {
-        if (!pendingFile) return;
-
-        setDuplicateModalVisible(false);
-        setUploading(true);
-
-        const progressList: UploadProgress[] = [{
-            file: pendingFile,
-            progress: 0,
-            status: 'uploading'
-        }];
-        setUploadProgress(progressList);
-
-        try {
-            const result = await uploadSingleFile(pendingFile, 0, true);
-
-            message.success('文件上传成功，正在后台解析中...');
-            onParsingStart?.();
-            startParsingMonitoring([result]);
-
-            resetState();
-            onSuccess?.();
-            onClose();
-        } catch (error) {
-            console.error('上传失败:', error);
-            message.error('上传失败，请重试');
-        } finally {
-            setUploading(false);
-        }
-    };
-
-    // 处理重复确认 - 更新已存在的候选人
-    const handleUpdateExisting = async () => {
-        if (!pendingFile || !selectedDuplicateId) {
-            message.warning('请选择要更新的候选人');
-            return;
-        }
-
-        setDuplicateModalVisible(false);
-        setUploading(true);
-
-        try {
-            const result = await updateExistingCandidate(selectedDuplicateId, pendingFile);
-
-            message.success('简历更新成功，正在后台解析中...');
-            onParsingStart?.();
-            startParsingMonitoring([result]);
-
-            resetState();
-            onSuccess?.();
-            onClose();
-        } catch (error) {
-            console.error('更新失败:', error);
-            message.error('更新失败，请重试');
-        } finally {
-            setUploading(false);
-        }
-    };
-
-    // 开始监控解析状态
     const startParsingMonitoring = (uploadResults: any[]) => {
-        const taskIds = uploadResults.map(result => result.task_id);
+        const taskIds: string[] = uploadResults.map(result => result.task_id);
         const fileNames = uploadResults.map(result => result.fileName || '未知文件');
         const totalFiles = taskIds.length;
-        let completedFiles = 0;
         const completedCandidates: { id: string; name: string; fileName: string }[] = [];
+        let finished = false;
+        let checkInterval: ReturnType<typeof setInterval> | null = null;
+        let eventSource: EventSource | null = null;
+
+        const stopMonitoring = () => {
+            finished = true;
+            if (checkInterval) {
+                clearInterval(checkInterval);
+                checkInterval = null;
+            }
+            if (eventSource) {
+                eventSource.close();
+                eventSource = null;
+            }
+        };
 
-        // 每5秒检查一次解析状态
-        const checkInterval = setInterval(async () => {
-            try {
-                const results = await Promise.all(
-                    taskIds.map(async (taskId, index) => {
-                        try {
-                            const candidate = await apiService.getCandidate(taskId);
-                            if (candidate) {
-                                // 检查是否已经记录过
-                                if (!completedCandidates.find(c => c.id === taskId)) {
-                                    completedCandidates.push({
-                                        id: taskId,
-                                        name: candidate.name || '未知候选人',
-                                        fileName: fileNames[index]
-                                    });
-                                }
-                                return true;
-                            }
-                            return false;
-                        } catch (error) {
-                            return false;
-                        }
-                    })
-                );
-
-                const newCompletedCount = results.filter(completed => completed).length;
-
-                // 如果有新的文件解析完成，显示通知
-                if (newCompletedCount > completedFiles) {
-                    const newlyCompleted = completedCandidates.slice(completedFiles);
-                    newlyCompleted.forEach(candidate => {
-                        showParsingCompleteNotification(candidate);
-                    });
-                    completedFiles = newCompletedCount;
-                }
+        // 记录解析完成的任务，并在全部完成时显示汇总通知
+        const markCompleted = (taskId: string, name?: string) => {
+            if (finished || completedCandidates.find(c => c.id === taskId)) {
+                return;
+            }
+            const candidate = {
+                id: taskId,
+                name: name || '未知候选人',
+                fileName: fileNames[taskIds.indexOf(taskId)]
+            };
+            completedCandidates.push(candidate);
+            showParsingCompleteNotification(candidate);
+
+            if (completedCandidates.length === totalFiles) {
+                stopMonitoring();
+
+                // 显示汇总通知
+                notification.success({
+                    message: '简历解析完成',
+                    description: (
+                        <div>
+                            <p>所有 {totalFiles} 个简历已解析完成！</p>
+                            <Button
+                                type="link"
+                                size="small"
+                                icon={<EyeOutlined />}
+                                onClick={() => navigate('/candidates')}
+                                style={{ padding: 0 }}
+                            >
+                                查看候选人列表
+                            </Button>
+                        </div>
+                    ),
+                    duration: 10,
+                    placement: 'topRight'
+                });
 
-                // 如果所有文件都解析完成，停止监控
-                if (completedFiles === totalFiles) {
-                    clearInterval(checkInterval);
-
-                    // 显示汇总通知
-                    notification.success({
-                        message: '简历解析完成',
-                        description: (
-                            <div>
-                                <p>所有 {totalFiles} 个简历已解析完成！</p>
-                                <Button
-                                    type="link"
-                                    size="small"
-                                    icon={<EyeOutlined />}
-                                    onClick={() => navigate('/candidates')}
-                                    style={{ padding: 0 }}
-                                >
-                                    查看候选人列表
-                                </Button>
-                            </div>
-                        ),
-                        duration: 10,
-                        placement: 'topRight'
-                    });
-
-                    // 尝试显示浏览器通知
-                    showBrowserNotification(`简历解析完成`, `所有 ${totalFiles} 个简历已解析完成，请查看候选人列表。`);
-
-                    // 静默刷新候选人列表
-                    onSuccess?.();
-                    onParsingComplete?.();
-                }
-            } catch (error) {
-                console.error('监控解析状态失败:', error);
+                // 尝试显示浏览器通知
+                showBrowserNotification(`简历解析完成`, `所有 ${totalFiles} 个简历已解析完成，请查看候选人列表。`);
+
+                // 静默刷新候选人列表
+                onSuccess?.();
+                onParsingComplete?.();
             }
-        }, 5000);
+        };
+
+        // 轮询方式（SSE不可用时的后备方案），每5秒批量检查一次解析状态
+        let changedSince: string | undefined;
+        const startPolling = () => {
+            if (finished || checkInterval) {
+                return;
+            }
+            checkInterval = setInterval(async () => {
+                const pendingIds = taskIds.filter(taskId => !completedCandidates.find(c => c.id === taskId));
+                if (pendingIds.length === 0) {
+                    return;
+                }
+                try {
+                    const statusResult = await apiService.getTaskStatuses(pendingIds, changedSince);
+                    changedSince = statusResult.server_time;
+
+                    // 只为新完成的任务获取候选人姓名
+                    await Promise.all(
+                        statusResult.tasks
+                            .filter(task => task.status === 'completed')
+                            .map(async (task) => {
+                                const candidate = await apiService.getCandidate(task.task_id);
+                                markCompleted(task.task_id, candidate?.name);
+                            })
+                    );
+                } catch (error) {
+                    console.error('监控解析状态失败:', error);
+                }
+            }, 5000);
+        };
+
+        // 优先使用服务端推送的任务事件流
+        if (typeof EventSource !== 'undefined') {
+            eventSource = new EventSource(apiService.getTaskEventsUrl(taskIds));
+            eventSource.addEventListener('status', (event) => {
+                try {
+                    const data = JSON.parse((event as MessageEvent).data);
+                    if (data.status === 'completed') {
+                        markCompleted(data.task_id, data.result?.name);
+                    }
+                } catch (error) {
+                    console.error('解析任务事件失败:', error);
+                }
+            });
+            eventSource.addEventListener('end', () => {
+                eventSource?.close();
+                eventSource = null;
+                // 失败的任务不会完成，剩余任务交给轮询兜底
+                if (!finished && completedCandidates.length < totalFiles) {
+                    startPolling();
+                }
+            });
+            eventSource.onerror = () => {
+                // 事件流中断时回退到轮询
+                eventSource?.close();
+                eventSource = null;
+                startPolling();
+            };
+        } else {
+            startPolling();
+        }
 
         // 30分钟后停止监控
         setTimeout(() => {
-            clearInterval(checkInterval);
-            if (completedFiles < totalFiles) {
+            if (finished) {
+                return;
+            }
+            stopMonitoring();
+            if (completedCandidates.length < totalFiles) {
                 notification.warning({
                     message: '解析超时',
-                    description: `已完成 ${completedFiles}/${totalFiles} 个文件的解析`,
+                    description: `已完成 ${completedCandidates.length}/${totalFiles} 个文件的解析`,
                     duration: 10
                 });
             }
@@ -145,6 +145,22 @@ export interface RegisterRequest {
     phone?: string;
 }
 
+export interface TaskStatusItem {
+    task_id: string;
+    status: string;
+    progress: number;
+    error?: string;
+    created_at?: string;
+    updated_at?: string;
+    completed_at?: string;
+}
+
+export interface TaskStatusBatchResponse {
+    tasks: TaskStatusItem[];
+    missing: string[];
+    server_time: string;
+}
+
 class ApiService {
     /**
      * 获取所有任务（候选人）
@@ -189,6 +205,36 @@ class ApiService {
         }
     }
 
+    /**
+     * 批量获取任务状态
+     */
+    async getTaskStatuses(taskIds: string[], changedSince?: string): Promise<TaskStatusBatchResponse> {
+        const response = await fetch(`${API_BASE_URL}/tasks/status`, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({
+                task_ids: taskIds,
+                changed_since: changedSince,
+            }),
+        });
+
+        if (!response.ok) {
+            throw new Error('批量获取任务状态失败');
+        }
+
+        return await response.json();
+    }
+
+    /**
+     * 获取任务事件流（SSE）地址
+     */
+    getTaskEventsUrl(taskIds: string[]): string {
+        const params = new URLSearchParams({ task_ids: taskIds.join(',') });
+        return `${API_BASE_URL}/tasks/events?${params}`;
+    }
+
     /**
      * 将任务转换为候选人格式
      */